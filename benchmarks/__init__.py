@@ -0,0 +1,9 @@
+""" End-to-end benchmarks of phytebyte, on synthetic ChEMBL- & FooDB-shaped
+databases of fixed sizes (see `datasets.DATASETS`):
+
+    python -m benchmarks run small -o results.json
+    python -m benchmarks compare benchmarks/baselines/small.json results.json
+
+Each stage of the pipeline (see `pipeline.STAGES`) is timed separately, so a
+regression points at the stage that caused it.
+"""
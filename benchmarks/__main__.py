@@ -0,0 +1,182 @@
+""" The benchmark runner:
+
+    python -m benchmarks run DATASET [-o RESULTS] [--repeat N] [--memory]
+                                     [--data-dir DIR] [--model MODEL]
+                                     [--fingerprinter FP] [--trace TRACE]
+                                     [--start-method METHOD]
+    python -m benchmarks compare BASELINE RESULTS [--tolerance FRACTION]
+                                                  [--min-delta DELTA]
+    python -m benchmarks imports [-o RESULTS] [--repeat N]
+
+`compare` exits with status 1 if any stage (or the total time) regressed,
+and `imports` if an entry point imported a heavy dependency (see
+`imports.HEAVY_MODULES`).
+"""
+import argparse
+import logging
+import os
+import sys
+from typing import List
+
+from .compare import (
+    DEFAULT_TOLERANCE, METRICS, IncomparableResults, compare_results,
+    results_metric, total_comparison)
+from .datasets import DATASETS
+from .runner import read_results, write_results
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main(argv: List[str]=None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not hasattr(args, 'func'):
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(title='commands')
+
+    run = commands.add_parser(
+        'run', help="Time each stage of the pipeline on a fixed-size, "
+                    "synthetic dataset")
+    run.add_argument('dataset', choices=list(DATASETS))
+    run.add_argument(
+        '-o', '--output',
+        help="Results file (defaults to results/DATASET.json, or "
+             "results/DATASET-memory.json, under the benchmarks dir)")
+    run.add_argument('--repeat', type=int, default=3,
+                     help="Runs of the pipeline; medians are compared")
+    run.add_argument(
+        '--memory', action='store_true',
+        help="Record the peak memory (RSS of this process & its workers, "
+             "and traced Python allocations) of each stage, instead of its "
+             "time")
+    run.add_argument(
+        '--data-dir', default=os.path.join(BENCHMARKS_DIR, 'data'),
+        help="Where the synthetic databases are generated (once)")
+    run.add_argument('--model', default='Random Forest')
+    run.add_argument('--fingerprinter', default='daylight')
+    run.add_argument(
+        '--trace',
+        help="Also write a Chrome trace of the runs (see phytebyte.tracing)")
+    run.add_argument(
+        '--start-method', choices=['fork', 'forkserver', 'spawn'],
+        help="How pool workers are started (see phytebyte.parallel)")
+    run.set_defaults(func=run_command)
+
+    compare = commands.add_parser(
+        'compare', help="Flag the stages that regressed against a baseline")
+    compare.add_argument(
+        'baseline', help="i.e. benchmarks/baselines/DATASET.json")
+    compare.add_argument('results')
+    compare.add_argument(
+        '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+        help="Fraction a stage may slow down by (default: %(default)s)")
+    compare.add_argument(
+        '--min-delta', type=float,
+        help="Seconds (or bytes) a stage may grow by, regardless of "
+             f"--tolerance (default: {METRICS['time'].min_delta}s, or "
+             f"{METRICS['memory'].min_delta} bytes)")
+    compare.set_defaults(func=compare_command)
+
+    imports = commands.add_parser(
+        'imports', help="Time the import of each entry point of phytebyte, "
+                        "in a fresh interpreter")
+    imports.add_argument(
+        '-o', '--output',
+        help="Results file (defaults to results/imports.json under the "
+             "benchmarks dir), to compare like those of `run`")
+    imports.add_argument('--repeat', type=int, default=5)
+    imports.set_defaults(func=imports_command)
+    return parser
+
+
+def run_command(args) -> int:
+    from phytebyte.parallel import set_start_method
+    from phytebyte.tracing import disable_tracing, enable_tracing
+    from .memory import RssSampler
+    from .runner import run_benchmark
+    suffix = "-memory" if args.memory else ""
+    output = args.output or os.path.join(BENCHMARKS_DIR, 'results',
+                                         f"{args.dataset}{suffix}.json")
+    if args.memory and not RssSampler.is_supported():
+        print("RSS can't be sampled on this platform (no /proc): only "
+              "Python allocations are recorded", file=sys.stderr)
+    if args.trace:
+        enable_tracing()
+    if args.start_method:
+        set_start_method(args.start_method)
+    results = run_benchmark(DATASETS[args.dataset], args.data_dir,
+                            repeat=args.repeat, memory=args.memory,
+                            model_type=args.model,
+                            fingerprinter_name=args.fingerprinter)
+    write_results(results, output)
+    if args.trace:
+        disable_tracing().write(args.trace)
+    metric = results_metric(results)
+    for stage, stats in results["stages"].items():
+        print(f"{stage:<20} {_format(stats[metric.key], metric.unit):>12}")
+    print(f"Results written to '{output}'.")
+    return 0
+
+
+def compare_command(args) -> int:
+    results = read_results(args.results)
+    try:
+        comparisons = compare_results(
+            read_results(args.baseline), results, args.tolerance,
+            args.min_delta)
+    except IncomparableResults as e:
+        print(e, file=sys.stderr)
+        return 2
+    metric = results_metric(results)
+    if metric is METRICS["time"]:
+        comparisons.append(total_comparison(
+            comparisons, args.tolerance,
+            metric.min_delta if args.min_delta is None else args.min_delta))
+    print(f"{'stage':<20} {'baseline':>12} {'result':>12} {'ratio':>7}")
+    for comparison in comparisons:
+        flag = "  REGRESSED" if comparison.regressed else ""
+        print(f"{comparison.stage:<20} "
+              f"{_format(comparison.baseline, metric.unit):>12} "
+              f"{_format(comparison.result, metric.unit):>12} "
+              f"{comparison.ratio:>6.2f}x{flag}")
+    regressions = [c.stage for c in comparisons if c.regressed]
+    if regressions:
+        print(f"Regressed beyond {args.tolerance:.0%}: "
+              f"{', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def imports_command(args) -> int:
+    from .imports import HEAVY_MODULES, heavy_imports, run_import_benchmark
+    output = args.output or os.path.join(BENCHMARKS_DIR, 'results',
+                                         "imports.json")
+    results = run_import_benchmark(args.repeat)
+    write_results(results, output)
+    for name, stats in results["stages"].items():
+        heavy = ", ".join(stats["heavy_modules"])
+        print(f"{name:<20} {_format(stats['median_s'], 's'):>12}  {heavy}")
+    print(f"Results written to '{output}'.")
+    heavy = heavy_imports(results)
+    if heavy:
+        print(f"Imported heavy dependencies ({', '.join(HEAVY_MODULES)}): "
+              f"{', '.join(heavy)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _format(value: float, unit: str) -> str:
+    if unit == "bytes":
+        return f"{value / 1024 ** 2:.1f}MB"
+    return f"{value:.3f}s"
+
+
+if __name__ == '__main__':
+    sys.exit(main())
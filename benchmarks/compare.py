@@ -0,0 +1,84 @@
+from collections import namedtuple
+from typing import Dict, List
+
+DEFAULT_TOLERANCE = .2
+
+# The measure of each stage that is compared, per kind of results, and how
+# much it may grow by regardless of `tolerance` (the timings of sub-second
+# stages are mostly noise, as is RSS within an allocator's arena or two)
+Metric = namedtuple("Metric", ["key", "unit", "min_delta"])
+METRICS = {
+    "time": Metric("median_s", "s", .05),
+    "memory": Metric("peak_total_rss_bytes", "bytes", 16 * 1024 ** 2)}
+
+StageComparison = namedtuple("StageComparison", [
+    "stage",
+    "baseline",
+    "result",
+    "ratio",
+    "regressed"])
+
+
+class IncomparableResults(Exception):
+    pass
+
+
+def results_metric(results: Dict) -> Metric:
+    # Results stored before memory profiling existed are all timings
+    return METRICS[results.get("kind", "time")]
+
+
+def compare_results(baseline: Dict,
+                    results: Dict,
+                    tolerance: float=DEFAULT_TOLERANCE,
+                    min_delta: float=None) -> List[StageComparison]:
+    """ Compares the metric of each stage of `results` (its median time, or
+    its peak memory; see `METRICS`) with the stored `baseline` (both as
+    written by `write_results()`).
+
+    A stage has regressed if its metric grew by more than `tolerance` (a
+    fraction) since `baseline`, and by more than `min_delta` (defaults to
+    the metric's). Stages absent from either side (i.e. added since the
+    baseline was stored) are skipped.
+    """
+    if baseline["dataset"] != results["dataset"]:
+        raise IncomparableResults(
+            f"Dataset {results['dataset']} differs from the baseline's "
+            f"{baseline['dataset']}")
+    metric = results_metric(results)
+    if results_metric(baseline) != metric:
+        raise IncomparableResults(
+            f"Can't compare {results.get('kind', 'time')} results with a "
+            f"{baseline.get('kind', 'time')} baseline")
+    if min_delta is None:
+        min_delta = metric.min_delta
+    comparisons = []
+    for stage, stats in results["stages"].items():
+        baseline_stats = baseline["stages"].get(stage)
+        if baseline_stats is None:
+            continue
+        comparisons.append(_compare(stage, baseline_stats[metric.key],
+                                    stats[metric.key], tolerance,
+                                    min_delta))
+    return comparisons
+
+
+def total_comparison(comparisons: List[StageComparison],
+                     tolerance: float=DEFAULT_TOLERANCE,
+                     min_delta: float=METRICS["time"].min_delta
+                     ) -> StageComparison:
+    """ The sum of the stages of `comparisons`, held to the same
+    `tolerance` (so many small slowdowns still add up to a regression).
+    Only meaningful for timings: peaks don't add up.
+    """
+    baseline = sum(comparison.baseline for comparison in comparisons)
+    result = sum(comparison.result for comparison in comparisons)
+    return _compare("total", baseline, result, tolerance, min_delta)
+
+
+def _compare(stage, baseline, result, tolerance, min_delta
+             ) -> StageComparison:
+    ratio = result / baseline if baseline > 0 else float('inf')
+    regressed = (result > baseline * (1 + tolerance) and
+                 result - baseline > min_delta)
+    return StageComparison(stage, baseline, result, ratio, regressed)
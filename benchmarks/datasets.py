@@ -0,0 +1,69 @@
+import logging
+import os
+from collections import namedtuple
+from typing import Dict
+
+from phytebyte.db import get_engine
+from phytebyte.synthetic import generate_chembl_db, generate_foodb_db
+
+logger = logging.getLogger(__name__)
+
+# Sizes are fixed, so timings of the same dataset are comparable across runs.
+# With the synthetic activity mix, ~0.3% of ChEMBL compounds are positives of
+# each gene target.
+Dataset = namedtuple("Dataset", [
+    "name",
+    "num_compounds",
+    "num_food_compounds",
+    "gene_targets",
+    "bioactivity_type",
+    "neg_sample_size_factor",
+    "seed"])
+
+DATASETS = {dataset.name: dataset for dataset in [
+    Dataset("small", 10000, 5000, ["PPARG"], "agonist", 10, 0),
+    Dataset("medium", 100000, 25000, ["PPARG"], "agonist", 10, 0),
+    # ~ the number of compounds in ChEMBL 25 & FooDB
+    Dataset("large", 1000000, 70000, ["PPARG"], "agonist", 100, 0)]}
+
+
+def get_dataset(name: str) -> Dataset:
+    dataset = DATASETS.get(name)
+    if dataset is None:
+        raise ValueError(f"Unknown dataset '{name}'"
+                         f" (choices: {list(DATASETS)})")
+    return dataset
+
+
+def prepare_dataset(dataset: Dataset, data_dir: str) -> Dict[str, str]:
+    """ Generates the synthetic databases of `dataset` into `data_dir`,
+    unless a previous run already did.
+
+    Returns: The URLs of the databases, keyed by 'chembl' & 'foodb'.
+    """
+    dataset_dir = os.path.join(data_dir, _dirname(dataset))
+    db_urls = {}
+    for name, generate, num_compounds in [
+            ('chembl', generate_chembl_db, dataset.num_compounds),
+            ('foodb', generate_foodb_db, dataset.num_food_compounds)]:
+        db_path = os.path.abspath(os.path.join(dataset_dir, f"{name}.db"))
+        db_urls[name] = f"sqlite:///{db_path}"
+        if os.path.exists(db_path):
+            continue
+        logger.info(f"Generating '{db_path}'.")
+        os.makedirs(dataset_dir, exist_ok=True)
+        tmp_path = db_path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        tmp_url = f"sqlite:///{tmp_path}"
+        generate(tmp_url, num_compounds, seed=dataset.seed)
+        get_engine(tmp_url).dispose()
+        os.rename(tmp_path, db_path)
+    return db_urls
+
+
+def _dirname(dataset: Dataset) -> str:
+    # Keyed by size & seed (not just name), so resized datasets regenerate
+    return (f"{dataset.name}-{dataset.num_compounds}-"
+            f"{dataset.num_food_compounds}-{dataset.seed}")
+
@@ -0,0 +1,88 @@
+""" Import-time benchmark: how long each entry point of phytebyte takes to
+import in a fresh interpreter (as a CLI invocation, or a spawned worker,
+does), and which heavy dependencies it pulls in.
+
+The results are timings of the `imports` pseudo-dataset, so they're
+compared against a baseline like those of the pipeline.
+"""
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import OrderedDict
+from typing import Dict, List
+
+from .runner import environment
+
+# Entry point -> the statement importing it
+IMPORTS = OrderedDict([
+    ("phytebyte", "import phytebyte"),
+    ("cli", "import phytebyte.cli"),
+    ("scoring", "from phytebyte import PhyteByte"),
+    ("fingerprinting",
+     "from phytebyte.fingerprinters import Fingerprinter"),
+    ("negative_sampling",
+     "from phytebyte.bioactive_cmpd.negative_samplers import "
+     "NegativeSampler"),
+    ("models", "from phytebyte.modeling.models import BinaryClassifierModel"),
+])
+
+# Dependencies whose import costs (hundreds of) milliseconds
+HEAVY_MODULES = ["sklearn", "scipy", "sqlalchemy", "pybel", "openbabel"]
+
+_MEASURE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+heavy = sorted({{name.partition('.')[0] for name in sys.modules}} &
+               set({heavy_modules!r}))
+print(json.dumps({{"seconds": seconds, "heavy_modules": heavy}}))
+"""
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(statement: str) -> Dict:
+    """ Runs `statement` in a fresh interpreter.
+
+    Returns: Its `seconds`, and the `heavy_modules` it imported.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT_DIR] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    output = subprocess.check_output(
+        [sys.executable, "-c", _MEASURE.format(
+            statement=statement, heavy_modules=HEAVY_MODULES)],
+        env=env, cwd=ROOT_DIR, universal_newlines=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_import_benchmark(repeat: int=5,
+                         imports: Dict[str, str]=IMPORTS) -> Dict:
+    """ Measures each of `imports` `repeat` times.
+
+    Returns: The results, as written by `write_results()`.
+    """
+    stages = OrderedDict()
+    for name, statement in imports.items():
+        measurements = [measure_import(statement) for _ in range(repeat)]
+        seconds = [measurement["seconds"] for measurement in measurements]
+        stages[name] = {"median_s": statistics.median(seconds),
+                        "min_s": min(seconds),
+                        "heavy_modules": measurements[0]["heavy_modules"]}
+    return {"kind": "time",
+            "dataset": {"name": "imports"},
+            "options": {},
+            "repeat": repeat,
+            "created": datetime.datetime.now().isoformat(timespec='seconds'),
+            "environment": environment(),
+            "stages": stages}
+
+
+def heavy_imports(results: Dict) -> List[str]:
+    """ The entry points of `results` that imported heavy dependencies. """
+    return [name for name, stats in results["stages"].items()
+            if stats["heavy_modules"]]
@@ -0,0 +1,180 @@
+""" Per-stage memory profiling: the peak RSS of this process & its worker
+processes (sampled from /proc, so Linux only), and the Python allocations
+made by this process (traced by `tracemalloc`).
+
+`tracemalloc` slows allocation-heavy code down severalfold, so memory is
+profiled in runs of its own (`python -m benchmarks run --memory`), never
+while timing.
+"""
+import os
+import threading
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# Whether a stage is being profiled: workers forked meanwhile stop tracing
+# allocations (which they'd inherit), as their memory is measured by RSS
+_profiling = False
+
+
+class RssSampler(object):
+    """ Polls the resident memory of process `pid` & its descendants (i.e.
+    `multiprocessing.Pool` workers) on a background thread, every `interval`
+    seconds, keeping the peaks.
+
+    Workers are measured by their PSS (proportional set size) where the
+    kernel reports it, so pages they share copy-on-write with the parent
+    (after a fork) aren't counted once per worker.
+    """
+    def __init__(self, pid: int=None, interval: float=.02):
+        self._pid = pid or os.getpid()
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+        self.peak_rss = 0
+        self.peak_children_rss = 0
+        self.peak_total_rss = 0
+
+    @staticmethod
+    def is_supported() -> bool:
+        return os.path.exists(f"/proc/{os.getpid()}/statm")
+
+    def start(self) -> 'RssSampler':
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="phytebyte-rss-sampler")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            self._sample()
+
+    def _sample(self):
+        rss = rss_bytes(self._pid) or 0
+        children_rss = sum(pss_bytes(pid) or rss_bytes(pid) or 0
+                           for pid in descendant_pids(self._pid))
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_children_rss = max(self.peak_children_rss, children_rss)
+        self.peak_total_rss = max(self.peak_total_rss, rss + children_rss)
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """ Resident set size of process `pid`, or None if it has exited. """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def pss_bytes(pid: int) -> Optional[int]:
+    """ Proportional set size of process `pid`, or None if the kernel
+    doesn't report it (or the process has exited).
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def descendant_pids(pid: int) -> List[int]:
+    pids = []
+    for child_pid in _child_pids(pid):
+        pids.append(child_pid)
+        pids.extend(descendant_pids(child_pid))
+    return pids
+
+
+def _child_pids(pid: int) -> List[int]:
+    pids = []
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return pids
+    for tid in tids:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+class MemoryProfiler(object):
+    """ Records the memory use of each named stage, like `StageTimer`
+    records its time (so either can profile `run_pipeline()`):
+
+    - `peak_rss_bytes`: Peak RSS of this process during the stage.
+    - `peak_children_rss_bytes`: Peak (summed) PSS/RSS of its workers.
+    - `peak_total_rss_bytes`: Peak of the two, summed (which `compare`
+      reads).
+    - `alloc_peak_bytes`: Peak of the Python allocations made during the
+      stage (above those live when it started).
+    - `alloc_net_bytes`: Allocations still live when the stage ended (i.e.
+      its output).
+
+    A stage that repeats keeps the maxima of its runs.
+    """
+    def __init__(self, interval: float=.02):
+        self._interval = interval
+        self._stages = OrderedDict()
+
+    @contextmanager
+    def stage(self, name: str):
+        global _profiling
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        alloc_start = tracemalloc.get_traced_memory()[0]
+        sampler = RssSampler(interval=self._interval).start()
+        _profiling = True
+        try:
+            yield
+        finally:
+            _profiling = False
+            sampler.stop()
+            alloc_end, alloc_peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            self._record(name, {
+                "peak_rss_bytes": sampler.peak_rss,
+                "peak_children_rss_bytes": sampler.peak_children_rss,
+                "peak_total_rss_bytes": sampler.peak_total_rss,
+                "alloc_peak_bytes": alloc_peak - alloc_start,
+                "alloc_net_bytes": alloc_end - alloc_start})
+
+    @property
+    def stage_names(self) -> List[str]:
+        return list(self._stages)
+
+    def summary(self) -> Dict[str, Dict]:
+        return OrderedDict((name, dict(stats))
+                           for name, stats in self._stages.items())
+
+    def _record(self, name: str, stats: Dict[str, int]):
+        recorded = self._stages.setdefault(name, stats)
+        for key, value in stats.items():
+            recorded[key] = max(recorded[key], value)
+
+
+def _stop_tracing_in_forked_worker():
+    if _profiling and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_stop_tracing_in_forked_worker)
@@ -0,0 +1,105 @@
+""" phytebyte's pipeline (as in `run.py`), split into separately timed
+stages. Negative sampling yields encoded negatives (the Tanimoto filter
+fingerprints each candidate), so the 'encoding' stage times the positives'
+encoding & the assembly of the model input.
+"""
+from typing import Dict
+
+import numpy as np
+
+from phytebyte import PhyteByte
+from phytebyte.bioactive_cmpd import ModelInputLoader
+from phytebyte.bioactive_cmpd.clustering import Clusterer
+from phytebyte.bioactive_cmpd.negative_samplers import NegativeSampler
+from phytebyte.bioactive_cmpd.sources import ChemblBioactiveCompoundSource
+from phytebyte.bioactive_cmpd.target_input import GeneTargetsInput
+from phytebyte.fingerprinters import Fingerprinter
+from phytebyte.food_cmpd import FoodCmpdReport
+from phytebyte.food_cmpd.sources.foodb import FoodbFoodCmpdSource
+from phytebyte.modeling.input import BinaryClassifierInputFactory
+from phytebyte.modeling.models import BinaryClassifierModel
+from .datasets import Dataset
+
+STAGES = ["positive_load", "clustering", "negative_sampling", "encoding",
+          "training", "evaluation", "food_screening", "report"]
+
+SEED = .6  # Seeds the random negative samples, as in `run.py`
+
+
+def run_pipeline(dataset: Dataset,
+                 db_urls: Dict[str, str],
+                 timer,
+                 fingerprinter_name: str='daylight',
+                 model_type: str='Random Forest',
+                 true_threshold: float=.5,
+                 top_k: int=100) -> Dict:
+    """ Runs every stage of `STAGES` once, against the databases of
+    `db_urls` (see `prepare_dataset()`), measuring each with `timer` (a
+    `StageTimer`, or a `MemoryProfiler`).
+
+    Returns: The sizes of each stage's output (which must match between runs
+    for their timings to be comparable), and the model's F1 score.
+    """
+    source = ChemblBioactiveCompoundSource(db_urls['chembl'], SEED)
+    food_cmpd_source = FoodbFoodCmpdSource(db_urls['foodb'])
+    fingerprinter = Fingerprinter.create(fingerprinter_name)
+    model = BinaryClassifierModel.create(model_type)
+    encoding = model.expected_encoding
+    negative_sampler = NegativeSampler.create('Tanimoto', source,
+                                              fingerprinter)
+    # Arguments in the order of `run.py`, which is the order that
+    # `ChemblBioactiveCompoundSource.fetch_with_gene_tgts()` receives them in
+    target_input = GeneTargetsInput(dataset.bioactivity_type,
+                                    dataset.gene_targets)
+    mdl = ModelInputLoader(
+        source, negative_sampler, Clusterer.create('positive', fingerprinter),
+        target_input, encoding)
+
+    with timer.stage("positive_load"):
+        bioactive_cmpd_list = mdl.load_positive_compounds()
+    with timer.stage("clustering"):
+        clusters = mdl.cluster_positive_compounds(bioactive_cmpd_list)
+    with timer.stage("negative_sampling"):
+        negatives = [
+            list(negative_sampler.sample(
+                [cmpd.smiles for cmpd in clust.bioactive_cmpds],
+                len(clust.bioactive_cmpds) * dataset.neg_sample_size_factor,
+                fingerprinter,
+                encoding))
+            for clust in clusters]
+    with timer.stage("encoding"):
+        binary_classifier_inputs = [
+            BinaryClassifierInputFactory.create(
+                encoding=encoding,
+                positives=clust.get_encoded_cmpds(encoding, fingerprinter),
+                negatives=neg_cmpds)
+            for clust, neg_cmpds in zip(clusters, negatives)]
+    # Like `PhyteByte.train()`, only the first cluster's input is modeled
+    bci = binary_classifier_inputs[0]
+    with timer.stage("training"):
+        model.train(bci, np.arange(len(bci)))
+    with timer.stage("evaluation"):
+        f1_score = BinaryClassifierModel.create(model_type).evaluate(
+            bci, true_threshold)
+
+    PhyteByte.fingerprinter = fingerprinter
+    PhyteByte.model = model
+    with timer.stage("food_screening"):
+        food_cmpds_sorted = PhyteByte(
+            source, None).sort_predicted_bioactive_food_cmpds(
+                food_cmpd_source)
+    with timer.stage("report"):
+        pos_cmpd_bitarrays = [
+            fingerprinter.fingerprint_and_encode(cmpd.smiles, 'bitarray')
+            for cmpd in bioactive_cmpd_list]
+        rows = FoodCmpdReport(food_cmpd_source, top_k=top_k).rows(
+            food_cmpds_sorted,
+            is_novel=lambda food_cmpd: fingerprinter.fingerprint_and_encode(
+                food_cmpd.smiles, 'bitarray') not in pos_cmpd_bitarrays)
+
+    return {"positives": len(bioactive_cmpd_list),
+            "clusters": len(clusters),
+            "negatives": sum(len(neg_cmpds) for neg_cmpds in negatives),
+            "scored_food_cmpds": len(food_cmpds_sorted),
+            "report_rows": len(rows),
+            "f1_score": float(f1_score)}
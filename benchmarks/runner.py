@@ -0,0 +1,74 @@
+import datetime
+import json
+import logging
+import os
+import platform
+from multiprocessing import cpu_count
+from typing import Dict
+
+from phytebyte.parallel import get_start_method
+from .datasets import Dataset, prepare_dataset
+from .memory import MemoryProfiler
+from .pipeline import run_pipeline
+from .timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+
+def run_benchmark(dataset: Dataset,
+                  data_dir: str,
+                  repeat: int=3,
+                  memory: bool=False,
+                  **pipeline_kwargs) -> Dict:
+    """ Runs the pipeline `repeat` times on `dataset` (generated into
+    `data_dir` on first use; not timed).
+
+    `memory`: Profile the memory of each stage (see `MemoryProfiler`),
+    instead of timing it.
+    `pipeline_kwargs`: Passed to `run_pipeline()` (i.e. `model_type`).
+    Returns: The results, as written by `write_results()`.
+    """
+    db_urls = prepare_dataset(dataset, data_dir)
+    recorder = MemoryProfiler() if memory else StageTimer()
+    counts = None
+    for i in range(repeat):
+        logger.info(f"Run {i + 1}/{repeat} of dataset '{dataset.name}'.")
+        run_counts = run_pipeline(dataset, db_urls, recorder,
+                                  **pipeline_kwargs)
+        if counts is not None and run_counts != counts:
+            logger.warning(f"Outputs of run {i + 1} ({run_counts}) differ "
+                           f"from run 1 ({counts}).")
+        counts = counts or run_counts
+    return {"kind": "memory" if memory else "time",
+            "dataset": dataset._asdict(),
+            "options": pipeline_kwargs,
+            "repeat": repeat,
+            "created": datetime.datetime.now().isoformat(timespec='seconds'),
+            "environment": environment(),
+            "counts": counts,
+            "stages": recorder.summary()}
+
+
+def environment() -> Dict:
+    """ Where the results were measured: timings are only comparable on
+    like hardware.
+    """
+    return {"python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": cpu_count(),
+            "start_method": get_start_method()}
+
+
+def write_results(results: Dict, path: str) -> None:
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+def read_results(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
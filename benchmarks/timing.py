@@ -0,0 +1,46 @@
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from statistics import median
+from typing import Dict, List
+
+
+class StageTimer(object):
+    """ Records the wall-clock & (this process') CPU seconds of each named
+    stage, over any number of repeats of the pipeline.
+
+    CPU seconds exclude worker processes (i.e. of `multiprocessing.Pool`),
+    so a stage whose CPU time is far below its wall time is either waiting
+    on I/O or running in a pool.
+    """
+    def __init__(self):
+        self._wall = OrderedDict()
+        self._cpu = OrderedDict()
+
+    @contextmanager
+    def stage(self, name: str):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self._wall.setdefault(name, []).append(
+                time.perf_counter() - wall_start)
+            self._cpu.setdefault(name, []).append(
+                time.process_time() - cpu_start)
+
+    @property
+    def stage_names(self) -> List[str]:
+        return list(self._wall)
+
+    def summary(self) -> Dict[str, Dict]:
+        """ Returns the timings of each stage (in the order stages first
+        ran): every repeat, and their median (which `compare` reads).
+        """
+        return OrderedDict(
+            (name, {"median_s": median(self._wall[name]),
+                    "min_s": min(self._wall[name]),
+                    "wall_s": self._wall[name],
+                    "cpu_s": self._cpu[name]})
+            for name in self._wall)
+
@@ -1,9 +1,12 @@
 import os
 
-from .query import Query
-from .phytebyte import PhyteByte
-
+from .lazy import lazy_attributes
 
+# Defined before the submodules are imported, which (transitively) import it
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 __all__ = ['Query', 'PhyteByte']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'Query': '.query',
+    'PhyteByte': '.phytebyte'})
@@ -0,0 +1,5 @@
+import sys
+
+from phytebyte.cli import main
+
+sys.exit(main())
@@ -0,0 +1,28 @@
+""" Asyncio wrappers of the (blocking) database sources, so that independent
+queries, i.e. against ChEMBL & FooDB, can overlap with each other and with
+CPU-bound work.
+
+Each call runs on a thread of `executor` (the event loop's default executor
+if `None`); the database drivers release the GIL while waiting on I/O.
+"""
+import asyncio
+import functools
+from concurrent.futures import Executor
+
+from phytebyte.db import DatabaseSource
+
+
+class AsyncSource(object):
+    def __init__(self, source: DatabaseSource, executor: Executor=None):
+        self._source = source
+        self._executor = executor
+
+    @property
+    def source(self) -> DatabaseSource:
+        return self._source
+
+    async def run(self, func, *args, **kwargs):
+        """ Awaits `func(*args, **kwargs)`, run on `executor`. """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
@@ -1,7 +1,10 @@
+from phytebyte.lazy import lazy_attributes
 from .types import (
     BioactiveCompound,
     CompoundBioactivity)
-from .model_input_loader import ModelInputLoader
 
 
 __all__ = ['BioactiveCompound', 'CompoundBioactivity', 'ModelInputLoader']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'ModelInputLoader': '.model_input_loader'})
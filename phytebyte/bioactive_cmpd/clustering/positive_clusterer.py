@@ -5,6 +5,7 @@ from sklearn.metrics import silhouette_score
 
 from phytebyte.bioactive_cmpd.types import BioactiveCompound
 from phytebyte.fingerprinters.base import Fingerprinter
+from phytebyte.tracing import span
 from .clusterer import Clusterer
 from .cluster import Cluster
 
@@ -35,19 +36,23 @@ class PositiveClusterer(Clusterer):
     def find_clusters(self,
                       pos_cmpds: List[BioactiveCompound],
                       eps_seq=np.array([0.1, 10, 15, 20, 100])):
-        pos_cmpd_nparrays = self._fingerprinter.smiles_to_nparrays(
-            [c.smiles for c in pos_cmpds])
-        # TODO ^Multiprocess, or re-use these from somewhere else
-        ss_seq = self.silhouette_series(eps_seq, pos_cmpd_nparrays)
-        if np.max(ss_seq) < 0.5:
-            # No silhouette score sufficient to warrant grouping
-            return [Cluster(pos_cmpds)]
-        elif (np.max(ss_seq) in ss_seq[[0, -1]]) & (np.max(ss_seq) != -2):
-            # Raise error if max score is from an extreme epsilon value
-            raise Exception("Silhouette optimal at an outlier epsilon value.")
-        else:
-            best_eps = eps_seq[np.where(ss_seq == np.max(ss_seq))][-1]
-            # Arbitrarily choose the higher eps value if SSs are equal
-            labels = self.run_dbscan(best_eps)
-            return [Cluster(np.array(pos_cmpds)[labels == l])
-                    for l in np.unique(labels)]
+        with span("PositiveClusterer.find_clusters", items=len(pos_cmpds)):
+            with span("Fingerprinter.smiles_to_nparrays",
+                      items=len(pos_cmpds)):
+                pos_cmpd_nparrays = self._fingerprinter.smiles_to_nparrays(
+                    [c.smiles for c in pos_cmpds])
+            # TODO ^Multiprocess, or re-use these from somewhere else
+            ss_seq = self.silhouette_series(eps_seq, pos_cmpd_nparrays)
+            if np.max(ss_seq) < 0.5:
+                # No silhouette score sufficient to warrant grouping
+                return [Cluster(pos_cmpds)]
+            elif (np.max(ss_seq) in ss_seq[[0, -1]]) & (np.max(ss_seq) != -2):
+                # Raise error if max score is from an extreme epsilon value
+                raise Exception(
+                    "Silhouette optimal at an outlier epsilon value.")
+            else:
+                best_eps = eps_seq[np.where(ss_seq == np.max(ss_seq))][-1]
+                # Arbitrarily choose the higher eps value if SSs are equal
+                labels = self.run_dbscan(best_eps)
+                return [Cluster(np.array(pos_cmpds)[labels == l])
+                        for l in np.unique(labels)]
@@ -1,13 +1,20 @@
+from __future__ import annotations
+
 import logging
-from typing import List, Iterator
+from typing import List, Iterator, TYPE_CHECKING
 
-from phytebyte.bioactive_cmpd.sources.base import BioactiveCompoundSource
+from phytebyte.bioactive_cmpd.types import BioactiveCompound
 from phytebyte.bioactive_cmpd.negative_samplers import NegativeSampler
 from phytebyte.bioactive_cmpd.clustering import Clusterer, Cluster
 from phytebyte.bioactive_cmpd.target_input import TargetInput
 from phytebyte.fingerprinters import Fingerprinter
 from phytebyte.modeling.input import (
     BinaryClassifierInputFactory, BinaryClassifierInput)
+from phytebyte.tracing import span
+
+if TYPE_CHECKING:
+    from phytebyte.bioactive_cmpd.sources.base import (
+        BioactiveCompoundSource)
 
 
 class ModelInputLoader():
@@ -24,20 +31,39 @@ class ModelInputLoader():
                  negative_sampler: NegativeSampler,
                  positive_clusterer: Clusterer,
                  target_input: TargetInput,
-                 encoding: str):
+                 encoding: str,
+                 lean: bool=False,
+                 memmap_dir: str=None,
+                 stream: bool=False):
+        """ `lean`: Fetch only the identity columns of positive compounds
+        (model input only needs their SMiLES), not their bioactivities (so
+        they're `None`).
+        `memmap_dir`: If given, model inputs are memory-mapped from scratch
+        files in this directory (see `NumpyBinaryClassifierInput`), for very
+        large sets of negatives.
+        `stream`: Whether model inputs are streamed (see
+        `StreamingBinaryClassifierInput`): their negatives are only sampled
+        as an incremental model trains on them.
+        """
         self._source = source
         self._negative_sampler = negative_sampler
         self._positive_clusterer = positive_clusterer
         self._target_input = target_input
         self._encoding = encoding
+        self._lean = lean
+        self._memmap_dir = memmap_dir
+        self._stream = stream
 
         self._pos_cmpd_clusters = None
         self._neg_cmpd_iters = None
     
     def load_positive_compounds(self):
-        bioactive_cmpd_list = [lazy_cmpd_callable() for lazy_cmpd_callable in
-                               self._target_input.fetch_bioactive_cmpds(
-                                   self._source)]
+        with span("ModelInputLoader.load_positive_compounds") as trace_args:
+            bioactive_cmpd_list = [
+                lazy_cmpd_callable() for lazy_cmpd_callable in
+                self._target_input.fetch_bioactive_cmpds(
+                    self._source, lean=self._lean)]
+            trace_args["items"] = len(bioactive_cmpd_list)
         self._check_for_redundant_molregno(bioactive_cmpd_list)
         return bioactive_cmpd_list
 
@@ -45,21 +71,57 @@ class ModelInputLoader():
              output_fingerprinter: Fingerprinter
              ) -> List[BinaryClassifierInput]:
         assert isinstance(neg_sample_size_factor, int)
-        bioactive_cmpd_list = self.load_positive_compounds()
-        self.logger.info(
-            f"Found '{len(bioactive_cmpd_list)}' pos sample compounds.")
-        self._pos_cmpd_clusters = self._positive_clusterer.find_clusters(
-            bioactive_cmpd_list)
-        self.logger.info(f"Found '{len(self._pos_cmpd_clusters)}' clusters.")
+        with span("ModelInputLoader.load",
+                  neg_sample_size_factor=neg_sample_size_factor):
+            bioactive_cmpd_list = self.load_positive_compounds()
+            self.logger.info(
+                f"Found '{len(bioactive_cmpd_list)}' pos sample compounds.")
+            clusters = self.cluster_positive_compounds(bioactive_cmpd_list)
+            return self.load_clusters(clusters, neg_sample_size_factor,
+                                      output_fingerprinter)
+
+    def cluster_positive_compounds(self,
+                                   bioactive_cmpd_list: List[BioactiveCompound]
+                                   ) -> List[Cluster]:
+        clusters = self._positive_clusterer.find_clusters(bioactive_cmpd_list)
+        self.logger.info(f"Found '{len(clusters)}' clusters.")
+        return clusters
+
+    def neg_reservoir_size(self,
+                           bioactive_cmpd_list: List[BioactiveCompound],
+                           neg_sample_size_factor: int) -> int:
+        """ Number of random compounds that `load_clusters()` draws negative
+        samples from, across all clusters of `bioactive_cmpd_list`.
+        """
+        return (len(bioactive_cmpd_list) * neg_sample_size_factor *
+                self._negative_sampler.oversample_factor)
+
+    def load_clusters(self, clusters: List[Cluster],
+                      neg_sample_size_factor: int,
+                      output_fingerprinter: Fingerprinter,
+                      neg_smiles_reservoir: List[str]=None
+                      ) -> List[BinaryClassifierInput]:
+        """ Builds one model input per cluster of positive compounds.
+
+        `neg_smiles_reservoir`: Optional random compounds (excluding all
+        positives) fetched ahead of time, i.e. while positives were being
+        clustered. Each cluster samples its negatives from its own slice;
+        otherwise each cluster queries its own random compounds.
+        """
+        assert isinstance(neg_sample_size_factor, int)
+        self._pos_cmpd_clusters = clusters
         self._neg_cmpd_iters = self._get_neg_bioactive_cmpd_iters(
             neg_sample_size_factor,
-            output_fingerprinter)
-        # Iterators turned into List below!
-        model_inputs = [
-            self._create_binary_classifier_input(clust, neg_cmpd_iter,
-                                                 output_fingerprinter)
-            for clust, neg_cmpd_iter in zip(
-                self._pos_cmpd_clusters, self._neg_cmpd_iters)]
+            output_fingerprinter,
+            neg_smiles_reservoir)
+        with span("ModelInputLoader.load_clusters", clusters=len(clusters)):
+            # Negatives are written into each model input as they're drawn
+            model_inputs = [
+                self._create_binary_classifier_input(
+                    clust, neg_cmpd_iter, output_fingerprinter,
+                    len(clust.bioactive_cmpds) * neg_sample_size_factor)
+                for clust, neg_cmpd_iter in zip(
+                    self._pos_cmpd_clusters, self._neg_cmpd_iters)]
         return model_inputs
         
     @staticmethod
@@ -71,29 +133,48 @@ class ModelInputLoader():
 
     def _get_neg_bioactive_cmpd_iters(self,
                                       neg_sample_size_factor: int,
-                                      output_fingerprinter: Fingerprinter
+                                      output_fingerprinter: Fingerprinter,
+                                      neg_smiles_reservoir: List[str]=None
                                       ) -> List[Iterator]:
-        return [self._negative_sampler.sample(
-                   [cmpd.smiles for cmpd in clust.bioactive_cmpds],
-                   len(clust.bioactive_cmpds) * neg_sample_size_factor,
-                   output_fingerprinter,
-                   self._encoding)
-                for clust in self._pos_cmpd_clusters]
+        if neg_smiles_reservoir is None:
+            return [self._negative_sampler.sample(
+                       [cmpd.smiles for cmpd in clust.bioactive_cmpds],
+                       len(clust.bioactive_cmpds) * neg_sample_size_factor,
+                       output_fingerprinter,
+                       self._encoding)
+                    for clust in self._pos_cmpd_clusters]
+        neg_cmpd_iters = []
+        start = 0
+        for clust in self._pos_cmpd_clusters:
+            sz = len(clust.bioactive_cmpds) * neg_sample_size_factor
+            end = start + sz * self._negative_sampler.oversample_factor
+            neg_cmpd_iters.append(self._negative_sampler.sample(
+                [cmpd.smiles for cmpd in clust.bioactive_cmpds],
+                sz,
+                output_fingerprinter,
+                self._encoding,
+                candidate_smiles=neg_smiles_reservoir[start:end]))
+            start = end
+        return neg_cmpd_iters
 
     def _create_binary_classifier_input(self,
                                         cluster: Cluster,
                                         neg_cmpd_iter: Iterator,
-                                        output_fingerprinter: Fingerprinter
+                                        output_fingerprinter: Fingerprinter,
+                                        max_negatives: int=None
                                         ) -> BinaryClassifierInput:
-        neg_cmpds = list(neg_cmpd_iter)
-        self.logger.info(f"Found '{len(neg_cmpds)}' neg samples")
-        pos_cmpds = cluster.get_encoded_cmpds(self._encoding,
-                                              output_fingerprinter)
+        with span("Cluster.get_encoded_cmpds"):
+            pos_cmpds = cluster.get_encoded_cmpds(self._encoding,
+                                                  output_fingerprinter)
         self.logger.info(f"Found '{len(pos_cmpds)}' pos samples")
+        self.logger.info(f"Sampling '{max_negatives}' neg samples")
         return BinaryClassifierInputFactory.create(
             encoding=self._encoding,
             positives=pos_cmpds,
-            negatives=neg_cmpds)
+            negatives=neg_cmpd_iter,
+            max_negatives=max_negatives,
+            memmap_dir=self._memmap_dir,
+            stream=self._stream)
 
     @property
     def positive_clusters(self):
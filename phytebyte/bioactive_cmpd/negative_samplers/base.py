@@ -1,9 +1,18 @@
+from __future__ import annotations
+
 from abc import abstractmethod, ABC
-from multiprocessing import cpu_count, Pool
-from typing import List, Iterator
+from contextlib import nullcontext
+from multiprocessing import cpu_count
+from typing import ContextManager, Dict, Iterable, List, Iterator, \
+    TYPE_CHECKING
 
-from phytebyte.bioactive_cmpd.sources.base import BioactiveCompoundSource
 from phytebyte.fingerprinters.base import Fingerprinter
+from phytebyte.parallel import Pool
+from phytebyte.tracing import count, span
+
+if TYPE_CHECKING:
+    from phytebyte.bioactive_cmpd.sources.base import (
+        BioactiveCompoundSource)
 
 
 class NotEnoughSamples(Exception):
@@ -11,6 +20,9 @@ class NotEnoughSamples(Exception):
 
 
 class NegativeSampler(ABC, object):
+    # Random compounds drawn per negative sample wanted (some are filtered)
+    oversample_factor = 2
+
     output_fingerprinter = None
     output_encoding = None
     excluded_mols = None
@@ -40,40 +52,90 @@ class NegativeSampler(ABC, object):
                excluded_positive_smiles_ls: List[str],
                sz: int,
                output_fingerprinter: Fingerprinter,
-               output_encoding: str) -> Iterator:
-        rand_neg_smiles_iter = self._source.fetch_random_compounds_exc_smiles(
-            excluded_smiles=excluded_positive_smiles_ls,
-            limit=sz * 2)
-        # Update Globals (class attrs) for multiprocessing
+               output_encoding: str,
+               candidate_smiles: Iterable[str]=None) -> Iterator:
+        """ `candidate_smiles`: Optional random compounds to sample from (i.e.
+        a slice of a reservoir fetched ahead of time), instead of querying
+        `sz * oversample_factor` random compounds from the source.
+        """
+        num_candidates = sz * self.oversample_factor
+        if candidate_smiles is None:
+            rand_neg_smiles_iter = \
+                self._source.fetch_random_compounds_exc_smiles(
+                    excluded_smiles=excluded_positive_smiles_ls,
+                    limit=num_candidates)
+        else:
+            rand_neg_smiles_iter = iter(candidate_smiles)
+        # Update Globals (class attrs) for multiprocessing. Workers are
+        # shipped them explicitly (see `_worker_state()`), as they only
+        # inherit them when forked.
         NegativeSampler.output_fingerprinter = output_fingerprinter
         NegativeSampler.output_encoding = output_encoding
-        with Pool(processes=self._num_proc) as p:
-            NegativeSampler.excluded_mols = self.encode_excluded_mols(
-                excluded_positive_smiles_ls, p)
-        with Pool(processes=self._num_proc, initializer=self._init_pool) as p:
-            cnt = 0
-            for neg_x in p.imap(
-               self._filter_and_encode, rand_neg_smiles_iter):
-                if neg_x is not None:
+        with span("NegativeSampler.sample", wanted=sz) as trace_args:
+            with span("NegativeSampler.encode_excluded_mols",
+                      items=len(excluded_positive_smiles_ls)), \
+                    Pool(processes=self._num_proc,
+                         initializer=self._init_pool,
+                         initargs=(self._worker_state(None),)) as p:
+                NegativeSampler.excluded_mols = self.encode_excluded_mols(
+                    excluded_positive_smiles_ls, p)
+            with self._shared_excluded_mols(
+                    NegativeSampler.excluded_mols) as excluded_mols, \
+                    Pool(processes=self._num_proc,
+                         initializer=self._init_pool,
+                         initargs=(self._worker_state(excluded_mols),)) as p:
+                cnt = rejected = 0
+                for neg_x in p.imap(
+                   self._filter_and_encode, rand_neg_smiles_iter):
+                    if neg_x is None:
+                        rejected += 1
+                        continue
                     cnt += 1
                     if cnt > sz:
                         p.terminate()
                         p.join()
                         break
                     yield neg_x
-            if cnt < sz:
-                p.terminate()
-                p.join()
-                raise NotEnoughSamples(
-                    f"Queried {sz*2} samples, filterd to {cnt}, expected {sz}")
+                self._trace_rejections(trace_args, min(cnt, sz), rejected)
+                if cnt < sz:
+                    p.terminate()
+                    p.join()
+                    raise NotEnoughSamples(
+                        f"Queried {num_candidates} samples, filterd to {cnt}, "
+                        f"expected {sz}")
         # Reset state of Class Attribute (global)
         NegativeSampler.output_fingerprinter = None
         NegativeSampler.output_encoding = None
         NegativeSampler.excluded_mols = None
 
+    @staticmethod
+    def _trace_rejections(trace_args, accepted: int, rejected: int):
+        count("negative_sampler.accepted", accepted)
+        count("negative_sampler.rejected", rejected)
+        trace_args["items"] = accepted
+        trace_args["rejection_rate"] = (
+            rejected / (accepted + rejected) if accepted + rejected else 0.)
+
+    def _worker_state(self, excluded_mols) -> Dict:
+        """ The class attributes that pool workers need, as they're shipped
+        to each worker (once) by `_init_pool()`. Subclasses add their own.
+        """
+        return {'output_fingerprinter': NegativeSampler.output_fingerprinter,
+                'output_encoding': NegativeSampler.output_encoding,
+                'excluded_mols': excluded_mols}
+
+    def _shared_excluded_mols(self, excluded_mols: List) -> ContextManager:
+        """ Context manager yielding `excluded_mols` as shipped to workers:
+        as they are by default. Subclasses may put them in shared memory
+        (see `phytebyte.parallel.SharedArray`), to be mapped instead of
+        copied by every worker.
+        """
+        return nullcontext(excluded_mols)
+
     @classmethod
-    def _init_pool(cls):
-        pass
+    def _init_pool(cls, state: Dict=None):
+        for name, value in (state or {}).items():
+            setattr(cls, name, value)
 
     @classmethod
     def _filter_and_encode(cls, neg_smiles: str):
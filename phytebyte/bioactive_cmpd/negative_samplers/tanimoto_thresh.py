@@ -1,14 +1,30 @@
 from bitarray import bitarray
-from functools import partial
-from typing import List
+import numpy as np
+from typing import ContextManager, Dict, List
 
 from .base import NegativeSampler
 from phytebyte.fingerprinters import Fingerprinter
+from phytebyte.fingerprinters.encoding import bitarrays_to_packed
+from phytebyte.parallel import SharedArray
+
+# Excluded fingerprints compared with a candidate at a time: few at first,
+# as a candidate is often rejected by the first similar one, then doubling
+# (which bounds the temporary arrays)
+_MIN_CHUNK_SIZE = 64
+_MAX_CHUNK_SIZE = 4096
+# Shifts & masks of the SWAR popcount (see `_popcounts()`)
+_1, _2, _4, _56 = (np.uint64(shift) for shift in (1, 2, 4, 56))
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0f0f0f0f0f0f0f0f)
+_H01 = np.uint64(0x0101010101010101)
 
 
 class TanimotoThreshNegativeSampler(NegativeSampler):
     _input_fingerprinter = None
     _max_tanimoto_thresh = None
+    # Set bits of each excluded fingerprint (in workers)
+    _excluded_mol_counts = None
 
     def __init__(self,
                  *args,
@@ -31,21 +47,44 @@ class TanimotoThreshNegativeSampler(NegativeSampler):
                 " we have an _input_fingerprinter set. Can't mock out a "
                 " call from a class attribute in pytest!")
         return [encoded_cmpd for encoded_cmpd in pool.imap(
-            partial(cls._input_fingerprinter.fingerprint_and_encode,
-                    encoding='bitarray'),
-            excluded_smiles)]
+            cls._input_fingerprint, excluded_smiles)]
+
+    def _worker_state(self, excluded_mols) -> Dict:
+        state = super()._worker_state(excluded_mols)
+        state['_input_fingerprinter'] = self._input_fingerprinter
+        state['_max_tanimoto_thresh'] = self._max_tanimoto_thresh
+        if excluded_mols is not None:
+            state['_excluded_mol_counts'] = _popcounts(excluded_mols.array)
+        return state
+
+    def _shared_excluded_mols(self, excluded_mols: List[bitarray]
+                              ) -> ContextManager:
+        """ The fingerprints, packed into the rows of a (shared) matrix """
+        return SharedArray(_pack(excluded_mols))
+
+    @classmethod
+    def _input_fingerprint(cls, smiles: str) -> bitarray:
+        return cls._input_fingerprinter.fingerprint_and_encode(
+            smiles, 'bitarray')
 
     @classmethod
     def _filter_func(cls, neg_smile: str) -> bool:
-        neg_smile_bitarray = cls._input_fingerprinter.fingerprint_and_encode(
-            neg_smile, 'bitarray')
+        neg_smile_bitarray = cls._input_fingerprint(neg_smile)
         if neg_smile_bitarray is None:
             return False
-        for excluded_mol_bitarray in cls.excluded_mols:
-            tani = cls._calculate_tanimoto(excluded_mol_bitarray,
-                                           neg_smile_bitarray)
-            if tani > cls._max_tanimoto_thresh:
+        neg_fp = _pack([neg_smile_bitarray])[0]
+        neg_count = neg_smile_bitarray.count()
+        excluded_fps = cls.excluded_mols.array
+        start, chunk_size = 0, _MIN_CHUNK_SIZE
+        while start < len(excluded_fps):
+            end = start + chunk_size
+            intersections = _popcounts(excluded_fps[start:end] & neg_fp)
+            unions = (cls._excluded_mol_counts[start:end] + neg_count -
+                      intersections)
+            # i.e. intersection / union > threshold, without dividing
+            if np.any(intersections > cls._max_tanimoto_thresh * unions):
                 return False
+            start, chunk_size = end, min(2 * chunk_size, _MAX_CHUNK_SIZE)
         return True
 
     @staticmethod
@@ -53,3 +92,28 @@ class TanimotoThreshNegativeSampler(NegativeSampler):
                             right_bitarr: bitarray) -> float:
         return ((left_bitarr & right_bitarr).count() /
                 (left_bitarr | right_bitarr).count())
+
+
+def _pack(bitarrays: List[bitarray]) -> np.ndarray:
+    """ `bitarrays` (of equal length) as the rows of a uint64 matrix (each
+    zero-padded to whole words)
+    """
+    packed = bitarrays_to_packed(bitarrays)
+    padded = np.zeros((len(packed), -(-packed.shape[1] // 8) * 8),
+                      dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view(np.uint64)
+
+
+def _popcounts(packed: np.ndarray) -> np.ndarray:
+    """ Set bits of each row of `packed` (uint64s) """
+    if hasattr(np, 'bitwise_count'):  # numpy >= 2.0
+        counts = np.bitwise_count(packed)
+    else:
+        # The classic SWAR popcount of each word
+        counts = packed - ((packed >> _1) & _M1)
+        counts = (counts & _M2) + ((counts >> _2) & _M2)
+        counts = (counts + (counts >> _4)) & _M4
+        counts = (counts * _H01) >> _56
+    return counts.sum(axis=1, dtype=np.int32)
+
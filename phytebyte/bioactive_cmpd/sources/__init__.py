@@ -1,11 +1,23 @@
-from .base import BioactiveCompoundSource
-from .chembl import (
-    ChemblBioactiveCompoundSource,
-    ChemblBioactiveCompoundQuery,
-    ChemblRandomCompoundSmilesQuery)
+from phytebyte.lazy import lazy_attributes
 
 
 __all__ = ['BioactiveCompoundSource',
+           'AsyncBioactiveCompoundSource',
            'ChemblBioactiveCompoundSource',
            'ChemblBioactiveCompoundQuery',
-           'ChemblRandomCompoundSmilesQuery']
+           'ChemblBioactivityQuery',
+           'ChemblCompoundSmilesQuery',
+           'ChemblMultiTargetQuery',
+           'ChemblRandomCompoundSmilesQuery',
+           'SnapshotBioactiveCompoundSource']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'BioactiveCompoundSource': '.base',
+    'AsyncBioactiveCompoundSource': '.aio',
+    'ChemblBioactiveCompoundSource': '.chembl',
+    'ChemblBioactiveCompoundQuery': '.chembl',
+    'ChemblBioactivityQuery': '.chembl',
+    'ChemblCompoundSmilesQuery': '.chembl',
+    'ChemblMultiTargetQuery': '.chembl',
+    'ChemblRandomCompoundSmilesQuery': '.chembl',
+    'SnapshotBioactiveCompoundSource': '.snapshot'})
@@ -0,0 +1,31 @@
+from typing import Dict, List
+
+from phytebyte.aio import AsyncSource
+from phytebyte.bioactive_cmpd.types import (
+    BioactiveCompound, CompoundBioactivity)
+
+
+class AsyncBioactiveCompoundSource(AsyncSource):
+    """ Async variant of a `BioactiveCompoundSource`. Iterators returned by the
+    source are consumed on the executor, and awaited as lists.
+    """
+    async def fetch_bioactive_cmpds(self, target_input, lean: bool=False
+                                    ) -> List[BioactiveCompound]:
+        return await self.run(self._fetch_bioactive_cmpds, target_input, lean)
+
+    def _fetch_bioactive_cmpds(self, target_input, lean):
+        return [lazy_cmpd() for lazy_cmpd in
+                target_input.fetch_bioactive_cmpds(self._source, lean=lean)]
+
+    async def fetch_random_compounds_exc_smiles(self,
+                                                excluded_smiles: List[str],
+                                                limit: int) -> List[str]:
+        return await self.run(
+            lambda: list(self._source.fetch_random_compounds_exc_smiles(
+                excluded_smiles, limit)))
+
+    async def fetch_bioactivities(self, uids: List[int], bioactivity_type,
+                                  gene_tgts: List[str]=None
+                                  ) -> Dict[int, List[CompoundBioactivity]]:
+        return await self.run(self._source.fetch_bioactivities, uids,
+                              bioactivity_type, gene_tgts=gene_tgts)
@@ -1,23 +1,24 @@
 from abc import ABC, abstractmethod
-from sqlalchemy import create_engine
-from typing import List, Iterator, Callable
+from typing import Callable, Dict, Iterator, List, Tuple
 
-from phytebyte.bioactive_cmpd.types import BioactiveCompound
+from phytebyte.bioactive_cmpd.types import (
+    BioactiveCompound, CompoundBioactivity)
+from phytebyte.db import (
+    DatabaseSource, DEFAULT_BATCH_SIZE, DEFAULT_POOL_SIZE)
 
 
-class BioactiveCompoundSource(ABC, object):
-    def __init__(self, db_url, seed):
-        self.db_url = db_url
+class BioactiveCompoundSource(DatabaseSource, ABC):
+    def __init__(self, db_url, seed,
+                 pool_size: int=DEFAULT_POOL_SIZE,
+                 batch_size: int=DEFAULT_BATCH_SIZE,
+                 prefetch_chunks: int=0):
+        super().__init__(db_url, pool_size=pool_size, batch_size=batch_size,
+                         prefetch_chunks=prefetch_chunks)
         self.seed = seed
 
-    @property
-    def engine(self):
-        engine = create_engine(self.db_url)
-        engine.execution_options(stream_results=True)
-        return engine
-
     @abstractmethod
-    def fetch_with_gene_tgts(self, bioactivity_type, gene_tgts: List[str]) -> \
+    def fetch_with_gene_tgts(self, bioactivity_type, gene_tgts: List[str],
+                             lean: bool=False) -> \
             Iterator[Callable[[], BioactiveCompound]]:
         """
         Fetch `BioactiveCompounds`, with assayed bioactivity,
@@ -27,17 +28,36 @@ class BioactiveCompoundSource(ABC, object):
 
         `gene_tgts`: List of strings representing genes. Each
         `BioactiveCompound` returned should target one of the genes in the list
+
+        `lean`: If True, only the identity columns (uid, names, SMiLES, gene
+        target) are fetched, and `bioactivities` is None
         """
         pass
 
     @abstractmethod
-    def fetch_with_compound_names(self, compound_names: List[str]) -> \
+    def fetch_with_gene_tgts_multi(self, gene_tgts: List[str],
+                                   bioactivity_types: List[str],
+                                   lean: bool=False) -> \
+            Iterator[Tuple[Tuple[str, str], Callable[[], BioactiveCompound]]]:
+        """
+        Fetch the `BioactiveCompounds` of a panel of genes, for several
+        bioactivity types, in a single round trip.
+
+        Returns: An iterator of ((gene_target, bioactivity_type), partial)
+        pairs.
+        """
+        pass
+
+    @abstractmethod
+    def fetch_with_compound_names(self, compound_names: List[str],
+                                  lean: bool=False) -> \
             Iterator[Callable[[], BioactiveCompound]]:
         """
         Fetch `BioactiveCompounds` that have names given by `compound_names`.
 
         `compound_names`: A list of str's representing the `pref_name` of the
         drugs that should be queried.
+        `lean`: If True, `bioactivities` is not fetched (it is None)
 
         Returns: An iterator of partials, each of which, when called, will
         return a BioactiveCompound. This allows multiple processes to
@@ -59,3 +79,14 @@ class BioactiveCompoundSource(ABC, object):
         Returns: An `Iterator` of str's representing each random compounds'
         SMiLES representation."""
         pass
+
+    @abstractmethod
+    def fetch_bioactivities(self, uids: List[int], bioactivity_type,
+                            gene_tgts: List[str]=None
+                            ) -> Dict[int, List[CompoundBioactivity]]:
+        """ Fetch the bioactivities of the compounds with the given `uids`, in
+        bulk (i.e. for compounds fetched with `lean=True`).
+
+        Returns: A dict from each uid to its `CompoundBioactivity`s.
+        """
+        pass
@@ -1,8 +1,16 @@
-from .chembl import ChemblBioactiveCompoundSource
-from .queries import (
-    ChemblBioactiveCompoundQuery,
-    ChemblRandomCompoundSmilesQuery)
+from phytebyte.lazy import lazy_attributes
 
 __all__ = ['ChemblBioactiveCompoundSource',
            'ChemblBioactiveCompoundQuery',
+           'ChemblBioactivityQuery',
+           'ChemblCompoundSmilesQuery',
+           'ChemblMultiTargetQuery',
            'ChemblRandomCompoundSmilesQuery']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'ChemblBioactiveCompoundSource': '.chembl',
+    'ChemblBioactiveCompoundQuery': '.queries',
+    'ChemblBioactivityQuery': '.queries',
+    'ChemblCompoundSmilesQuery': '.queries',
+    'ChemblMultiTargetQuery': '.queries',
+    'ChemblRandomCompoundSmilesQuery': '.queries'})
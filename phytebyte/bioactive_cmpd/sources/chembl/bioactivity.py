@@ -27,3 +27,7 @@ antagonist_bioact_filter = BioactivityStandardFilter(
     relations=['=', '<', '<<', '>', '>>'],
     units=['nM'],
     max_value=20000)
+
+bioact_filters = {
+    "agonist": agonist_bioact_filter,
+    "antagonist": antagonist_bioact_filter}
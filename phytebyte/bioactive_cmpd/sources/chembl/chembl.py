@@ -1,16 +1,62 @@
 import functools
-from typing import Callable, Iterator, List
+from typing import Callable, Dict, Iterator, List, Tuple
 
+from sqlalchemy import select, func, text
+
+from phytebyte.db import DEFAULT_BATCH_SIZE, DEFAULT_POOL_SIZE
+from phytebyte.query import KeyRange
+from phytebyte.tracing import count
 from phytebyte.bioactive_cmpd.sources import BioactiveCompoundSource
 from phytebyte.bioactive_cmpd import BioactiveCompound
+from phytebyte.bioactive_cmpd.types import CompoundBioactivity
 from .queries import (
-    ChemblBioactiveCompoundQuery, ChemblRandomCompoundSmilesQuery)
-from .bioactivity import agonist_bioact_filter, antagonist_bioact_filter
+    ChemblBioactiveCompoundQuery, ChemblBioactivityQuery,
+    ChemblCompoundSmilesQuery, ChemblMultiTargetQuery,
+    ChemblRandomCompoundSmilesQuery)
+from .bioactivity import bioact_filters
+from .models import Version
+from .gene_activity import has_gene_activity_view
 
 class ChemblBioactiveCompoundSource(BioactiveCompoundSource):
+    """
+    `result_cache`: Optional `phytebyte.cache.QueryResultCache`. If given, the
+    rows of positive-compound queries are cached on disk, per query and per
+    ChEMBL release, so repeated runs skip the (slow) ChEMBL query.
+    """
+    def __init__(self, db_url, seed,
+                 pool_size: int=DEFAULT_POOL_SIZE,
+                 batch_size: int=DEFAULT_BATCH_SIZE,
+                 prefetch_chunks: int=0,
+                 result_cache=None):
+        super().__init__(db_url, seed, pool_size=pool_size,
+                         batch_size=batch_size,
+                         prefetch_chunks=prefetch_chunks)
+        self.result_cache = result_cache
+        self._release = None
+        self._gene_activity_view = None
+
+    @property
+    def release(self) -> str:
+        """ Name of the ChEMBL release (i.e. 'ChEMBL_25') in the database. """
+        if self._release is None:
+            with self.engine.connect() as conn:
+                self._release = conn.execute(
+                    select([func.max(Version.name)])).scalar()
+        return self._release
+
+    @property
+    def gene_activity_view(self) -> bool:
+        """ Whether `phytebyte db prepare` created the gene-target activity
+        view in the database (lean queries are then served from it).
+        """
+        if self._gene_activity_view is None:
+            self._gene_activity_view = has_gene_activity_view(self.engine)
+        return self._gene_activity_view
+
     def fetch_with_gene_tgts(self,
                              gene_tgts: List[str],
-                             bioactivity_type) ->\
+                             bioactivity_type,
+                             lean: bool=False) ->\
                                  Iterator[Callable[[], BioactiveCompound]]:
         """
         Fetch `BioactiveCompounds`, with assayed bioactivity,
@@ -18,47 +64,106 @@ class ChemblBioactiveCompoundSource(BioactiveCompoundSource):
 
         `gene_tgts`: List of strings representing genes. Each
         `BioactiveCompound` returned should target one of the genes in the list
+        `lean`: If True, `bioactivities` are not fetched (they are None)
         """
-        if bioactivity_type == "agonist":
-            query = ChemblBioactiveCompoundQuery(agonist_bioact_filter, gene_tgts=gene_tgts)
-        elif bioactivity_type == "antagonist":
-            query = ChemblBioactiveCompoundQuery(antagonist_bioact_filter, gene_tgts=gene_tgts)
-        else:
-            raise Exception(f"bioactivity_type '{bioactivity_type}' not supported")
+        query = ChemblBioactiveCompoundQuery(
+            self._bioact_filter(bioactivity_type), gene_tgts=gene_tgts,
+            lean=lean, gene_activity_view=lean and self.gene_activity_view)
         return self._fetch_bioactive_compounds(query)
 
-    def fetch_with_compound_names(self, compound_names: List[str]) -> \
+    def fetch_with_compound_names(self, compound_names: List[str],
+                                  lean: bool=False) -> \
             Iterator[Callable[[], BioactiveCompound]]:
         """
         Fetch `BioactiveCompounds` that have names given by `compound_names`.
 
         `compound_names`: A list of str's representing the `pref_name` of the
         drugs that should be queried.
+        `lean`: If True, `bioactivities` are not fetched (they are None)
 
         Returns: An iterator of partials, each of which, when called, will
         return a BioactiveCompound. This allows multiple processes to
         deserialize in parallel, rather than a single process deserializing.
         """
-        query = ChemblBioactiveCompoundQuery(compound_names=compound_names)
+        query = ChemblBioactiveCompoundQuery(
+            compound_names=compound_names, lean=lean,
+            gene_activity_view=lean and self.gene_activity_view)
         return self._fetch_bioactive_compounds(query)
 
+    def fetch_with_gene_tgts_multi(self,
+                                   gene_tgts: List[str],
+                                   bioactivity_types: List[str],
+                                   lean: bool=False) -> \
+            Iterator[Tuple[Tuple[str, str], Callable[[], BioactiveCompound]]]:
+        """
+        Fetch the `BioactiveCompounds` of every gene in `gene_tgts`, for every
+        bioactivity type in `bioactivity_types`, in a single query.
+
+        Returns: An iterator of ((gene_target, bioactivity_type), partial)
+        pairs, so callers can partition compounds without deserializing them.
+        """
+        query = ChemblMultiTargetQuery(
+            {bioactivity_type: self._bioact_filter(bioactivity_type)
+             for bioactivity_type in bioactivity_types},
+            gene_tgts=gene_tgts, lean=lean,
+            gene_activity_view=lean and self.gene_activity_view)
+        for row in self._fetch_rows(query):
+            yield (query.row_to_partition_key(row),
+                   functools.partial(query.row_to_bioactive_compound, row[1:]))
+
+    def fetch_bioactivities(self,
+                            uids: List[int],
+                            bioactivity_type,
+                            gene_tgts: List[str]=None
+                            ) -> Dict[int, List[CompoundBioactivity]]:
+        """ Fetch the bioactivities of many compounds (i.e. those fetched with
+        `lean=True`) in a single query.
+
+        Returns: A dict from each uid to its `CompoundBioactivity`s (uids
+        without a matching bioactivity are absent).
+        """
+        bioactivities = {}
+        if len(uids) == 0:
+            return bioactivities
+        query = ChemblBioactivityQuery(self._bioact_filter(bioactivity_type),
+                                       list(uids), gene_tgts=gene_tgts)
+        for row in self.stream_query(query):
+            uid, bioactivity = query.row_to_uid_and_bioactivity(row)
+            bioactivities.setdefault(uid, []).append(bioactivity)
+        return bioactivities
+
+    @staticmethod
+    def _bioact_filter(bioactivity_type):
+        try:
+            return bioact_filters[bioactivity_type]
+        except KeyError:
+            raise Exception(
+                f"bioactivity_type '{bioactivity_type}' not supported")
+
     def _fetch_bioactive_compounds(self, query) -> \
             Iterator[Callable[[], BioactiveCompound]]:
-        executable_query = query.build()
         # Return generator of curried functions, which when called, will
         # deserialize each row into namedtuple (allows caller to multi-process)
-        with self.engine.connect() as conn:
-            conn.execution_options(stream_results=True)
-            iterator = conn.execute(executable_query)
-            cnt = 0
-            while True:
-                chunk = iterator.fetchmany(1000)
-                cnt += 1
-                if not chunk:
-                    break
-                for row in chunk:
-                    yield functools.partial(query.row_to_bioactive_compound,
-                                            row)
+        for row in self._fetch_rows(query):
+            yield functools.partial(query.row_to_bioactive_compound, row)
+
+    def _fetch_rows(self, query) -> Iterator:
+        if self.result_cache is None:
+            return self.stream_query(query)
+        return iter(self._fetch_cached_rows(query))
+
+    def _fetch_cached_rows(self, query) -> List[tuple]:
+        sql = str(query.statement().compile(dialect=self.engine.dialect))
+        key = self.result_cache.key(
+            f"{sql}\n{sorted(query.params.items())!r}", self.release)
+        rows = self.result_cache.get(key)
+        if rows is None:
+            count("query_result_cache.misses")
+            rows = [tuple(row) for row in self.stream_query(query)]
+            self.result_cache.put(key, rows)
+        else:
+            count("query_result_cache.hits")
+        return rows
 
     def fetch_random_compounds_exc_smiles(self,
                                           excluded_smiles: List[str],
@@ -76,16 +181,27 @@ class ChemblBioactiveCompoundSource(BioactiveCompoundSource):
         """
         query = ChemblRandomCompoundSmilesQuery(
             limit=limit, excluded_smiles=excluded_smiles)
-        raw_query = query.to_raw_query(self.engine.dialect)
-        with self.engine.connect() as conn:
-            conn.execution_options(stream_results=True)
-            conn.execute(f"SELECT setseed({self.seed})")
-            iterator = conn.execute(raw_query)
-            cnt = 0
-            while True:
-                chunk = iterator.fetchmany(1000)
-                cnt += 1
-                if not chunk:
-                    break
-                for row in chunk:
-                    yield row[0]
+        for row in self.stream_query(query, on_connect=self._set_seed):
+            yield row[0]
+
+    def fetch_all_compound_smiles(self, key_range: KeyRange=None
+                                  ) -> Iterator[str]:
+        """ Fetch Iterator of the SMiLES strs of every compound, in `molregno`
+        order.
+
+        `key_range`: Optional (lower, upper) range of `molregno`s to restrict
+        the scan to, as returned by `compound_key_ranges()`.
+        """
+        query = ChemblCompoundSmilesQuery()
+        for row in self.stream_rows(query.build_range(key_range)):
+            yield row[0]
+
+    def compound_key_ranges(self, num_partitions: int) -> List[KeyRange]:
+        """ Split the `molregno`s of all compounds into (at most)
+        `num_partitions` disjoint ranges, which can be scanned in parallel
+        with `fetch_all_compound_smiles()`.
+        """
+        return self.key_ranges(ChemblCompoundSmilesQuery(), num_partitions)
+
+    def _set_seed(self, conn):
+        conn.execute(text("SELECT setseed(:seed)"), seed=self.seed)
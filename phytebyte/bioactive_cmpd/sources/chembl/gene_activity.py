@@ -0,0 +1,162 @@
+""" A materialized, indexed view of the (human) gene-target activities of each
+compound: the nine-table join behind `ChemblBioactiveCompoundQuery`, flattened
+into a single table. Stock ChEMBL dumps have no indexes for this access
+pattern (by gene symbol & activity type); `prepare_gene_activity_view()`
+creates both. Lean queries read from the view whenever it exists.
+"""
+import logging
+import time
+from collections import namedtuple
+
+from sqlalchemy import (
+    and_, join, select, BigInteger, Column, Index, MetaData, Numeric,
+    SmallInteger, String, Table)
+
+from .models import (
+    CompoundStructure, MoleculeDictionary, ComponentSynonym,
+    Activity, Assay, ComponentSequence, TargetComponent,
+    CompoundRecord, TargetDictionary
+)
+
+GENE_ACTIVITY_VIEW = "phytebyte_gene_activity"
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+GeneActivity = Table(
+    GENE_ACTIVITY_VIEW, metadata,
+    Column("gene_symbol", String(500)),
+    Column("molregno", BigInteger),
+    Column("pref_name", String(255)),
+    Column("canonical_smiles", String(4000)),
+    Column("compound_name", String(4000)),
+    Column("standard_type", String(250)),
+    Column("standard_relation", String(50)),
+    Column("standard_value", Numeric),
+    Column("standard_units", String(100)),
+    Column("confidence_score", SmallInteger))
+
+gene_activity_indexes = [
+    Index(f"{GENE_ACTIVITY_VIEW}_gene_type_idx",
+          GeneActivity.c.gene_symbol, GeneActivity.c.standard_type),
+    Index(f"{GENE_ACTIVITY_VIEW}_molregno_idx", GeneActivity.c.molregno)]
+
+# Seconds taken to run a benchmark query, before & after preparing the view
+PrepareReport = namedtuple("PrepareReport", [
+    "before_seconds", "after_seconds"])
+
+
+# The view's columns, as columns of the tables the view is built from
+GeneActivityColumns = namedtuple("GeneActivityColumns", [
+    column.name for column in GeneActivity.columns])
+
+joined_gene_activity_columns = GeneActivityColumns(
+    gene_symbol=ComponentSynonym.component_synonym,
+    molregno=CompoundStructure.molregno,
+    pref_name=MoleculeDictionary.pref_name,
+    canonical_smiles=CompoundStructure.canonical_smiles,
+    compound_name=CompoundRecord.compound_name,
+    standard_type=Activity.standard_type,
+    standard_relation=Activity.standard_relation,
+    standard_value=Activity.standard_value,
+    standard_units=Activity.standard_units,
+    confidence_score=Assay.confidence_score)
+
+
+def gene_activity_join():
+    """ The join of every table with a (human) gene-target activity column.
+    """
+    return (
+         join(ComponentSequence, ComponentSynonym,
+              ComponentSequence.component_id ==
+              ComponentSynonym.component_id)
+         .join(TargetComponent,
+               TargetComponent.component_id ==
+               ComponentSequence.component_id)
+         .join(TargetDictionary,
+               TargetDictionary.tid == TargetComponent.tid)
+         .join(Assay,
+               Assay.tid == TargetDictionary.tid)
+         .join(Activity,
+               Activity.assay_id == Assay.assay_id)
+         .join(CompoundRecord,
+               CompoundRecord.record_id == Activity.record_id)
+         .join(MoleculeDictionary,
+               MoleculeDictionary.molregno == CompoundRecord.molregno)
+         .join(CompoundStructure,
+               CompoundStructure.molregno == MoleculeDictionary.molregno))
+
+
+def human_gene_symbol_clauses() -> tuple:
+    return (ComponentSynonym.syn_type == "GENE_SYMBOL",
+            ComponentSequence.organism == "Homo sapiens")
+
+
+def gene_activity_select() -> select:
+    """ The query the view materializes. """
+    return select([
+        column.label(name) for name, column
+        in joined_gene_activity_columns._asdict().items()])\
+        .select_from(gene_activity_join())\
+        .where(and_(*human_gene_symbol_clauses()))
+
+
+def has_gene_activity_view(engine) -> bool:
+    with engine.connect() as conn:
+        return bool(engine.dialect.has_table(conn, GENE_ACTIVITY_VIEW))
+
+
+def prepare_gene_activity_view(engine, benchmark_query_factory,
+                               refresh: bool=False) -> PrepareReport:
+    """ Creates (or, if `refresh`, rebuilds) the view & its indexes.
+
+    `benchmark_query_factory`: Callable, passed whether the view exists, that
+    returns a `Query` whose EXPLAIN timing is reported before & after.
+    """
+    before_seconds = explain_timing(
+        engine, benchmark_query_factory(has_gene_activity_view(engine)))
+    with engine.begin() as conn:
+        exists = engine.dialect.has_table(conn, GENE_ACTIVITY_VIEW)
+        if exists and refresh:
+            conn.execute(_drop_view_sql(engine.dialect.name))
+            exists = False
+        if not exists:
+            logger.info(f"Creating '{GENE_ACTIVITY_VIEW}'.")
+            conn.execute(_create_view_sql(engine.dialect))
+            for index in gene_activity_indexes:
+                index.create(conn)
+            if engine.dialect.name == 'postgresql':
+                conn.execute(f"ANALYZE {GENE_ACTIVITY_VIEW}")
+    after_seconds = explain_timing(engine, benchmark_query_factory(True))
+    return PrepareReport(before_seconds, after_seconds)
+
+
+def explain_timing(engine, query) -> float:
+    """ Seconds the database takes to execute `query`: from `EXPLAIN ANALYZE`
+    on Postgres, otherwise the wall time of executing & fetching it.
+    """
+    raw_query = query.to_raw_query(engine.dialect)
+    with engine.connect() as conn:
+        if engine.dialect.name == 'postgresql':
+            plan = conn.execute(
+                f"EXPLAIN (ANALYZE, FORMAT JSON) {raw_query}").scalar()
+            return plan[0]["Execution Time"] / 1000
+        start = time.perf_counter()
+        conn.execute(raw_query).fetchall()
+        return time.perf_counter() - start
+
+
+def _create_view_sql(dialect) -> str:
+    select_sql = gene_activity_select().compile(
+        dialect=dialect, compile_kwargs={"literal_binds": True}).string
+    if dialect.name == 'postgresql':
+        return f"CREATE MATERIALIZED VIEW {GENE_ACTIVITY_VIEW} AS {select_sql}"
+    # No materialized views elsewhere (i.e. MySQL): materialize into a table
+    return f"CREATE TABLE {GENE_ACTIVITY_VIEW} AS {select_sql}"
+
+
+def _drop_view_sql(dialect_name: str) -> str:
+    if dialect_name == 'postgresql':
+        return f"DROP MATERIALIZED VIEW {GENE_ACTIVITY_VIEW}"
+    return f"DROP TABLE {GENE_ACTIVITY_VIEW}"
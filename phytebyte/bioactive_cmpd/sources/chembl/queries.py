@@ -1,5 +1,5 @@
-from sqlalchemy import select, and_, not_, func, join, subquery
-from typing import List
+from sqlalchemy import select, and_, or_, not_, func, join, case, subquery
+from typing import Dict, List, Tuple
 
 from phytebyte import Query
 from phytebyte.bioactive_cmpd.sources.chembl.bioactivity import (
@@ -8,19 +8,34 @@ from phytebyte.bioactive_cmpd.types import (
     BioactiveCompound, CompoundBioactivity)
 from .models import (
     CompoundStructure, MoleculeDictionary, ComponentSynonym,
-    Activity, Assay, ComponentSequence, TargetComponent,
-    CompoundRecord, TargetDictionary
+    Activity, Assay, CompoundRecord
 )
+from .gene_activity import (
+    GeneActivity, gene_activity_join, human_gene_symbol_clauses,
+    joined_gene_activity_columns)
 
 
 class ChemblBioactiveCompoundQuery(Query):
+    """
+    `lean`: If True, only the identity columns of each compound are fetched
+    (`bioactivities` is None), skipping the aggregated bioactivity arrays and
+    assay descriptions. Use `ChemblBioactivityQuery` to fetch them afterwards,
+    for the compounds that need them.
+    `gene_activity_view`: Whether the database has the `phytebyte db prepare`
+    view of gene-target activities. Lean queries are served from it, rather
+    than by joining nine tables (it has no assay descriptions).
+    """
     def __init__(self,
                  bioact_standard_filter: BioactivityStandardFilter,
                  gene_tgts: List[str]=None,
-                 compound_names: List[str]=None):
+                 compound_names: List[str]=None,
+                 lean: bool=False,
+                 gene_activity_view: bool=False):
         self._bioact_standard_filter = bioact_standard_filter
         self._gene_tgts = gene_tgts
         self._compound_names = compound_names
+        self._lean = lean
+        self._use_view = lean and gene_activity_view
         assert self._compound_names is None or isinstance(
             self._compound_names, (list, tuple))
         assert self._gene_tgts is None or isinstance(
@@ -30,75 +45,112 @@ class ChemblBioactiveCompoundQuery(Query):
         return f"""<ChemblBioactiveCompoundQuery
            {self._bioact_standard_filter},
            {self._gene_tgts},
-           {self._compound_names}>"""
+           {self._compound_names},
+           lean={self._lean}, view={self._use_view}>"""
+
+    @property
+    def params(self):
+        params = {}
+        if self._gene_tgts:
+            params['gene_tgts'] = list(self._gene_tgts)
+        if self._compound_names:
+            params['compound_names'] = list(self._compound_names)
+        return params
+
+    @property
+    def _shape(self):
+        return (self._filter_shape(self._bioact_standard_filter),
+                bool(self._gene_tgts), bool(self._compound_names),
+                self._lean, self._use_view)
+
+    @staticmethod
+    def _filter_shape(bioact_standard_filter):
+        if bioact_standard_filter is None:
+            return None
+        return (tuple(bioact_standard_filter.types),
+                tuple(bioact_standard_filter.relations),
+                tuple(bioact_standard_filter.units),
+                bioact_standard_filter.max_value)
 
     @staticmethod
     def row_to_bioactive_compound(row) -> BioactiveCompound:
+        # Rows of lean queries end after the identity columns
+        bioactivities = None if len(row) <= 5 else [
+            CompoundBioactivity(*bioact_tup)
+            for bioact_tup in zip(*row[5:9])]
         return BioactiveCompound(
             uid=row[0], pref_name=row[1], smiles=row[2],
             gene_target=row[3], name=row[4],
-            bioactivities=[CompoundBioactivity(*bioact_tup)
-                           for bioact_tup in zip(*row[5:9])])
+            bioactivities=bioactivities)
+
+    @property
+    def _cols(self):
+        """ Gene-target activity columns, in the view or the joined tables """
+        if self._use_view:
+            return GeneActivity.c
+        return joined_gene_activity_columns
 
     @property
     def _select(self):
-        return select([
-            CompoundStructure.molregno.label("uid"),
-            MoleculeDictionary.pref_name.label("pref_name"),
-            CompoundStructure.canonical_smiles.label("canonical_smiles"),
-            ComponentSynonym.component_synonym.label("gene_target"),
-            func.array_agg(Activity.standard_value).label("value_arr"),
-            func.array_agg(Activity.standard_units).label("units_arr"),
-            func.array_agg(Activity.standard_type).label("type_arr"),
-            func.array_agg(Assay.description).label("descr_arr"),
+        columns = [
+            self._cols.molregno.label("uid"),
+            self._cols.pref_name.label("pref_name"),
+            self._cols.canonical_smiles.label("canonical_smiles"),
+            self._cols.gene_symbol.label("gene_target"),
             # HERE BE HACKS: We take the "min" compound_name so we don't need to group by the name
             # if we grouped by 'name', we would get redundant compounds w/ same molregno, but diff names
-            func.min(CompoundRecord.compound_name).label("name")])
+            func.min(self._cols.compound_name).label("name")]
+        if not self._lean:
+            columns += [
+                func.array_agg(Activity.standard_value).label("value_arr"),
+                func.array_agg(Activity.standard_units).label("units_arr"),
+                func.array_agg(Activity.standard_type).label("type_arr"),
+                func.array_agg(Assay.description).label("descr_arr")]
+        return select(columns)
 
     @property
     def _select_from(self):
-        return (
-             join(ComponentSequence, ComponentSynonym,
-                  ComponentSequence.component_id ==
-                  ComponentSynonym.component_id)
-             .join(TargetComponent,
-                   TargetComponent.component_id ==
-                   ComponentSequence.component_id)
-             .join(TargetDictionary,
-                   TargetDictionary.tid == TargetComponent.tid)
-             .join(Assay,
-                   Assay.tid == TargetDictionary.tid)
-             .join(Activity,
-                   Activity.assay_id == Assay.assay_id)
-             .join(CompoundRecord,
-                   CompoundRecord.record_id == Activity.record_id)
-             .join(MoleculeDictionary,
-                   MoleculeDictionary.molregno == CompoundRecord.molregno)
-             .join(CompoundStructure,
-                   CompoundStructure.molregno == MoleculeDictionary.molregno))
+        if self._use_view:
+            return GeneActivity
+        return gene_activity_join()
+
+    def _bioact_standard_clause(self, bioact_standard_filter):
+        return and_(
+            self._cols.standard_type.in_(bioact_standard_filter.types),
+            self._cols.standard_relation.in_(
+                bioact_standard_filter.relations),
+            self._cols.standard_units.in_(bioact_standard_filter.units),
+            self._cols.standard_value < bioact_standard_filter.max_value)
+
+    @property
+    def _target_clauses(self) -> tuple:
+        """ Clauses shared by all queries of human gene-target activities """
+        and_tuple = (self._cols.confidence_score >= 7,)
+        if not self._use_view:
+            # Already applied when the view is materialized
+            and_tuple = human_gene_symbol_clauses() + and_tuple
+        return and_tuple
 
     @property
     def _whereclause(self):
-        and_tuple = (
-            ComponentSynonym.syn_type == "GENE_SYMBOL",
-            ComponentSequence.organism == "Homo sapiens",
-            Assay.confidence_score >= 7,
-            Activity.standard_type.in_(self._bioact_standard_filter.types),
-            Activity.standard_relation.in_(
-                self._bioact_standard_filter.relations),
-            Activity.standard_units.in_(
-                self._bioact_standard_filter.units),
-            Activity.standard_value < self._bioact_standard_filter.max_value)
+        and_tuple = self._target_clauses + (
+            self._bioact_standard_clause(self._bioact_standard_filter),)
         if self._gene_tgts:
-            and_tuple += (ComponentSynonym.component_synonym.in_(
-                self._gene_tgts),)
+            and_tuple += (self._cols.gene_symbol.in_(
+                self._param('gene_tgts')),)
         if self._compound_names:
-            and_tuple += (CompoundRecord.compound_name.in_(
-                self._compound_names),)
+            and_tuple += (self._cols.compound_name.in_(
+                self._param('compound_names')),)
         return and_(*and_tuple)
 
     @property
     def _group_by(self):
+        if self._use_view:
+            # No primary keys in the view, to group dependent columns by
+            return (GeneActivity.c.molregno,
+                    GeneActivity.c.gene_symbol,
+                    GeneActivity.c.pref_name,
+                    GeneActivity.c.canonical_smiles)
         group_by_tuple = (
             CompoundStructure.molregno,
             MoleculeDictionary.molregno,
@@ -108,8 +160,167 @@ class ChemblBioactiveCompoundQuery(Query):
 
     @property
     def _order_by(self):
+        if self._use_view:
+            return (GeneActivity.c.molregno,)
         return (MoleculeDictionary.molregno,)
 
+    @property
+    def _key_column(self):
+        return self._cols.molregno
+
+
+class ChemblMultiTargetQuery(ChemblBioactiveCompoundQuery):
+    """ The bioactive compounds of several gene targets and bioactivity types
+    (i.e. agonists & antagonists of a panel of genes), in one query.
+
+    Each row is labelled with the bioactivity type whose filter its activities
+    passed, in an extra leading column. A compound has one row per (gene
+    target, bioactivity type). If filters overlap, an activity is labelled with
+    the first matching type in `bioact_standard_filters`.
+    """
+    def __init__(self,
+                 bioact_standard_filters: Dict[str, BioactivityStandardFilter],
+                 gene_tgts: List[str],
+                 lean: bool=False,
+                 gene_activity_view: bool=False):
+        super().__init__(None, gene_tgts=gene_tgts, lean=lean,
+                         gene_activity_view=gene_activity_view)
+        self._bioact_standard_filters = bioact_standard_filters
+        assert len(self._bioact_standard_filters) > 0
+
+    def __repr__(self):
+        return f"""<ChemblMultiTargetQuery
+           {list(self._bioact_standard_filters)},
+           {self._gene_tgts},
+           lean={self._lean}, view={self._use_view}>"""
+
+    @property
+    def params(self):
+        return {'gene_tgts': list(self._gene_tgts)}
+
+    @property
+    def _shape(self):
+        return (tuple((bioactivity_type, self._filter_shape(bioact_filter))
+                      for bioactivity_type, bioact_filter
+                      in self._bioact_standard_filters.items()),
+                self._lean, self._use_view)
+
+    @staticmethod
+    def row_to_partition_key(row) -> Tuple[str, str]:
+        """ (gene_target, bioactivity_type) of a row, without deserializing
+        it.
+        """
+        return row[4], row[0]
+
+    @property
+    def _bioactivity_type(self):
+        return case([
+            (self._bioact_standard_clause(bioact_standard_filter),
+             bioactivity_type)
+            for bioactivity_type, bioact_standard_filter
+            in self._bioact_standard_filters.items()])
+
+    @property
+    def _select(self):
+        select_ = super()._select
+        return select(
+            [self._bioactivity_type.label("bioactivity_type")] +
+            list(select_.inner_columns))
+
+    @property
+    def _whereclause(self):
+        return and_(
+            *self._target_clauses,
+            self._cols.gene_symbol.in_(self._param('gene_tgts')),
+            or_(*[self._bioact_standard_clause(bioact_standard_filter)
+                  for bioact_standard_filter
+                  in self._bioact_standard_filters.values()]))
+
+    @property
+    def _group_by(self):
+        return super()._group_by + (self._bioactivity_type,)
+
+
+class ChemblBioactivityQuery(ChemblBioactiveCompoundQuery):
+    """ The individual bioactivities (one row per activity) of the compounds
+    with the given `uids`, that pass the same filters as the
+    `ChemblBioactiveCompoundQuery` they were fetched with.
+    """
+    def __init__(self,
+                 bioact_standard_filter: BioactivityStandardFilter,
+                 uids: List[int],
+                 gene_tgts: List[str]=None):
+        super().__init__(bioact_standard_filter, gene_tgts=gene_tgts)
+        self._uids = uids
+        assert isinstance(self._uids, (list, tuple))
+
+    def __repr__(self):
+        return f"""<ChemblBioactivityQuery
+           {self._bioact_standard_filter},
+           {len(self._uids)} uids,
+           {self._gene_tgts}>"""
+
+    @property
+    def params(self):
+        return dict(super().params, uids=list(self._uids))
+
+    @property
+    def _shape(self):
+        return (self._filter_shape(self._bioact_standard_filter),
+                bool(self._gene_tgts))
+
+    @staticmethod
+    def row_to_uid_and_bioactivity(row) -> Tuple[int, CompoundBioactivity]:
+        return row[0], CompoundBioactivity(*row[1:5])
+
+    @property
+    def _select(self):
+        return select([
+            CompoundStructure.molregno.label("uid"),
+            Activity.standard_value,
+            Activity.standard_units,
+            Activity.standard_type,
+            Assay.description])
+
+    @property
+    def _whereclause(self):
+        return and_(super()._whereclause,
+                    CompoundStructure.molregno.in_(self._param('uids')))
+
+    @property
+    def _group_by(self):
+        return ()
+
+    @property
+    def _order_by(self):
+        return (CompoundStructure.molregno,)
+
+
+class ChemblCompoundSmilesQuery(Query):
+    """ The SMiLES of every compound in ChEMBL, in `molregno` order (i.e. to
+    export or fingerprint the whole compound universe).
+    """
+    def __repr__(self):
+        return self.__class__.__name__
+
+    @property
+    def _select(self):
+        return select([
+            CompoundStructure.canonical_smiles,
+            CompoundStructure.molregno])
+
+    @property
+    def _select_from(self):
+        return CompoundStructure
+
+    @property
+    def _order_by(self):
+        return (CompoundStructure.molregno,)
+
+    @property
+    def _key_column(self):
+        return CompoundStructure.molregno
+
 
 class ChemblRandomCompoundSmilesQuery(Query):
     def __init__(self, limit: int, excluded_smiles: List[str]):
@@ -120,7 +331,12 @@ class ChemblRandomCompoundSmilesQuery(Query):
 
     def __repr__(self):
         return f"""<ChemblRandomCompoundSmilesQuery
-           Limit: {self._limit}>"""
+           Limit: {self._record_limit}>"""
+
+    @property
+    def params(self):
+        return {'excluded_smiles': list(self._excluded_smiles),
+                'limit': self._record_limit}
 
     @property
     def _select(self):
@@ -136,7 +352,8 @@ class ChemblRandomCompoundSmilesQuery(Query):
     @property
     def _whereclause(self):
         return not_(
-            CompoundStructure.canonical_smiles.in_(self._excluded_smiles))
+            CompoundStructure.canonical_smiles.in_(
+                self._param('excluded_smiles')))
 
     @property
     def _order_by(self):
@@ -144,7 +361,7 @@ class ChemblRandomCompoundSmilesQuery(Query):
 
     @property
     def _limit(self):
-        return self._record_limit
+        return self._param('limit')
 
     @property
     def _group_by(self):
@@ -0,0 +1,177 @@
+import functools
+import random
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from phytebyte.bioactive_cmpd.sources import BioactiveCompoundSource
+from phytebyte.bioactive_cmpd.types import (
+    BioactiveCompound, CompoundBioactivity)
+from phytebyte.bioactive_cmpd.sources.chembl.bioactivity import (
+    BioactivityStandardFilter, bioact_filters)
+from phytebyte.snapshot import Snapshot
+
+# Columns of the snapshot's `gene_activity` table read per activity
+_ACTIVITY_COLUMNS = [
+    "molregno", "pref_name", "canonical_smiles", "gene_symbol",
+    "compound_name", "standard_value", "standard_units", "standard_type",
+    "assay_description", "standard_relation", "confidence_score"]
+(_UID, _PREF_NAME, _SMILES, _GENE, _NAME, _VALUE, _UNITS, _TYPE, _DESCR,
+ _RELATION, _CONFIDENCE) = range(len(_ACTIVITY_COLUMNS))
+
+MIN_CONFIDENCE_SCORE = 7
+
+
+class SnapshotBioactiveCompoundSource(BioactiveCompoundSource):
+    """ Serves the same compounds as `ChemblBioactiveCompoundSource`, from the
+    ChEMBL tables of a `phytebyte snapshot`, without a database server.
+
+    `snapshot_dir`: Directory written by `phytebyte snapshot`.
+    `seed`: Seed of the random compounds sampled by
+    `fetch_random_compounds_exc_smiles()`.
+    """
+    def __init__(self, snapshot_dir: str, seed):
+        super().__init__(None, seed)
+        self.snapshot = Snapshot(snapshot_dir)
+
+    def fetch_with_gene_tgts(self,
+                             gene_tgts: List[str],
+                             bioactivity_type,
+                             lean: bool=False) ->\
+            Iterator[Callable[[], BioactiveCompound]]:
+        activities = self._activities(
+            {"gene_symbol": gene_tgts},
+            {bioactivity_type: self._bioact_filter(bioactivity_type)})
+        for _, lazy_cmpd in self._group_compounds(activities, lean):
+            yield lazy_cmpd
+
+    def fetch_with_compound_names(self, compound_names: List[str],
+                                  lean: bool=False) -> \
+            Iterator[Callable[[], BioactiveCompound]]:
+        # Every (confident) activity of the named compounds
+        activities = self._activities({"compound_name": compound_names},
+                                      {None: None})
+        for _, lazy_cmpd in self._group_compounds(activities, lean):
+            yield lazy_cmpd
+
+    def fetch_with_gene_tgts_multi(self,
+                                   gene_tgts: List[str],
+                                   bioactivity_types: List[str],
+                                   lean: bool=False) -> \
+            Iterator[Tuple[Tuple[str, str], Callable[[], BioactiveCompound]]]:
+        return self._group_compounds(self._activities(
+            {"gene_symbol": gene_tgts},
+            {bioactivity_type: self._bioact_filter(bioactivity_type)
+             for bioactivity_type in bioactivity_types}), lean)
+
+    def fetch_bioactivities(self,
+                            uids: List[int],
+                            bioactivity_type,
+                            gene_tgts: List[str]=None
+                            ) -> Dict[int, List[CompoundBioactivity]]:
+        bioactivities = {}
+        if len(uids) == 0:
+            return bioactivities
+        where = {"molregno": uids}
+        if gene_tgts:
+            where["gene_symbol"] = gene_tgts
+        for _, row in self._activities(
+                where,
+                {bioactivity_type: self._bioact_filter(bioactivity_type)}):
+            bioactivities.setdefault(row[_UID], []).append(
+                self._row_to_bioactivity(row))
+        return bioactivities
+
+    def fetch_random_compounds_exc_smiles(self,
+                                          excluded_smiles: List[str],
+                                          limit: int) -> Iterator[str]:
+        table = self.snapshot.table("compound_structures")
+        excluded_smiles = set(excluded_smiles)
+        rng = random.Random(self.seed)
+        # Enough rows for `limit` compounds, even if all excluded are drawn
+        indices = sorted(rng.sample(
+            range(table.num_rows),
+            min(table.num_rows, limit + len(excluded_smiles))))
+        sampled = [smiles for (smiles,) in
+                   table.take(["canonical_smiles"], indices)]
+        # Read in table order, but yielded in random order (as ChEMBL's
+        # `ORDER BY random()`), so any prefix of them is a random sample too
+        rng.shuffle(sampled)
+        num_yielded = 0
+        for smiles in sampled:
+            if num_yielded == limit:
+                break
+            if smiles not in excluded_smiles:
+                num_yielded += 1
+                yield smiles
+
+    def fetch_all_compound_smiles(self, key_range=None) -> Iterator[str]:
+        between = None if key_range is None else {"molregno": key_range}
+        for (smiles,) in self.snapshot.table("compound_structures").rows(
+                ["canonical_smiles"], between=between):
+            yield smiles
+
+    @staticmethod
+    def _bioact_filter(bioactivity_type):
+        try:
+            return bioact_filters[bioactivity_type]
+        except KeyError:
+            raise Exception(
+                f"bioactivity_type '{bioactivity_type}' not supported")
+
+    def _activities(self, where: Dict[str, List],
+                    bioact_standard_filters: Dict[
+                        str, BioactivityStandardFilter]
+                    ) -> Iterator[Tuple[str, tuple]]:
+        """ Yields the (bioactivity_type, row) of each activity matching
+        `where` that passes a filter, labelled with the first filter it
+        passes (like `ChemblMultiTargetQuery`). A `None` filter passes all.
+        """
+        for row in self.snapshot.table("gene_activity").rows(
+                _ACTIVITY_COLUMNS, where):
+            if row[_CONFIDENCE] is None or \
+                    row[_CONFIDENCE] < MIN_CONFIDENCE_SCORE:
+                continue
+            for bioactivity_type, bioact_standard_filter in \
+                    bioact_standard_filters.items():
+                if self._passes(row, bioact_standard_filter):
+                    yield bioactivity_type, row
+                    break
+
+    @staticmethod
+    def _passes(row, bioact_standard_filter) -> bool:
+        if bioact_standard_filter is None:
+            return True
+        return (row[_TYPE] in bioact_standard_filter.types and
+                row[_RELATION] in bioact_standard_filter.relations and
+                row[_UNITS] in bioact_standard_filter.units and
+                row[_VALUE] is not None and
+                row[_VALUE] < bioact_standard_filter.max_value)
+
+    @staticmethod
+    def _row_to_bioactivity(row) -> CompoundBioactivity:
+        return CompoundBioactivity(amount=row[_VALUE], units=row[_UNITS],
+                                   type=row[_TYPE], descr=row[_DESCR])
+
+    def _group_compounds(self, activities: Iterator[Tuple[str, tuple]],
+                         lean: bool) -> \
+            Iterator[Tuple[Tuple[str, str], Callable[[], BioactiveCompound]]]:
+        """ Groups activities by compound, gene target & bioactivity type (as
+        the ChEMBL queries `GROUP BY`), in `molregno` order.
+        """
+        groups = OrderedDict()
+        for bioactivity_type, row in activities:
+            key = (row[_UID], row[_GENE], bioactivity_type)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = (row, [], [])
+            if row[_NAME] is not None:
+                group[1].append(row[_NAME])
+            group[2].append(self._row_to_bioactivity(row))
+        for key in sorted(groups, key=lambda key: key[0]):
+            row, names, bioactivities = groups[key]
+            uid, gene_target, bioactivity_type = key
+            yield ((gene_target, bioactivity_type),
+                   functools.partial(
+                       BioactiveCompound, uid, row[_PREF_NAME], row[_SMILES],
+                       gene_target, min(names) if names else None,
+                       None if lean else bioactivities))
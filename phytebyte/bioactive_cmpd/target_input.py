@@ -1,15 +1,23 @@
+from __future__ import annotations
+
 from abc import abstractmethod, ABC
-from typing import List, Iterator
+from typing import Callable, Dict, List, Iterator, Tuple, TYPE_CHECKING
 
-from .sources import BioactiveCompoundSource
 from .types import BioactiveCompound
 
+if TYPE_CHECKING:
+    from .sources import BioactiveCompoundSource
+
 
 class TargetInput(ABC):
 
     @abstractmethod
-    def fetch_bioactive_cmpds(self, source: BioactiveCompoundSource
+    def fetch_bioactive_cmpds(self, source: BioactiveCompoundSource,
+                              lean: bool=False
                               ) -> Iterator[BioactiveCompound]:
+        """ `lean`: If True, only the identity columns of each compound are
+        fetched (`bioactivities` is None), i.e. for model input.
+        """
         pass
 
 
@@ -18,7 +26,8 @@ class PhenotypesTargetInput(TargetInput):
         self._phenotypes = phenotypes
         raise NotImplemented
 
-    def fetch_bioactive_cmpds(self, source: BioactiveCompoundSource):
+    def fetch_bioactive_cmpds(self, source: BioactiveCompoundSource,
+                              lean: bool=False):
         raise NotImplemented
 
 
@@ -27,16 +36,72 @@ class GeneTargetsInput(TargetInput):
         self._gene_targets = gene_targets
         self._bioactivity_type = bioactivity_type
 
-    def fetch_bioactive_cmpds(self, source: BioactiveCompoundSource):
-        return source.fetch_with_gene_tgts(self._bioactivity_type, self._gene_targets)
+    def fetch_bioactive_cmpds(self, source: BioactiveCompoundSource,
+                              lean: bool=False):
+        return source.fetch_with_gene_tgts(self._bioactivity_type, self._gene_targets,
+                                           lean=lean)
+
+
+class MultiTargetInput(TargetInput):
+    """ A panel of gene targets (i.e. the nuclear receptors), screened for
+    several bioactivity types at once. All positive sets are fetched with a
+    single query, then partitioned locally by (gene_target, bioactivity_type).
+    """
+    def __init__(self, gene_targets: List[str],
+                 bioactivity_types: List[str]=('agonist', 'antagonist')):
+        self._gene_targets = gene_targets
+        self._bioactivity_types = bioactivity_types
+
+    def fetch_partitions(self, source: BioactiveCompoundSource,
+                         lean: bool=False
+                         ) -> Dict[Tuple[str, str], List[Callable]]:
+        """ Returns the (lazy) bioactive compounds of every (gene_target,
+        bioactivity_type) in the panel that has any.
+        """
+        partitions = {}
+        for key, lazy_cmpd in source.fetch_with_gene_tgts_multi(
+                self._gene_targets, self._bioactivity_types, lean=lean):
+            partitions.setdefault(key, []).append(lazy_cmpd)
+        return partitions
+
+    def target_inputs(self, source: BioactiveCompoundSource,
+                      lean: bool=False
+                      ) -> Dict[Tuple[str, str], TargetInput]:
+        """ One `TargetInput` per (gene_target, bioactivity_type), serving
+        the compounds of the panel's single query (i.e. to train one model
+        per target with `PhyteByte`).
+        """
+        return {key: PrefetchedTargetInput(lazy_cmpds)
+                for key, lazy_cmpds
+                in self.fetch_partitions(source, lean=lean).items()}
+
+    def fetch_bioactive_cmpds(self, source: BioactiveCompoundSource,
+                              lean: bool=False):
+        for _, lazy_cmpd in source.fetch_with_gene_tgts_multi(
+                self._gene_targets, self._bioactivity_types, lean=lean):
+            yield lazy_cmpd
+
+
+class PrefetchedTargetInput(TargetInput):
+    """ Serves already-fetched (lazy) bioactive compounds, i.e. one partition
+    of a `MultiTargetInput`. `source` and `lean` are ignored.
+    """
+    def __init__(self, lazy_cmpds: List[Callable[[], BioactiveCompound]]):
+        self._lazy_cmpds = lazy_cmpds
+
+    def fetch_bioactive_cmpds(self, source: BioactiveCompoundSource,
+                              lean: bool=False):
+        return iter(self._lazy_cmpds)
 
 
 class CompoundNamesTargetInput(TargetInput):
     def __init__(self, compound_names: List[str]):
         self._compound_names = compound_names
 
-    def fetch_bioactive_cmpds(self, source: BioactiveCompoundSource):
-        return source.fetch_with_compound_names(self._compound_names)
+    def fetch_bioactive_cmpds(self, source: BioactiveCompoundSource,
+                              lean: bool=False):
+        return source.fetch_with_compound_names(self._compound_names,
+                                                lean=lean)
 
 
 class MetabolitesTargetInput(TargetInput):
@@ -1,3 +1,4 @@
 from .bitstring_smiles_cache import BitstringSmilesCache
+from .query_result_cache import QueryResultCache
 
-__all__ = ['BitstringSmilesCache']
+__all__ = ['BitstringSmilesCache', 'QueryResultCache']
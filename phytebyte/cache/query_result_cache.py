@@ -0,0 +1,116 @@
+import gzip
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from typing import List, Optional
+
+
+class QueryResultCache(object):
+    """ On-disk cache of query result rows, keyed by the compiled SQL of the
+    query and the release of the database it was run against (so a new
+    database release never serves stale rows).
+
+    Each result set is stored as one gzipped pickle of row tuples. Entries
+    expire `ttl` seconds after they were written, and the least recently
+    read entries are evicted once the cache exceeds `max_bytes`.
+
+    `root_dir`: Defaults to `phytebyte/queries` in the user's cache directory
+    (`$XDG_CACHE_HOME`, else `~/.cache`), rather than the (often read-only)
+    installed package.
+    """
+    _suffix = '.pkl.gz'
+
+    def __init__(self,
+                 root_dir: str=None,
+                 ttl: float=30 * 24 * 60 * 60,
+                 max_bytes: int=1024 ** 3):
+        self._root_dir = root_dir or _default_root_dir()
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+
+    @staticmethod
+    def key(sql: str, release: str) -> str:
+        return hashlib.sha256(
+            f"{release}\n{sql}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[List[tuple]]:
+        """ Returns the cached rows for `key`, or `None` on a miss. """
+        filepath = self._filepath(key)
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            return None
+        if time.time() - stat.st_mtime > self._ttl:
+            self._remove(filepath)
+            return None
+        try:
+            with gzip.open(filepath, 'rb') as f:
+                rows = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # Truncated/corrupt entry: treat as a miss, and re-populate
+            self._remove(filepath)
+            return None
+        # Record the read (atime) for LRU eviction, keeping the write time
+        # (mtime) that the TTL is measured from
+        os.utime(filepath, (time.time(), stat.st_mtime))
+        return rows
+
+    def put(self, key: str, rows: List[tuple]) -> None:
+        os.makedirs(self._root_dir, exist_ok=True)
+        # Write to a temp file & rename, so readers never see partial entries
+        fd, tmp_filepath = tempfile.mkstemp(dir=self._root_dir,
+                                            suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw_f, \
+                    gzip.GzipFile(fileobj=raw_f, mode='wb',
+                                  compresslevel=1) as f:
+                pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_filepath, self._filepath(key))
+        except BaseException:
+            self._remove(tmp_filepath)
+            raise
+        self._evict()
+
+    def clear(self) -> None:
+        for filepath, _ in self._entries():
+            self._remove(filepath)
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_atime)
+        total_bytes = sum(stat.st_size for _, stat in entries)
+        for filepath, stat in entries:
+            if total_bytes <= self._max_bytes:
+                break
+            self._remove(filepath)
+            total_bytes -= stat.st_size
+
+    def _entries(self):
+        if not os.path.isdir(self._root_dir):
+            return []
+        entries = []
+        for filename in os.listdir(self._root_dir):
+            if filename.endswith(self._suffix):
+                filepath = os.path.join(self._root_dir, filename)
+                try:
+                    entries.append((filepath, os.stat(filepath)))
+                except FileNotFoundError:
+                    pass
+        return entries
+
+    def _filepath(self, key: str) -> str:
+        return os.path.join(self._root_dir, f'{key}{self._suffix}')
+
+    @staticmethod
+    def _remove(filepath: str):
+        try:
+            os.remove(filepath)
+        except FileNotFoundError:
+            pass
+
+
+def _default_root_dir() -> str:
+    cache_home = (os.environ.get('XDG_CACHE_HOME') or
+                  os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_home, 'phytebyte', 'queries')
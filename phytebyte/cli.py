@@ -0,0 +1,163 @@
+""" The `phytebyte` command:
+
+    phytebyte db prepare [--chembl-db-url URL] [--refresh]
+    phytebyte snapshot OUT_DIR [--chembl-db-url URL] [--foodb-db-url URL]
+                               [--format {sqlite,arrow}] [--workers N]
+    phytebyte synthetic OUT_DIR [--compounds N] [--food-compounds N]
+                                [--seed SEED]
+"""
+import argparse
+import logging
+import os
+import sys
+from typing import List
+
+# Just the (light) bioactivity filters: each command imports the database
+# modules it uses, so `--help` & argument errors are instant
+from phytebyte.bioactive_cmpd.sources.chembl.bioactivity import bioact_filters
+
+
+def main(argv: List[str]=None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not hasattr(args, 'func'):
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='phytebyte')
+    commands = parser.add_subparsers(title='commands')
+
+    db = commands.add_parser('db', help="Manage the source databases")
+    db_commands = db.add_subparsers(title='db commands')
+    prepare = db_commands.add_parser(
+        'prepare',
+        help="Create phytebyte's gene-activity materialized view (and its "
+             "indexes) in ChEMBL, and report query timings before & after")
+    prepare.add_argument(
+        '--chembl-db-url', default=os.environ.get('CHEMBL_DB_URL'),
+        help="Defaults to $CHEMBL_DB_URL")
+    prepare.add_argument(
+        '--refresh', action='store_true',
+        help="Rebuild the view if it exists (i.e. after a ChEMBL upgrade)")
+    prepare.add_argument(
+        '--gene-targets', nargs='+', default=['PPARG'],
+        help="Gene targets of the query that is timed")
+    prepare.add_argument(
+        '--bioactivity-type', choices=sorted(bioact_filters),
+        default='agonist', help="Bioactivity type of the query that is timed")
+    prepare.set_defaults(func=db_prepare)
+
+    snapshot = commands.add_parser(
+        'snapshot',
+        help="Export the ChEMBL & FooDB columns phytebyte reads into local "
+             "files, to run without database servers")
+    snapshot.add_argument('out_dir', help="Directory of the snapshot")
+    snapshot.add_argument(
+        '--chembl-db-url', default=os.environ.get('CHEMBL_DB_URL'),
+        help="Defaults to $CHEMBL_DB_URL")
+    snapshot.add_argument(
+        '--foodb-db-url', default=os.environ.get('FOODB_URL'),
+        help="Defaults to $FOODB_URL")
+    snapshot.add_argument(
+        '--format', choices=['sqlite', 'arrow'], default='sqlite',
+        help="SQLite databases, or Arrow IPC files (memory-mapped when read; "
+             "needs pyarrow: `pip install phytebyte[arrow]`)")
+    snapshot.add_argument(
+        '--workers', type=int, default=4,
+        help="Number of tables exported in parallel")
+    snapshot.set_defaults(func=snapshot_export)
+
+    synthetic = commands.add_parser(
+        'synthetic',
+        help="Generate ChEMBL- & FooDB-shaped SQLite databases of synthetic, "
+             "drug-like compounds (i.e. for scale benchmarks)")
+    synthetic.add_argument(
+        'out_dir', help="Directory of the 'chembl.db' & 'foodb.db' files")
+    synthetic.add_argument(
+        '--compounds', type=int, default=10000,
+        help="Number of ChEMBL compounds")
+    synthetic.add_argument(
+        '--food-compounds', type=int, default=None,
+        help="Number of FooDB compounds (defaults to --compounds)")
+    synthetic.add_argument('--seed', type=int, default=0)
+    synthetic.set_defaults(func=synthetic_generate)
+    return parser
+
+
+def db_prepare(args) -> int:
+    from phytebyte.db import get_engine
+    from phytebyte.bioactive_cmpd.sources.chembl.gene_activity import (
+        GENE_ACTIVITY_VIEW, prepare_gene_activity_view)
+    from phytebyte.bioactive_cmpd.sources.chembl.queries import (
+        ChemblBioactiveCompoundQuery)
+    if not args.chembl_db_url:
+        print("No ChEMBL database: pass --chembl-db-url, or set "
+              "$CHEMBL_DB_URL", file=sys.stderr)
+        return 1
+
+    def benchmark_query(gene_activity_view: bool):
+        return ChemblBioactiveCompoundQuery(
+            bioact_filters[args.bioactivity_type],
+            gene_tgts=args.gene_targets,
+            lean=True,
+            gene_activity_view=gene_activity_view)
+
+    report = prepare_gene_activity_view(get_engine(args.chembl_db_url),
+                                        benchmark_query,
+                                        refresh=args.refresh)
+    print(f"'{GENE_ACTIVITY_VIEW}' is ready.")
+    print(f"Lean positive-compound query ({args.bioactivity_type} of "
+          f"{', '.join(args.gene_targets)}):")
+    print(f"  before: {report.before_seconds * 1000:.1f} ms")
+    print(f"  after:  {report.after_seconds * 1000:.1f} ms")
+    return 0
+
+
+def snapshot_export(args) -> int:
+    from phytebyte.snapshot.base import MissingFormatDependency
+    from phytebyte.snapshot.export import export_snapshot
+    db_urls = {database: db_url for database, db_url
+               in [('chembl', args.chembl_db_url),
+                   ('foodb', args.foodb_db_url)] if db_url}
+    if not db_urls:
+        print("No databases: pass --chembl-db-url and/or --foodb-db-url, or "
+              "set $CHEMBL_DB_URL and/or $FOODB_URL", file=sys.stderr)
+        return 1
+    try:
+        num_rows = export_snapshot(args.out_dir, db_urls,
+                                   format_name=args.format,
+                                   max_workers=args.workers)
+    except MissingFormatDependency as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Snapshot ({args.format}) written to '{args.out_dir}':")
+    for name, table_rows in sorted(num_rows.items()):
+        print(f"  {name}: {table_rows} rows")
+    return 0
+
+
+def synthetic_generate(args) -> int:
+    from phytebyte.synthetic import generate_chembl_db, generate_foodb_db
+    db_urls = {}
+    for name in ['chembl', 'foodb']:
+        db_path = os.path.join(args.out_dir, f"{name}.db")
+        if os.path.exists(db_path):
+            print(f"'{db_path}' already exists", file=sys.stderr)
+            return 1
+        db_urls[name] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.makedirs(args.out_dir, exist_ok=True)
+    food_compounds = args.food_compounds if args.food_compounds is not None \
+        else args.compounds
+    num_rows = dict(
+        generate_chembl_db(db_urls['chembl'], args.compounds, seed=args.seed),
+        **generate_foodb_db(db_urls['foodb'], food_compounds,
+                            seed=args.seed))
+    for name, table_rows in sorted(num_rows.items()):
+        print(f"  {name}: {table_rows} rows")
+    print(f"export CHEMBL_DB_URL=\"{db_urls['chembl']}\"")
+    print(f"export FOODB_URL=\"{db_urls['foodb']}\"")
+    return 0
@@ -0,0 +1,273 @@
+import logging
+import os
+from queue import Full, Queue
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, Iterator, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.util import LRUCache
+
+from phytebyte.query import KeyRange, Query
+from phytebyte.sqlite_compat import install_sqlite_compat
+from phytebyte.tracing import count
+
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_BATCH_SIZE = 1000
+# Seconds MySQL waits on a slow consumer of an unbuffered result set, before
+# aborting the stream (server default is 60)
+MYSQL_NET_WRITE_TIMEOUT = 3600
+# Number of compiled statements kept, shared by all engines (keyed by dialect)
+COMPILED_CACHE_SIZE = 256
+
+logger = logging.getLogger(__name__)
+
+_engines = {}
+_engines_lock = Lock()
+# Engines created by a parent process, which a forked child must never close
+_inherited_engines = []
+# Compiled forms of `Query.statement()`s, so each shape is compiled only once
+_compiled_cache = LRUCache(COMPILED_CACHE_SIZE)
+
+
+def get_engine(db_url: str,
+               pool_size: int=DEFAULT_POOL_SIZE,
+               max_overflow: int=DEFAULT_MAX_OVERFLOW):
+    """ Returns the process-wide `Engine` for `db_url`, creating it (and its
+    `QueuePool`) on first use. Connections are pre-pinged on checkout, so
+    stale connections in long-lived pools are transparently replaced.
+    """
+    key = (db_url, pool_size, max_overflow)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _create_engine(db_url, pool_size, max_overflow)
+            _engines[key] = engine
+    return engine
+
+
+def _create_engine(db_url, pool_size, max_overflow):
+    if make_url(db_url).get_backend_name() == 'sqlite':
+        # SQLite picks its own (Singleton/Null) pool, which takes no sizing
+        engine = create_engine(db_url, pool_pre_ping=True)
+        install_sqlite_compat(engine)
+        return engine
+    return create_engine(db_url,
+                         poolclass=QueuePool,
+                         pool_size=pool_size,
+                         max_overflow=max_overflow,
+                         pool_pre_ping=True)
+
+
+def dispose_engines() -> None:
+    """ Close all pooled connections and empty the engine registry. """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+def _forget_engines_after_fork():
+    # Pooled connections share their sockets with the parent process: closing
+    # them here would tear down the parent's sessions. Keep them referenced
+    # (so they're never garbage collected & closed), and let the child create
+    # its own engines on demand.
+    global _engines_lock
+    _engines_lock = Lock()
+    _inherited_engines.extend(_engines.values())
+    _engines.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_engines_after_fork)
+
+
+def stream_rows(engine,
+                statement,
+                batch_size: int=DEFAULT_BATCH_SIZE,
+                on_connect: Callable=None,
+                prefetch_chunks: int=0,
+                params: Dict=None) -> Iterator:
+    """ Executes `statement` on a dedicated connection, and yields its rows
+    while fetching them from the database `batch_size` rows at a time.
+
+    Rows are read through a server-side cursor where the driver supports one
+    (i.e. mysqlclient's `SSCursor`), so memory use is bounded by `batch_size`,
+    not by the size of the result set.
+
+    `on_connect`: Optional callable, passed the connection before `statement`
+    is executed (i.e. to set session state, like a random seed).
+    `prefetch_chunks`: If > 0, chunks are fetched on a background thread, up
+    to `prefetch_chunks` chunks ahead of the consumer, so that database I/O
+    overlaps with the consumer's work.
+    `params`: Values of the bound parameters of `statement`.
+    """
+    chunk_iter = _stream_chunks(engine, statement, batch_size, on_connect,
+                                params)
+    if prefetch_chunks > 0:
+        chunk_iter = prefetch(chunk_iter, prefetch_chunks)
+    for chunk in chunk_iter:
+        for row in chunk:
+            yield row
+
+
+def _stream_chunks(engine, statement, batch_size, on_connect,
+                   params) -> Iterator:
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True,
+                                      compiled_cache=_compiled_cache)
+        unbuffered = _prepare_unbuffered_stream(conn)
+        if on_connect is not None:
+            on_connect(conn)
+        exhausted = False
+        try:
+            result = _execute(conn, statement, params)
+            while True:
+                chunk = result.fetchmany(batch_size)
+                if not chunk:
+                    break
+                count("db.rows_fetched", len(chunk))
+                yield chunk
+            exhausted = True
+        finally:
+            if unbuffered and not exhausted:
+                # Closing an unbuffered MySQL cursor reads (and buffers!) the
+                # rest of the result set; drop the connection instead
+                conn.invalidate()
+
+
+def _execute(conn, statement, params):
+    if params:
+        return conn.execute(statement, params)
+    return conn.execute(statement)
+
+
+def fetch_rows(engine, statement, params: Dict=None) -> List:
+    """ Executes `statement`, and returns all of its rows (i.e. for small
+    result sets, that aren't worth streaming).
+    """
+    with engine.connect() as conn:
+        conn = conn.execution_options(compiled_cache=_compiled_cache)
+        rows = list(_execute(conn, statement, params))
+    count("db.rows_fetched", len(rows))
+    return rows
+
+
+# Kinds of entries passed from the `prefetch()` thread to its consumer
+_ITEM, _DONE, _ERROR = object(), object(), object()
+
+
+def prefetch(iterator: Iterator, max_items: int) -> Iterator:
+    """ Consumes `iterator` on a background thread, holding at most
+    `max_items` items in a queue ahead of the caller (backpressure: the
+    thread blocks while the queue is full). Exceptions raised by `iterator`
+    are re-raised in the caller. If the caller stops early, the thread stops
+    and closes `iterator`.
+    """
+    items = Queue(maxsize=max_items)
+    stopped = Event()
+
+    def produce():
+        try:
+            for item in iterator:
+                if not _put_unless_stopped(items, (_ITEM, item), stopped):
+                    break
+            else:
+                _put_unless_stopped(items, (_DONE, None), stopped)
+        except BaseException as e:
+            _put_unless_stopped(items, (_ERROR, e), stopped)
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+    producer = Thread(target=produce, name="phytebyte-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            kind, item = items.get()
+            if kind is _DONE:
+                break
+            elif kind is _ERROR:
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
+
+
+def _put_unless_stopped(items: Queue, entry, stopped: Event) -> bool:
+    while not stopped.is_set():
+        try:
+            items.put(entry, timeout=.1)
+            return True
+        except Full:
+            pass
+    return False
+
+
+def _prepare_unbuffered_stream(conn) -> bool:
+    """ Returns whether `conn` streams through an unbuffered MySQL cursor. """
+    if conn.dialect.name != 'mysql':
+        return False
+    if not conn.dialect.supports_server_side_cursors:
+        logger.warning(
+            f"MySQL driver '{conn.dialect.driver}' has no server-side cursor"
+            ": the entire result set will be buffered client-side.")
+        return False
+    # The server aborts an unbuffered result set, if the client doesn't read
+    # from it for `net_write_timeout` seconds (i.e. while fingerprinting)
+    conn.execute(
+        f"SET SESSION net_write_timeout = {MYSQL_NET_WRITE_TIMEOUT}")
+    return True
+
+
+class DatabaseSource(object):
+    """ Shared connection & streaming logic of all database-backed sources
+    (i.e. `BioactiveCompoundSource` and `FoodCmpdSource`).
+
+    `pool_size`: Number of connections kept open in the engine's pool.
+    `batch_size`: Number of rows fetched per round trip while streaming.
+    `prefetch_chunks`: Number of `batch_size` chunks read ahead of the
+    consumer on a background thread (0 disables read-ahead).
+    """
+    def __init__(self,
+                 db_url: str,
+                 pool_size: int=DEFAULT_POOL_SIZE,
+                 batch_size: int=DEFAULT_BATCH_SIZE,
+                 prefetch_chunks: int=0):
+        self.db_url = db_url
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.prefetch_chunks = prefetch_chunks
+
+    @property
+    def engine(self):
+        return get_engine(self.db_url, pool_size=self.pool_size)
+
+    def stream_rows(self, statement, on_connect: Callable=None,
+                    params: Dict=None) -> Iterator:
+        return stream_rows(self.engine, statement,
+                           batch_size=self.batch_size,
+                           on_connect=on_connect,
+                           prefetch_chunks=self.prefetch_chunks,
+                           params=params)
+
+    def stream_query(self, query: Query,
+                     on_connect: Callable=None) -> Iterator:
+        """ Streams the rows of `query`'s cached, parametrized statement. """
+        return self.stream_rows(query.statement(), on_connect=on_connect,
+                                params=query.params)
+
+    def fetch_query(self, query: Query) -> List:
+        return fetch_rows(self.engine, query.statement(), query.params)
+
+    def key_ranges(self, query: Query, num_partitions: int) -> List[KeyRange]:
+        """ Splits the rows matched by `query` into (at most) `num_partitions`
+        primary-key ranges, to be scanned with `query.build_range()`.
+        """
+        with self.engine.connect() as conn:
+            min_key, max_key = conn.execute(query.build_key_bounds()).first()
+        return query.split_key_range(min_key, max_key, num_partitions)
@@ -1,7 +1,15 @@
 from abc import ABC, abstractmethod
 from bitarray import bitarray
 import numpy as np
-from typing import List
+from typing import List, Optional, TYPE_CHECKING
+
+from phytebyte.tracing import count
+from .encoding import (
+    bitarray_to_dense, bitarrays_to_dense, bits_to_sparse, dense_to_bits)
+
+# scipy is only imported by the 'sparse' encoding
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
 
 
 class Fingerprinter(ABC, object):
@@ -33,10 +41,13 @@ class Fingerprinter(ABC, object):
         return fp_class()
 
     def fingerprint_and_encode(self, smiles: str, encoding: str):
+        count("fingerprinter.fingerprints")
         if encoding == 'numpy':
             return self.smiles_to_nparray(smiles)
         elif encoding == 'bitarray':
             return self.smiles_to_bitarray(smiles)
+        elif encoding == 'sparse':
+            return self.smiles_to_sparse(smiles)
         else:
             raise NotImplementedError(encoding)
 
@@ -58,13 +69,41 @@ class Fingerprinter(ABC, object):
         return [self.smiles_to_bitarray(smiles)
                 for smiles in smiles_iter]
 
+    def smiles_to_sparse_rows(self, smiles_iter) -> 'csr_matrix':
+        """ Converts `smiles_iter` into a `scipy.sparse.csr_matrix`, with a
+        row of each fingerprint's on-bits (empty for SMiLES that can't be
+        fingerprinted), built straight from their indices, without a dense
+        row per fingerprint.
+        """
+        assert type(smiles_iter) is not str,\
+            "`smiles_iter` must be a seq of smile strings not single SMiLE str"
+        return bits_to_sparse(
+            [self.smiles_to_bits(smiles) for smiles in smiles_iter],
+            self.fp_length)
+
+    def smiles_to_sparse(self, smiles: str) -> Optional['csr_matrix']:
+        """ Converts 1 SMiLES into a 1-row `scipy.sparse.csr_matrix` """
+        bits = self.smiles_to_bits(smiles)
+        if bits is not None:
+            return bits_to_sparse([bits], self.fp_length)
+
+    def smiles_to_bits(self, smiles: str) -> Optional[np.ndarray]:
+        """ The indices of the on-bits of the fingerprint of `smiles`.
+        Fingerprinters that compute them directly override this.
+        """
+        nparray = self.smiles_to_nparray(smiles)
+        if nparray is not None:
+            return dense_to_bits(nparray)
+
     def bitarrays_to_nparrays(self, bitarray_iter) -> np.ndarray:
-        """ Converts bitarray encoding of each Fingerprint into an nparray  """
-        return [self.bitarray_to_nparray(bitarr) for bitarr in bitarray_iter]
+        """ Converts bitarray encoding of each Fingerprint into an nparray
+        (the rows of a matrix)
+        """
+        return bitarrays_to_dense(list(bitarray_iter))
 
     def bitarray_to_nparray(self, bitarr) -> np.array:
         """ Converts bitarray encoding of 1 Fingerprint into an nparray  """
-        return np.array(bitarr.tolist())
+        return bitarray_to_dense(bitarr)
 
     @abstractmethod
     def smiles_to_nparray(self, smiles: str) -> np.array:
@@ -81,6 +120,14 @@ class Fingerprinter(ABC, object):
         """
         pass
 
+    @property
+    def fp_length(self) -> int:
+        """ The number of bits of each fingerprint (needed by the 'sparse'
+        encoding).
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} fingerprints have no fixed length")
+
     @classmethod
     def get_available_fingerprints(cls):
         from phytebyte.fingerprinters.pybel import (
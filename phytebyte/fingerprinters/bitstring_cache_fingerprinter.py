@@ -1,6 +1,9 @@
 from bitarray import bitarray
 import numpy as np
+from phytebyte.tracing import count
 from .base import Fingerprinter
+from .encoding import (
+    bits_to_sparse, bitstring_to_bits, bitstring_to_dense, dense_to_bitstring)
 
 
 class BitstringCacheFingerprinter(Fingerprinter):
@@ -10,9 +13,25 @@ class BitstringCacheFingerprinter(Fingerprinter):
     def set_cache(cls, bitstring_cache):
         cls._bitstring_cache = bitstring_cache
 
+    def __getstate__(self):
+        # The cache is a class attribute, so it's pickled along, for workers
+        # that don't inherit it by forking
+        return dict(self.__dict__, _bitstring_cache=self._bitstring_cache)
+
+    def __setstate__(self, state):
+        state = dict(state)
+        bitstring_cache = state.pop('_bitstring_cache', None)
+        self.__dict__.update(state)
+        if bitstring_cache is not None:
+            type(self).set_cache(bitstring_cache)
+
     def fingerprint_and_encode(self, smiles: str, encoding: str):
         cached_bitstring = self._bitstring_cache.get(
             smiles) if self._bitstring_cache else None
+        if cached_bitstring is None:
+            count("fingerprinter.fingerprints")
+        else:
+            count("fingerprinter.cache_hits")
         if encoding == 'numpy':
             if cached_bitstring is not None:
                 return self.bitstring_to_nparray(cached_bitstring)
@@ -23,6 +42,11 @@ class BitstringCacheFingerprinter(Fingerprinter):
                 return self.bitstring_to_bitarray(cached_bitstring)
             else:
                 return self.smiles_to_bitarray(smiles)
+        elif encoding == 'sparse':
+            if cached_bitstring is not None:
+                return self.bitstring_to_sparse(cached_bitstring)
+            else:
+                return self.smiles_to_sparse(smiles)
         else:
             raise NotImplementedError(encoding)
 
@@ -34,7 +58,7 @@ class BitstringCacheFingerprinter(Fingerprinter):
     @staticmethod
     def nparray_to_bitstring(nparray: np.ndarray):
         if nparray is not None:
-            return "".join([str(bit) for bit in list(nparray)])
+            return dense_to_bitstring(nparray)
 
     @staticmethod
     def bitarray_to_bitstring(bitarr: bitarray):
@@ -44,7 +68,13 @@ class BitstringCacheFingerprinter(Fingerprinter):
     @staticmethod
     def bitstring_to_nparray(bitstring: str):
         if bitstring:
-            return np.fromstring(bitstring, dtype='u1') - 48
+            return bitstring_to_dense(bitstring)
+
+    @staticmethod
+    def bitstring_to_sparse(bitstring: str):
+        if bitstring:
+            return bits_to_sparse([bitstring_to_bits(bitstring)],
+                                  len(bitstring))
 
     @staticmethod
     def bitstring_to_bitarray(bitstring: str):
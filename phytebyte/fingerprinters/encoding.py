@@ -0,0 +1,151 @@
+""" Conversions between the encodings of (binary) fingerprints, through
+buffers & `np.packbits()`/`np.unpackbits()` (rather than a Python object per
+bit):
+
+- packed: A `np.ndarray` of uint8s, 8 bits per byte (most significant bit
+  first, as a big-endian `bitarray`), zero-padded to whole bytes.
+- bitarray: A (big-endian, the default) `bitarray`, whose buffer is packed
+  bytes.
+- dense: A `np.ndarray` of uint8 0's & 1's (the 'numpy' encoding).
+- bits: A `np.ndarray` of the indices of the on-bits.
+- bitstring: A str of '0's & '1's (as cached by `BitstringSmilesCache`).
+
+The batch variants (plural) convert the rows of a whole matrix at once.
+"""
+from bitarray import bitarray
+import numpy as np
+from typing import List, Optional, Sequence, TYPE_CHECKING
+
+# scipy is only imported by the 'sparse' encoding
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+_ZERO = ord('0')
+
+
+def dense_to_packed(dense: np.ndarray) -> np.ndarray:
+    """ Packs the last axis of `dense` (any non-zero being a 1) """
+    return np.packbits(np.asarray(dense), axis=-1)
+
+
+def packed_to_dense(packed: np.ndarray, num_bits: int) -> np.ndarray:
+    """ Unpacks the last axis of `packed` into `num_bits` 0's & 1's """
+    return np.unpackbits(np.asarray(packed, dtype=np.uint8), axis=-1,
+                         count=num_bits)
+
+
+def bitarray_to_packed(bitarr: bitarray) -> np.ndarray:
+    return np.frombuffer(bitarr.tobytes(), dtype=np.uint8)
+
+
+def packed_to_bitarray(packed: np.ndarray, num_bits: int) -> bitarray:
+    bitarr = bitarray(endian='big')
+    bitarr.frombytes(np.ascontiguousarray(packed, dtype=np.uint8).tobytes())
+    del bitarr[num_bits:]
+    return bitarr
+
+
+def bitarray_to_dense(bitarr: bitarray) -> np.ndarray:
+    return packed_to_dense(np.frombuffer(_buffer(bitarr), dtype=np.uint8),
+                           len(bitarr))
+
+
+def dense_to_bitarray(dense: np.ndarray) -> bitarray:
+    return packed_to_bitarray(dense_to_packed(dense), len(dense))
+
+
+def dense_to_bits(dense: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(dense).astype(np.int32)
+
+
+def bits_to_dense(bits: Sequence[int], num_bits: int) -> np.ndarray:
+    dense = np.zeros(num_bits, dtype=np.uint8)
+    dense[np.asarray(bits, dtype=np.intp)] = 1
+    return dense
+
+
+def bitstring_to_dense(bitstring: str) -> np.ndarray:
+    return np.frombuffer(bitstring.encode('ascii'), dtype=np.uint8) - _ZERO
+
+
+def dense_to_bitstring(dense: np.ndarray) -> str:
+    return (np.not_equal(dense, 0).view(np.uint8) + _ZERO).tobytes().decode(
+        'ascii')
+
+
+def bitstring_to_bits(bitstring: str) -> np.ndarray:
+    return dense_to_bits(
+        np.frombuffer(bitstring.encode('ascii'), dtype=np.uint8) != _ZERO)
+
+
+def bitarrays_to_packed(bitarrays: Sequence[bitarray]) -> np.ndarray:
+    """ `bitarrays` (of equal length) packed into the rows of a matrix """
+    num_bytes = (len(bitarrays[0]) + 7) // 8 if len(bitarrays) else 0
+    return np.frombuffer(
+        b"".join(bitarr.tobytes() for bitarr in bitarrays),
+        dtype=np.uint8).reshape(len(bitarrays), num_bytes)
+
+
+def packed_to_bitarrays(packed: np.ndarray, num_bits: int
+                        ) -> List[bitarray]:
+    return [packed_to_bitarray(row, num_bits) for row in packed]
+
+
+def bitarrays_to_dense(bitarrays: Sequence[bitarray]) -> np.ndarray:
+    num_bits = len(bitarrays[0]) if len(bitarrays) else 0
+    return packed_to_dense(bitarrays_to_packed(bitarrays), num_bits)
+
+
+def dense_to_bitarrays(dense: np.ndarray) -> List[bitarray]:
+    dense = np.asarray(dense)
+    return packed_to_bitarrays(dense_to_packed(dense), dense.shape[-1])
+
+
+def bitstrings_to_dense(bitstrings: Sequence[str]) -> np.ndarray:
+    """ `bitstrings` (of equal length) as the rows of a matrix """
+    num_bits = len(bitstrings[0]) if len(bitstrings) else 0
+    return bitstring_to_dense("".join(bitstrings)).reshape(len(bitstrings),
+                                                          num_bits)
+
+
+def dense_to_bitstrings(dense: np.ndarray) -> List[str]:
+    dense = np.asarray(dense)
+    joined, num_bits = dense_to_bitstring(dense), dense.shape[-1]
+    return [joined[start:start + num_bits]
+            for start in range(0, len(joined), num_bits or 1)]
+
+
+def bits_to_sparse(bits_iter: Sequence[Optional[np.ndarray]],
+                   num_bits: int) -> 'csr_matrix':
+    """ A `csr_matrix` with a row of the on-bit indices of each of
+    `bits_iter` (`None` giving an empty row), & `num_bits` columns.
+    """
+    from scipy.sparse import csr_matrix
+    rows = [np.asarray([] if bits is None else bits, dtype=np.int32)
+            for bits in bits_iter]
+    indptr = np.zeros(len(rows) + 1, dtype=np.int32)
+    np.cumsum([len(row) for row in rows], out=indptr[1:])
+    indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+    return csr_matrix(
+        (np.ones(len(indices), dtype=np.uint8), indices, indptr),
+        shape=(len(rows), num_bits))
+
+
+def dense_to_sparse(dense: np.ndarray) -> 'csr_matrix':
+    """ The rows of `dense` as a `csr_matrix` """
+    from scipy.sparse import csr_matrix
+    return csr_matrix(np.atleast_2d(np.not_equal(dense, 0).view(np.uint8)))
+
+
+def sparse_to_dense(sparse: 'csr_matrix') -> np.ndarray:
+    return sparse.toarray().astype(np.uint8, copy=False)
+
+
+def _buffer(bitarr: bitarray):
+    """ A view of the bytes of `bitarr`, or a copy of them, for the
+    `bitarray` releases without the buffer protocol
+    """
+    try:
+        return memoryview(bitarr)
+    except TypeError:
+        return bitarr.tobytes()
@@ -1,11 +1,11 @@
 from abc import ABC, abstractmethod
-from bitarray import bitarray
 import numpy as np
 import pybel
 import warnings
 
 from phytebyte.fingerprinters.bitstring_cache_fingerprinter import (
     BitstringCacheFingerprinter)
+from phytebyte.fingerprinters.encoding import dense_to_bitarray
 from .io import PybelDeserializer
 
 warnings.simplefilter("ignore", DeprecationWarning)
@@ -20,10 +20,15 @@ class PybelFingerprinter(BitstringCacheFingerprinter, PybelDeserializer, ABC):
             arr[fp.bits] = True
             return arr
 
+    def smiles_to_bits(self, smiles: str):
+        fp = self.smiles_to_fingerprint(smiles)
+        if fp:
+            return np.array(fp.bits, dtype=np.int32)
+
     def smiles_to_bitarray(self, smiles: str):
         np_arr = self.smiles_to_nparray(smiles)
         if np_arr is not None:
-            return bitarray(list(np_arr))
+            return dense_to_bitarray(np_arr)
 
     def smiles_to_fingerprint(self, smiles: str):
         mol = self.smiles_to_molecule(smiles)
@@ -49,6 +54,10 @@ class PybelFingerprinter(BitstringCacheFingerprinter, PybelDeserializer, ABC):
             raise
         return fp
 
+    @property
+    def fp_length(self) -> int:
+        return self._pybel_fp_length
+
     @property
     @abstractmethod
     def fp_type(self):
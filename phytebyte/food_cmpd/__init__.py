@@ -1,4 +1,8 @@
+from phytebyte.lazy import lazy_attributes
 from phytebyte.food_cmpd.types import FoodCmpd, FoodContent
-from phytebyte.food_cmpd.sources import FoodCmpdSource
 
-__all__ = ['FoodCmpd', 'FoodContent', 'FoodCmpdSource']
+__all__ = ['FoodCmpd', 'FoodContent', 'FoodCmpdSource', 'FoodCmpdReport']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'FoodCmpdSource': '.sources',
+    'FoodCmpdReport': '.report'})
@@ -0,0 +1,45 @@
+from typing import Callable, List, Tuple
+
+from phytebyte.food_cmpd.sources import FoodCmpdSource
+from phytebyte.food_cmpd.types import FoodCmpd
+
+
+class FoodCmpdReport():
+    """ Builds the tabular report of the top-scoring food compounds.
+
+    The food content of all `top_k` compounds is prefetched with a single
+    `FoodCmpdSource.fetch_foods_many()` call, rather than one query per
+    compound when each row's food bullets are rendered.
+    """
+    headers = ["Compound", "Score", "Novel Relationship", "Foods"]
+
+    def __init__(self,
+                 food_cmpd_source: FoodCmpdSource,
+                 top_k: int=100):
+        self._food_cmpd_source = food_cmpd_source
+        self._top_k = top_k
+
+    def prefetch_foods(self, food_cmpds: List[FoodCmpd]) -> None:
+        foods_by_uid = self._food_cmpd_source.fetch_foods_many(
+            [food_cmpd.uid for food_cmpd in food_cmpds])
+        for food_cmpd in food_cmpds:
+            food_cmpd.foods = foods_by_uid.get(food_cmpd.uid, [])
+
+    def rows(self,
+             food_cmpds_sorted: List[Tuple[FoodCmpd, float]],
+             is_novel: Callable[[FoodCmpd], bool]=None) -> List[List]:
+        """ Returns one row per compound in the `top_k` of `food_cmpds_sorted`
+        that is found in at least one food.
+
+        `is_novel`: Optional callable, returning whether the compound-target
+        relationship is absent from the training data.
+        """
+        top_k = food_cmpds_sorted[:self._top_k]
+        self.prefetch_foods([food_cmpd for food_cmpd, _ in top_k])
+        rows = []
+        for food_cmpd, score in top_k:
+            food_bullets = food_cmpd.get_food_bullets()
+            if len(food_bullets) > 0:
+                novel = is_novel(food_cmpd) if is_novel else None
+                rows.append([food_cmpd.name, score, novel, food_bullets])
+        return rows
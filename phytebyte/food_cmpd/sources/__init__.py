@@ -1,10 +1,18 @@
-from .base import FoodCmpdSource
-from .foodb import (
-    FoodbFoodCmpdSource,
-    FoodbFoodCmpdQuery,
-    FoodbFoodsFromCmpdQuery)
+from phytebyte.lazy import lazy_attributes
 
 __all__ = ['FoodCmpdSource',
+           'AsyncFoodCmpdSource',
            'FoodbFoodCmpdSource',
            'FoodbFoodCmpdQuery',
-           'FoodbFoodsFromCmpdQuery']
+           'FoodbFoodsFromCmpdQuery',
+           'FoodbFoodsFromCmpdsQuery',
+           'SnapshotFoodCmpdSource']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'FoodCmpdSource': '.base',
+    'AsyncFoodCmpdSource': '.aio',
+    'FoodbFoodCmpdSource': '.foodb',
+    'FoodbFoodCmpdQuery': '.foodb',
+    'FoodbFoodsFromCmpdQuery': '.foodb',
+    'FoodbFoodsFromCmpdsQuery': '.foodb',
+    'SnapshotFoodCmpdSource': '.snapshot'})
@@ -0,0 +1,19 @@
+from typing import Dict, List
+
+from phytebyte.aio import AsyncSource
+from phytebyte.query import KeyRange
+from phytebyte.food_cmpd.types import FoodCmpd, FoodContent
+
+
+class AsyncFoodCmpdSource(AsyncSource):
+    """ Async variant of a `FoodCmpdSource`. Iterators returned by the source
+    are consumed on the executor, and awaited as lists.
+    """
+    async def fetch_all_cmpds(self, key_range: KeyRange=None
+                              ) -> List[FoodCmpd]:
+        return await self.run(
+            lambda: list(self._source.fetch_all_cmpds(key_range)))
+
+    async def fetch_foods_many(self, food_cmpd_uids: List[int]
+                               ) -> Dict[int, List[FoodContent]]:
+        return await self.run(self._source.fetch_foods_many, food_cmpd_uids)
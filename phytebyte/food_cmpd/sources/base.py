@@ -1,27 +1,31 @@
 from abc import ABC, abstractmethod
-from sqlalchemy import create_engine
-from typing import List
+from typing import Dict, List
 
+from phytebyte.db import DatabaseSource
+from phytebyte.query import KeyRange
 from phytebyte.food_cmpd.types import FoodCmpd, FoodContent
 
 
-class FoodCmpdSource(ABC):
-    def __init__(self, db_url):
-        self.db_url = db_url
-
-    @property
-    def engine(self):
-        engine = create_engine(self.db_url)
-        engine.execution_options(stream_results=True)
-        return engine
-
+class FoodCmpdSource(DatabaseSource, ABC):
     @abstractmethod
-    def fetch_all_cmpds(self) -> List[FoodCmpd]:
+    def fetch_all_cmpds(self, key_range: KeyRange=None) -> List[FoodCmpd]:
         """
         Fetch a `FoodCmpd` for each unique ID in the database.
+
+        `key_range`: Optional (lower, upper) range of IDs to restrict the
+        scan to, as returned by `cmpd_key_ranges()`.
         """
         pass
 
+    def cmpd_key_ranges(self, num_partitions: int) -> List[KeyRange]:
+        """
+        Split the compound IDs into (at most) `num_partitions` disjoint
+        ranges, in ID order, that can be scanned in parallel by passing each
+        to `fetch_all_cmpds()`. Sources that can't be partitioned are
+        scanned as a single range.
+        """
+        return [None]
+
     @abstractmethod
     def fetch_foods(self, food_cmpd_ids: List[int]) -> List[FoodContent]:
         """
@@ -32,3 +36,18 @@ class FoodCmpdSource(ABC):
         for the database in question.
         """
         pass
+
+    @abstractmethod
+    def fetch_foods_many(self, food_cmpd_uids: List[int]
+                         ) -> Dict[int, List[FoodContent]]:
+        """
+        Fetch the foods containing each of the provided food compounds in a
+        single round trip, rather than one `fetch_foods()` call per compound.
+
+        `food_cmpd_uids`: List of integers corresponding to food compounds IDs
+        for the database in question.
+
+        Returns: A dict mapping each uid to its (possibly empty) list of
+        `FoodContent` objects.
+        """
+        pass
@@ -1,8 +1,12 @@
-from .foodb import FoodbFoodCmpdSource
-from .queries import (
-    FoodbFoodCmpdQuery,
-    FoodbFoodsFromCmpdQuery)
+from phytebyte.lazy import lazy_attributes
 
 __all__ = ['FoodbFoodCmpdSource',
            'FoodbFoodCmpdQuery',
-           'FoodbFoodsFromCmpdQuery']
+           'FoodbFoodsFromCmpdQuery',
+           'FoodbFoodsFromCmpdsQuery']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'FoodbFoodCmpdSource': '.foodb',
+    'FoodbFoodCmpdQuery': '.queries',
+    'FoodbFoodsFromCmpdQuery': '.queries',
+    'FoodbFoodsFromCmpdsQuery': '.queries'})
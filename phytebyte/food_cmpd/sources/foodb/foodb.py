@@ -1,44 +1,43 @@
-from typing import List, Iterator
+from typing import Dict, List, Iterator
 
+from phytebyte.query import KeyRange
 from phytebyte.food_cmpd.sources import FoodCmpdSource
 from phytebyte.food_cmpd import FoodCmpd, FoodContent
 from .queries import (
-    FoodbFoodCmpdQuery, FoodbFoodCmpdSmilesOnlyQuery, FoodbFoodsFromCmpdQuery)
+    FoodbFoodCmpdQuery, FoodbFoodCmpdSmilesOnlyQuery, FoodbFoodsFromCmpdQuery,
+    FoodbFoodsFromCmpdsQuery)
 
 
 class FoodbFoodCmpdSource(FoodCmpdSource):
-    def fetch_all_cmpds(self) -> Iterator[FoodCmpd]:
+    def fetch_all_cmpds(self, key_range: KeyRange=None
+                        ) -> Iterator[FoodCmpd]:
         query = FoodbFoodCmpdQuery()
-        executable_query = query.build()
-        conn = self.engine.connect()
-        conn.execution_options(stream_results=True)
-        iterator = conn.execute(executable_query)
-        cnt = 0
-        while True:
-            chunk = iterator.fetchmany(1000)
-            cnt += 1
-            if not chunk:
-                break
-            for row in chunk:
-                yield query.row_to_food_cmpd(row, self)
+        executable_query = query.build_range(key_range)
+        for row in self.stream_rows(executable_query):
+            yield query.row_to_food_cmpd(row, self)
 
-    def fetch_all_cmpd_smiles(self) -> Iterator[str]:
+    def fetch_all_cmpd_smiles(self, key_range: KeyRange=None
+                              ) -> Iterator[str]:
         query = FoodbFoodCmpdSmilesOnlyQuery()
-        executable_query = query.build()
-        conn = self.engine.connect()
-        conn.execution_options(stream_results=True)
-        iterator = conn.execute(executable_query)
-        cnt = 0
-        while True:
-            chunk = iterator.fetchmany(1000)
-            cnt += 1
-            if not chunk:
-                break
-            for row in chunk:
-                yield row[0]
+        executable_query = query.build_range(key_range)
+        for row in self.stream_rows(executable_query):
+            yield row[0]
+
+    def cmpd_key_ranges(self, num_partitions: int) -> List[KeyRange]:
+        return self.key_ranges(FoodbFoodCmpdQuery(), num_partitions)
 
     def fetch_foods(self, food_cmpd_uid: int) -> List[FoodContent]:
         query = FoodbFoodsFromCmpdQuery(food_cmpd_uid)
-        executable_query = query.build()
         return [query.row_to_food_content(row)
-                for row in self.engine.connect().execute(executable_query)]
+                for row in self.fetch_query(query)]
+
+    def fetch_foods_many(self, food_cmpd_uids: List[int]
+                         ) -> Dict[int, List[FoodContent]]:
+        foods_by_uid = {uid: [] for uid in food_cmpd_uids}
+        if not food_cmpd_uids:
+            return foods_by_uid
+        query = FoodbFoodsFromCmpdsQuery(list(food_cmpd_uids))
+        for row in self.fetch_query(query):
+            uid, food_content = query.row_to_cmpd_uid_and_food_content(row)
+            foods_by_uid[uid].append(food_content)
+        return foods_by_uid
@@ -1,4 +1,6 @@
 from sqlalchemy import select, and_, desc
+from typing import List, Tuple
+
 from phytebyte import Query
 from phytebyte.food_cmpd.types import FoodCmpd, FoodContent
 from .models import Compound, Content, Food
@@ -31,6 +33,10 @@ class FoodbFoodCmpdQuery(Query):
     def _order_by(self):
         return (Compound.id,)
 
+    @property
+    def _key_column(self):
+        return Compound.id
+
 
 class FoodbFoodCmpdSmilesOnlyQuery(FoodbFoodCmpdQuery):
     @property
@@ -50,6 +56,10 @@ class FoodbFoodsFromCmpdQuery(Query):
         return f"""<FoodbFoodsFromCmpdQuery
             {self._food_cmpd_uid}>"""
 
+    @property
+    def params(self):
+        return {'food_cmpd_uid': self._food_cmpd_uid}
+
     @staticmethod
     def row_to_food_content(row) -> FoodContent:
         return FoodContent(*row)
@@ -79,7 +89,7 @@ class FoodbFoodsFromCmpdQuery(Query):
     def _whereclause(self):
         return and_(
             Content.source_type == "Compound",
-            Compound.id == self._food_cmpd_uid)
+            Compound.id == self._param('food_cmpd_uid'))
 
     @property
     def _order_by(self):
@@ -89,3 +99,50 @@ class FoodbFoodsFromCmpdQuery(Query):
             desc(Content.orig_max),
             desc(Content.orig_min))
         return order_by_tuple
+
+
+class FoodbFoodsFromCmpdsQuery(FoodbFoodsFromCmpdQuery):
+    """ Batched variant of `FoodbFoodsFromCmpdQuery`: fetches the food content
+    of many compounds in one `IN` query. Each row is prefixed with the uid of
+    the compound it belongs to, so callers can group rows locally.
+    """
+    def __init__(self,
+                 food_cmpd_uids: List[int]):
+        self._food_cmpd_uids = food_cmpd_uids
+        assert isinstance(self._food_cmpd_uids, (list, tuple))
+        assert all(isinstance(uid, int) for uid in self._food_cmpd_uids)
+
+    def __repr__(self):
+        return f"""<FoodbFoodsFromCmpdsQuery
+            {self._food_cmpd_uids}>"""
+
+    @property
+    def params(self):
+        return {'food_cmpd_uids': list(self._food_cmpd_uids)}
+
+    @staticmethod
+    def row_to_cmpd_uid_and_food_content(row) -> Tuple[int, FoodContent]:
+        return row[0], FoodContent(*row[1:])
+
+    @property
+    def _select(self):
+        return select([
+            Compound.id.label("cmpd_uid"),
+            Food.name,
+            Food.description,
+            Content.orig_food_part,
+            Content.orig_content,
+            Content.orig_unit,
+            Content.orig_min,
+            Content.orig_max,
+            Content.standard_content])
+
+    @property
+    def _whereclause(self):
+        return and_(
+            Content.source_type == "Compound",
+            Compound.id.in_(self._param('food_cmpd_uids')))
+
+    @property
+    def _order_by(self):
+        return (Compound.id,) + super()._order_by
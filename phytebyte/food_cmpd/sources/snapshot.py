@@ -0,0 +1,55 @@
+from typing import Dict, Iterator, List
+
+from phytebyte.query import KeyRange, Query
+from phytebyte.food_cmpd.sources import FoodCmpdSource
+from phytebyte.food_cmpd.types import FoodCmpd, FoodContent
+from phytebyte.snapshot import Snapshot
+
+_CMPD_COLUMNS = ["uid", "smiles", "name", "description"]
+_CONTENT_COLUMNS = ["cmpd_uid", "food_name", "food_descr", "food_part",
+                    "content", "unit", "min", "max", "amount"]
+
+
+class SnapshotFoodCmpdSource(FoodCmpdSource):
+    """ Serves the same compounds & food content as `FoodbFoodCmpdSource`,
+    from the FooDB tables of a `phytebyte snapshot`, without a database
+    server.
+    """
+    def __init__(self, snapshot_dir: str):
+        super().__init__(None)
+        self.snapshot = Snapshot(snapshot_dir)
+
+    def fetch_all_cmpds(self, key_range: KeyRange=None
+                        ) -> Iterator[FoodCmpd]:
+        for row in self.snapshot.table("food_compounds").rows(
+                _CMPD_COLUMNS,
+                between=None if key_range is None else {"uid": key_range}):
+            yield FoodCmpd(self, *row)
+
+    def cmpd_key_ranges(self, num_partitions: int) -> List[KeyRange]:
+        uids = [uid for (uid,) in
+                self.snapshot.table("food_compounds").rows(["uid"])]
+        if not uids:
+            return []
+        return Query.split_key_range(min(uids), max(uids), num_partitions)
+
+    def fetch_foods(self, food_cmpd_uid: int) -> List[FoodContent]:
+        return self.fetch_foods_many([food_cmpd_uid])[food_cmpd_uid]
+
+    def fetch_foods_many(self, food_cmpd_uids: List[int]
+                         ) -> Dict[int, List[FoodContent]]:
+        foods_by_uid = {uid: [] for uid in food_cmpd_uids}
+        if not food_cmpd_uids:
+            return foods_by_uid
+        for row in self.snapshot.table("food_contents").rows(
+                _CONTENT_COLUMNS, {"cmpd_uid": list(food_cmpd_uids)}):
+            foods_by_uid[row[0]].append(FoodContent(*row[1:]))
+        for foods in foods_by_uid.values():
+            foods.sort(key=self._content_sort_key)
+        return foods_by_uid
+
+    @staticmethod
+    def _content_sort_key(food: FoodContent):
+        # Largest amounts first (as `FoodbFoodsFromCmpdQuery`), missing last
+        return tuple((value is None, -(value or 0)) for value in
+                     (food.content, food.amount, food.max, food.min))
@@ -8,17 +8,28 @@ FoodContent = namedtuple(
 
 
 class FoodCmpd:
-    def __init__(self, source, uid_, smiles, name, descr):
+    def __init__(self, source, uid_, smiles, name, descr,
+                 foods: List[FoodContent]=None):
         self.source = source
         self.uid = uid_
         self.smiles = smiles
         self.name = name
         self.descr = descr
+        self._foods = foods
 
     @property
     def foods(self) -> List[FoodContent]:
+        """ Prefetched food content (see `FoodCmpdSource.fetch_foods_many()`)
+        if available, otherwise queried from `self.source` on each access.
+        """
+        if self._foods is not None:
+            return self._foods
         return [f for f in self.source.fetch_foods(self.uid)]
 
+    @foods.setter
+    def foods(self, foods: List[FoodContent]):
+        self._foods = foods
+
     @staticmethod
     def get_amount(food: FoodContent):
         amt = food.content or food.amount or food.max or food.min
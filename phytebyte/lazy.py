@@ -0,0 +1,36 @@
+""" Module-level lazy attributes (PEP 562), so that importing a package
+doesn't import all of its submodules (and their dependencies: SQLAlchemy &
+the ChEMBL/FooDB models, sklearn, ...). Workers that only fingerprint or
+score compounds then import just the modules they use.
+"""
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_attributes(package_name: str, attributes: Dict[str, str]
+                    ) -> Tuple[Callable[[str], object], Callable[[], List]]:
+    """ Returns the `__getattr__` & `__dir__` of package `package_name`,
+    which import each of its `attributes` (name -> module, relative to the
+    package) on first access.
+
+    Usage, in the package's `__init__.py`:
+
+        __getattr__, __dir__ = lazy_attributes(__name__, {
+            'ChemblBioactiveCompoundSource': '.chembl', ...})
+    """
+    def __getattr__(name: str):
+        module_name = attributes.get(name)
+        if module_name is None:
+            raise AttributeError(
+                f"module '{package_name}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(module_name, package_name),
+                        name)
+        # Cached on the package, so later accesses skip `__getattr__`
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package_name])) | set(attributes))
+
+    return __getattr__, __dir__
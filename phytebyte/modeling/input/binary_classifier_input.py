@@ -1,7 +1,14 @@
 from abc import ABC, abstractmethod
+import itertools
+import os
+import tempfile
 import numpy as np
 from bitarray import bitarray
-from typing import List
+from typing import Iterable, Iterator, List, Tuple, TYPE_CHECKING
+
+# scipy is only imported by the 'sparse' encoding
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
 
 
 class BinaryClassifierInput(ABC):
@@ -19,23 +26,52 @@ class BinaryClassifierInput(ABC):
 
 
 class NumpyBinaryClassifierInput(BinaryClassifierInput):
-    def __init__(self, positives: np.ndarray, negatives: np.ndarray):
-        self._X = np.append(positives, negatives, axis=0)
-        self._y = np.append(np.ones(len(positives)),
-                            np.zeros(len(negatives)))
+    """ The fingerprints of `positives` & `negatives` (either of which may be
+    an iterator, e.g. of negative samples as they're drawn) are written
+    straight into the rows of one preallocated design matrix, with uint8
+    labels. `None`s (compounds that couldn't be fingerprinted) are skipped.
+
+    `max_rows`: The most rows there may be (needed if either is an iterator).
+    `memmap_dir`: If given, the matrix is a memory map of a scratch file in
+    this directory (removed once mapped), rather than held in memory: for
+    very large sets of negatives.
+    `sparse`: Whether `positives` & `negatives` are `scipy.sparse` rows
+    (or matrices) of the 'sparse' encoding, which are written into the
+    arrays of one `csr_matrix` (grown as needed), rather than a dense array.
+    `memmap_dir` isn't supported with it.
+    """
+    def __init__(self, positives: Iterable, negatives: Iterable,
+                 sparse: bool=False, max_rows: int=None,
+                 memmap_dir: str=None):
+        rows = itertools.chain(_sparse_blocks(positives) if sparse
+                               else _not_none(positives),
+                               [_END_OF_POSITIVES],
+                               _sparse_blocks(negatives) if sparse
+                               else _not_none(negatives))
+        if sparse:
+            if memmap_dir is not None:
+                raise ValueError("memmap_dir isn't supported for sparse rows")
+            self._X, num_positives = _write_sparse_rows(rows, max_rows)
+            self._y = _labels(num_positives, self._X.shape[0] - num_positives)
+            return
+        if max_rows is None:
+            max_rows = _num_rows(positives) + _num_rows(negatives)
+        self._X, num_positives = _write_rows(rows, max_rows, memmap_dir)
+        self._y = _labels(num_positives, len(self._X) - num_positives)
 
     def __len__(self):
-        return len(self._X)
+        return self._X.shape[0]
 
     def index(self, idx):
         return (self._X[idx,], self._y[idx])
 
 
 class BitarrayBinaryClassifierInput(BinaryClassifierInput):
-    def __init__(self, positives: List[bitarray], negatives: List[bitarray]):
-        self._X = positives + negatives
-        self._y = np.append(np.ones(len(positives)),
-                            np.zeros(len(negatives)))
+    def __init__(self, positives: List[bitarray],
+                 negatives: Iterable[bitarray]):
+        self._X = list(positives)
+        self._X.extend(negatives)
+        self._y = _labels(len(positives), len(self._X) - len(positives))
 
     def __len__(self):
         return len(self._X)
@@ -43,3 +79,182 @@ class BitarrayBinaryClassifierInput(BinaryClassifierInput):
     def index(self, idx):
         return ([self._X[i] for i in idx],
                 self._y[idx])
+
+
+class StreamingBinaryClassifierInput(BinaryClassifierInput):
+    """ The positives (held in memory), & an iterator of at most
+    `max_negatives` negatives, which are only drawn (e.g. sampled) as the
+    `batches()` they're in are trained on: the design matrix is never
+    materialized, for incremental models (see
+    `IncrementalBinaryClassifierModel`). It can be iterated once.
+
+    `encoding`: Of the rows: 'numpy' (arrays, stacked into a matrix),
+    'sparse' (`scipy.sparse` rows, stacked into a `csr_matrix`), or
+    'bitarray' (a list of `bitarray`s, as `BitarrayBinaryClassifierInput`).
+    """
+    def __init__(self, positives: Iterable, negatives: Iterator,
+                 max_negatives: int, encoding: str='numpy'):
+        self._positives = list(_not_none(positives))
+        self._negatives = _not_none(negatives)
+        self._max_negatives = max_negatives
+        self._encoding = encoding
+
+    def __len__(self):
+        """ The most samples there may be """
+        return len(self._positives) + self._max_negatives
+
+    def index(self, idx):
+        raise NotImplementedError(
+            "A streamed model input can't be indexed; iterate its batches()")
+
+    def batches(self, batch_size: int) -> Iterator[Tuple]:
+        """ Mini-batches of (about) `batch_size` negatives each, with an even
+        share of the positives, as (design matrix, labels).
+        """
+        num_batches = max(1, -(-self._max_negatives // batch_size))
+        for pos_idx in np.array_split(np.arange(len(self._positives)),
+                                      num_batches):
+            rows = [self._positives[i] for i in pos_idx]
+            num_positives = len(rows)
+            rows.extend(itertools.islice(self._negatives, batch_size))
+            if rows:
+                yield (self._stack(rows),
+                       _labels(num_positives, len(rows) - num_positives))
+        # Drawn to its end, e.g. for a sampler to check it drew enough
+        if next(self._negatives, None) is not None:
+            raise ValueError(
+                f"More than max_negatives={self._max_negatives} negatives")
+
+    def _stack(self, rows: List):
+        if self._encoding == 'sparse':
+            from scipy.sparse import vstack
+            return vstack(rows, format='csr')
+        elif self._encoding == 'bitarray':
+            return rows
+        return np.stack(rows)
+
+
+# Marks the end of the positives, among the rows written by `_write_rows()`
+_END_OF_POSITIVES = object()
+
+
+def _write_rows(rows: Iterable, max_rows: int, memmap_dir: str=None
+                ) -> Tuple[np.ndarray, int]:
+    """ Writes `rows` (positives, `_END_OF_POSITIVES`, then negatives) into
+    a matrix of `max_rows` rows, allocated (or mapped) once the first row
+    gives its width & dtype.
+
+    Returns: The filled rows of the matrix, & the number of positives.
+    """
+    X = None
+    num_rows = num_positives = 0
+    for row in rows:
+        if row is _END_OF_POSITIVES:
+            num_positives = num_rows
+            continue
+        if X is None:
+            X = _allocate((max_rows,) + np.shape(row), np.asarray(row).dtype,
+                          memmap_dir)
+        if num_rows == max_rows:
+            raise ValueError(f"More than max_rows={max_rows} rows")
+        X[num_rows] = row
+        num_rows += 1
+    if X is None:
+        return np.zeros((0, 0), dtype=np.uint8), 0
+    return X[:num_rows], num_positives
+
+
+def _write_sparse_rows(blocks: Iterable, max_rows: int=None
+                       ) -> Tuple['csr_matrix', int]:
+    """ As `_write_rows()`, for `scipy.sparse` rows (or blocks of them):
+    their indices & data are appended to the (growing) arrays of one
+    `csr_matrix`, so the blocks needn't all be held, & then stacked.
+    """
+    from scipy.sparse import csr_matrix
+    indptr = _GrowingArray(np.int64)
+    indptr.extend([0])
+    indices = data = None
+    num_rows = num_positives = num_cols = 0
+    for block in blocks:
+        if block is _END_OF_POSITIVES:
+            num_positives = num_rows
+            continue
+        block = block.tocsr()
+        if indices is None:
+            indices = _GrowingArray(block.indices.dtype)
+            data = _GrowingArray(block.data.dtype)
+            num_cols = block.shape[1]
+        num_rows += block.shape[0]
+        if max_rows is not None and num_rows > max_rows:
+            raise ValueError(f"More than max_rows={max_rows} rows")
+        indptr.extend(block.indptr[1:] + len(indices))
+        indices.extend(block.indices)
+        data.extend(block.data)
+    if indices is None:
+        return csr_matrix((0, 0), dtype=np.uint8), 0
+    # (One index dtype, so scipy needn't convert the indices)
+    index_dtype = np.int32 if len(indices) < 2 ** 31 else np.int64
+    return (csr_matrix((data.array,
+                        indices.array.astype(index_dtype, copy=False),
+                        indptr.array.astype(index_dtype)),
+                       shape=(num_rows, num_cols)),
+            num_positives)
+
+
+class _GrowingArray(object):
+    """ A 1-d array that's appended to, doubling its capacity as needed """
+    def __init__(self, dtype, capacity: int=1024):
+        self._array = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def extend(self, values: np.ndarray) -> None:
+        end = self._size + len(values)
+        if end > len(self._array):
+            grown = np.empty(max(end, 2 * len(self._array)),
+                             dtype=self._array.dtype)
+            grown[:self._size] = self._array[:self._size]
+            self._array = grown
+        self._array[self._size:end] = values
+        self._size = end
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._array[:self._size]
+
+
+def _allocate(shape: Tuple, dtype, memmap_dir: str=None) -> np.ndarray:
+    if memmap_dir is None:
+        # Pages of rows never written (i.e. of fewer negatives than
+        # expected) are never touched, so take no memory
+        return np.empty(shape, dtype=dtype)
+    fd, path = tempfile.mkstemp(suffix='.npy', dir=memmap_dir)
+    os.close(fd)
+    try:
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype,
+                                         shape=shape)
+    finally:
+        os.remove(path)
+
+
+def _labels(num_positives: int, num_negatives: int) -> np.ndarray:
+    y = np.zeros(num_positives + num_negatives, dtype=np.uint8)
+    y[:num_positives] = 1
+    return y
+
+
+def _not_none(rows: Iterable) -> Iterable:
+    return (row for row in rows if row is not None)
+
+
+def _num_rows(rows) -> int:
+    return rows.shape[0] if hasattr(rows, 'shape') else len(rows)
+
+
+def _sparse_blocks(rows) -> Iterable:
+    """ `rows` (a sparse matrix, or an iterable of sparse rows) as blocks of
+    rows for `_write_sparse_rows()`
+    """
+    return [rows] if hasattr(rows, 'tocsr') else _not_none(rows)
@@ -1,17 +1,58 @@
 from .binary_classifier_input import (
-    NumpyBinaryClassifierInput, BitarrayBinaryClassifierInput)
+    NumpyBinaryClassifierInput, BitarrayBinaryClassifierInput,
+    StreamingBinaryClassifierInput)
 
 
 class BinaryClassifierInputFactory():
     @classmethod
-    def create(cls, encoding: str, positives, negatives, *args, **kwargs):
-        if encoding == 'numpy':
+    def create(cls, encoding: str, positives, negatives, *args,
+               max_negatives: int=None, memmap_dir: str=None,
+               stream: bool=False, **kwargs):
+        """ `negatives` may be an iterator (of at most `max_negatives`, if
+        given), whose samples are written into the model input as they're
+        drawn.
+        `memmap_dir`: See `NumpyBinaryClassifierInput`. Only the 'numpy'
+        encoding supports it (`ValueError` is raised for the others); a
+        streamed input never holds its negatives, so doesn't need it.
+        `stream`: Whether to return a `StreamingBinaryClassifierInput`, whose
+        negatives are only drawn as they're trained on (by an incremental
+        model).
+        """
+        if stream:
+            if encoding not in ('numpy', 'sparse', 'bitarray'):
+                raise NotImplementedError(encoding)
+            return StreamingBinaryClassifierInput(
+                positives=positives,
+                negatives=negatives,
+                max_negatives=max_negatives,
+                encoding=encoding)
+        elif memmap_dir is not None and encoding != 'numpy':
+            raise ValueError(
+                f"memmap_dir isn't supported by the '{encoding}' encoding")
+        elif encoding == 'numpy':
             return NumpyBinaryClassifierInput(
                 positives=positives,
-                negatives=negatives)
+                negatives=negatives,
+                max_rows=_max_rows(positives, max_negatives),
+                memmap_dir=memmap_dir)
+        elif encoding == 'sparse':
+            return NumpyBinaryClassifierInput(
+                positives=positives,
+                negatives=negatives,
+                sparse=True,
+                max_rows=_max_rows(positives, max_negatives))
         elif encoding == 'bitarray':
             return BitarrayBinaryClassifierInput(
                 positives=positives,
                 negatives=negatives)
         else:
             raise NotImplementedError(encoding)
+
+
+def _max_rows(positives, max_negatives: int=None) -> int:
+    if max_negatives is None:
+        return None
+    # (`positives` may be a matrix, i.e. a sparse one, which has no len())
+    num_positives = (positives.shape[0] if hasattr(positives, 'shape')
+                     else len(positives))
+    return num_positives + max_negatives
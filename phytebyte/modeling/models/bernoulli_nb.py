@@ -0,0 +1,17 @@
+from .incremental import IncrementalBinaryClassifierModel
+from .linear import LinearScorer
+
+
+class BernoulliNBBinaryClassifierModel(IncrementalBinaryClassifierModel):
+    """ Bernoulli naive Bayes, over the bits of binary fingerprints (as
+    scored by `LinearScorer`, features are taken to be 0 or 1).
+    """
+    model_type = "Bernoulli NB"
+
+    def _create_learner(self):
+        # Imported here, so workers scoring a loaded model don't import it
+        from sklearn.naive_bayes import BernoulliNB
+        return BernoulliNB()
+
+    def _create_scorer(self, learner) -> LinearScorer:
+        return LinearScorer.from_bernoulli_nb(learner)
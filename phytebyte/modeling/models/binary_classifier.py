@@ -1,11 +1,22 @@
 from abc import ABC, abstractmethod
 import numpy as np
-from sklearn.metrics import fbeta_score
+from typing import Dict, Sequence
 
 from phytebyte.modeling.input import BinaryClassifierInput
+from phytebyte.tracing import span
 
 
 class BinaryClassifierModel(ABC):
+    # The name `create()` knows the model by (recorded by `save()`)
+    model_type = None
+    training_set_hash = None
+    # The `ModelHeader` of a model read by `load()`
+    header = None
+    # Whether the model trains a mini-batch at a time, so its input may be
+    # streamed (see `IncrementalBinaryClassifierModel`)
+    incremental = False
+    _model_path = None
+
     @classmethod
     def create(cls, name, *args, **kwargs):
         if name == "Random Forest":
@@ -14,6 +25,12 @@ class BinaryClassifierModel(ABC):
         elif name == "Tanimoto":
             from .tanimoto import TanimotoBinaryClassifierModel
             return TanimotoBinaryClassifierModel(*args, **kwargs)
+        elif name == "Logistic":
+            from .logistic import LogisticBinaryClassifierModel
+            return LogisticBinaryClassifierModel(*args, **kwargs)
+        elif name == "Bernoulli NB":
+            from .bernoulli_nb import BernoulliNBBinaryClassifierModel
+            return BernoulliNBBinaryClassifierModel(*args, **kwargs)
         else:
             raise NotImplementedError
 
@@ -42,6 +59,101 @@ class BinaryClassifierModel(ABC):
         """
         pass
 
+    def calc_scores(self, encoded_cmpds: Sequence) -> np.ndarray:
+        """ The scores (see `calc_score()`) of a batch of `encoded_cmpds`.
+        Models that can score many compounds at once faster than one at a
+        time override this.
+        """
+        return np.array([self.calc_score(encoded_cmpd)
+                         for encoded_cmpd in encoded_cmpds], dtype=float)
+
+    def save(self, path: str, fp_type: str, chembl_version: str=None):
+        """ Saves the trained model to directory `path` (see
+        `persistence`), recording the type of the fingerprints it was
+        trained on (`fp_type`), and the ChEMBL release its positives were
+        drawn from.
+
+        Returns: The `ModelHeader` written.
+        """
+        from .persistence import write_model
+        return write_model(path, self.model_type, self._to_arrays(), fp_type,
+                           self.expected_encoding, self.training_set_hash,
+                           chembl_version)
+
+    @classmethod
+    def load(cls, path: str, fp_type: str=None, mmap: bool=True
+             ) -> 'BinaryClassifierModel':
+        """ Loads the model saved to `path` by `save()`.
+
+        `fp_type`: If given, `IncompatibleModel` is raised unless the model
+        was trained on fingerprints of this type.
+        `mmap`: Whether the model's arrays are memory-mapped (& shared with
+        the other processes that map them), rather than read into memory.
+        """
+        from .persistence import IncompatibleModel, read_model
+        header, arrays = read_model(path, mmap)
+        if fp_type is not None and header.fp_type != fp_type:
+            raise IncompatibleModel(
+                f"Model '{path}' was trained on '{header.fp_type}' "
+                f"fingerprints, not '{fp_type}'")
+        model = cls.create(header.model_type)
+        if header.encoding != model.expected_encoding:
+            model = cls.create(header.model_type, encoding=header.encoding)
+        model._from_arrays(arrays)
+        model.header = header
+        model.training_set_hash = header.training_set_hash
+        model._model_path = path if mmap else None
+        return model
+
+    def _record_training_set(self, X, y) -> None:
+        """ Called by `train()` with the samples trained on. """
+        from .persistence import training_set_hash
+        self._record_training_set_hash(training_set_hash(X, y))
+
+    def _record_training_set_hash(self, training_set_hash: str) -> None:
+        self.training_set_hash = training_set_hash
+        self.header = None
+        self._model_path = None
+
+    def _design_matrix(self, encoded_cmpds):
+        """ `encoded_cmpds` (rows, or a matrix of them) as a matrix: a
+        `csr_matrix` for the 'sparse' encoding.
+        """
+        if self.expected_encoding == 'sparse':
+            from scipy.sparse import issparse, vstack
+            if issparse(encoded_cmpds):
+                return encoded_cmpds.tocsr()
+            return vstack(encoded_cmpds, format='csr')
+        return np.stack(encoded_cmpds)
+
+    def _to_arrays(self) -> Dict[str, np.ndarray]:
+        """ The arrays the trained model is saved as (see `save()`). """
+        raise NotImplementedError(f"{type(self).__name__} can't be saved")
+
+    def _from_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        """ Restores the model from the arrays of `_to_arrays()`. """
+        raise NotImplementedError(f"{type(self).__name__} can't be loaded")
+
+    def __getstate__(self):
+        # A memory-mapped model pickles as its path, so pool workers map it
+        # too, instead of each being sent a copy, with its header, to check
+        # that they map the same model
+        if self._model_path is not None:
+            return {'_model_path': self._model_path, 'header': self.header}
+        return self.__dict__
+
+    def __setstate__(self, state):
+        if set(state) == {'_model_path', 'header'}:
+            from .persistence import IncompatibleModel
+            model = self.load(state['_model_path'])
+            if model.header != state['header']:
+                raise IncompatibleModel(
+                    f"Model '{state['_model_path']}' was replaced (by the "
+                    f"model saved {model.header.created}) since it was "
+                    f"loaded (saved {state['header'].created})")
+            state = model.__dict__
+        self.__dict__.update(state)
+
     def predict(self, encoded_cmpd, thresh) -> float:
         """ Takes an `encoded_cmpd` and a score threshold and returns a hard
         classification.
@@ -64,12 +176,24 @@ class BinaryClassifierModel(ABC):
                 - `rand_state_seed` :int - For reproducibility of train/test
                 splitting
         """
+        # sklearn is imported here, not by workers that only score compounds
+        from sklearn.metrics import fbeta_score
         np.random.seed(rand_state_seed)
         test_idx = np.random.choice(
             np.arange(len(bci)), size=round(test_size * len(bci)),
             replace=False)
         train_idx = np.setdiff1d(np.arange(len(bci)), test_idx)
-        self.train(bci, train_idx)
-        X_test, y_test = bci.index(test_idx)
-        y_pred = [self.predict(row, thresh) for row in X_test]
-        return fbeta_score(y_test, y_pred, beta=beta)
+        with span("BinaryClassifierModel.evaluate", items=len(bci),
+                  model=type(self).__name__) as trace_args:
+            self.train(bci, train_idx)
+            X_test, y_test = bci.index(test_idx)
+            y_pred = self.calc_scores(X_test) > thresh
+            score = fbeta_score(y_test, y_pred, beta=beta)
+            trace_args["fbeta"] = score
+        return score
+
+
+def _num_cmpds(encoded_cmpds) -> int:
+    """ The number of `encoded_cmpds` (rows, or a matrix of them) """
+    return (encoded_cmpds.shape[0] if hasattr(encoded_cmpds, 'shape')
+            else len(encoded_cmpds))
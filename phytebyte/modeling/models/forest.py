@@ -0,0 +1,128 @@
+from typing import Dict
+
+import numpy as np
+
+# Children of leaf nodes (as in sklearn's `Tree`)
+LEAF = -1
+
+
+class FlatForest(object):
+    """ A trained random forest, as flat arrays over the nodes of all of its
+    trees (which are concatenated), so it can be saved to, and scored from,
+    memory-mapped `.npy` files:
+
+    - `roots`: Index of the root node of each tree.
+    - `feature` & `threshold`: The split of each internal node: a sample
+      goes to `children_left` if its `feature` is <= `threshold`, and to
+      `children_right` otherwise (both are `LEAF` at leaves).
+    - `value`: The probability of the positive class at each leaf.
+
+    Its scores are those of `RandomForestClassifier.predict_proba()`, but
+    scoring needs only numpy (not sklearn).
+    """
+    ARRAYS = ['roots', 'feature', 'threshold', 'children_left',
+              'children_right', 'value']
+
+    def __init__(self,
+                 roots: np.ndarray,
+                 feature: np.ndarray,
+                 threshold: np.ndarray,
+                 children_left: np.ndarray,
+                 children_right: np.ndarray,
+                 value: np.ndarray):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+
+    @classmethod
+    def from_sklearn(cls, rfc, positive_class=1) -> 'FlatForest':
+        """ Flattens the trees of `rfc`, a trained
+        `sklearn.ensemble.RandomForestClassifier`.
+        """
+        classes = list(rfc.classes_)
+        positive_idx = (classes.index(positive_class)
+                        if positive_class in classes else None)
+        roots, feature, threshold, left, right, value = ([] for _ in
+                                                         range(6))
+        offset = 0
+        for estimator in rfc.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == LEAF
+            roots.append(offset)
+            feature.append(tree.feature)
+            threshold.append(tree.threshold)
+            left.append(np.where(is_leaf, LEAF, tree.children_left + offset))
+            right.append(np.where(is_leaf, LEAF,
+                                  tree.children_right + offset))
+            # Class counts (or fractions) of the samples at each node
+            node_values = tree.value[:, 0, :]
+            if positive_idx is None:
+                value.append(np.zeros(tree.node_count))
+            else:
+                value.append(node_values[:, positive_idx] /
+                             node_values.sum(axis=1))
+            offset += tree.node_count
+        return cls(np.array(roots, dtype=np.int64),
+                   np.concatenate(feature).astype(np.int32),
+                   np.concatenate(threshold).astype(np.float64),
+                   np.concatenate(left).astype(np.int64),
+                   np.concatenate(right).astype(np.int64),
+                   np.concatenate(value).astype(np.float64))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @property
+    def num_trees(self) -> int:
+        return len(self.roots)
+
+    def score(self, x: np.ndarray) -> float:
+        """ The positive-class probability of sample `x`, averaged over the
+        trees (as `RandomForestClassifier.predict_proba()`).
+        """
+        # sklearn compares the samples' features as float32s
+        x = np.asarray(x, dtype=np.float32).ravel()
+        total = 0.
+        for root in self.roots:
+            node = root
+            while self.children_left[node] != LEAF:
+                if x[self.feature[node]] <= self.threshold[node]:
+                    node = self.children_left[node]
+                else:
+                    node = self.children_right[node]
+            total += self.value[node]
+        return float(total / self.num_trees)
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
+        """ The positive-class probabilities of the samples (rows) of `X`, as
+        `score()`, but descending every tree for every sample at once, a
+        level at a time.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        num_samples, num_features = len(X), X.shape[-1]
+        X = X.ravel()
+        # The node each sample is at in each tree (sample-major), & the
+        # positions in `nodes` still at internal nodes, with the offsets of
+        # their samples' rows in `X`
+        nodes = np.tile(self.roots, num_samples)
+        descending = np.flatnonzero(self.children_left[nodes] != LEAF)
+        row_offsets = descending // self.num_trees * num_features
+        while len(descending):
+            at = nodes[descending]
+            children = np.where(
+                X[row_offsets + self.feature[at]] <= self.threshold[at],
+                self.children_left[at], self.children_right[at])
+            nodes[descending] = children
+            internal = self.children_left[children] != LEAF
+            descending = descending[internal]
+            row_offsets = row_offsets[internal]
+        # Summed a tree at a time (the order `predict_proba()` adds them in),
+        # so the scores are identical to it
+        leaf_values = self.value[nodes].reshape(-1, self.num_trees)
+        totals = np.zeros(len(leaf_values))
+        for tree in range(self.num_trees):
+            totals += leaf_values[:, tree]
+        return totals / self.num_trees
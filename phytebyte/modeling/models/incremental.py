@@ -0,0 +1,112 @@
+from abc import abstractmethod
+import numpy as np
+from typing import Dict, Sequence
+
+from phytebyte.fingerprinters.encoding import (
+    bitarrays_to_dense, bitarrays_to_packed)
+from phytebyte.modeling.input import BinaryClassifierInput
+from phytebyte.modeling.input.binary_classifier_input import (
+    StreamingBinaryClassifierInput)
+from phytebyte.tracing import span
+from .binary_classifier import BinaryClassifierModel, _num_cmpds
+from .linear import LinearScorer
+
+CLASSES = np.array([0, 1])
+
+
+class IncrementalBinaryClassifierModel(BinaryClassifierModel):
+    """ A model of an sklearn learner with `partial_fit()`, trained a
+    mini-batch at a time: from the `batches()` of a streamed model input
+    (see `StreamingBinaryClassifierInput`), so its negatives are only
+    sampled & fingerprinted as they're trained on, or from slices of the
+    shuffled indexed samples of any other (which are positives first: SGD
+    would forget the positives of class-sorted batches).
+
+    The trained learner is scored as a `LinearScorer`: a batch of
+    compounds is scored by a single product of their fingerprints with its
+    weights, without sklearn.
+
+    `encoding`: 'numpy' (dense rows), 'sparse' (`scipy.sparse` rows), or
+    'bitarray' (rows scored packed, 8 bits per byte: the fastest to screen
+    a whole library with).
+    """
+    encodings = ('numpy', 'sparse', 'bitarray')
+    incremental = True
+    # Negatives per mini-batch
+    batch_size = 1024
+    # Seeds the shuffling of indexed samples into mini-batches
+    random_state = 1
+    _learner = None
+    _scorer = None
+
+    def __init__(self, encoding: str='numpy'):
+        if encoding not in self.encodings:
+            raise NotImplementedError(encoding)
+        self._encoding = encoding
+
+    @property
+    def expected_encoding(self) -> str:
+        return self._encoding
+
+    @abstractmethod
+    def _create_learner(self):
+        """ A new (untrained) sklearn learner with `partial_fit()` """
+        pass
+
+    @abstractmethod
+    def _create_scorer(self, learner) -> LinearScorer:
+        """ The `LinearScorer` of the trained `learner` """
+        pass
+
+    def train(self, bci: BinaryClassifierInput, idx=None,
+              batch_size: int=None) -> None:
+        from .persistence import TrainingSetDigest
+        batch_size = batch_size or self.batch_size
+        self._learner = self._create_learner()
+        digest = TrainingSetDigest()
+        with span(f"{type(self).__name__}.train",
+                  batch_size=batch_size) as trace_args:
+            num_samples = 0
+            for X, y in self._batches(bci, idx, batch_size):
+                digest.update(X, y)
+                if self._encoding == 'bitarray':
+                    X = bitarrays_to_dense(X)
+                self._learner.partial_fit(X, y, classes=CLASSES)
+                num_samples += len(y)
+            trace_args["items"] = num_samples
+            self._scorer = self._create_scorer(self._learner)
+        self._record_training_set_hash(digest.hexdigest())
+
+    def calc_score(self, encoded_cmpd) -> float:
+        return float(self.calc_scores([encoded_cmpd])[0])
+
+    def calc_scores(self, encoded_cmpds: Sequence) -> np.ndarray:
+        if not _num_cmpds(encoded_cmpds):
+            return np.zeros(0)
+        if self._encoding == 'bitarray':
+            return self._scorer.score_packed(
+                bitarrays_to_packed(encoded_cmpds))
+        return self._scorer.score_batch(self._design_matrix(encoded_cmpds))
+
+    def __getstate__(self):
+        # Workers score with `_scorer`, so needn't unpickle (& import) sklearn
+        state = super().__getstate__()
+        if '_learner' in state:
+            state = {k: v for k, v in state.items() if k != '_learner'}
+        return state
+
+    def _to_arrays(self) -> Dict[str, np.ndarray]:
+        return self._scorer.arrays()
+
+    def _from_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        self._learner = None
+        self._scorer = LinearScorer(**arrays)
+
+    def _batches(self, bci: BinaryClassifierInput, idx, batch_size: int):
+        if isinstance(bci, StreamingBinaryClassifierInput):
+            yield from bci.batches(batch_size)
+            return
+        idx = np.random.RandomState(self.random_state).permutation(
+            np.arange(len(bci)) if idx is None else idx)
+        for start in range(0, len(idx), batch_size):
+            yield bci.index(idx[start:start + batch_size])
@@ -0,0 +1,98 @@
+from typing import Dict
+
+import numpy as np
+
+# Rows of packed fingerprints looked up at once by `score_packed()`
+PACKED_CHUNK_SIZE = 4096
+# The 8 bits of each byte value (most significant bit first, as
+# `np.packbits()`)
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)
+
+
+class LinearScorer(object):
+    """ A trained model whose log-odds of the positive class are linear in
+    the bits of a fingerprint, as arrays, so it can be saved to, and scored
+    from, memory-mapped `.npy` files:
+
+    - `weights`: The log-odds added by each on-bit.
+    - `bias`: The log-odds of a fingerprint of no on-bits (an array of 1).
+
+    Scoring a batch of fingerprints is a single product of their rows with
+    `weights`, & needs only numpy (not sklearn).
+    """
+    ARRAYS = ['weights', 'bias']
+    _byte_weights = None
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray):
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def from_linear_model(cls, clf) -> 'LinearScorer':
+        """ From a trained binary sklearn linear classifier (e.g. a logistic
+        `SGDClassifier`), whose `predict_proba()` is the logistic function
+        of its decision function.
+        """
+        return cls(np.asarray(clf.coef_[0], dtype=np.float64),
+                   np.asarray(clf.intercept_, dtype=np.float64))
+
+    @classmethod
+    def from_bernoulli_nb(cls, nb) -> 'LinearScorer':
+        """ From a trained binary `sklearn.naive_bayes.BernoulliNB`, whose
+        log-likelihood of a class is, summed over the bits, the log
+        probability of each bit being on if it is, & off if it isn't.
+        """
+        log_on = nb.feature_log_prob_
+        log_off = np.log1p(-np.exp(log_on))
+        # Classes are sorted, so the negatives' (0) come first
+        return cls(
+            (log_on[1] - log_off[1]) - (log_on[0] - log_off[0]),
+            np.array([nb.class_log_prior_[1] - nb.class_log_prior_[0] +
+                      (log_off[1] - log_off[0]).sum()]))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @property
+    def num_bits(self) -> int:
+        return len(self.weights)
+
+    def score_batch(self, X) -> np.ndarray:
+        """ The positive-class probabilities of the rows of `X`: an array of
+        0's & 1's, or a `scipy.sparse` matrix.
+        """
+        return _logistic(X.dot(self.weights) + self.bias[0])
+
+    def score_packed(self, packed: np.ndarray) -> np.ndarray:
+        """ The positive-class probabilities of the rows of `packed`, the
+        fingerprints packed 8 bits per byte (see `encoding`): each byte of a
+        row adds the sum of the weights of its on-bits, looked up in a
+        table of the 256 values of each byte.
+        """
+        byte_weights = self._get_byte_weights()
+        num_bytes = byte_weights.shape[0]
+        offsets = np.arange(num_bytes, dtype=np.intp) * 256
+        byte_weights = byte_weights.ravel()
+        log_odds = np.empty(len(packed))
+        for start in range(0, len(packed), PACKED_CHUNK_SIZE):
+            chunk = packed[start:start + PACKED_CHUNK_SIZE, :num_bytes]
+            log_odds[start:start + PACKED_CHUNK_SIZE] = byte_weights[
+                chunk + offsets].sum(axis=1)
+        return _logistic(log_odds + self.bias[0])
+
+    def _get_byte_weights(self) -> np.ndarray:
+        """ The summed weights of the on-bits of each of the 256 values of
+        each byte of a packed fingerprint (built once).
+        """
+        if self._byte_weights is None:
+            num_bytes = -(-self.num_bits // 8)
+            weights = np.zeros(num_bytes * 8)
+            weights[:self.num_bits] = self.weights
+            self._byte_weights = weights.reshape(num_bytes, 8).dot(
+                _BYTE_BITS.T)
+        return self._byte_weights
+
+
+def _logistic(log_odds: np.ndarray) -> np.ndarray:
+    # (As 1 / (1 + exp(-log_odds)), without overflowing)
+    return np.exp(-np.logaddexp(0, -log_odds))
@@ -0,0 +1,15 @@
+from .incremental import IncrementalBinaryClassifierModel
+from .linear import LinearScorer
+
+
+class LogisticBinaryClassifierModel(IncrementalBinaryClassifierModel):
+    """ Logistic regression, fit by stochastic gradient descent """
+    model_type = "Logistic"
+
+    def _create_learner(self):
+        # Imported here, so workers scoring a loaded model don't import it
+        from sklearn.linear_model import SGDClassifier
+        return SGDClassifier(loss='log_loss', random_state=1)
+
+    def _create_scorer(self, learner) -> LinearScorer:
+        return LinearScorer.from_linear_model(learner)
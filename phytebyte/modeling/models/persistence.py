@@ -0,0 +1,209 @@
+""" Saving & loading trained `BinaryClassifierModel`s.
+
+A saved model is a directory holding a `header.json` (the model's type &
+metadata: see `ModelHeader`), and an `.npy` file per array of the model.
+The arrays are loaded memory-mapped by default, so the scoring workers of a
+host share the same (page-cached) copy of a model, rather than each holding
+its own.
+
+A model is written into a temporary sibling directory, which then replaces
+the model's directory, so the files of a save are never mixed with those of
+another, or overwritten while mapped.
+"""
+import datetime
+import errno
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from collections import namedtuple
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+HEADER_FILENAME = 'header.json'
+# Bumped when the layout of saved models changes
+FORMAT_VERSION = 1
+# Times `read_model()` reads a model being replaced, before giving up
+READ_ATTEMPTS = 5
+
+ModelHeader = namedtuple("ModelHeader", [
+    "format_version",
+    "model_type",
+    # Type & encoding of the fingerprints the model was trained on (& must
+    # score)
+    "fp_type",
+    "encoding",
+    "training_set_hash",
+    # Release of the ChEMBL database the positives were drawn from
+    "chembl_version",
+    "created",
+    # Unique to each save, so a model replaced by another save of the same
+    # training set (in the same second) can still be told apart (`None` for
+    # models saved before it was recorded)
+    "save_id",
+    "arrays"])
+
+
+class IncompatibleModel(Exception):
+    pass
+
+
+def training_set_hash(X: Iterable, y: np.ndarray) -> str:
+    """ A digest of the design matrix `X` (an array, a sparse matrix, or a
+    list of bitarrays) and labels `y`, identifying the training set of a
+    model.
+    """
+    return TrainingSetDigest().update(X, y).hexdigest()
+
+
+class TrainingSetDigest(object):
+    """ `training_set_hash()` of a training set streamed in batches (as
+    `update()`d with each).
+    """
+    def __init__(self):
+        self._digest = hashlib.sha256()
+
+    def update(self, X: Iterable, y: np.ndarray) -> 'TrainingSetDigest':
+        digest = self._digest
+        if hasattr(X, 'tocsr'):  # A scipy.sparse matrix
+            X = X.tocsr()
+            digest.update(str(X.shape).encode('utf-8'))
+            for array in (X.indptr, X.indices, X.data):
+                digest.update(np.ascontiguousarray(array).tobytes())
+        elif isinstance(X, np.ndarray):
+            digest.update(str(X.shape).encode('utf-8'))
+            digest.update(np.ascontiguousarray(X).tobytes())
+        else:
+            for row in X:
+                digest.update(row.tobytes())
+        digest.update(np.ascontiguousarray(y, dtype=np.uint8).tobytes())
+        return self
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def write_model(path: str,
+                model_type: str,
+                arrays: Dict[str, np.ndarray],
+                fp_type: str,
+                encoding: str,
+                training_set_hash: str=None,
+                chembl_version: str=None) -> ModelHeader:
+    """ Writes `arrays` & the header of a model to directory `path` (replacing
+    any model saved there).
+    """
+    tmp_path = _sibling_path(path, 'tmp')
+    os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+    os.mkdir(tmp_path)
+    try:
+        header = _write_files(tmp_path, model_type, arrays, fp_type,
+                              encoding, training_set_hash, chembl_version)
+        _replace_dir(tmp_path, path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return header
+
+
+def _write_files(path: str,
+                 model_type: str,
+                 arrays: Dict[str, np.ndarray],
+                 fp_type: str,
+                 encoding: str,
+                 training_set_hash: str,
+                 chembl_version: str) -> ModelHeader:
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"),
+                np.ascontiguousarray(array), allow_pickle=False)
+    header = ModelHeader(
+        format_version=FORMAT_VERSION,
+        model_type=model_type,
+        fp_type=fp_type,
+        encoding=encoding,
+        training_set_hash=training_set_hash,
+        chembl_version=chembl_version,
+        created=datetime.datetime.now().isoformat(timespec='seconds'),
+        save_id=uuid.uuid4().hex,
+        arrays=sorted(arrays))
+    with open(os.path.join(path, HEADER_FILENAME), 'w') as f:
+        json.dump(header._asdict(), f, indent=2)
+        f.write("\n")
+    return header
+
+
+def _replace_dir(src: str, dst: str) -> None:
+    """ Renames directory `src` to `dst`. A directory already at `dst` is
+    first renamed aside (a non-empty directory can't be renamed over), & then
+    removed: files of it still mapped stay readable until unmapped.
+    """
+    try:
+        os.rename(src, dst)
+        return
+    except OSError as e:
+        if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+            raise
+    old_path = _sibling_path(dst, 'old')
+    os.rename(dst, old_path)
+    os.rename(src, dst)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def _sibling_path(path: str, suffix: str) -> str:
+    """ A unique, hidden path in the directory of `path` """
+    path = os.path.abspath(path)
+    return os.path.join(
+        os.path.dirname(path),
+        f".{os.path.basename(path)}.{uuid.uuid4().hex}.{suffix}")
+
+
+def read_model(path: str, mmap: bool=True
+               ) -> Tuple[ModelHeader, Dict[str, np.ndarray]]:
+    """ The header & arrays (see `read_arrays()`) of the model at `path`,
+    both of the same save of it: they're read again, if the model is
+    replaced (by `write_model()`) while they're read.
+    """
+    for attempt in range(READ_ATTEMPTS):
+        try:
+            dir_id = _dir_id(path)
+            header = read_header(path)
+            arrays = read_arrays(path, header, mmap)
+            if _dir_id(path) == dir_id:
+                return header, arrays
+        except FileNotFoundError:
+            # The old model was renamed aside, & the new not yet into place
+            if attempt == READ_ATTEMPTS - 1:
+                raise
+            time.sleep(.01)
+    raise IncompatibleModel(f"Model '{path}' kept being replaced while read")
+
+
+def _dir_id(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_dev, stat.st_ino
+
+
+def read_header(path: str) -> ModelHeader:
+    with open(os.path.join(path, HEADER_FILENAME)) as f:
+        fields = json.load(f)
+    if fields.get("format_version") != FORMAT_VERSION:
+        raise IncompatibleModel(
+            f"Model '{path}' has format version "
+            f"{fields.get('format_version')}, not {FORMAT_VERSION}")
+    return ModelHeader(**{field: fields.get(field)
+                          for field in ModelHeader._fields})
+
+
+def read_arrays(path: str,
+                header: ModelHeader,
+                mmap: bool=True) -> Dict[str, np.ndarray]:
+    """ The arrays of the model at `path`: read-only memory maps if `mmap`
+    (else read into memory).
+    """
+    return {name: np.load(os.path.join(path, f"{name}.npy"),
+                          mmap_mode='r' if mmap else None,
+                          allow_pickle=False)
+            for name in header.arrays}
@@ -1,22 +1,65 @@
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from typing import Dict, Sequence
 
 from phytebyte.modeling.input import BinaryClassifierInput
-from .binary_classifier import BinaryClassifierModel
+from phytebyte.tracing import span
+from .binary_classifier import BinaryClassifierModel, _num_cmpds
+from .forest import FlatForest
 
 
 class RandomForestBinaryClassifierModel(BinaryClassifierModel):
+    """ `encoding`: 'numpy' (dense rows), or 'sparse' (`scipy.sparse` rows,
+    which sklearn trains on as they are: for long fingerprints).
+    """
+    model_type = "Random Forest"
+    encodings = ('numpy', 'sparse')
+    _rfc = None
+    # The trained (or loaded) forest, flattened: it scores compounds without
+    # sklearn, & faster than it for the few of a chunk
+    _forest = None
+
+    def __init__(self, encoding: str='numpy'):
+        if encoding not in self.encodings:
+            raise NotImplementedError(encoding)
+        self._encoding = encoding
+
     @property
     def expected_encoding(self) -> str:
-        return 'numpy'
+        return self._encoding
 
     def train(self, bci: BinaryClassifierInput,
               idx, num_estimators: int=100) -> None:
+        # Imported here, so workers scoring a loaded model don't import it
+        from sklearn.ensemble import RandomForestClassifier
         self._rfc = RandomForestClassifier(n_estimators=num_estimators, random_state=1)
-        self._rfc.fit(*bci.index(idx))
+        X, y = bci.index(idx)
+        with span("RandomForestBinaryClassifierModel.train", items=len(idx),
+                  num_estimators=num_estimators):
+            self._rfc.fit(X, y)
+            self._forest = FlatForest.from_sklearn(self._rfc)
+        self._record_training_set(X, y)
+
+    def calc_score(self, encoded_cmpd) -> float:
+        return float(self.calc_scores([encoded_cmpd])[0])
+
+    def calc_scores(self, encoded_cmpds: Sequence) -> np.ndarray:
+        if not _num_cmpds(encoded_cmpds):
+            return np.zeros(0)
+        X = self._design_matrix(encoded_cmpds)
+        # (The rows of the 'sparse' encoding are densified a chunk at a time)
+        return self._forest.score_batch(X.toarray() if hasattr(X, 'toarray')
+                                        else X)
+
+    def __getstate__(self):
+        # Workers score with `_forest`, so needn't unpickle (& import) sklearn
+        state = super().__getstate__()
+        if '_rfc' in state:
+            state = {k: v for k, v in state.items() if k != '_rfc'}
+        return state
+
+    def _to_arrays(self) -> Dict[str, np.ndarray]:
+        return self._forest.arrays()
 
-    def calc_score(self, encoded_cmpd: np.ndarray) -> float:
-        prob_results = self._rfc.predict_proba(
-            encoded_cmpd.reshape(1, -1))
-        positive_class_score = prob_results[0][1]
-        return positive_class_score
+    def _from_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        self._rfc = None
+        self._forest = FlatForest(**arrays)
@@ -1,11 +1,17 @@
 from bitarray import bitarray
-from sklearn.metrics import fbeta_score
+import numpy as np
+from typing import Dict
 
+from phytebyte.fingerprinters.encoding import (
+    bitarrays_to_packed, packed_to_bitarrays)
 from phytebyte.modeling.input import BinaryClassifierInput
+from phytebyte.tracing import span
 from .binary_classifier import BinaryClassifierModel
 
 
 class TanimotoBinaryClassifierModel(BinaryClassifierModel):
+    model_type = "Tanimoto"
+
     @property
     def expected_encoding(self) -> str:
         """ The encoding that the underlying model library's (i.e.
@@ -14,14 +20,26 @@ class TanimotoBinaryClassifierModel(BinaryClassifierModel):
         return "bitarray"
 
     def train(self, bci: BinaryClassifierInput, idx) -> None:
-        X_train, y_train = bci.index(idx)
-        self._pos = [fp for fp, y in zip(X_train, y_train) if y]
+        with span("TanimotoBinaryClassifierModel.train", items=len(idx)):
+            X_train, y_train = bci.index(idx)
+            self._pos = [fp for fp, y in zip(X_train, y_train) if y]
+        self._record_training_set(X_train, y_train)
 
     def calc_score(self, encoded_cmpd) -> float:
         tanimotos = [self._calculate_tanimoto(pos_fp, encoded_cmpd)
                      for pos_fp in self._pos]
         return max(tanimotos)
 
+    def _to_arrays(self) -> Dict[str, np.ndarray]:
+        num_bits = len(self._pos[0]) if self._pos else 0
+        # The positives' fingerprints, packed into the rows of a matrix
+        return {"positives": bitarrays_to_packed(self._pos),
+                "num_bits": np.array([num_bits], dtype=np.int64)}
+
+    def _from_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        self._pos = packed_to_bitarrays(arrays["positives"],
+                                        int(arrays["num_bits"][0]))
+
     # def train(self, model_input: BinaryClassifierInput) -> None:
     #     """ Takes `model_input` of type `BinaryClassifierInput`, and uses
     #     the information to update internal state, by creating and training
@@ -0,0 +1,181 @@
+""" Worker pools for phytebyte's parallel stages (negative sampling & food
+compound scoring), and the shared memory their large read-only state lives
+in.
+
+The start method of the pools' workers is the platform's default (`fork`
+on Linux) unless `set_start_method()` is called, or set by the
+`PHYTEBYTE_START_METHOD` environment variable:
+
+- `fork`: Workers inherit the parent's memory, copy-on-write. Reference
+  counting writes to every object a worker reads, though, so over a long
+  run each worker ends up with a private copy of (i.e.) the model.
+- `forkserver`: Workers are forked from a server process that has only
+  preloaded the modules in `PRELOAD_MODULES`, and is safe to start from a
+  process running threads (unlike `fork`).
+- `spawn`: Workers are fresh interpreters.
+
+Either way, the pools ship each worker its state once, through their
+`initializer` (so it's pickled, per worker, under `forkserver` & `spawn`),
+and large arrays (i.e. the fingerprints of excluded compounds) are mapped
+from shared memory rather than copied.
+"""
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory, util
+from multiprocessing.context import BaseContext
+from typing import Callable, Sequence
+
+import numpy as np
+
+START_METHOD_ENV_VAR = 'PHYTEBYTE_START_METHOD'
+
+# Imported by the forkserver before it forks any worker (modules that fail
+# to import, i.e. openbabel where it isn't installed, are skipped)
+PRELOAD_MODULES = ['numpy', 'bitarray', 'openbabel', 'pybel',
+                   'phytebyte.fingerprinters',
+                   'phytebyte.bioactive_cmpd.negative_samplers',
+                   'phytebyte.modeling.models']
+
+_start_method = None
+
+
+def set_start_method(method: str=None) -> None:
+    """ Sets the start method of the workers of pools created from now on:
+    'fork', 'forkserver' or 'spawn' (or None, for the default).
+    """
+    if method is not None and \
+            method not in multiprocessing.get_all_start_methods():
+        raise ValueError(
+            f"Unsupported start method '{method}': choose from "
+            f"{multiprocessing.get_all_start_methods()}")
+    global _start_method
+    _start_method = method
+
+
+def get_start_method() -> str:
+    return (_start_method or os.environ.get(START_METHOD_ENV_VAR) or
+            multiprocessing.get_start_method())
+
+
+def get_context() -> BaseContext:
+    method = get_start_method()
+    context = multiprocessing.get_context(method)
+    if method == 'forkserver':
+        context.set_forkserver_preload(PRELOAD_MODULES)
+    return context
+
+
+def Pool(processes: int=None,
+         initializer: Callable=None,
+         initargs: Sequence=()) -> multiprocessing.pool.Pool:
+    """ `multiprocessing.Pool`, with workers started by the configured
+    start method (see `get_start_method()`).
+    """
+    return get_context().Pool(processes, initializer, initargs)
+
+
+class SharedArray(object):
+    """ A read-only copy of a numpy array, in a block of shared memory. It
+    pickles as the name of the block, so pool workers map the array instead
+    of receiving copies of it.
+
+    The process that created it owns the block: it's freed by `close()` (or
+    on leaving the `with` block). Other processes attach to it untracked (see
+    `_attach()`), and unmap it on `close()`, or when they exit.
+    """
+    _finalizer = None
+
+    def __init__(self, array: np.ndarray):
+        array = np.ascontiguousarray(array)
+        self._shape = array.shape
+        self._dtype = array.dtype.str
+        # Shared memory blocks can't be empty
+        self._shm = shared_memory.SharedMemory(create=True,
+                                               size=max(array.nbytes, 1))
+        self._owner = True
+        self._array = None
+        np.ndarray(self._shape, self._dtype, buffer=self._shm.buf)[...] = \
+            array
+
+    def __getstate__(self):
+        return {"name": self._shm.name, "shape": self._shape,
+                "dtype": self._dtype}
+
+    def __setstate__(self, state):
+        self._shm = _attach(state["name"])
+        self._owner = False
+        self._array = None
+        self._shape = state["shape"]
+        self._dtype = state["dtype"]
+        self._finalizer = util.Finalize(self, self._detach, exitpriority=0)
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._array is None:
+            self._array = np.ndarray(self._shape, self._dtype,
+                                     buffer=self._shm.buf)
+            self._array.flags.writeable = False
+        return self._array
+
+    def __len__(self) -> int:
+        return self._shape[0]
+
+    def __enter__(self) -> 'SharedArray':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self) -> None:
+        """ Unmaps the block (& frees it, in the process that owns it): views
+        of `array` must not be held.
+        """
+        if self._shm is None:
+            return
+        if self._finalizer is not None:
+            self._finalizer.cancel()
+        self._array = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def _detach(self) -> None:
+        """ `close()`, as an attached process exits """
+        try:
+            self.close()
+        except BufferError:
+            # Views of `array` are still held: the block is unmapped as the
+            # process exits anyway
+            pass
+
+
+_attach_lock = threading.Lock()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """ Maps the existing shared memory block `name`, without registering
+    it with the resource tracker: only its owner's registration should
+    free it.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13, attaching registers the block as if this process created
+    # it, so an unshared tracker would warn it 'leaked', & unlink it again,
+    # as the process exits. Unregistering it after attaching isn't safe: a
+    # tracker shared with the owner would drop the owner's registration
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = _register_nothing
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _register_nothing(name: str, rtype: str) -> None:
+    pass
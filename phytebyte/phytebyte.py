@@ -1,17 +1,31 @@
+from __future__ import annotations
+
 from .bioactive_cmpd.negative_samplers import NegativeSampler
 from .bioactive_cmpd.clustering import Clusterer
 from .bioactive_cmpd.target_input import TargetInput
-from .bioactive_cmpd.sources import BioactiveCompoundSource
 from .bioactive_cmpd import ModelInputLoader
 from .modeling.models import BinaryClassifierModel
-from .food_cmpd import FoodCmpdSource, FoodCmpd
+from .food_cmpd import FoodCmpd
 from .fingerprinters import Fingerprinter
+from .parallel import Pool
+from .tracing import count, span
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import itertools
 import logging
-from multiprocessing import Pool, cpu_count
-from typing import List, Iterator, Tuple
+from multiprocessing import cpu_count
+from typing import Iterable, List, Iterator, Optional, Tuple, TYPE_CHECKING
 import numpy as np
 
+# Only annotated: importing the sources (SQLAlchemy & the ChEMBL/FooDB
+# models) is left to their callers, so scoring workers don't
+if TYPE_CHECKING:
+    from .bioactive_cmpd.sources import BioactiveCompoundSource
+    from .food_cmpd import FoodCmpdSource
+    from .query import KeyRange
+
 class PhyteByte():
     logger = logging.getLogger("PhyteByte")
     logger.setLevel(logging.DEBUG)
@@ -23,7 +37,15 @@ class PhyteByte():
 
     fingerprinter = None
     model = None
-    # Globals to enable multiprocessing
+    # Compounds fingerprinted & scored (by `BinaryClassifierModel.
+    # calc_scores()`) together by a scoring worker
+    scoring_chunk_size = 64
+    # Keys (IDs) of the food compounds a scoring worker scans & scores per
+    # unit of work when screening is partitioned: each unit's scores are
+    # sent back as soon as it's done
+    partition_unit_keys = 1024
+    # Globals to enable multiprocessing (shipped to each pool worker by
+    # `_scoring_pool()`)
 
     def __init__(self,
                  source: BioactiveCompoundSource,
@@ -35,6 +57,8 @@ class PhyteByte():
         self._config_file_path = config_file_path
         self._negative_sampler = None
         self._positive_clusterer = None
+        self._model_encoding = None
+        self._model_input_memmap_dir = None
 
         if config_file_path:
             self._load_config()
@@ -69,15 +93,51 @@ class PhyteByte():
         cls.fingerprinter = Fingerprinter.create(fingerprinter_name,
                                                  cache=cache)
 
+    def set_model_encoding(self, encoding: str):
+        """ The encoding of the fingerprints models are trained on & score,
+        for models that support several (e.g. 'sparse', for long
+        fingerprints, rather than the default 'numpy').
+        """
+        self._model_encoding = encoding
+
+    def set_model_input_memmap_dir(self, memmap_dir: str):
+        """ Memory-maps model inputs from scratch files in `memmap_dir`
+        (rather than holding them in memory), for very large sets of
+        negatives. Only supported by the 'numpy' model encoding.
+        """
+        self._model_input_memmap_dir = memmap_dir
+
+    def _model_input_loader(self,
+                            binary_classifier_model: BinaryClassifierModel,
+                            stream: bool=False,
+                            lean: bool=True) -> ModelInputLoader:
+        """ `stream`: Whether the model input is streamed (for incremental
+        models, which train on it a mini-batch at a time).
+        `lean`: Whether positive compounds are fetched without their
+        bioactivities (which model input doesn't need).
+        """
+        return ModelInputLoader(self._source, self._negative_sampler,
+                                self._positive_clusterer, self._target_input,
+                                binary_classifier_model.expected_encoding,
+                                lean=lean,
+                                memmap_dir=self._model_input_memmap_dir,
+                                stream=stream)
+
+    def _create_model(self, model_type: str) -> BinaryClassifierModel:
+        if self._model_encoding is None:
+            return BinaryClassifierModel.create(model_type)
+        return BinaryClassifierModel.create(model_type,
+                                            encoding=self._model_encoding)
+
     def train_model(self,
                     model_type: str,
                     neg_sample_size_factor: int,
                     *args,
                     **kwargs):
-        binary_classifier_model = BinaryClassifierModel.create(model_type)
-        mdl = ModelInputLoader(self._source, self._negative_sampler,
-                               self._positive_clusterer, self._target_input,
-                               binary_classifier_model.expected_encoding)
+        binary_classifier_model = self._create_model(model_type)
+        mdl = self._model_input_loader(
+            binary_classifier_model,
+            stream=binary_classifier_model.incremental)
         binary_classifier_input = mdl.load(
             neg_sample_size_factor,
             output_fingerprinter=self.fingerprinter)
@@ -93,11 +153,9 @@ class PhyteByte():
             *args,
             **kwargs) -> List[float]:
         self.logger.info("Training and evaluating model")
-        binary_classifier_model = BinaryClassifierModel.create(model_type)
+        binary_classifier_model = self._create_model(model_type)
         self.logger.info("Loading model input.")
-        mdl = ModelInputLoader(self._source, self._negative_sampler,
-                               self._positive_clusterer, self._target_input,
-                               binary_classifier_model.expected_encoding)
+        mdl = self._model_input_loader(binary_classifier_model)
         binary_classifier_inputs = mdl.load(
             neg_sample_size_factor, self.fingerprinter)
         self.logger.debug("Done.")
@@ -120,11 +178,11 @@ class PhyteByte():
               *args,
               **kwargs) -> List[float]:
         self.logger.info("Training model for production.")
-        binary_classifier_model = BinaryClassifierModel.create(model_type)
+        binary_classifier_model = self._create_model(model_type)
         self.logger.info("Loading model input.")
-        mdl = ModelInputLoader(self._source, self._negative_sampler,
-                               self._positive_clusterer, self._target_input,
-                               binary_classifier_model.expected_encoding)
+        mdl = self._model_input_loader(
+            binary_classifier_model,
+            stream=binary_classifier_model.incremental)
         binary_classifier_inputs = mdl.load(
             neg_sample_size_factor, self.fingerprinter)
         self.logger.debug("Done.")
@@ -136,25 +194,216 @@ class PhyteByte():
         PhyteByte.model = binary_classifier_model
         self.logger.debug("Done.")
 
+    def save_model(self, path: str):
+        """ Saves the trained model (see `BinaryClassifierModel.save()`),
+        with the type of the fingerprints it scores, and the ChEMBL release
+        of its positives (if the source knows it).
+        """
+        return self.model.save(path, self.fingerprinter.fp_type,
+                               chembl_version=getattr(self._source,
+                                                      'release', None))
+
+    def load_model(self, path: str, mmap: bool=True):
+        """ Loads the model saved by `save_model()`, instead of training one.
+        It must have been trained on fingerprints of the type set by
+        `set_fingerprinter()`.
+        """
+        model = BinaryClassifierModel.load(
+            path, fp_type=self.fingerprinter.fp_type, mmap=mmap)
+        release = getattr(self._source, 'release', None)
+        if release and model.header.chembl_version and \
+                release != model.header.chembl_version:
+            self.logger.warning(
+                f"Model '{path}' was trained on "
+                f"{model.header.chembl_version}, not {release}.")
+        PhyteByte.model = model
+        return model
+
+    def train_and_sort_predicted_bioactive_food_cmpds(
+            self,
+            model_type: str,
+            neg_sample_size_factor: int,
+            food_cmpd_source: FoodCmpdSource,
+            *args,
+            **kwargs) -> List[Tuple[FoodCmpd, float]]:
+        """ `train_model()`, then `sort_predicted_bioactive_food_cmpds()`, with
+        their independent database I/O overlapped (see
+        `train_and_predict_async()`).
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.train_and_predict_async(
+                model_type, neg_sample_size_factor, food_cmpd_source,
+                *args, **kwargs))
+        finally:
+            loop.close()
+
+    async def train_and_predict_async(self,
+                                      model_type: str,
+                                      neg_sample_size_factor: int,
+                                      food_cmpd_source: FoodCmpdSource,
+                                      *args,
+                                      **kwargs) -> List[Tuple[FoodCmpd, float]]:
+        """ Trains a model & scores every food compound, like `train()` (on
+        the model input of the first cluster) followed by
+        `sort_predicted_bioactive_food_cmpds()`, but overlapping the phases
+        that don't depend on each other:
+
+        - The food library is scanned (FooDB) from the start.
+        - Once positives are fetched (ChEMBL), a reservoir of random negative
+          candidates is fetched while positives are being clustered.
+
+        The scan can't be scored until the model is trained, so the whole
+        food library is held in memory (as a list of `FoodCmpd`s), rather than
+        streamed: to screen a library in bounded memory, `train()` & iterate
+        `predict_bioactive_food_cmpd_iter()` instead.
+        """
+        from .bioactive_cmpd.sources import AsyncBioactiveCompoundSource
+        from .food_cmpd.sources import AsyncFoodCmpdSource
+        binary_classifier_model = self._create_model(model_type)
+        mdl = self._model_input_loader(
+            binary_classifier_model,
+            stream=binary_classifier_model.incremental)
+        loop = asyncio.get_event_loop()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            bioactive_source = AsyncBioactiveCompoundSource(self._source,
+                                                            executor)
+            food_source = AsyncFoodCmpdSource(food_cmpd_source, executor)
+            food_cmpds = asyncio.ensure_future(food_source.fetch_all_cmpds())
+
+            self.logger.info("Loading positive compounds.")
+            bioactive_cmpd_list = await loop.run_in_executor(
+                executor, mdl.load_positive_compounds)
+            self.logger.info(
+                f"Found '{len(bioactive_cmpd_list)}' pos sample compounds.")
+            neg_smiles_reservoir = asyncio.ensure_future(
+                bioactive_source.fetch_random_compounds_exc_smiles(
+                    [cmpd.smiles for cmpd in bioactive_cmpd_list],
+                    mdl.neg_reservoir_size(bioactive_cmpd_list,
+                                           neg_sample_size_factor)))
+            clusters = await loop.run_in_executor(
+                executor, mdl.cluster_positive_compounds, bioactive_cmpd_list)
+            binary_classifier_inputs = await loop.run_in_executor(
+                executor, mdl.load_clusters, clusters, neg_sample_size_factor,
+                self.fingerprinter, await neg_smiles_reservoir)
+            # As `train()`, on the model input of the first cluster
+            bci = binary_classifier_inputs[0]
+            binary_classifier_model.train(bci, np.arange(len(bci)),
+                                          *args, **kwargs)
+            PhyteByte.model = binary_classifier_model
+
+            self.logger.info("Scoring food compounds.")
+            return sorted(self._predict_food_cmpds(await food_cmpds),
+                          key=lambda tup: tup[1],
+                          reverse=True)
+
+    def _predict_food_cmpds(self, food_cmpds: List[FoodCmpd]
+                            ) -> Iterator[Tuple[FoodCmpd, float]]:
+        with span("PhyteByte.screen", items=len(food_cmpds)), \
+                self._scoring_pool() as p:
+            for food_cmpd, bioactivity_score in zip(
+                    food_cmpds,
+                    self._imap_chunks(
+                        p, [food_cmpd.smiles for food_cmpd in food_cmpds])):
+                if self._count_scored(bioactivity_score):
+                    yield food_cmpd, bioactivity_score
+
     def predict_bioactive_food_cmpd_iter(self,
-                                         food_cmpd_source: FoodCmpdSource
+                                         food_cmpd_source: FoodCmpdSource,
+                                         num_partitions: int=None
                                          ) -> Iterator[Tuple[FoodCmpd, float]]:
+        """ Scores every compound in `food_cmpd_source`.
+
+        `num_partitions`: If given, the compounds are split into this many
+        ID ranges, each of which is scanned & scored by its own worker (on
+        its own DB connection), and the results are yielded in ID order.
+        """
+        if num_partitions:
+            with span("PhyteByte.screen", num_partitions=num_partitions):
+                for scored_food_cmpd in \
+                        self._predict_bioactive_food_cmpd_partitioned_iter(
+                            food_cmpd_source, num_partitions):
+                    count("screening.scored")
+                    yield scored_food_cmpd
+            return
         food_cmpd_iter = food_cmpd_source.fetch_all_cmpds()
-        with Pool(cpu_count()) as p:
-            predicted_cmpd_bioactivity_iter = p.imap(
-                self._predict_cmpd_bioactivity,
-                food_cmpd_source.fetch_all_cmpd_smiles())
+        with span("PhyteByte.screen"), self._scoring_pool() as p:
+            predicted_cmpd_bioactivity_iter = self._imap_chunks(
+                p, food_cmpd_source.fetch_all_cmpd_smiles())
             for food_cmpd, bioactivity_score in zip(
                     food_cmpd_iter, predicted_cmpd_bioactivity_iter):
-                if food_cmpd is not None and bioactivity_score is not None:
+                if food_cmpd is not None and \
+                        self._count_scored(bioactivity_score):
                     yield food_cmpd, bioactivity_score
+
+    @classmethod
+    def _imap_chunks(cls, p, food_cmpd_smiles: Iterable[str]
+                     ) -> Iterator[Optional[float]]:
+        """ The scores of `food_cmpd_smiles` (in order), scored by the workers
+        of pool `p` a chunk at a time.
+        """
+        return itertools.chain.from_iterable(p.imap(
+            cls._predict_cmpds_bioactivity,
+            _chunks(food_cmpd_smiles, cls.scoring_chunk_size)))
+
+    @classmethod
+    def _scoring_pool(cls):
+        """ A pool of workers, each shipped the fingerprinter & model once
+        (so they needn't be inherited by forking).
+        """
+        return Pool(cpu_count(), initializer=cls._init_scoring_worker,
+                    initargs=(cls.fingerprinter, cls.model))
+
+    @classmethod
+    def _init_scoring_worker(cls, fingerprinter: Fingerprinter,
+                             model: BinaryClassifierModel):
+        PhyteByte.fingerprinter = fingerprinter
+        PhyteByte.model = model
+
+    @staticmethod
+    def _count_scored(bioactivity_score) -> bool:
+        """ Counts (& returns) whether a compound could be scored (i.e. its
+        SMiLES could be fingerprinted).
+        """
+        scored = bioactivity_score is not None
+        count("screening.scored" if scored else "screening.unscored")
+        return scored
+
+    def _predict_bioactive_food_cmpd_partitioned_iter(
+            self,
+            food_cmpd_source: FoodCmpdSource,
+            num_partitions: int) -> Iterator[Tuple[FoodCmpd, float]]:
+        key_ranges = food_cmpd_source.cmpd_key_ranges(num_partitions)
+        with self._scoring_pool() as p:
+            # Each range is scanned in units of `partition_unit_keys` keys, so
+            # results stream back (& a worker holds) a unit at a time. imap()
+            # preserves their (ID) order
+            for scored_food_cmpds in p.imap(
+                    functools.partial(self._predict_key_range_bioactivity,
+                                      food_cmpd_source),
+                    _split_key_ranges(key_ranges, self.partition_unit_keys)):
+                yield from scored_food_cmpds
+
+    @classmethod
+    def _predict_key_range_bioactivity(cls,
+                                       food_cmpd_source: FoodCmpdSource,
+                                       key_range: KeyRange
+                                       ) -> List[Tuple[FoodCmpd, float]]:
+        scored_food_cmpds = []
+        for food_cmpds in _chunks(food_cmpd_source.fetch_all_cmpds(key_range),
+                                  cls.scoring_chunk_size):
+            for food_cmpd, bioactivity_score in zip(
+                    food_cmpds, cls._predict_cmpds_bioactivity(
+                        [food_cmpd.smiles for food_cmpd in food_cmpds])):
+                if bioactivity_score is not None:
+                    scored_food_cmpds.append((food_cmpd, bioactivity_score))
+        return scored_food_cmpds
     
     def load_positive_compounds(self, model_type: str):
-        binary_classifier_model = BinaryClassifierModel.create(model_type)
+        binary_classifier_model = self._create_model(model_type)
         self.logger.info("Loading positive compounds")
-        mdl = ModelInputLoader(self._source, self._negative_sampler,
-                               self._positive_clusterer, self._target_input,
-                               binary_classifier_model.expected_encoding)
+        # With their bioactivities, for callers to report
+        mdl = self._model_input_loader(binary_classifier_model, lean=False)
         positive_compounds = mdl.load_positive_compounds()
         return positive_compounds
 
@@ -162,14 +411,49 @@ class PhyteByte():
     @classmethod
     def _predict_cmpd_bioactivity(cls, food_cmpd_smiles: str
                                   ) -> float:
-        encoded_cmpd = cls.fingerprinter.fingerprint_and_encode(
-            food_cmpd_smiles, cls.model.expected_encoding)
-        if encoded_cmpd is not None:
-            return cls.model.calc_score(encoded_cmpd)
+        return cls._predict_cmpds_bioactivity([food_cmpd_smiles])[0]
+
+    @classmethod
+    def _predict_cmpds_bioactivity(cls, food_cmpd_smiles: List[str]
+                                   ) -> List[Optional[float]]:
+        """ The scores of a chunk of compounds (`None` for those that can't
+        be fingerprinted), scored together.
+        """
+        encoded_cmpds = [cls.fingerprinter.fingerprint_and_encode(
+            smiles, cls.model.expected_encoding)
+            for smiles in food_cmpd_smiles]
+        fingerprinted = [encoded_cmpd for encoded_cmpd in encoded_cmpds
+                         if encoded_cmpd is not None]
+        scores = iter(cls.model.calc_scores(fingerprinted)
+                      if fingerprinted else [])
+        return [None if encoded_cmpd is None else float(next(scores))
+                for encoded_cmpd in encoded_cmpds]
 
     def sort_predicted_bioactive_food_cmpds(self, food_cmpd_source:
-                                            FoodCmpdSource
+                                            FoodCmpdSource,
+                                            num_partitions: int=None
                                             ) -> List[Tuple[FoodCmpd, float]]:
-        return sorted(self.predict_bioactive_food_cmpd_iter(food_cmpd_source),
+        return sorted(self.predict_bioactive_food_cmpd_iter(food_cmpd_source,
+                                                            num_partitions),
                       key=lambda tup: tup[1],
                       reverse=True)
+
+
+def _split_key_ranges(key_ranges: Iterable[KeyRange], size: int
+                      ) -> Iterator[KeyRange]:
+    """ `key_ranges`, each split into consecutive ranges of (at most)
+    `size` keys. `None` (the whole source, of one that can't be partitioned)
+    is passed through unsplit.
+    """
+    for key_range in key_ranges:
+        if key_range is None:
+            yield None
+            continue
+        lower, upper = key_range
+        for start in range(lower, upper, size):
+            yield start, min(start + size, upper)
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    return iter(lambda: list(itertools.islice(iterator, size)), [])
@@ -1,8 +1,23 @@
 from abc import ABC, abstractmethod
-from sqlalchemy import select
+from collections import OrderedDict
+from threading import Lock
+from sqlalchemy import bindparam, select, func
+from typing import Dict, List, Tuple
+
+# (lower, upper) bounds of a primary-key range: lower <= key < upper
+KeyRange = Tuple[int, int]
+
+# Number of distinct query shapes whose statements are kept by `statement()`
+STATEMENT_CACHE_SIZE = 128
+
+_statements = OrderedDict()
+_statements_lock = Lock()
 
 
 class Query(ABC):
+    # Whether `_param()` renders bound parameters (see `statement()`)
+    _parametrized = False
+
     def __str__(self):
         stmt = self.build()
         return stmt.compile(
@@ -17,6 +32,57 @@ class Query(ABC):
             dialect=dialect,
             compile_kwargs={"literal_binds": True}).string
 
+    def statement(self) -> select:
+        """ `build()`, with `params` as bound parameters rather than literals.
+
+        Queries of the same class & `_shape` (i.e. differing only in their
+        gene targets, or limit) share one statement, which is built once and
+        kept in a small LRU cache. Executing the same statement object lets
+        SQLAlchemy reuse its compiled form (see `phytebyte.db`): that
+        client-side compilation is all that's saved. The database doesn't
+        prepare it: the drivers (psycopg2, mysqlclient) interpolate the
+        values into the SQL text, and an expanding (list) parameter renders
+        one placeholder per value. Execute it as
+        `conn.execute(query.statement(), query.params)`.
+        """
+        key = (self.__class__, self._shape)
+        with _statements_lock:
+            statement = _statements.get(key)
+            if statement is not None:
+                _statements.move_to_end(key)
+                return statement
+        self._parametrized = True
+        try:
+            statement = self.build()
+        finally:
+            self._parametrized = False
+        with _statements_lock:
+            _statements[key] = statement
+            while len(_statements) > STATEMENT_CACHE_SIZE:
+                _statements.popitem(last=False)
+        return statement
+
+    @property
+    def params(self) -> Dict:
+        """ Values of the bound parameters of `statement()`, by name. """
+        return {}
+
+    @property
+    def _shape(self) -> Tuple:
+        """ Hashable summary of everything that changes the structure of the
+        SQL (but not `params`), i.e. which optional filters are present.
+        """
+        return ()
+
+    def _param(self, name: str):
+        """ Use in place of the value of `params[name]` when building a
+        query: it is inlined by `build()`, and bound by `statement()`.
+        """
+        value = self.params[name]
+        if not self._parametrized:
+            return value
+        return bindparam(name, expanding=isinstance(value, (list, tuple)))
+
     def build(self) -> select:
         query = self._select\
                     .select_from(self._select_from)\
@@ -29,6 +95,61 @@ class Query(ABC):
             query = query.having(self._having)
         return query
 
+    def build_range(self, key_range: KeyRange=None) -> select:
+        """ `build()`, restricted to rows whose `_key_column` falls within
+        `key_range` (all rows if `None`). Disjoint ranges can be scanned in
+        parallel, on separate connections.
+        """
+        if key_range is None:
+            return self.build()
+        self._check_key_column()
+        lower, upper = key_range
+        return self.build()\
+                   .where(self._key_column >= lower)\
+                   .where(self._key_column < upper)
+
+    def build_page(self, page_size: int, after_key: int=None) -> select:
+        """ Keyset pagination: the first `page_size` rows, ordered by
+        `_key_column`, whose key is greater than `after_key` (the last key of
+        the previous page). Unlike OFFSET, each page is an index range scan.
+        """
+        self._check_key_column()
+        query = self.build()\
+                    .order_by(None)\
+                    .order_by(self._key_column)\
+                    .limit(page_size)
+        if after_key is not None:
+            query = query.where(self._key_column > after_key)
+        return query
+
+    def build_key_bounds(self) -> select:
+        """ Selects the (min, max) `_key_column` value of the rows matched by
+        this query.
+        """
+        self._check_key_column()
+        return select([func.min(self._key_column),
+                       func.max(self._key_column)])\
+            .select_from(self._select_from)\
+            .where(self._whereclause)
+
+    @staticmethod
+    def split_key_range(min_key: int, max_key: int,
+                        num_partitions: int) -> List[KeyRange]:
+        """ Splits [min_key, max_key] into at most `num_partitions` contiguous
+        `KeyRange`s, in key order.
+        """
+        if min_key is None or max_key is None:
+            return []
+        step = (max_key - min_key) // num_partitions + 1
+        return [(lower, min(lower + step, max_key + 1))
+                for lower in range(min_key, max_key + 1, step)]
+
+    def _check_key_column(self):
+        if self._key_column is None:
+            raise NotImplementedError(
+                f"{self.__class__.__name__} has no `_key_column` to paginate"
+                " or partition by")
+
     @property
     @abstractmethod
     def _select(self):
@@ -58,3 +179,10 @@ class Query(ABC):
     @property
     def _limit(self):
         return None
+
+    @property
+    def _key_column(self):
+        """ Unique, indexed column (i.e. the primary key) used for keyset
+        pagination and range partitioning. `None` if unsupported.
+        """
+        return None
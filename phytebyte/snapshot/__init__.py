@@ -0,0 +1,12 @@
+from .base import (MissingFormatDependency, SnapshotFormat,
+                   SnapshotTableReader, SnapshotTableWriter)
+from .snapshot import Snapshot
+from .tables import SNAPSHOT_TABLES, TableSpec
+
+__all__ = ['MissingFormatDependency',
+           'Snapshot',
+           'SnapshotFormat',
+           'SnapshotTableReader',
+           'SnapshotTableWriter',
+           'SNAPSHOT_TABLES',
+           'TableSpec']
@@ -0,0 +1,134 @@
+import os
+from threading import Lock
+from typing import Collection, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .base import SnapshotFormat, SnapshotTableReader, SnapshotTableWriter
+
+ARROW_TYPES = {"int": pa.int64(), "float": pa.float64(), "str": pa.string()}
+
+
+def arrow_schema(spec) -> pa.Schema:
+    return pa.schema([(name, ARROW_TYPES[type_])
+                      for name, type_ in spec.columns])
+
+
+class ArrowSnapshotTableWriter(SnapshotTableWriter):
+    def __init__(self, path, spec):
+        super().__init__(path, spec)
+        self._schema = arrow_schema(spec)
+        self._sink = pa.OSFile(self.tmp_path, 'wb')
+        self._writer = pa.ipc.new_file(self._sink, self._schema)
+
+    def write_rows(self, rows):
+        columns = list(zip(*rows)) if rows else [[]] * len(self._schema)
+        self._writer.write_batch(pa.record_batch(
+            [pa.array(column, type=field.type)
+             for column, field in zip(columns, self._schema)],
+            schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        if not self._sink.closed:
+            self._sink.close()
+        super().abort()
+
+
+class ArrowSnapshotTableReader(SnapshotTableReader):
+    """ Memory-maps the table's (uncompressed) Arrow IPC file, whose pages
+    are shared by every process reading the same snapshot. Columns are
+    filtered & selected in place; rows are only converted to Python objects
+    a record batch at a time, as they're iterated.
+
+    A `between` range of a column in sorted order (as the key columns are
+    exported) is found by binary search, & read as a slice of the table.
+    """
+    def __init__(self, path, spec):
+        super().__init__(path, spec)
+        self._table = None
+        self._sorted_columns = {}
+        self._lock = Lock()
+
+    @property
+    def table(self) -> pa.Table:
+        with self._lock:
+            if self._table is None:
+                self._table = pa.ipc.open_file(
+                    pa.memory_map(self.path, 'r')).read_all()
+        return self._table
+
+    @property
+    def num_rows(self):
+        return self.table.num_rows
+
+    def rows(self, columns: List[str],
+             where: Dict[str, Collection]=None,
+             between: Dict[str, Tuple]=None) -> Iterator[tuple]:
+        table = self.table
+        start, stop = 0, table.num_rows
+        unsorted_ranges = {}
+        for column, (lower, upper) in (between or {}).items():
+            keys = self._sorted_column(column)
+            if keys is None:
+                unsorted_ranges[column] = (lower, upper)
+                continue
+            start = max(start, int(np.searchsorted(keys, lower, 'left')))
+            stop = min(stop, int(np.searchsorted(keys, upper, 'left')))
+        table = table.slice(start, max(0, stop - start))
+        mask = None
+        for column, (lower, upper) in unsorted_ranges.items():
+            column_mask = pc.and_(pc.greater_equal(table[column], lower),
+                                  pc.less(table[column], upper))
+            mask = column_mask if mask is None else pc.and_(mask, column_mask)
+        for column, values in (where or {}).items():
+            column_mask = pc.is_in(table[column], value_set=pa.array(
+                list(values), type=table.schema.field(column).type))
+            mask = column_mask if mask is None else pc.and_(mask, column_mask)
+        if mask is not None:
+            table = table.filter(mask)
+        return self._iter_rows(table.select(columns))
+
+    def take(self, columns: List[str], indices: List[int]) -> Iterator[tuple]:
+        return self._iter_rows(
+            self.table.select(columns).take(pa.array(indices, pa.int64())))
+
+    def _sorted_column(self, column: str) -> np.ndarray:
+        """ The values of `column`, if they're (non-null &) sorted, else
+        `None` (checked once).
+        """
+        with self._lock:
+            if column not in self._sorted_columns:
+                values = self._table[column]
+                keys = None
+                if values.null_count == 0 and (
+                        pa.types.is_integer(values.type) or
+                        pa.types.is_floating(values.type)):
+                    keys = values.to_numpy()
+                    if not np.all(keys[:-1] <= keys[1:]):
+                        keys = None
+                self._sorted_columns[column] = keys
+            return self._sorted_columns[column]
+
+    @staticmethod
+    def _iter_rows(table: pa.Table) -> Iterator[tuple]:
+        for batch in table.to_batches():
+            yield from zip(*(column.to_pylist() for column in batch.columns))
+
+
+class ArrowSnapshotFormat(SnapshotFormat):
+    """ Each table in its own Arrow IPC (Feather v2) file. """
+    name = 'arrow'
+    suffix = '.arrow'
+
+    def writer(self, path, spec):
+        return ArrowSnapshotTableWriter(path, spec)
+
+    def reader(self, path, spec):
+        return ArrowSnapshotTableReader(path, spec)
@@ -0,0 +1,114 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Collection, Dict, Iterator, List, Tuple
+
+from .tables import TableSpec
+
+
+class SnapshotTableWriter(ABC):
+    """ Writes the rows of one snapshot table, in batches. The table only
+    appears at its path once `close()` is called, so readers never see a
+    partially written table.
+    """
+    def __init__(self, path: str, spec: TableSpec):
+        self.path = path
+        self.spec = spec
+        self.tmp_path = f"{path}.tmp"
+
+    @abstractmethod
+    def write_rows(self, rows: List[tuple]) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """ Finishes the table, and moves it into place """
+        pass
+
+    def abort(self) -> None:
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class SnapshotTableReader(ABC):
+    def __init__(self, path: str, spec: TableSpec):
+        self.path = path
+        self.spec = spec
+
+    @property
+    @abstractmethod
+    def num_rows(self) -> int:
+        pass
+
+    @abstractmethod
+    def rows(self, columns: List[str],
+             where: Dict[str, Collection]=None,
+             between: Dict[str, Tuple]=None) -> Iterator[tuple]:
+        """ Yields the `columns` of each row, in table order.
+
+        `where`: Optional dict from column name to values; only rows whose
+        value of each column is one of its values are yielded.
+        `between`: Optional dict from column name to a (lower, upper) range;
+        only rows whose value of each column is in its range (including
+        `lower`, excluding `upper`) are yielded.
+        """
+        pass
+
+    @abstractmethod
+    def take(self, columns: List[str], indices: List[int]) -> Iterator[tuple]:
+        """ Yields the `columns` of the rows at (0-based, sorted) `indices`.
+        """
+        pass
+
+
+class MissingFormatDependency(ImportError):
+    """ A snapshot format's optional dependency isn't installed. """
+    pass
+
+
+class SnapshotFormat(ABC):
+    """ A file format that snapshot tables are stored in, one file per table.
+
+    Factory method 'create()' instantiates each SnapshotFormat implementation.
+    """
+    name = None
+    suffix = None
+
+    @classmethod
+    def create(cls, format_name: str) -> 'SnapshotFormat':
+        available_formats = cls.get_available_formats()
+        format_class = available_formats.get(format_name)
+        if format_class is None:
+            raise Exception(
+                f"Can't support snapshot format: '{format_name}'"
+                f"\n --> Choices: {list(available_formats.keys())}")
+        return format_class()
+
+    @classmethod
+    def get_available_formats(cls):
+        from .sqlite import SqliteSnapshotFormat
+
+        def arrow_format():
+            # Imported on use, so pyarrow is only needed for Arrow snapshots
+            try:
+                from .arrow import ArrowSnapshotFormat
+            except ImportError as e:
+                raise MissingFormatDependency(
+                    "The 'arrow' snapshot format needs pyarrow (`pip install "
+                    "phytebyte[arrow]`): use the 'sqlite' format without "
+                    "it") from e
+            return ArrowSnapshotFormat()
+        return {
+            'arrow': arrow_format,
+            'sqlite': SqliteSnapshotFormat
+        }
+
+    def path(self, snapshot_dir: str, spec: TableSpec) -> str:
+        return os.path.join(snapshot_dir, f"{spec.name}{self.suffix}")
+
+    @abstractmethod
+    def writer(self, path: str, spec: TableSpec) -> SnapshotTableWriter:
+        pass
+
+    @abstractmethod
+    def reader(self, path: str, spec: TableSpec) -> SnapshotTableReader:
+        pass
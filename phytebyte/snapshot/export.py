@@ -0,0 +1,131 @@
+""" Exports the columns of ChEMBL & FooDB that phytebyte reads into a local
+snapshot (see `phytebyte snapshot`), one table per thread.
+"""
+import itertools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from sqlalchemy import and_, cast, select, Float
+
+from phytebyte.db import DEFAULT_BATCH_SIZE, get_engine, stream_rows
+from phytebyte.bioactive_cmpd.sources.chembl.gene_activity import (
+    gene_activity_join, human_gene_symbol_clauses,
+    joined_gene_activity_columns)
+from phytebyte.bioactive_cmpd.sources.chembl.models import (
+    Assay, CompoundStructure)
+from phytebyte.food_cmpd.sources.foodb.models import Content, Food
+from phytebyte.food_cmpd.sources.foodb.queries import FoodbFoodCmpdQuery
+from .base import SnapshotFormat
+from .snapshot import read_manifest, write_manifest
+from .tables import SNAPSHOT_TABLES, TableSpec
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_statements() -> Dict[str, select]:
+    """ The statement that selects the rows of each snapshot table, with
+    columns in the order of its `TableSpec`.
+    """
+    cols = joined_gene_activity_columns
+    return {
+        "compound_structures": select([
+            CompoundStructure.molregno,
+            CompoundStructure.canonical_smiles])
+        .order_by(CompoundStructure.molregno),
+
+        "gene_activity": select([
+            cols.gene_symbol.label("gene_symbol"),
+            cols.molregno.label("molregno"),
+            cols.pref_name.label("pref_name"),
+            cols.canonical_smiles.label("canonical_smiles"),
+            cols.compound_name.label("compound_name"),
+            cols.standard_type.label("standard_type"),
+            cols.standard_relation.label("standard_relation"),
+            cast(cols.standard_value, Float).label("standard_value"),
+            cols.standard_units.label("standard_units"),
+            cols.confidence_score.label("confidence_score"),
+            Assay.description.label("assay_description")])
+        .select_from(gene_activity_join())
+        .where(and_(*human_gene_symbol_clauses()))
+        .order_by(cols.molregno),
+
+        "food_compounds": FoodbFoodCmpdQuery().build(),
+
+        "food_contents": select([
+            Content.source_id.label("cmpd_uid"),
+            Food.name.label("food_name"),
+            Food.description.label("food_descr"),
+            Content.orig_food_part.label("food_part"),
+            cast(Content.orig_content, Float).label("content"),
+            Content.orig_unit.label("unit"),
+            cast(Content.orig_min, Float).label("min"),
+            cast(Content.orig_max, Float).label("max"),
+            cast(Content.standard_content, Float).label("amount")])
+        .select_from(Food.__table__.join(Content, Food.id == Content.food_id))
+        .where(Content.source_type == "Compound")
+        .order_by(Content.source_id)}
+
+
+def export_snapshot(snapshot_dir: str,
+                    db_urls: Dict[str, str],
+                    format_name: str='sqlite',
+                    max_workers: int=4,
+                    batch_size: int=DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """ Exports the tables of each database in `db_urls` (i.e.
+    {'chembl': ..., 'foodb': ...}) into `snapshot_dir`, in parallel.
+
+    Tables of databases absent from `db_urls` are kept from an existing
+    snapshot of the same format. The manifest is written last, so an
+    interrupted export never leaves a readable, partial snapshot.
+
+    Returns: The number of rows of each exported table.
+    """
+    specs = [spec for spec in SNAPSHOT_TABLES.values()
+             if spec.database in db_urls]
+    if not specs:
+        databases = sorted({spec.database
+                            for spec in SNAPSHOT_TABLES.values()})
+        raise ValueError(f"No snapshot tables for databases {list(db_urls)}"
+                         f" (choices: {databases})")
+    snapshot_format = SnapshotFormat.create(format_name)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    statements = snapshot_statements()
+
+    def export(spec: TableSpec) -> int:
+        return export_table(
+            snapshot_format, snapshot_format.path(snapshot_dir, spec), spec,
+            get_engine(db_urls[spec.database]), statements[spec.name],
+            batch_size)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        num_rows = dict(zip([spec.name for spec in specs],
+                            executor.map(export, specs)))
+
+    manifest = read_manifest(snapshot_dir)
+    if manifest is not None and manifest["format"] == format_name:
+        num_rows = dict(manifest["tables"], **num_rows)
+    write_manifest(snapshot_dir, format_name, num_rows)
+    return num_rows
+
+
+def export_table(snapshot_format: SnapshotFormat, path: str, spec: TableSpec,
+                 engine, statement, batch_size: int) -> int:
+    logger.info(f"Exporting '{spec.name}' to '{path}'.")
+    writer = snapshot_format.writer(path, spec)
+    num_rows = 0
+    try:
+        rows = stream_rows(engine, statement, batch_size=batch_size)
+        while True:
+            batch = [tuple(row) for row in itertools.islice(rows, batch_size)]
+            if not batch:
+                break
+            writer.write_rows(batch)
+            num_rows += len(batch)
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    logger.info(f"Exported {num_rows} rows of '{spec.name}'.")
+    return num_rows
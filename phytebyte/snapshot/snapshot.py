@@ -0,0 +1,57 @@
+import json
+import os
+from threading import Lock
+from typing import Dict
+
+from .base import SnapshotFormat, SnapshotTableReader
+from .tables import SNAPSHOT_TABLES
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+class Snapshot(object):
+    """ A directory written by `phytebyte snapshot`: one file per exported
+    table, and a manifest of the format and number of rows of each table.
+    """
+    def __init__(self, snapshot_dir: str):
+        self.snapshot_dir = snapshot_dir
+        manifest = read_manifest(snapshot_dir)
+        if manifest is None:
+            raise FileNotFoundError(
+                f"No snapshot in '{snapshot_dir}' (no {MANIFEST_FILENAME}): "
+                "create one with `phytebyte snapshot`")
+        self.format = SnapshotFormat.create(manifest["format"])
+        self.num_rows = manifest["tables"]
+        self._readers = {}
+        self._lock = Lock()
+
+    def table(self, name: str) -> SnapshotTableReader:
+        if name not in self.num_rows:
+            raise KeyError(
+                f"Table '{name}' is not in the snapshot at "
+                f"'{self.snapshot_dir}' (tables: {sorted(self.num_rows)})")
+        with self._lock:
+            reader = self._readers.get(name)
+            if reader is None:
+                spec = SNAPSHOT_TABLES[name]
+                reader = self.format.reader(
+                    self.format.path(self.snapshot_dir, spec), spec)
+                self._readers[name] = reader
+        return reader
+
+
+def read_manifest(snapshot_dir: str) -> Dict:
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_FILENAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_manifest(snapshot_dir: str, format_name: str,
+                   num_rows: Dict[str, int]) -> None:
+    path = os.path.join(snapshot_dir, MANIFEST_FILENAME)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump({"format": format_name, "tables": num_rows}, f, indent=2,
+                  sort_keys=True)
+    os.replace(f"{path}.tmp", path)
@@ -0,0 +1,105 @@
+import json
+import os
+import sqlite3
+from typing import Collection, Dict, Iterator, List, Tuple
+
+from .base import SnapshotFormat, SnapshotTableReader, SnapshotTableWriter
+
+SQLITE_TYPES = {"int": "INTEGER", "float": "REAL", "str": "TEXT"}
+
+
+class SqliteSnapshotTableWriter(SnapshotTableWriter):
+    def __init__(self, path, spec):
+        super().__init__(path, spec)
+        self.abort()
+        self._conn = sqlite3.connect(self.tmp_path)
+        columns = ", ".join(f'"{name}" {SQLITE_TYPES[type_]}'
+                            for name, type_ in spec.columns)
+        self._conn.execute(f'CREATE TABLE "{spec.name}" ({columns})')
+        self._insert_sql = (
+            f'INSERT INTO "{spec.name}" VALUES '
+            f'({", ".join("?" * len(spec.columns))})')
+
+    def write_rows(self, rows):
+        self._conn.executemany(self._insert_sql, rows)
+
+    def close(self):
+        # Indexes are built once, after all rows are in
+        for column in self.spec.indexes:
+            self._conn.execute(
+                f'CREATE INDEX "{self.spec.name}_{column}_idx" '
+                f'ON "{self.spec.name}" ("{column}")')
+        self._conn.commit()
+        self._conn.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        if getattr(self, '_conn', None) is not None:
+            self._conn.close()
+        super().abort()
+
+
+class SqliteSnapshotTableReader(SnapshotTableReader):
+    """ Each call reads on its own (read-only) connection, so a reader can be
+    shared by threads.
+    """
+    def __init__(self, path, spec):
+        super().__init__(path, spec)
+        self._num_rows = None
+
+    @property
+    def num_rows(self):
+        if self._num_rows is None:
+            self._num_rows = next(self._execute(
+                f'SELECT count(*) FROM "{self.spec.name}"', []))[0]
+        return self._num_rows
+
+    def rows(self, columns: List[str],
+             where: Dict[str, Collection]=None,
+             between: Dict[str, Tuple]=None) -> Iterator[tuple]:
+        clauses, params = [], []
+        for column, values in (where or {}).items():
+            # One JSON array parameter per column, rather than one parameter
+            # per value (which SQLite limits the number of)
+            clauses.append(
+                f'"{column}" IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps(list(values)))
+        for column, (lower, upper) in (between or {}).items():
+            # (A range scan of the column's index, if it has one)
+            clauses.append(f'"{column}" >= ? AND "{column}" < ?')
+            params.extend([lower, upper])
+        sql = f'SELECT {self._columns_sql(columns)} FROM "{self.spec.name}"'
+        if clauses:
+            sql += f' WHERE {" AND ".join(clauses)}'
+        return self._execute(f"{sql} ORDER BY rowid", params)
+
+    def take(self, columns: List[str], indices: List[int]) -> Iterator[tuple]:
+        return self._execute(
+            f'SELECT {self._columns_sql(columns)} FROM "{self.spec.name}" '
+            f'WHERE rowid IN (SELECT value + 1 FROM json_each(?)) '
+            f'ORDER BY rowid', [json.dumps(list(indices))])
+
+    @staticmethod
+    def _columns_sql(columns):
+        return ", ".join(f'"{column}"' for column in columns)
+
+    def _execute(self, sql, params) -> Iterator[tuple]:
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            yield from conn.execute(sql, params)
+        finally:
+            conn.close()
+
+
+class SqliteSnapshotFormat(SnapshotFormat):
+    """ Each table in its own SQLite database file, with an index on each
+    column it is filtered by.
+    """
+    name = 'sqlite'
+    suffix = '.sqlite'
+
+    def writer(self, path, spec):
+        return SqliteSnapshotTableWriter(path, spec)
+
+    def reader(self, path, spec):
+        return SqliteSnapshotTableReader(path, spec)
@@ -0,0 +1,57 @@
+from collections import namedtuple
+
+# A table of a snapshot: its columns, as (name, type) pairs, where type is one
+# of 'int' | 'float' | 'str', and the columns that readers filter by
+# (indexed by formats that support indexes)
+TableSpec = namedtuple("TableSpec", [
+    "name", "database", "columns", "indexes"])
+
+COMPOUND_STRUCTURES = TableSpec(
+    name="compound_structures",
+    database="chembl",
+    columns=[("molregno", "int"),
+             ("canonical_smiles", "str")],
+    indexes=["molregno"])
+
+GENE_ACTIVITY = TableSpec(
+    name="gene_activity",
+    database="chembl",
+    columns=[("gene_symbol", "str"),
+             ("molregno", "int"),
+             ("pref_name", "str"),
+             ("canonical_smiles", "str"),
+             ("compound_name", "str"),
+             ("standard_type", "str"),
+             ("standard_relation", "str"),
+             ("standard_value", "float"),
+             ("standard_units", "str"),
+             ("confidence_score", "int"),
+             ("assay_description", "str")],
+    indexes=["gene_symbol", "molregno", "compound_name"])
+
+FOOD_COMPOUNDS = TableSpec(
+    name="food_compounds",
+    database="foodb",
+    columns=[("uid", "int"),
+             ("smiles", "str"),
+             ("name", "str"),
+             ("description", "str")],
+    indexes=["uid"])
+
+FOOD_CONTENTS = TableSpec(
+    name="food_contents",
+    database="foodb",
+    columns=[("cmpd_uid", "int"),
+             ("food_name", "str"),
+             ("food_descr", "str"),
+             ("food_part", "str"),
+             ("content", "float"),
+             ("unit", "str"),
+             ("min", "float"),
+             ("max", "float"),
+             ("amount", "float")],
+    indexes=["cmpd_uid"])
+
+SNAPSHOT_TABLES = {
+    table.name: table for table in [
+        COMPOUND_STRUCTURES, GENE_ACTIVITY, FOOD_COMPOUNDS, FOOD_CONTENTS]}
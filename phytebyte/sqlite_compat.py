@@ -0,0 +1,48 @@
+""" SQLite stand-ins for the Postgres functions used by the ChEMBL queries
+(`setseed()`, a seedable `random()`, and `array_agg()`), so sources run
+end-to-end against SQLite databases, i.e. those built by
+`phytebyte.synthetic`.
+"""
+import json
+import random
+
+from sqlalchemy import event
+from sqlalchemy.sql import sqltypes
+
+
+class SqliteArray(sqltypes.ARRAY):
+    """ `ARRAY` results on SQLite: the JSON text built by `array_agg()` """
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            return None if value is None else json.loads(value)
+        return process
+
+
+class ArrayAgg(object):
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        self.values.append(value)
+
+    def finalize(self):
+        return json.dumps(self.values)
+
+
+def install_sqlite_compat(engine) -> None:
+    """ Registers the functions on each new connection of `engine`, and
+    decodes `ARRAY` results. `random()` draws from a per-connection
+    generator, that `setseed()` seeds (as on Postgres).
+    """
+    engine.dialect.colspecs = dict(engine.dialect.colspecs)
+    engine.dialect.colspecs[sqltypes.ARRAY] = SqliteArray
+
+    @event.listens_for(engine, "connect")
+    def register_functions(dbapi_conn, connection_record):
+        rng = random.Random()
+
+        def setseed(seed):
+            rng.seed(seed)
+        dbapi_conn.create_function("setseed", 1, setseed)
+        dbapi_conn.create_function("random", 0, rng.random)
+        dbapi_conn.create_aggregate("array_agg", 1, ArrayAgg)
@@ -0,0 +1,13 @@
+""" Synthetic, ChEMBL- & FooDB-shaped SQLite databases of any size, to
+benchmark phytebyte end-to-end without the real databases.
+"""
+from .chembl import generate_chembl_db
+from .foodb import generate_foodb_db
+from .schema import create_sqlite_schema, sqlite_metadata
+from .smiles import SmilesGenerator
+
+__all__ = ['generate_chembl_db',
+           'generate_foodb_db',
+           'create_sqlite_schema',
+           'sqlite_metadata',
+           'SmilesGenerator']
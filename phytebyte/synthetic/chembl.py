@@ -0,0 +1,126 @@
+import logging
+import random
+from typing import Dict, List
+
+from phytebyte.db import get_engine
+from phytebyte.bioactive_cmpd.sources.chembl.models import metadata
+from .schema import sqlite_metadata
+from .smiles import SmilesGenerator
+from .writer import BatchInserter
+
+# Real gene symbols, so target inputs (i.e. `GeneTargetsInput`) read as usual
+GENE_SYMBOLS = [
+    "PPARG", "PPARA", "PPARD", "ESR1", "ESR2", "AR", "NR3C1", "RXRA", "VDR",
+    "THRB", "EGFR", "ERBB2", "ABL1", "SRC", "JAK2", "BRAF", "MAPK1", "CDK2",
+    "PTGS1", "PTGS2", "ACHE", "HTR2A", "DRD2", "ADRB2", "OPRM1", "CYP3A4",
+    "HDAC1", "PDE4B", "AKT1", "MTOR", "SIRT1", "NFKB1", "TNF", "IL6", "INSR",
+    "GCK", "DPP4", "HMGCR", "ACE", "AGTR1"]
+ASSAYS_PER_TARGET = 5
+
+# (value, weight)s of the randomized columns
+STANDARD_TYPES = [("IC50", 5), ("EC50", 3), ("Ki", 3), ("Kd", 1),
+                  ("Potency", 1)]
+STANDARD_RELATIONS = [("=", 8), ("<", 1), (">", 1)]
+STANDARD_UNITS = [("nM", 9), ("ug.mL-1", 1)]
+CONFIDENCE_SCORES = [(9, 5), (8, 2), (7, 1), (5, 1), (4, 1)]
+ACTIVITIES_PER_COMPOUND = [(0, 2), (1, 4), (2, 3), (3, 2), (5, 1)]
+
+logger = logging.getLogger(__name__)
+
+
+def generate_chembl_db(db_url: str,
+                       num_compounds: int,
+                       seed: int=0,
+                       gene_symbols: List[str]=GENE_SYMBOLS,
+                       batch_size: int=10000) -> Dict[str, int]:
+    """ Creates the ChEMBL schema (see `sqlite_metadata()`) in the (empty)
+    database at `db_url`, and fills the tables that phytebyte reads with
+    `num_compounds` compounds, and their activities against human (and
+    mouse) targets of `gene_symbols`.
+
+    Returns: The number of rows inserted into each table.
+    """
+    rng = random.Random(seed)
+    sqlite_md = sqlite_metadata(metadata)
+    engine = get_engine(db_url)
+    sqlite_md.create_all(engine)
+    inserter = BatchInserter(engine, sqlite_md, batch_size)
+    logger.info(f"Generating {num_compounds} ChEMBL compounds.")
+    with inserter:
+        inserter.insert("version", [{
+            "name": f"ChEMBL_synthetic_{num_compounds}_{seed}"}])
+        assay_ids = _insert_targets(inserter, rng, gene_symbols)
+        _insert_compounds(inserter, rng, num_compounds, seed, assay_ids)
+    return dict(inserter.num_rows)
+
+
+def _insert_targets(inserter, rng, gene_symbols) -> List[int]:
+    """ Inserts a human & a mouse target per gene, each with assays.
+
+    Returns: The ids of the assays.
+    """
+    assay_ids = []
+    organisms = [("Homo sapiens", str.upper),
+                 ("Mus musculus", str.capitalize)]
+    for i, gene_symbol in enumerate(gene_symbols):
+        for j, (organism, to_symbol) in enumerate(organisms):
+            component_id = 2 * i + j + 1
+            inserter.insert("component_sequences", [{
+                "component_id": component_id, "organism": organism}])
+            inserter.insert("component_synonyms", [{
+                "compsyn_id": component_id, "component_id": component_id,
+                "component_synonym": to_symbol(gene_symbol),
+                "syn_type": "GENE_SYMBOL"}])
+            inserter.insert("target_dictionary", [{
+                "tid": component_id, "pref_name": gene_symbol,
+                "organism": organism,
+                "chembl_id": f"CHEMBL_T{component_id}"}])
+            inserter.insert("target_components", [{
+                "targcomp_id": component_id, "tid": component_id,
+                "component_id": component_id, "homologue": 0}])
+            for k in range(ASSAYS_PER_TARGET):
+                assay_id = component_id * ASSAYS_PER_TARGET + k
+                inserter.insert("assays", [{
+                    "assay_id": assay_id, "tid": component_id,
+                    "confidence_score": _choice(rng, CONFIDENCE_SCORES),
+                    "description":
+                        f"Synthetic assay {k} of {gene_symbol} ({organism})",
+                    "chembl_id": f"CHEMBL_A{assay_id}"}])
+                assay_ids.append(assay_id)
+    return assay_ids
+
+
+def _insert_compounds(inserter, rng, num_compounds, seed, assay_ids):
+    record_id = activity_id = 0
+    for molregno, smiles in enumerate(
+            SmilesGenerator(seed).generate(num_compounds), start=1):
+        inserter.insert("molecule_dictionary", [{
+            "molregno": molregno,
+            "pref_name": f"SYNTH-{molregno}" if rng.random() < .4 else None,
+            "chembl_id": f"CHEMBL{molregno}"}])
+        inserter.insert("compound_structures", [{
+            "molregno": molregno, "canonical_smiles": smiles}])
+        record_ids = []
+        for _ in range(rng.choice([1, 1, 1, 2])):
+            record_id += 1
+            record_ids.append(record_id)
+            inserter.insert("compound_records", [{
+                "record_id": record_id, "molregno": molregno,
+                "compound_name": f"synthetic compound {record_id}"}])
+        for _ in range(_choice(rng, ACTIVITIES_PER_COMPOUND)):
+            activity_id += 1
+            inserter.insert("activities", [{
+                "activity_id": activity_id,
+                "assay_id": rng.choice(assay_ids),
+                "record_id": rng.choice(record_ids),
+                "molregno": molregno,
+                "standard_type": _choice(rng, STANDARD_TYPES),
+                "standard_relation": _choice(rng, STANDARD_RELATIONS),
+                # Log-uniform, from 0.1 nM to ~300 uM
+                "standard_value": round(10 ** rng.uniform(-1, 5.5), 3),
+                "standard_units": _choice(rng, STANDARD_UNITS)}])
+
+
+def _choice(rng, weighted_values):
+    values, weights = zip(*weighted_values)
+    return rng.choices(values, weights)[0]
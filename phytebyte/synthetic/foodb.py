@@ -0,0 +1,82 @@
+import logging
+import random
+from typing import Dict
+
+from phytebyte.db import get_engine
+from phytebyte.food_cmpd.sources.foodb.models import metadata
+from .schema import sqlite_metadata
+from .smiles import SmilesGenerator
+from .writer import BatchInserter
+
+FOOD_NAMES = [
+    "Apple", "Banana", "Broccoli", "Carrot", "Cocoa bean", "Coffee",
+    "Garlic", "Ginger", "Grape", "Green tea", "Kale", "Lemon", "Onion",
+    "Orange", "Peanut", "Rosemary", "Soy bean", "Spinach", "Tomato",
+    "Turmeric"]
+FOOD_PARTS = [("Fruit", 3), ("Leaf", 2), ("Root", 1), ("Seed", 2), (None, 2)]
+CONTENTS_PER_COMPOUND = [(0, 3), (1, 4), (2, 2), (4, 1)]
+
+logger = logging.getLogger(__name__)
+
+
+def generate_foodb_db(db_url: str,
+                      num_compounds: int,
+                      seed: int=0,
+                      num_foods: int=200,
+                      batch_size: int=10000) -> Dict[str, int]:
+    """ Creates the FooDB schema (see `sqlite_metadata()`) in the (empty)
+    database at `db_url`, and fills the tables that phytebyte reads with
+    `num_compounds` compounds, and their content in `num_foods` foods.
+
+    Returns: The number of rows inserted into each table.
+    """
+    rng = random.Random(seed)
+    sqlite_md = sqlite_metadata(metadata)
+    engine = get_engine(db_url)
+    sqlite_md.create_all(engine)
+    inserter = BatchInserter(engine, sqlite_md, batch_size)
+    logger.info(f"Generating {num_compounds} FooDB compounds.")
+    with inserter:
+        for food_id in range(1, num_foods + 1):
+            food_name = FOOD_NAMES[(food_id - 1) % len(FOOD_NAMES)]
+            inserter.insert("foods", [{
+                "id": food_id,
+                "name": f"{food_name} {(food_id - 1) // len(FOOD_NAMES)}",
+                "description": f"Synthetic {food_name.lower()}",
+                "food_type": "Type 1"}])
+        content_id = 0
+        # A different seed than ChEMBL's, so the compound universes differ
+        smiles_iter = SmilesGenerator(seed + 1).generate(num_compounds)
+        for cmpd_id, smiles in enumerate(smiles_iter, start=1):
+            inserter.insert("compounds", [{
+                "id": cmpd_id,
+                "moldb_smiles": smiles,
+                "name": f"Food compound {cmpd_id}",
+                "description": f"Synthetic food compound {cmpd_id}",
+                "public_id": f"FDB{cmpd_id:06d}",
+                "type": "SmallMoleculeCompound"}])
+            for _ in range(_choice(rng, CONTENTS_PER_COMPOUND)):
+                content_id += 1
+                content = round(10 ** rng.uniform(-3, 3), 3)
+                inserter.insert("contents", [{
+                    "id": content_id,
+                    "source_id": cmpd_id,
+                    "source_type":
+                        "Compound" if rng.random() < .9 else "Nutrient",
+                    "food_id": rng.randint(1, num_foods),
+                    "orig_food_part": _choice(rng, FOOD_PARTS),
+                    "orig_content": content,
+                    "orig_min":
+                        round(content / 2, 3) if rng.random() < .3 else None,
+                    "orig_max":
+                        round(content * 2, 3) if rng.random() < .3 else None,
+                    "orig_unit": "mg/100g",
+                    "standard_content": content,
+                    "citation": "Synthetic",
+                    "citation_type": "DATABASE"}])
+    return dict(inserter.num_rows)
+
+
+def _choice(rng, weighted_values):
+    values, weights = zip(*weighted_values)
+    return rng.choices(values, weights)[0]
@@ -0,0 +1,40 @@
+import copy
+import re
+
+from sqlalchemy import CheckConstraint, DefaultClause, MetaData, text
+
+# i.e. "'ACTIVE'::character varying" -> "'ACTIVE'"
+_POSTGRES_CAST = re.compile(r"::[a-z ]+")
+
+
+def sqlite_metadata(metadata: MetaData) -> MetaData:
+    """ A copy of `metadata` (the ChEMBL or FooDB models) that SQLite can
+    create: the same tables, columns, types & indexes, without the Postgres
+    CHECK constraints, casts in server defaults, or MySQL collations.
+
+    NOT NULL is dropped from non-key columns, so generators need only fill
+    the columns that phytebyte reads.
+    """
+    sqlite_md = MetaData()
+    for table in metadata.sorted_tables:
+        table_copy = table.tometadata(sqlite_md)
+        for constraint in list(table_copy.constraints):
+            if isinstance(constraint, CheckConstraint):
+                table_copy.constraints.remove(constraint)
+        for column in table_copy.columns:
+            # Types & defaults are shared with `metadata`: replace, don't edit
+            if getattr(column.type, 'collation', None):
+                column.type = copy.copy(column.type)
+                column.type.collation = None
+            if column.server_default is not None:
+                default = str(getattr(column.server_default.arg, 'text',
+                                      column.server_default.arg))
+                column.server_default = DefaultClause(
+                    text(_POSTGRES_CAST.sub("", default)))
+            if not column.primary_key:
+                column.nullable = True
+    return sqlite_md
+
+
+def create_sqlite_schema(engine, metadata: MetaData) -> None:
+    sqlite_metadata(metadata).create_all(engine)
@@ -0,0 +1,79 @@
+import random
+from typing import Iterator
+
+# Ring systems, written with ring-closure labels 1 & 2, where each '*' is an
+# atom with a free hydrogen that may carry a branch. The first & last atoms
+# have free hydrogens too, to bond to the previous & next fragments.
+RING_TEMPLATES = [
+    "c1cc*ccc1", "c1cc*c*cc1", "c1ccc*cc1", "c1cc*ncc1", "c1ccncc1",
+    "c1cnc*nc1", "c1ccc2cc*ccc2c1", "c1ccc2nc*ccc2c1", "c1ccc2[nH]ccc2c1",
+    "c1cc*sc1", "c1cc*oc1", "c1cc[nH]c1", "C1CC*CCC1",
+    "C1CCN*CC1", "C1COCCN1", "C1CCC*C1", "C1CC1", "C1CCC(=O)N1",
+    "C1CN*CCN1", "C1CCOC1"]
+
+# Terminal substituents, bonded by their first atom
+SUBSTITUENTS = [
+    "C", "CC", "C(C)C", "O", "OC", "OCC", "N", "NC", "N(C)C", "F", "Cl",
+    "Br", "C(F)(F)F", "C#N", "C(=O)O", "C(=O)N", "C(=O)OC", "S(=O)(=O)N",
+    "S(=O)(=O)C", "[N+](=O)[O-]", "CO", "CCN"]
+
+# Leading substituents, bonded by their last atom
+PREFIXES = [
+    "C", "CC", "CC(C)", "OC", "N", "NC", "CN(C)", "F", "Cl", "Br",
+    "FC(F)(F)", "N#C", "OC(=O)", "NC(=O)", "CS(=O)(=O)", "COC(=O)"]
+
+# Bonds between ring systems
+LINKERS = [
+    "", "C", "CC", "O", "N", "C(=O)N", "NC(=O)", "S(=O)(=O)N", "OC", "CO",
+    "C(=O)", "NC(=O)N", "C=C"]
+
+MAX_DEPTH = 3
+
+
+class SmilesGenerator(object):
+    """ Generates valid, drug-like SMiLES: ring systems (aromatic &
+    aliphatic, with heteroatoms) joined by linkers and decorated with common
+    substituents. Generation is reproducible from `seed`.
+    """
+    def __init__(self, seed: int=0):
+        self._rng = random.Random(seed)
+
+    def generate(self, num_smiles: int) -> Iterator[str]:
+        """ Yields `num_smiles` distinct SMiLES. """
+        seen = set()
+        while len(seen) < num_smiles:
+            smiles = self._molecule()
+            if smiles not in seen:
+                seen.add(smiles)
+                yield smiles
+
+    def _molecule(self) -> str:
+        smiles = self._fragment(0)
+        if self._rng.random() < .3:
+            smiles = self._rng.choice(PREFIXES) + smiles
+        return smiles
+
+    def _fragment(self, depth: int) -> str:
+        """ A ring system, with its branches and the fragments bonded after
+        it. Ring-closure labels are offset by `depth`, so they never clash
+        with labels still open in enclosing fragments.
+        """
+        rng = self._rng
+        template = rng.choice(RING_TEMPLATES).translate(
+            {ord('1'): str(2 * depth + 1), ord('2'): str(2 * depth + 2)})
+        parts = []
+        for i, part in enumerate(template.split('*')):
+            if i > 0 and rng.random() < .5:
+                parts.append(f"({self._branch(depth)})")
+            parts.append(part)
+        smiles = "".join(parts)
+        if depth < MAX_DEPTH and rng.random() < .6 / (depth + 1):
+            smiles += rng.choice(LINKERS) + self._fragment(depth + 1)
+        elif rng.random() < .5:
+            smiles += rng.choice(SUBSTITUENTS)
+        return smiles
+
+    def _branch(self, depth: int) -> str:
+        if depth < MAX_DEPTH and self._rng.random() < .2:
+            return self._rng.choice(LINKERS) + self._fragment(depth + 1)
+        return self._rng.choice(SUBSTITUENTS)
@@ -0,0 +1,51 @@
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import MetaData
+
+
+class BatchInserter(object):
+    """ Buffers the rows inserted into each table, and inserts them
+    `batch_size` rows at a time (one `executemany()` each), in a single
+    transaction that is committed on exit.
+    """
+    def __init__(self, engine, metadata: MetaData, batch_size: int):
+        self._engine = engine
+        self._metadata = metadata
+        self._batch_size = batch_size
+        self._rows = defaultdict(list)
+        self._conn = None
+        self._transaction = None
+        self.num_rows = defaultdict(int)
+
+    def __enter__(self) -> 'BatchInserter':
+        self._conn = self._engine.connect()
+        if self._engine.dialect.name == 'sqlite':
+            # Nothing to recover if generation is interrupted
+            self._conn.execute("PRAGMA synchronous = OFF")
+        self._transaction = self._conn.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                for table_name in list(self._rows):
+                    self._flush(table_name)
+                self._transaction.commit()
+            else:
+                self._transaction.rollback()
+        finally:
+            self._conn.close()
+
+    def insert(self, table_name: str, rows: List[Dict]) -> None:
+        buffered = self._rows[table_name]
+        buffered.extend(rows)
+        if len(buffered) >= self._batch_size:
+            self._flush(table_name)
+
+    def _flush(self, table_name: str):
+        rows = self._rows.pop(table_name, [])
+        if rows:
+            self._conn.execute(self._metadata.tables[table_name].insert(),
+                               rows)
+            self.num_rows[table_name] += len(rows)
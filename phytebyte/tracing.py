@@ -0,0 +1,186 @@
+""" Lightweight tracing of phytebyte's pipeline: timed spans around its
+stages, and counters on its hot paths (i.e. fingerprints computed, DB rows
+fetched, cache hits), written as a Chrome trace (open it in
+chrome://tracing or https://ui.perfetto.dev).
+
+Tracing is off unless `enable_tracing()` is called, or the
+`PHYTEBYTE_TRACE` environment variable names the file to write the trace of
+the process to (at exit). While off, `span()` and `count()` return
+immediately.
+
+Counters are per process: increments made in `multiprocessing.Pool`
+workers aren't recorded, so the hot paths that run in pools are counted
+where their results are collected.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List
+
+TRACE_ENV_VAR = 'PHYTEBYTE_TRACE'
+# Set to the PID of the process that traces, for its child processes to see
+TRACE_OWNER_ENV_VAR = 'PHYTEBYTE_TRACE_OWNER'
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+
+
+class Tracer(object):
+    """ Records spans (as Chrome trace 'complete' events) & counter totals.
+
+    Each span's args hold the CPU time of its thread, and the counters
+    incremented while it was open (i.e. the rows fetched by a stage).
+    """
+    def __init__(self):
+        self.pid = os.getpid()
+        self._start = time.perf_counter()
+        self._events = []
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **args):
+        counters_start = self.counters
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield args
+        finally:
+            wall_end = time.perf_counter()
+            args["cpu_ms"] = round((time.thread_time() - cpu_start) * 1e3, 3)
+            for counter, value in self.counters.items():
+                delta = value - counters_start.get(counter, 0)
+                if delta:
+                    args[counter] = delta
+            self._add_event({
+                "name": name,
+                "ph": "X",
+                "ts": self._us(wall_start),
+                "dur": round((wall_end - wall_start) * 1e6, 3),
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+                "args": args})
+
+    def count(self, name: str, n: int=1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    @property
+    def events(self) -> List[Dict]:
+        with self._lock:
+            return list(self._events)
+
+    def summary(self) -> Dict[str, Dict]:
+        """ Totals of the spans of each name: calls, wall & CPU seconds. """
+        summary = OrderedDict()
+        for event in self.events:
+            totals = summary.setdefault(
+                event["name"], {"calls": 0, "wall_s": 0., "cpu_s": 0.})
+            totals["calls"] += 1
+            totals["wall_s"] += event["dur"] / 1e6
+            totals["cpu_s"] += event["args"]["cpu_ms"] / 1e3
+        return summary
+
+    def to_chrome_trace(self) -> Dict:
+        """ The trace, in the Chrome 'Trace Event Format'. Counter totals
+        are added as a final counter event (& under 'otherData').
+        """
+        counters = self.counters
+        events = self.events
+        if counters:
+            events.append({"name": "counters", "ph": "C",
+                           "ts": self._us(time.perf_counter()),
+                           "pid": self.pid, "args": counters})
+        return {"traceEvents": events,
+                "displayTimeUnit": "ms",
+                "otherData": {"counters": counters}}
+
+    def write(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+        logger.info(f"Trace written to '{path}'.")
+
+    def _add_event(self, event: Dict):
+        with self._lock:
+            self._events.append(event)
+
+    def _us(self, perf_counter: float) -> float:
+        return round((perf_counter - self._start) * 1e6, 3)
+
+
+class _NullSpan(object):
+    """ `span()` while tracing is off: a reusable, do-nothing context. """
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_null_span = _NullSpan()
+
+
+def span(name: str, **args):
+    """ Context manager timing the code it wraps as span `name`. `args` (and
+    any keys set on the dict it yields) are recorded with the span.
+    """
+    if _tracer is None:
+        return _null_span
+    return _tracer.span(name, **args)
+
+
+def count(name: str, n: int=1) -> None:
+    """ Increments counter `name` by `n`. """
+    if _tracer is None:
+        return
+    _tracer.count(name, n)
+
+
+def get_tracer() -> Tracer:
+    """ The active `Tracer`, or None while tracing is off. """
+    return _tracer
+
+
+def enable_tracing() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def disable_tracing() -> Tracer:
+    """ Turns tracing off, returning the `Tracer` that was active (if any).
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def _write_trace_at_exit(path: str):
+    tracer = get_tracer()
+    if tracer is not None and tracer.pid == os.getpid():
+        tracer.write(path)
+
+
+def _enable_tracing_from_env():
+    # Spawned pool workers re-import phytebyte (& inherit the environment),
+    # but only the process that set the trace up writes it
+    owner = os.environ.setdefault(TRACE_OWNER_ENV_VAR, str(os.getpid()))
+    if owner == str(os.getpid()):
+        enable_tracing()
+        atexit.register(_write_trace_at_exit, os.environ[TRACE_ENV_VAR])
+
+
+if os.environ.get(TRACE_ENV_VAR):
+    _enable_tracing_from_env()
@@ -1,13 +1,21 @@
 from setuptools import setup, find_packages
 
 setup(name='phytebyte',
-      packages=find_packages(),
+      packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
       zip_safe=False,
       version='1.0',
+      python_requires='>=3.8',
       description='',
       author='Sean Harrington',
       author_email='seanharr11@gmail.com',
       setup_requires=['pytest-runner'],
       tests_require=['pytest'],
+      extras_require={
+          # Arrow snapshots (`phytebyte snapshot --format arrow`)
+          'arrow': ['pyarrow'],
+      },
       url='',
+      entry_points={
+          'console_scripts': ['phytebyte=phytebyte.cli:main'],
+      },
       )
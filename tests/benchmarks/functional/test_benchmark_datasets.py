@@ -0,0 +1,21 @@
+import os
+
+from sqlalchemy import create_engine
+
+from benchmarks.datasets import Dataset, prepare_dataset
+
+
+def test_prepare_dataset_generates_once(tmp_path):
+    dataset = Dataset("tiny", 50, 20, ["PPARG"], "agonist", 2, 0)
+    db_urls = prepare_dataset(dataset, str(tmp_path))
+    assert sorted(db_urls) == ['chembl', 'foodb']
+    engine = create_engine(db_urls['foodb'])
+    assert engine.execute("SELECT COUNT(*) FROM compounds").scalar() == 20
+    engine.dispose()
+
+    db_path = db_urls['chembl'][len("sqlite:///"):]
+    mtime = os.path.getmtime(db_path)
+    assert prepare_dataset(dataset, str(tmp_path)) == db_urls
+    assert os.path.getmtime(db_path) == mtime
+    assert not [name for name in os.listdir(os.path.dirname(db_path))
+                if name.endswith(".tmp")]
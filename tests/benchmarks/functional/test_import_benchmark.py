@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.imports import (
+    IMPORTS, heavy_imports, measure_import, run_import_benchmark)
+
+
+@pytest.mark.parametrize("name", list(IMPORTS))
+def test_entry_point_imports_no_heavy_dependencies(name):
+    measurement = measure_import(IMPORTS[name])
+    assert measurement["heavy_modules"] == []
+    assert measurement["seconds"] > 0
+
+
+def test_run_import_benchmark():
+    results = run_import_benchmark(
+        repeat=2, imports={"phytebyte": "import phytebyte",
+                           "db": "import phytebyte.db"})
+    assert results["dataset"] == {"name": "imports"}
+    assert list(results["stages"]) == ["phytebyte", "db"]
+    assert results["stages"]["db"]["heavy_modules"] == ["sqlalchemy"]
+    assert heavy_imports(results) == ["db"]
@@ -0,0 +1,88 @@
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.compare import (
+    IncomparableResults, compare_results, total_comparison)
+from benchmarks.runner import write_results
+
+
+def results(**median_s):
+    return {"dataset": {"name": "small"},
+            "stages": {stage: {"median_s": s}
+                       for stage, s in median_s.items()}}
+
+
+def memory_results(**peak_bytes):
+    return {"kind": "memory",
+            "dataset": {"name": "small"},
+            "stages": {stage: {"peak_total_rss_bytes": n}
+                       for stage, n in peak_bytes.items()}}
+
+
+def test_compare_results_flags_stage_beyond_tolerance():
+    comparisons = compare_results(
+        results(positive_load=1., training=2.),
+        results(positive_load=1.1, training=3.), tolerance=.2)
+    assert [(c.stage, c.regressed) for c in comparisons] == [
+        ("positive_load", False), ("training", True)]
+    assert comparisons[1].ratio == 1.5
+    assert comparisons[1].baseline == 2.
+    assert comparisons[1].result == 3.
+
+
+def test_compare_results_ignores_slowdowns_below_min_delta():
+    comparisons = compare_results(results(report=.01), results(report=.03),
+                                  tolerance=.2, min_delta=.05)
+    assert not comparisons[0].regressed
+
+
+def test_compare_results_skips_stages_missing_from_baseline():
+    comparisons = compare_results(results(training=1.),
+                                  results(training=1., new_stage=5.))
+    assert [c.stage for c in comparisons] == ["training"]
+
+
+def test_compare_results_refuses_other_datasets():
+    other = results(training=1.)
+    other["dataset"] = {"name": "medium"}
+    with pytest.raises(IncomparableResults):
+        compare_results(results(training=1.), other)
+
+
+def test_compare_results_compares_peak_memory():
+    mb = 1024 ** 2
+    comparisons = compare_results(
+        memory_results(negative_sampling=500 * mb, encoding=10 * mb),
+        memory_results(negative_sampling=800 * mb, encoding=14 * mb),
+        tolerance=.2)
+    # The encoding stage grew by less than the memory metric's min delta
+    assert [(c.stage, c.regressed) for c in comparisons] == [
+        ("negative_sampling", True), ("encoding", False)]
+
+
+def test_compare_results_refuses_other_kinds():
+    with pytest.raises(IncomparableResults):
+        compare_results(results(training=1.),
+                        memory_results(training=1024))
+
+
+def test_total_comparison_adds_up_small_slowdowns():
+    comparisons = compare_results(
+        results(a=1., b=1., c=1.), results(a=1.04, b=1.04, c=1.04),
+        tolerance=.02, min_delta=.05)
+    assert not any(c.regressed for c in comparisons)
+    total = total_comparison(comparisons, tolerance=.02, min_delta=.05)
+    assert total.stage == "total"
+    assert total.regressed
+
+
+@pytest.mark.parametrize("result_s, expected_status", [
+    (1.1, 0),
+    (2., 1)])
+def test_compare_command_exit_status(tmp_path, capsys, result_s,
+                                     expected_status):
+    write_results(results(training=1.), str(tmp_path / "baseline.json"))
+    write_results(results(training=result_s), str(tmp_path / "new.json"))
+    assert main(["compare", str(tmp_path / "baseline.json"),
+                 str(tmp_path / "new.json")]) == expected_status
+    assert "training" in capsys.readouterr().out
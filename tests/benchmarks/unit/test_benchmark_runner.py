@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+from benchmarks.datasets import DATASETS
+from benchmarks.runner import read_results, run_benchmark, write_results
+from benchmarks.timing import StageTimer
+
+
+def test_stage_timer_summary():
+    timer = StageTimer()
+    for _ in range(3):
+        with timer.stage("training"):
+            pass
+    with timer.stage("report"):
+        pass
+    summary = timer.summary()
+    assert list(summary) == ["training", "report"]
+    assert len(summary["training"]["wall_s"]) == 3
+    assert len(summary["training"]["cpu_s"]) == 3
+    assert summary["training"]["median_s"] >= summary["training"]["min_s"]
+
+
+def test_stage_timer_records_failed_stage():
+    timer = StageTimer()
+    try:
+        with timer.stage("positive_load"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert timer.stage_names == ["positive_load"]
+
+
+def fake_pipeline(dataset, db_urls, timer, **kwargs):
+    for stage in ["positive_load", "training"]:
+        with timer.stage(stage):
+            pass
+    return {"positives": 3}
+
+
+@patch("benchmarks.runner.run_pipeline", side_effect=fake_pipeline)
+@patch("benchmarks.runner.prepare_dataset", return_value={})
+def test_run_benchmark(mock_prepare, mock_run_pipeline, tmp_path):
+    results = run_benchmark(DATASETS["small"], str(tmp_path), repeat=2,
+                            model_type="Random Forest")
+    assert mock_run_pipeline.call_count == 2
+    assert mock_run_pipeline.call_args[1] == {"model_type": "Random Forest"}
+    assert results["dataset"]["name"] == "small"
+    assert results["counts"] == {"positives": 3}
+    assert results["options"] == {"model_type": "Random Forest"}
+    assert len(results["stages"]["training"]["wall_s"]) == 2
+
+    path = str(tmp_path / "results" / "small.json")
+    write_results(results, path)
+    assert read_results(path) == results
+
+
+@patch("benchmarks.runner.run_pipeline", side_effect=fake_pipeline)
+@patch("benchmarks.runner.prepare_dataset", return_value={})
+def test_run_benchmark__memory(mock_prepare, mock_run_pipeline, tmp_path):
+    results = run_benchmark(DATASETS["small"], str(tmp_path), repeat=1,
+                            memory=True)
+    assert results["kind"] == "memory"
+    assert "peak_total_rss_bytes" in results["stages"]["training"]
+    assert "alloc_peak_bytes" in results["stages"]["training"]
@@ -0,0 +1,56 @@
+import time
+import tracemalloc
+from multiprocessing import Pool
+
+import pytest
+
+from benchmarks.memory import MemoryProfiler, RssSampler
+
+MB = 1024 ** 2
+
+
+def allocate_and_hold(num_bytes):
+    # Touched (non-zero) pages, so they count towards RSS
+    buf = bytearray(b"x" * num_bytes)
+    time.sleep(.3)
+    return len(buf)
+
+
+def test_stage_records_python_allocations():
+    profiler = MemoryProfiler()
+    with profiler.stage("kept"):
+        kept = bytearray(50 * MB)
+    with profiler.stage("freed"):
+        freed = bytearray(50 * MB)
+        del freed
+    summary = profiler.summary()
+    assert summary["kept"]["alloc_net_bytes"] >= 50 * MB
+    assert summary["kept"]["alloc_peak_bytes"] >= 50 * MB
+    assert summary["freed"]["alloc_peak_bytes"] >= 50 * MB
+    assert summary["freed"]["alloc_net_bytes"] < 1 * MB
+    assert not tracemalloc.is_tracing()
+    assert len(kept) == 50 * MB
+
+
+def test_repeated_stage_keeps_maxima():
+    profiler = MemoryProfiler()
+    for num_bytes in [30 * MB, 10 * MB]:
+        with profiler.stage("stage"):
+            bytearray(num_bytes)
+    assert profiler.stage_names == ["stage"]
+    assert profiler.summary()["stage"]["alloc_peak_bytes"] >= 30 * MB
+
+
+@pytest.mark.skipif(not RssSampler.is_supported(),
+                    reason="RSS is sampled from /proc")
+def test_stage_records_worker_rss():
+    profiler = MemoryProfiler(interval=.01)
+    with profiler.stage("pooled"):
+        with Pool(2) as p:
+            assert p.map(allocate_and_hold, [100 * MB] * 2) == [100 * MB] * 2
+    stats = profiler.summary()["pooled"]
+    assert stats["peak_children_rss_bytes"] >= 150 * MB
+    assert stats["peak_total_rss_bytes"] >= (stats["peak_rss_bytes"] +
+                                             100 * MB)
+    # The workers' allocations aren't traced in this process
+    assert stats["alloc_peak_bytes"] < 50 * MB
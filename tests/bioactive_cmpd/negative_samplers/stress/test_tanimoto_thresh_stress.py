@@ -1,4 +1,5 @@
 import sys
+import tracemalloc
 # Stress tests
 
 
@@ -25,11 +26,20 @@ def test_sample__100000(ttn_sampler, output_fingerprinter):
 
 def test_sample__memory_overhead__100000_bitarrays(
         ttn_sampler, output_fingerprinter):
-    sample_iter = ttn_sampler.sample(['C=N']*1000, 100000,
-                                     output_fingerprinter,
-                                     "numpy")
-    samples = [sample for sample in sample_iter]
-    size = sys.getsizeof(samples) / 1024 / 1024
-    size = round(size, 2)
-    sys.stdout.write(f"\nSize: {size}MB")
-    assert size < 10
+    # `sys.getsizeof()` of the list would count just its pointers, not the
+    # arrays: trace every allocation made while sampling instead
+    tracemalloc.start()
+    try:
+        samples = [sample for sample in ttn_sampler.sample(
+            ['C=N']*1000, 100000, output_fingerprinter, "numpy")]
+        allocated, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    fingerprints_size = sum(sample.nbytes for sample in samples)
+    sys.stdout.write(f"\nSize: {round(allocated / 1024 / 1024, 2)}MB "
+                     f"(peak: {round(peak / 1024 / 1024, 2)}MB, fingerprints:"
+                     f" {round(fingerprints_size / 1024 / 1024, 2)}MB)")
+    # Each fingerprint is held once (plus its array header), and at most a
+    # fraction of them are ever buffered on top
+    assert allocated < fingerprints_size * 1.1
+    assert peak < fingerprints_size * 1.5
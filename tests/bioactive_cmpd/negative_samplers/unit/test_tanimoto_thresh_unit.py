@@ -1,6 +1,9 @@
+from phytebyte import parallel
 from phytebyte.bioactive_cmpd.negative_samplers import (
     NotEnoughSamples)
+from phytebyte.parallel import SharedArray
 
+from bitarray import bitarray
 import numpy as np
 import pytest
 import types
@@ -74,3 +77,54 @@ def test_raises_NotEnoughSamples(ttn_sampler, output_fingerprinter):
 def test_input_fingerprinter_used_to_encode_pos_smiles(ttn_sampler,
                                                        input_fingerprinter):
     assert ttn_sampler._input_fingerprinter == input_fingerprinter
+
+
+def test_sample__candidate_smiles__does_not_query(ttn_sampler,
+                                                  output_fingerprinter):
+    candidates = ['C'] * 20
+    samples = [sample for sample in ttn_sampler.sample(
+        ['C=N'], 10, output_fingerprinter, "numpy",
+        candidate_smiles=candidates)]
+    assert len(samples) == 10
+    assert ttn_sampler._source.call_args_ls == []
+
+
+@pytest.mark.parametrize("method", ['forkserver', 'spawn'])
+def test_sample__workers_not_forked(ttn_sampler, output_fingerprinter,
+                                    method):
+    parallel.set_start_method(method)
+    try:
+        samples = [sample for sample in ttn_sampler.sample(
+            ['C=N'], 10, output_fingerprinter, "numpy")]
+        with pytest.raises(NotEnoughSamples):
+            [_ for _ in ttn_sampler.sample(["CO=N2"] * 10, 10,
+                                           output_fingerprinter, "numpy")]
+    finally:
+        parallel.set_start_method(None)
+    assert len(samples) == 10
+
+
+def test_filter_func_matches_tanimoto(ttn_sampler):
+    from phytebyte.bioactive_cmpd.negative_samplers.tanimoto_thresh import (
+        _pack, _popcounts)
+    # Tanimotos of .67 & .5 with "C" (see `MockFingerprinter`)
+    excluded = [bitarray("011" * 341 + "1"), bitarray("01" * 512)]
+    candidate = bitarray("1" * 1024)
+    assert [ttn_sampler._calculate_tanimoto(excluded_mol, candidate) > .6
+            for excluded_mol in excluded] == [True, False]
+    packed = _pack(excluded)
+    assert list(_popcounts(packed)) == [b.count() for b in excluded]
+
+    def filter_with(excluded_fps):
+        with SharedArray(excluded_fps) as shared:
+            ttn_sampler._init_pool({
+                'excluded_mols': shared,
+                '_excluded_mol_counts': _popcounts(excluded_fps)})
+            try:
+                return ttn_sampler._filter_func("C")
+            finally:
+                ttn_sampler._init_pool({'excluded_mols': None,
+                                        '_excluded_mol_counts': None})
+    assert not filter_with(packed)
+    assert filter_with(packed[1:])
+    assert filter_with(packed[:0])
@@ -0,0 +1,56 @@
+from phytebyte.db import get_engine
+from phytebyte.bioactive_cmpd.sources import (
+    ChemblBioactiveCompoundQuery, ChemblBioactiveCompoundSource)
+from phytebyte.bioactive_cmpd.sources.chembl.bioactivity import (
+    agonist_bioact_filter)
+from phytebyte.bioactive_cmpd.sources.chembl.gene_activity import (
+    has_gene_activity_view, prepare_gene_activity_view)
+
+
+def lean_query(gene_activity_view):
+    return ChemblBioactiveCompoundQuery(
+        agonist_bioact_filter, gene_tgts=['PPARG'], lean=True,
+        gene_activity_view=gene_activity_view)
+
+
+def test_prepare__view_serves_same_rows_as_join(mini_chembl_db_url):
+    engine = get_engine(mini_chembl_db_url)
+    assert not has_gene_activity_view(engine)
+    report = prepare_gene_activity_view(engine, lean_query)
+    assert has_gene_activity_view(engine)
+    assert report.before_seconds >= 0 and report.after_seconds >= 0
+
+    with engine.connect() as conn:
+        joined_rows = conn.execute(lean_query(False).build()).fetchall()
+        view_rows = conn.execute(lean_query(True).build()).fetchall()
+    assert [tuple(row) for row in joined_rows] == [
+        (1, 'ONE', 'CC=O', 'PPARG', 'cmpd one')]
+    assert [tuple(row) for row in view_rows] == [
+        tuple(row) for row in joined_rows]
+
+
+def test_prepare__refresh_rebuilds(mini_chembl_db_url):
+    engine = get_engine(mini_chembl_db_url)
+    prepare_gene_activity_view(engine, lean_query)
+    with engine.begin() as conn:
+        conn.execute("UPDATE compound_structures SET canonical_smiles = 'C'"
+                     " WHERE molregno = 1")
+    prepare_gene_activity_view(engine, lean_query)
+    with engine.connect() as conn:
+        assert conn.execute(lean_query(True).build()).first()[2] == 'CC=O'
+    prepare_gene_activity_view(engine, lean_query, refresh=True)
+    with engine.connect() as conn:
+        assert conn.execute(lean_query(True).build()).first()[2] == 'C'
+
+
+def test_source__lean_fetch_uses_view(mini_chembl_db_url):
+    source = ChemblBioactiveCompoundSource(mini_chembl_db_url, .5)
+    assert not source.gene_activity_view
+    prepare_gene_activity_view(source.engine, lean_query)
+
+    source = ChemblBioactiveCompoundSource(mini_chembl_db_url, .5)
+    assert source.gene_activity_view
+    cmpds = [lazy_cmpd() for lazy_cmpd in
+             source.fetch_with_gene_tgts(['PPARG'], 'agonist', lean=True)]
+    assert [(cmpd.uid, cmpd.smiles, cmpd.bioactivities)
+            for cmpd in cmpds] == [(1, 'CC=O', None)]
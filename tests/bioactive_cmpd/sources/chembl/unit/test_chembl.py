@@ -1,3 +1,4 @@
+import os
 from unittest.mock import Mock, MagicMock
 import pytest
 
@@ -20,6 +21,8 @@ def mock_cbc_query_class(mock_bioactive_compound):
     mock_cbc_query = Mock()
     mock_cbc_query.build = MagicMock(
         return_value=Mock())
+    mock_cbc_query.statement = MagicMock(return_value=Mock())
+    mock_cbc_query.params = {'gene_tgts': ['HMGCR']}
     mock_cbc_query.row_to_bioactive_compound = MagicMock(
         return_value=mock_bioactive_compound)
     return MagicMock(return_value=mock_cbc_query)
@@ -29,6 +32,8 @@ def mock_cbc_query_class(mock_bioactive_compound):
 def mock_crcs_query_class():
     mock_cbc_query = Mock()
     mock_cbc_query.build = MagicMock(return_value=Mock())
+    mock_cbc_query.statement = MagicMock(return_value=Mock())
+    mock_cbc_query.params = {'limit': 100, 'excluded_smiles': ['CC=P']}
     return MagicMock(return_value=mock_cbc_query)
 
 
@@ -40,7 +45,7 @@ def cbc_source(mock_streaming_engine_factory,
                monkeypatch):
     mock_create_engine_func = MagicMock(
         return_value=mock_streaming_engine_factory(mock_rows, 2))
-    monkeypatch.setattr("phytebyte.bioactive_cmpd.sources.base.create_engine",
+    monkeypatch.setattr("phytebyte.db.create_engine",
                         mock_create_engine_func)
     monkeypatch.setattr(
         "phytebyte.bioactive_cmpd.sources.chembl.chembl."
@@ -80,7 +85,7 @@ def test_random_compounds_exc_smiles(monkeypatch, cbc_source,
     mock_rows = [['CC=N'], ['CC=O']]
     mock_engine = mock_streaming_engine_factory(mock_rows, 1)
 
-    monkeypatch.setattr("phytebyte.bioactive_cmpd.sources.base.create_engine",
+    monkeypatch.setattr("phytebyte.db.create_engine",
                         MagicMock(return_value=mock_engine))
 
     smiles_iter = cbc_source.fetch_random_compounds_exc_smiles(100, ['CC=P'])
@@ -89,3 +94,66 @@ def test_random_compounds_exc_smiles(monkeypatch, cbc_source,
     assert first_smile == "CC=N"
     second_smile = next(smiles_iter)
     assert second_smile == "CC=O"
+
+
+def test_fetch_with_gene_tgts__result_cache(cbc_source, mock_rows,
+                                            mock_cbc_query_class, tmp_path):
+    from phytebyte.cache import QueryResultCache
+    cbc_source.result_cache = QueryResultCache(root_dir=str(tmp_path))
+    cbc_source._release = "ChEMBL_25"
+    mock_query = mock_cbc_query_class.return_value
+
+    for partial in cbc_source.fetch_with_gene_tgts(['HMGCR'], 'agonist'):
+        partial()
+    assert len(os.listdir(tmp_path)) == 1
+
+    # Served from the cache, without connecting to the database
+    cbc_source.engine.connect.reset_mock()
+    mock_query.row_to_bioactive_compound.reset_mock()
+    partials = list(cbc_source.fetch_with_gene_tgts(['HMGCR'], 'agonist'))
+    for partial in partials:
+        partial()
+    assert not cbc_source.engine.connect.called
+    assert [call[0][0] for call in
+            mock_query.row_to_bioactive_compound.call_args_list] == \
+        [tuple(row) for row in mock_rows]
+
+
+def test_fetch_with_gene_tgts__lean(cbc_source, mock_cbc_query_class):
+    next(cbc_source.fetch_with_gene_tgts(['HMGCR'], 'agonist', lean=True))
+    assert mock_cbc_query_class.call_args[1]['lean'] is True
+
+
+def test_fetch_bioactivities(monkeypatch, cbc_source,
+                             mock_streaming_engine_factory):
+    mock_rows = [(1, 10, 'nM', 'EC50', 'descr1'),
+                 (1, 20, 'nM', 'EC50', 'descr2'),
+                 (2, 5, 'nM', 'EC50', 'descr3')]
+    monkeypatch.setattr(
+        "phytebyte.db.create_engine",
+        MagicMock(return_value=mock_streaming_engine_factory(mock_rows, 2)))
+    bioactivities = cbc_source.fetch_bioactivities([1, 2, 3], 'agonist')
+    assert [b.descr for b in bioactivities[1]] == ['descr1', 'descr2']
+    assert [b.amount for b in bioactivities[2]] == [5]
+    assert 3 not in bioactivities
+
+
+def test_fetch_bioactivities__no_uids(cbc_source):
+    assert cbc_source.fetch_bioactivities([], 'agonist') == {}
+    assert not cbc_source.engine.connect.called
+
+
+def test_fetch_with_gene_tgts_multi(monkeypatch, cbc_source,
+                                    mock_streaming_engine_factory):
+    mock_rows = [('agonist', 1, 'pref1', 'CC=O', 'PPARG', 'name1'),
+                 ('antagonist', 1, 'pref1', 'CC=O', 'PPARG', 'name1'),
+                 ('agonist', 2, 'pref2', 'CC=N', 'NR1H4', 'name2')]
+    monkeypatch.setattr(
+        "phytebyte.db.create_engine",
+        MagicMock(return_value=mock_streaming_engine_factory(mock_rows, 2)))
+    fetched = list(cbc_source.fetch_with_gene_tgts_multi(
+        ['PPARG', 'NR1H4'], ['agonist', 'antagonist'], lean=True))
+    assert [key for key, _ in fetched] == [
+        ('PPARG', 'agonist'), ('PPARG', 'antagonist'), ('NR1H4', 'agonist')]
+    cmpd = fetched[2][1]()
+    assert (cmpd.uid, cmpd.smiles, cmpd.bioactivities) == (2, 'CC=N', None)
@@ -68,3 +68,25 @@ def test_whereclause_respects_compound_names():
         compound_names=['Dihydrogen Monoxide'])
     query = cbc_q.build()
     assert "compound_name" in str(query._whereclause)
+
+
+def test_build__lean_skips_bioactivity_arrays():
+    query = ChemblBioactiveCompoundQuery(agonist_bioact_filter, lean=True)
+    columns = [col.name for col in query.build().columns]
+    assert columns == [
+        "uid", "pref_name", "canonical_smiles", "gene_target", "name"]
+    assert "assays.description" not in str(query.build())
+
+
+def test_build__columns_match_row_to_bioactive_compound(cbc_query):
+    columns = [col.name for col in cbc_query.build().columns]
+    assert columns[4] == "name"
+    assert columns[5:9] == ["value_arr", "units_arr", "type_arr", "descr_arr"]
+
+
+def test_row_to_bioactive_compound__lean(cbc_query):
+    cmpd = cbc_query.row_to_bioactive_compound(
+        (1000, 'pref_name', 'CC=NC', 'MOCK_GENE_TGT', 'name'))
+    assert cmpd.smiles == 'CC=NC'
+    assert cmpd.name == 'name'
+    assert cmpd.bioactivities is None
@@ -0,0 +1,37 @@
+import pytest
+import sqlalchemy
+from phytebyte.bioactive_cmpd.sources.chembl.bioactivity import agonist_bioact_filter
+
+from phytebyte.bioactive_cmpd.sources import ChemblBioactivityQuery
+from phytebyte.bioactive_cmpd.types import CompoundBioactivity
+
+
+@pytest.fixture
+def bioactivity_query():
+    return ChemblBioactivityQuery(agonist_bioact_filter, [1000, 1001],
+                                  gene_tgts=['PPARG'])
+
+
+def test_repr_is_implemented(bioactivity_query):
+    assert "<ChemblBioactivityQuery" in repr(bioactivity_query)
+
+
+def test_uids_is_int__raises_AssertionError():
+    with pytest.raises(AssertionError):
+        ChemblBioactivityQuery(agonist_bioact_filter, 1000)
+
+
+def test_build(bioactivity_query):
+    query = bioactivity_query.build()
+    assert isinstance(query, sqlalchemy.sql.expression.Executable)
+    assert "array_agg" not in str(query)
+    assert "GROUP BY" not in str(query)
+    assert "compound_structures.molregno IN" in str(query)
+    assert "component_synonyms.component_synonym IN" in str(query)
+
+
+def test_row_to_uid_and_bioactivity(bioactivity_query):
+    uid, bioactivity = bioactivity_query.row_to_uid_and_bioactivity(
+        (1000, 10, 'nM', 'EC50', 'Assay descr'))
+    assert uid == 1000
+    assert bioactivity == CompoundBioactivity(10, 'nM', 'EC50', 'Assay descr')
@@ -0,0 +1,14 @@
+import sqlalchemy
+
+from phytebyte.bioactive_cmpd.sources import ChemblCompoundSmilesQuery
+
+
+def test_build():
+    q = ChemblCompoundSmilesQuery().build()
+    assert isinstance(q, sqlalchemy.sql.expression.Executable)
+
+
+def test_build_range__partitions_by_molregno():
+    q = ChemblCompoundSmilesQuery().build_range((1, 1000))
+    assert "compound_structures.molregno >=" in str(q._whereclause)
+    assert "compound_structures.molregno <" in str(q._whereclause)
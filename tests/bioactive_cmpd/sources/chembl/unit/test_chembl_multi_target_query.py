@@ -0,0 +1,49 @@
+import pytest
+from phytebyte.bioactive_cmpd.sources.chembl.bioactivity import (
+    agonist_bioact_filter, antagonist_bioact_filter)
+
+from phytebyte.bioactive_cmpd.sources import ChemblMultiTargetQuery
+
+
+@pytest.fixture
+def multi_target_query():
+    return ChemblMultiTargetQuery(
+        {'agonist': agonist_bioact_filter,
+         'antagonist': antagonist_bioact_filter},
+        gene_tgts=['PPARG', 'NR1H4'])
+
+
+def test_repr_is_implemented(multi_target_query):
+    assert "<ChemblMultiTargetQuery" in repr(multi_target_query)
+
+
+def test_no_filters__raises_AssertionError():
+    with pytest.raises(AssertionError):
+        ChemblMultiTargetQuery({}, gene_tgts=['PPARG'])
+
+
+def test_build__labels_rows_with_bioactivity_type(multi_target_query):
+    query = multi_target_query.build()
+    columns = [col.name for col in query.columns]
+    assert columns[0] == "bioactivity_type"
+    assert columns[1:6] == [
+        "uid", "pref_name", "canonical_smiles", "gene_target", "name"]
+    sql = str(query)
+    assert "CASE WHEN" in sql
+    assert " OR " in sql
+    assert "component_synonyms.component_synonym IN" in sql
+
+
+def test_build__lean(multi_target_query):
+    lean_query = ChemblMultiTargetQuery(
+        {'agonist': agonist_bioact_filter}, gene_tgts=['PPARG'], lean=True)
+    assert len(lean_query.build().columns) == 6
+    assert len(multi_target_query.build().columns) == 10
+
+
+def test_row_to_partition_key(multi_target_query):
+    row = ('antagonist', 1000, 'pref_name', 'CC=NC', 'PPARG', 'name')
+    assert multi_target_query.row_to_partition_key(row) == (
+        'PPARG', 'antagonist')
+    cmpd = multi_target_query.row_to_bioactive_compound(row[1:])
+    assert cmpd.gene_target == 'PPARG'
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy.dialects import mysql, postgresql
+
+from phytebyte.bioactive_cmpd.sources import ChemblBioactiveCompoundQuery
+from phytebyte.bioactive_cmpd.sources.chembl.bioactivity import (
+    agonist_bioact_filter)
+from phytebyte.bioactive_cmpd.sources.chembl.gene_activity import (
+    GENE_ACTIVITY_VIEW, gene_activity_select, _create_view_sql)
+
+
+def test_gene_activity_select__columns_match_view():
+    assert [col.name for col in gene_activity_select().columns] == [
+        "gene_symbol", "molregno", "pref_name", "canonical_smiles",
+        "compound_name", "standard_type", "standard_relation",
+        "standard_value", "standard_units", "confidence_score"]
+
+
+def test_create_view_sql__postgres_materialized_view():
+    sql = _create_view_sql(postgresql.dialect())
+    assert sql.startswith(f"CREATE MATERIALIZED VIEW {GENE_ACTIVITY_VIEW}")
+
+
+def test_create_view_sql__mysql_table():
+    sql = _create_view_sql(mysql.dialect())
+    assert sql.startswith(f"CREATE TABLE {GENE_ACTIVITY_VIEW}")
+
+
+def test_lean_query__reads_from_view():
+    query = ChemblBioactiveCompoundQuery(
+        agonist_bioact_filter, gene_tgts=['PPARG'], lean=True,
+        gene_activity_view=True).build()
+    sql = str(query)
+    assert f"FROM {GENE_ACTIVITY_VIEW}" in sql
+    assert "JOIN" not in sql
+    assert f"{GENE_ACTIVITY_VIEW}.gene_symbol IN" in sql
+
+
+@pytest.mark.parametrize("lean,gene_activity_view", [
+    (True, False), (False, True)])
+def test_query__joins_tables(lean, gene_activity_view):
+    query = ChemblBioactiveCompoundQuery(
+        agonist_bioact_filter, gene_tgts=['PPARG'], lean=lean,
+        gene_activity_view=gene_activity_view).build()
+    assert GENE_ACTIVITY_VIEW not in str(query)
+    assert "JOIN activities" in str(query)
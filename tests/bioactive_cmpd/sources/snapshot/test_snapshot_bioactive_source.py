@@ -0,0 +1,86 @@
+import pytest
+
+from phytebyte.bioactive_cmpd.sources import SnapshotBioactiveCompoundSource
+from phytebyte.bioactive_cmpd.types import (
+    BioactiveCompound, CompoundBioactivity)
+
+
+@pytest.fixture
+def snapshot_source(mini_snapshot_dir):
+    return SnapshotBioactiveCompoundSource(mini_snapshot_dir, .5)
+
+
+def test_fetch_with_gene_tgts(snapshot_source):
+    cmpds = [lazy_cmpd() for lazy_cmpd in
+             snapshot_source.fetch_with_gene_tgts(['PPARG'], 'agonist')]
+    assert cmpds == [BioactiveCompound(
+        uid=1, pref_name='ONE', smiles='CC=O', gene_target='PPARG',
+        name='cmpd one', bioactivities=[
+            CompoundBioactivity(15., 'nM', 'EC50', 'Human assay'),
+            CompoundBioactivity(25., 'nM', 'EC50', 'Human assay')])]
+
+
+def test_fetch_with_gene_tgts__lean(snapshot_source):
+    cmpds = [lazy_cmpd() for lazy_cmpd in snapshot_source.fetch_with_gene_tgts(
+        ['PPARG'], 'antagonist', lean=True)]
+    assert [(cmpd.uid, cmpd.bioactivities) for cmpd in cmpds] == [(2, None)]
+
+
+def test_fetch_with_gene_tgts__bad_bioactivity_type(snapshot_source):
+    with pytest.raises(Exception, match="not supported"):
+        list(snapshot_source.fetch_with_gene_tgts(['PPARG'], 'inverse'))
+
+
+def test_fetch_with_gene_tgts_multi(snapshot_source):
+    partitions = [(key, lazy_cmpd().uid) for key, lazy_cmpd in
+                  snapshot_source.fetch_with_gene_tgts_multi(
+                      ['PPARG', 'Pparg'], ['agonist', 'antagonist'])]
+    assert partitions == [(('PPARG', 'agonist'), 1),
+                          (('PPARG', 'antagonist'), 2)]
+
+
+def test_fetch_with_compound_names(snapshot_source):
+    cmpds = [lazy_cmpd() for lazy_cmpd in
+             snapshot_source.fetch_with_compound_names(['cmpd uno'])]
+    assert [(cmpd.uid, cmpd.name) for cmpd in cmpds] == [(1, 'cmpd uno')]
+
+
+def test_fetch_bioactivities(snapshot_source):
+    assert snapshot_source.fetch_bioactivities([1, 2], 'agonist') == {
+        1: [CompoundBioactivity(15., 'nM', 'EC50', 'Human assay'),
+            CompoundBioactivity(25., 'nM', 'EC50', 'Human assay')]}
+    assert snapshot_source.fetch_bioactivities([], 'agonist') == {}
+
+
+def test_fetch_random_compounds_exc_smiles(snapshot_source):
+    assert list(snapshot_source.fetch_random_compounds_exc_smiles(
+        ['CC=O'], 5)) == ['CC=N']
+    assert len(list(snapshot_source.fetch_random_compounds_exc_smiles(
+        [], 1))) == 1
+
+
+
+def test_fetch_random_compounds_exc_smiles__random_order(tmp_path):
+    from phytebyte.snapshot import SnapshotFormat
+    from phytebyte.snapshot.snapshot import write_manifest
+    from phytebyte.snapshot.tables import COMPOUND_STRUCTURES
+    snapshot_format = SnapshotFormat.create('sqlite')
+    writer = snapshot_format.writer(
+        snapshot_format.path(str(tmp_path), COMPOUND_STRUCTURES),
+        COMPOUND_STRUCTURES)
+    writer.write_rows([(i, 'C' * i) for i in range(1, 101)])
+    writer.close()
+    write_manifest(str(tmp_path), 'sqlite', {"compound_structures": 100})
+    smiles = list(SnapshotBioactiveCompoundSource(str(tmp_path), .5).
+                  fetch_random_compounds_exc_smiles(['C'], 20))
+    assert len(smiles) == 20 and 'C' not in smiles
+    # Not in molregno order, so a prefix of them isn't biased to low ones
+    assert smiles != sorted(smiles, key=len)
+    assert smiles == list(SnapshotBioactiveCompoundSource(str(tmp_path), .5).
+                          fetch_random_compounds_exc_smiles(['C'], 20))
+
+def test_fetch_all_compound_smiles(snapshot_source):
+    assert list(snapshot_source.fetch_all_compound_smiles()) == [
+        'CC=O', 'CC=N']
+    assert list(snapshot_source.fetch_all_compound_smiles((2, 3))) == [
+        'CC=N']
@@ -32,6 +32,8 @@ def mock_clusters(mock_encoded_cmpds):
     cluster2 = Mock()
     cluster1.get_encoded_cmpds = MagicMock(return_value=mock_encoded_cmpds)
     cluster2.get_encoded_cmpds = MagicMock(return_value=mock_encoded_cmpds)
+    cluster1.bioactive_cmpds = [Mock(), Mock()]
+    cluster2.bioactive_cmpds = [Mock()]
     return [cluster1, cluster2]
 
 
@@ -102,9 +104,11 @@ def test_load__calls_BinaryClassifierInputFactory_create(
     call_args_ls = mock_bcif.create.call_args_list
     assert len(call_args_ls) == 2
     assert set(call_args_ls[0][1].keys()) == set(
-        ['encoding', 'positives', 'negatives'])
+        ['encoding', 'positives', 'negatives', 'max_negatives', 'memmap_dir',
+         'stream'])
     assert set(call_args_ls[1][1].keys()) == set(
-        ['encoding', 'positives', 'negatives'])
+        ['encoding', 'positives', 'negatives', 'max_negatives', 'memmap_dir',
+         'stream'])
 
 
 def test_load__calls_get_encoded_cmpds(mock_source,
@@ -126,3 +130,44 @@ def test_load__calls_get_encoded_cmpds(mock_source,
 
     mock_clusters[0].get_encoded_cmpds.assert_called_once()
     mock_clusters[1].get_encoded_cmpds.assert_called_once()
+
+
+def test_load_positive_compounds__not_lean_by_default(model_input_loader,
+                                                      mock_source,
+                                                      mock_target_input):
+    model_input_loader.load_positive_compounds()
+    mock_target_input.fetch_bioactive_cmpds.assert_called_once_with(
+        mock_source, lean=False)
+
+
+def test_load_positive_compounds__lean(
+        mock_source, mock_negative_sampler, mock_positive_clusterer,
+        mock_target_input, mock_encoding):
+    mil = ModelInputLoader(mock_source, mock_negative_sampler,
+                           mock_positive_clusterer, mock_target_input,
+                           mock_encoding, lean=True)
+    mil.load_positive_compounds()
+    mock_target_input.fetch_bioactive_cmpds.assert_called_once_with(
+        mock_source, lean=True)
+
+
+def test_load_clusters__samples_from_reservoir_slices(
+        mock_source, mock_negative_sampler, mock_positive_clusterer,
+        mock_target_input):
+    mock_negative_sampler.oversample_factor = 2
+    mock_negative_sampler.sample = MagicMock(return_value=iter([]))
+    clusters = [Mock(bioactive_cmpds=[Mock(smiles='C')]),
+                Mock(bioactive_cmpds=[Mock(smiles='N'), Mock(smiles='O')])]
+    mil = ModelInputLoader(mock_source, mock_negative_sampler,
+                           mock_positive_clusterer, mock_target_input, 'numpy')
+    mil._create_binary_classifier_input = MagicMock(return_value=Mock())
+    reservoir = [f"C{'C' * i}" for i in range(12)]
+    assert mil.neg_reservoir_size(
+        [cmpd for clust in clusters for cmpd in clust.bioactive_cmpds],
+        2) == 12
+
+    mil.load_clusters(clusters, 2, Mock(), neg_smiles_reservoir=reservoir)
+    candidates = [call[1]['candidate_smiles']
+                  for call in mock_negative_sampler.sample.call_args_list]
+    assert candidates == [reservoir[:4], reservoir[4:]]
+    assert mil.positive_clusters == clusters
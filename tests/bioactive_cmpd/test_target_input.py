@@ -0,0 +1,52 @@
+import pytest
+from unittest.mock import Mock, MagicMock
+
+from phytebyte.bioactive_cmpd.target_input import (
+    GeneTargetsInput, MultiTargetInput)
+
+
+@pytest.fixture
+def mock_source():
+    m = Mock()
+    m.fetch_with_gene_tgts_multi = MagicMock(return_value=iter([
+        (('PPARG', 'agonist'), lambda: 'cmpd1'),
+        (('PPARG', 'antagonist'), lambda: 'cmpd2'),
+        (('NR1H4', 'agonist'), lambda: 'cmpd3'),
+        (('PPARG', 'agonist'), lambda: 'cmpd4')]))
+    return m
+
+
+def test_gene_targets_input__passes_lean(mock_source):
+    GeneTargetsInput('agonist', ['PPARG']).fetch_bioactive_cmpds(
+        mock_source, lean=True)
+    mock_source.fetch_with_gene_tgts.assert_called_once_with(
+        ['PPARG'], 'agonist', lean=True)
+
+
+def test_multi_target_input__fetch_partitions(mock_source):
+    mti = MultiTargetInput(['PPARG', 'NR1H4'])
+    partitions = mti.fetch_partitions(mock_source, lean=True)
+    mock_source.fetch_with_gene_tgts_multi.assert_called_once_with(
+        ['PPARG', 'NR1H4'], ('agonist', 'antagonist'), lean=True)
+    assert {key: [lazy_cmpd() for lazy_cmpd in lazy_cmpds]
+            for key, lazy_cmpds in partitions.items()} == {
+        ('PPARG', 'agonist'): ['cmpd1', 'cmpd4'],
+        ('PPARG', 'antagonist'): ['cmpd2'],
+        ('NR1H4', 'agonist'): ['cmpd3']}
+
+
+def test_multi_target_input__target_inputs(mock_source):
+    target_inputs = MultiTargetInput(['PPARG', 'NR1H4']).target_inputs(
+        mock_source)
+    assert mock_source.fetch_with_gene_tgts_multi.call_count == 1
+    lazy_cmpds = target_inputs[('PPARG', 'agonist')].fetch_bioactive_cmpds(
+        mock_source)
+    assert [lazy_cmpd() for lazy_cmpd in lazy_cmpds] == ['cmpd1', 'cmpd4']
+    assert mock_source.fetch_with_gene_tgts_multi.call_count == 1
+
+
+def test_multi_target_input__fetch_bioactive_cmpds(mock_source):
+    lazy_cmpds = MultiTargetInput(['PPARG', 'NR1H4']).fetch_bioactive_cmpds(
+        mock_source)
+    assert [lazy_cmpd() for lazy_cmpd in lazy_cmpds] == [
+        'cmpd1', 'cmpd2', 'cmpd3', 'cmpd4']
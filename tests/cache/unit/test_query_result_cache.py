@@ -0,0 +1,89 @@
+import os
+import time
+
+import pytest
+
+from phytebyte.cache import QueryResultCache
+
+
+@pytest.fixture
+def rows():
+    return [(1, 'PPARG', 'CC=O', ['EC50'], [12.5]),
+            (2, 'PPARG', 'CC=N', ['IC50'], [3.0])]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return QueryResultCache(root_dir=str(tmp_path / 'queries'))
+
+
+def test_key__depends_on_sql_and_release():
+    key = QueryResultCache.key("SELECT 1", "ChEMBL_25")
+    assert key == QueryResultCache.key("SELECT 1", "ChEMBL_25")
+    assert key != QueryResultCache.key("SELECT 2", "ChEMBL_25")
+    assert key != QueryResultCache.key("SELECT 1", "ChEMBL_26")
+
+
+def test_root_dir__defaults_to_user_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'xdg'))
+    assert QueryResultCache()._root_dir == \
+        str(tmp_path / 'xdg' / 'phytebyte' / 'queries')
+    monkeypatch.delenv('XDG_CACHE_HOME')
+    monkeypatch.setenv('HOME', str(tmp_path))
+    assert QueryResultCache()._root_dir == \
+        str(tmp_path / '.cache' / 'phytebyte' / 'queries')
+
+
+def test_get__miss(cache):
+    assert cache.get(QueryResultCache.key("SELECT 1", "ChEMBL_25")) is None
+
+
+def test_put_get__roundtrip(cache, rows):
+    key = QueryResultCache.key("SELECT 1", "ChEMBL_25")
+    cache.put(key, rows)
+    assert cache.get(key) == rows
+
+
+def test_get__expired_entry_is_removed(tmp_path, rows):
+    cache = QueryResultCache(root_dir=str(tmp_path), ttl=60)
+    key = QueryResultCache.key("SELECT 1", "ChEMBL_25")
+    cache.put(key, rows)
+    filepath, = [tmp_path / f for f in os.listdir(tmp_path)]
+    an_hour_ago = time.time() - 60 * 60
+    os.utime(filepath, (an_hour_ago, an_hour_ago))
+    assert cache.get(key) is None
+    assert not filepath.exists()
+
+
+def test_get__corrupt_entry_is_a_miss(tmp_path, rows):
+    cache = QueryResultCache(root_dir=str(tmp_path))
+    key = QueryResultCache.key("SELECT 1", "ChEMBL_25")
+    cache.put(key, rows)
+    filepath, = [tmp_path / f for f in os.listdir(tmp_path)]
+    filepath.write_bytes(b'not gzip')
+    assert cache.get(key) is None
+
+
+def test_put__evicts_least_recently_read(tmp_path, rows):
+    cache = QueryResultCache(root_dir=str(tmp_path))
+    old_key, new_key = "a" * 64, "b" * 64
+    cache.put(old_key, rows)
+    cache.put(new_key, rows)
+    entry_size = os.path.getsize(tmp_path / f"{old_key}.pkl.gz")
+    now = time.time()
+    os.utime(tmp_path / f"{old_key}.pkl.gz", (now - 100, now))
+    cache.get(new_key)
+
+    cache._max_bytes = entry_size + 1
+    cache.put("c" * 64, rows[:1])
+    assert not (tmp_path / f"{old_key}.pkl.gz").exists()
+    assert (tmp_path / f"{'c' * 64}.pkl.gz").exists()
+    assert sum(os.path.getsize(tmp_path / f)
+               for f in os.listdir(tmp_path)) <= entry_size + 1
+
+
+def test_clear(cache, rows):
+    key = QueryResultCache.key("SELECT 1", "ChEMBL_25")
+    cache.put(key, rows)
+    cache.clear()
+    assert cache.get(key) is None
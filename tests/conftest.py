@@ -1,6 +1,17 @@
 import pytest
 from unittest.mock import Mock, MagicMock
 
+from phytebyte.db import dispose_engines
+
+
+@pytest.fixture(autouse=True)
+def empty_engine_registry():
+    # Engines are cached per db_url, so `create_engine` mocks from one test
+    # would otherwise leak into the next
+    dispose_engines()
+    yield
+    dispose_engines()
+
 
 @pytest.fixture
 def mock_streaming_engine_factory():
@@ -23,6 +34,7 @@ def mock_streaming_engine_factory():
         # Support context-managers
         mock_conn = Mock()
         mock_conn.execute = MagicMock(return_value=MockChunkIterator())
+        mock_conn.execution_options = MagicMock(return_value=mock_conn)
         mock_conn.__enter__ = Mock(return_value=mock_conn)
         mock_conn.__exit__ = Mock(return_value=None)
         mock_engine = Mock()
@@ -30,3 +42,109 @@ def mock_streaming_engine_factory():
         mock_engine.execute_options = MagicMock()
         return mock_engine
     return create_mock_streaming_engine
+
+
+# Just the ChEMBL columns that positive-compound queries read
+MINI_CHEMBL_DDL = [
+    "CREATE TABLE component_sequences (component_id INTEGER PRIMARY KEY,"
+    " organism TEXT)",
+    "CREATE TABLE component_synonyms (compsyn_id INTEGER PRIMARY KEY,"
+    " component_id INTEGER, component_synonym TEXT, syn_type TEXT)",
+    "CREATE TABLE target_components (targcomp_id INTEGER PRIMARY KEY,"
+    " component_id INTEGER, tid INTEGER)",
+    "CREATE TABLE target_dictionary (tid INTEGER PRIMARY KEY)",
+    "CREATE TABLE assays (assay_id INTEGER PRIMARY KEY, tid INTEGER,"
+    " confidence_score INTEGER, description TEXT)",
+    "CREATE TABLE activities (activity_id INTEGER PRIMARY KEY,"
+    " assay_id INTEGER, record_id INTEGER, standard_type TEXT,"
+    " standard_relation TEXT, standard_value NUMERIC, standard_units TEXT)",
+    "CREATE TABLE compound_records (record_id INTEGER PRIMARY KEY,"
+    " molregno INTEGER, compound_name TEXT)",
+    "CREATE TABLE molecule_dictionary (molregno INTEGER PRIMARY KEY,"
+    " pref_name TEXT)",
+    "CREATE TABLE compound_structures (molregno INTEGER PRIMARY KEY,"
+    " canonical_smiles TEXT)"]
+
+MINI_CHEMBL_ROWS = [
+    "INSERT INTO component_sequences VALUES (1, 'Homo sapiens'),"
+    " (2, 'Mus musculus')",
+    "INSERT INTO component_synonyms VALUES (1, 1, 'PPARG', 'GENE_SYMBOL'),"
+    " (2, 2, 'Pparg', 'GENE_SYMBOL')",
+    "INSERT INTO target_components VALUES (1, 1, 10), (2, 2, 20)",
+    "INSERT INTO target_dictionary VALUES (10), (20)",
+    "INSERT INTO assays VALUES (100, 10, 9, 'Human assay'),"
+    " (200, 20, 9, 'Mouse assay')",
+    "INSERT INTO activities VALUES"
+    " (1, 100, 1000, 'EC50', '=', 15, 'nM'),"
+    " (2, 100, 1001, 'EC50', '=', 25, 'nM'),"
+    " (3, 100, 1002, 'IC50', '<', 5, 'nM'),"
+    " (4, 200, 1000, 'EC50', '=', 15, 'nM')",
+    "INSERT INTO compound_records VALUES (1000, 1, 'cmpd one'),"
+    " (1001, 1, 'cmpd uno'), (1002, 2, 'cmpd two')",
+    "INSERT INTO molecule_dictionary VALUES (1, 'ONE'), (2, 'TWO')",
+    "INSERT INTO compound_structures VALUES (1, 'CC=O'), (2, 'CC=N')"]
+
+
+@pytest.fixture
+def mini_chembl_db_url(tmp_path):
+    """ SQLite database with two compounds active against human PPARG (one
+    agonist with two activities, one antagonist), & a mouse activity.
+    """
+    from sqlalchemy import create_engine
+    db_url = f"sqlite:///{tmp_path / 'chembl.db'}"
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        for statement in MINI_CHEMBL_DDL + MINI_CHEMBL_ROWS:
+            conn.execute(statement)
+    engine.dispose()
+    return db_url
+
+
+# Just the FooDB columns that food-compound queries read
+MINI_FOODB_DDL = [
+    "CREATE TABLE compounds (id INTEGER PRIMARY KEY, moldb_smiles TEXT,"
+    " name TEXT, description TEXT)",
+    "CREATE TABLE foods (id INTEGER PRIMARY KEY, name TEXT,"
+    " description TEXT)",
+    "CREATE TABLE contents (id INTEGER PRIMARY KEY, source_id INTEGER,"
+    " source_type TEXT, food_id INTEGER, orig_food_part TEXT,"
+    " orig_content NUMERIC, orig_unit TEXT, orig_min NUMERIC,"
+    " orig_max NUMERIC, standard_content NUMERIC)"]
+
+MINI_FOODB_ROWS = [
+    "INSERT INTO compounds VALUES (1, 'CC=O', 'Acetaldehyde', 'descr one'),"
+    " (2, 'CCO', 'Ethanol', 'descr two'), (3, 'C', 'Methane', NULL)",
+    "INSERT INTO foods VALUES (10, 'Apple', 'A fruit'),"
+    " (20, 'Beer', 'A drink')",
+    "INSERT INTO contents VALUES"
+    " (1, 1, 'Compound', 10, 'Fruit', 1.5, 'mg/100g', NULL, NULL, 1.5),"
+    " (2, 2, 'Compound', 20, NULL, 4000, 'mg/100g', NULL, NULL, 4000),"
+    " (3, 2, 'Compound', 10, 'Fruit', 2.25, 'mg/100g', NULL, NULL, 2.25),"
+    " (4, 1, 'Nutrient', 20, NULL, 99, 'mg/100g', NULL, NULL, 99)"]
+
+
+@pytest.fixture
+def mini_foodb_db_url(tmp_path):
+    """ SQLite database with three compounds: one in an apple, one in beer &
+    an apple, and one in no food.
+    """
+    from sqlalchemy import create_engine
+    db_url = f"sqlite:///{tmp_path / 'foodb.db'}"
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        for statement in MINI_FOODB_DDL + MINI_FOODB_ROWS:
+            conn.execute(statement)
+    engine.dispose()
+    return db_url
+
+
+@pytest.fixture
+def mini_snapshot_dir(tmp_path, mini_chembl_db_url, mini_foodb_db_url):
+    """ SQLite-format snapshot of the mini ChEMBL & FooDB databases """
+    from phytebyte.snapshot.export import export_snapshot
+    snapshot_dir = str(tmp_path / 'snapshot')
+    export_snapshot(snapshot_dir,
+                    {'chembl': mini_chembl_db_url,
+                     'foodb': mini_foodb_db_url},
+                    format_name='sqlite')
+    return snapshot_dir
@@ -73,6 +73,16 @@ def test_smiles_to_bitarray(pybel_fp, mock_smiles):
     assert bitarr == bitarray([i % 2 == 0 for i in range(1024)])
 
 
+def test_smiles_to_sparse(pybel_fp, mock_smiles):
+    mock_fp = Mock()
+    mock_fp.bits = [i for i in range(1024) if i % 2 == 0]
+    pybel_fp.smiles_to_fingerprint = MagicMock(return_value=mock_fp)
+    sparse_row = pybel_fp.smiles_to_sparse(mock_smiles)
+    assert sparse_row.shape == (1, 1024)
+    assert np.array_equal(sparse_row.toarray()[0],
+                          pybel_fp.smiles_to_nparray(mock_smiles))
+
+
 def test_smiles_to_fingerprint(pybel_fp, mock_smiles, mock_molecule):
     pybel_fp.smiles_to_molecule = MagicMock(return_value=mock_molecule)
     fp = pybel_fp.smiles_to_fingerprint(mock_smiles)
@@ -87,3 +87,55 @@ def test_fingerprint_and_encode__bitarray(subclassed_fingerprinter,
     bitarr = subclassed_fingerprinter.fingerprint_and_encode(mock_smiles,
                                                              'bitarray')
     assert isinstance(bitarr, bitarray)
+
+
+@pytest.fixture
+def sparse_fingerprinter(mock_bit_string):
+    class SparseFingerprinterSubclass(Fingerprinter):
+        def smiles_to_bitarray(self, smiles):
+            return bitarray(mock_bit_string)
+
+        def smiles_to_nparray(self, smiles):
+            if smiles != 'bad':
+                return np.array([int(bit) for bit in mock_bit_string],
+                                dtype=np.uint8)
+
+        @property
+        def fp_type(self):
+            return 'some_type'
+
+        @property
+        def fp_length(self):
+            return len(mock_bit_string)
+    return SparseFingerprinterSubclass()
+
+
+def test_fingerprint_and_encode__sparse(sparse_fingerprinter, mock_smiles,
+                                        mock_bit_string):
+    sparse_row = sparse_fingerprinter.fingerprint_and_encode(mock_smiles,
+                                                             'sparse')
+    assert sparse_row.shape == (1, len(mock_bit_string))
+    assert np.array_equal(sparse_row.toarray()[0],
+                          sparse_fingerprinter.smiles_to_nparray(mock_smiles))
+    assert sparse_fingerprinter.fingerprint_and_encode('bad', 'sparse') is None
+
+
+def test_smiles_to_sparse_rows(sparse_fingerprinter, mock_smiles):
+    sparse_rows = sparse_fingerprinter.smiles_to_sparse_rows(
+        [mock_smiles, 'bad', mock_smiles])
+    assert sparse_rows.format == 'csr'
+    assert list(sparse_rows.getnnz(axis=1)) == [5, 0, 5]
+    assert np.array_equal(
+        sparse_rows[2].toarray()[0],
+        sparse_fingerprinter.smiles_to_nparray(mock_smiles))
+
+
+def test_smiles_to_sparse_rows__bad_smiles_iter(sparse_fingerprinter,
+                                                mock_smiles):
+    with pytest.raises(AssertionError):
+        sparse_fingerprinter.smiles_to_sparse_rows(mock_smiles)
+
+
+def test_fp_length__not_fixed(subclassed_fingerprinter):
+    with pytest.raises(NotImplementedError):
+        subclassed_fingerprinter.fp_length
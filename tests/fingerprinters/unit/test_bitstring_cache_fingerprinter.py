@@ -101,3 +101,32 @@ def test_bitstring_to_bitarray(BitstringCacheFingerprinterSub):
     bcf = BitstringCacheFingerprinterSub()
     bitstring = "1010"
     assert bitarray(bitstring) == bcf.bitstring_to_bitarray(bitstring)
+
+
+def test_bitstring_to_sparse(BitstringCacheFingerprinterSub):
+    bcf = BitstringCacheFingerprinterSub()
+    bitstring = "1010"
+    sparse_row = bcf.bitstring_to_sparse(bitstring)
+    assert sparse_row.shape == (1, 4)
+    assert np.array_equal(sparse_row.toarray()[0],
+                          bcf.bitstring_to_nparray(bitstring))
+
+
+def test_fingerprint_and_encode__sparse__cached(bitstring_cache_fp_w_cache,
+                                                mock_cache):
+    mock_cache.get = MagicMock(return_value="0110")
+    sparse_row = bitstring_cache_fp_w_cache.fingerprint_and_encode(
+        'C', 'sparse')
+    assert list(sparse_row.indices) == [1, 2]
+
+
+def test_cache_is_pickled_with_the_fingerprinter(bitstring_cache_fp_w_cache,
+                                                 mock_cache):
+    fp_class = type(bitstring_cache_fp_w_cache)
+    state = bitstring_cache_fp_w_cache.__getstate__()
+    # As in a spawned worker, which doesn't inherit the class attribute
+    fp_class.set_cache(None)
+    fp = fp_class.__new__(fp_class)
+    fp.__setstate__(state)
+    assert fp._bitstring_cache == mock_cache
+    assert fp_class._bitstring_cache == mock_cache
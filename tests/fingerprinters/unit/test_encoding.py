@@ -0,0 +1,76 @@
+from bitarray import bitarray
+import numpy as np
+import pytest
+
+from phytebyte.fingerprinters import encoding
+
+
+@pytest.fixture
+def dense():
+    rng = np.random.RandomState(0)
+    # Not a whole number of bytes
+    return (rng.rand(4, 21) < .4).astype(np.uint8)
+
+
+def test_bitarray_round_trip(dense):
+    for row in dense:
+        bitarr = encoding.dense_to_bitarray(row)
+        assert bitarr == bitarray([bool(bit) for bit in row])
+        assert np.array_equal(encoding.bitarray_to_dense(bitarr), row)
+        assert encoding.bitarray_to_dense(bitarr).dtype == np.uint8
+
+
+def test_packed_round_trip(dense):
+    packed = encoding.dense_to_packed(dense)
+    assert packed.shape == (4, 3)
+    assert np.array_equal(encoding.packed_to_dense(packed, 21), dense)
+    bitarr = encoding.dense_to_bitarray(dense[0])
+    assert np.array_equal(encoding.bitarray_to_packed(bitarr), packed[0])
+    assert encoding.packed_to_bitarray(packed[0], 21) == bitarr
+
+
+def test_bitstring_round_trip(dense):
+    bitstring = encoding.dense_to_bitstring(dense[0])
+    assert bitstring == "".join(str(bit) for bit in dense[0])
+    assert np.array_equal(encoding.bitstring_to_dense(bitstring), dense[0])
+    assert list(encoding.bitstring_to_bits(bitstring)) == \
+        list(np.flatnonzero(dense[0]))
+
+
+def test_bits_round_trip(dense):
+    bits = encoding.dense_to_bits(dense[1])
+    assert np.array_equal(encoding.bits_to_dense(bits, 21), dense[1])
+
+
+def test_batches(dense):
+    bitarrays = encoding.dense_to_bitarrays(dense)
+    assert bitarrays == [encoding.dense_to_bitarray(row) for row in dense]
+    assert np.array_equal(encoding.bitarrays_to_dense(bitarrays), dense)
+    assert np.array_equal(encoding.bitarrays_to_packed(bitarrays),
+                          encoding.dense_to_packed(dense))
+    assert encoding.packed_to_bitarrays(
+        encoding.bitarrays_to_packed(bitarrays), 21) == bitarrays
+    bitstrings = encoding.dense_to_bitstrings(dense)
+    assert bitstrings == [encoding.dense_to_bitstring(row) for row in dense]
+    assert np.array_equal(encoding.bitstrings_to_dense(bitstrings), dense)
+
+
+def test_sparse_round_trip(dense):
+    sparse = encoding.dense_to_sparse(dense)
+    assert sparse.shape == dense.shape
+    assert np.array_equal(encoding.sparse_to_dense(sparse), dense)
+    assert np.array_equal(
+        encoding.bits_to_sparse(
+            [encoding.dense_to_bits(row) for row in dense], 21).toarray(),
+        dense)
+
+
+def test_bits_to_sparse__empty_rows():
+    sparse = encoding.bits_to_sparse([None, np.array([1, 3])], 4)
+    assert sparse.toarray().tolist() == [[0, 0, 0, 0], [0, 1, 0, 1]]
+
+
+def test_empty_batches():
+    assert encoding.bitarrays_to_packed([]).shape == (0, 0)
+    assert encoding.bitarrays_to_dense([]).shape == (0, 0)
+    assert encoding.bitstrings_to_dense([]).shape == (0, 0)
@@ -55,7 +55,7 @@ def test_fetch_all_cmpds(ffc_source, monkeypatch, mock_rows,
                          mock_streaming_engine_factory):
     mock_engine = mock_streaming_engine_factory(mock_rows, 2)
     monkeypatch.setattr(
-        "phytebyte.food_cmpd.sources.base.create_engine",
+        "phytebyte.db.create_engine",
         MagicMock(return_value=mock_engine))
     assert len([foo for foo in ffc_source.fetch_all_cmpds()]) == 2
 
@@ -64,10 +64,72 @@ def test_fetch_foods(ffc_source, monkeypatch):
     mock_rows = [1] * 4
     mock_conn = Mock()
     mock_conn.execute = MagicMock(return_value=mock_rows)
+    mock_conn.execution_options = MagicMock(return_value=mock_conn)
+    mock_conn.__enter__ = Mock(return_value=mock_conn)
+    mock_conn.__exit__ = Mock(return_value=None)
     mock_engine = Mock()
     mock_engine.connect = MagicMock(return_value=mock_conn)
     monkeypatch.setattr(
-        "phytebyte.food_cmpd.sources.base.create_engine",
+        "phytebyte.db.create_engine",
         MagicMock(return_value=mock_engine))
 
     assert len(ffc_source.fetch_foods(100)) == 4
+
+
+def test_fetch_foods_many__groups_rows_by_cmpd_uid(ffc_source, monkeypatch):
+    mock_rows = [
+        (1, 'food1', 'a food', 'rind', 5, 'ppm', 1, 10, 5),
+        (1, 'food2', 'a food', 'seed', 4, 'ppm', 1, 10, 4),
+        (3, 'food1', 'a food', 'rind', 1, 'ppm', 1, 10, 1)]
+    mock_conn = Mock()
+    mock_conn.execute = MagicMock(return_value=mock_rows)
+    mock_conn.execution_options = MagicMock(return_value=mock_conn)
+    mock_conn.__enter__ = Mock(return_value=mock_conn)
+    mock_conn.__exit__ = Mock(return_value=None)
+    mock_engine = Mock()
+    mock_engine.connect = MagicMock(return_value=mock_conn)
+    monkeypatch.setattr(
+        "phytebyte.db.create_engine",
+        MagicMock(return_value=mock_engine))
+
+    foods_by_uid = ffc_source.fetch_foods_many([1, 2, 3])
+    mock_conn.execute.assert_called_once()
+    assert [f.food_name for f in foods_by_uid[1]] == ['food1', 'food2']
+    assert foods_by_uid[2] == []
+    assert len(foods_by_uid[3]) == 1
+
+
+def test_fetch_foods_many__no_uids__does_not_query(ffc_source, monkeypatch):
+    mock_create_engine = MagicMock()
+    monkeypatch.setattr(
+        "phytebyte.db.create_engine",
+        mock_create_engine)
+    assert ffc_source.fetch_foods_many([]) == {}
+    mock_create_engine.assert_not_called()
+
+
+def test_fetch_all_cmpds__key_range(ffc_source, mock_ffc_query_class,
+                                    monkeypatch, mock_rows,
+                                    mock_streaming_engine_factory):
+    mock_engine = mock_streaming_engine_factory(mock_rows, 1)
+    monkeypatch.setattr(
+        "phytebyte.db.create_engine",
+        MagicMock(return_value=mock_engine))
+    assert len(list(ffc_source.fetch_all_cmpds((1, 100)))) == 2
+    mock_ffc_query_class.return_value.build_range.assert_called_once_with(
+        (1, 100))
+
+
+def test_cmpd_key_ranges(monkeypatch):
+    mock_conn = Mock()
+    mock_conn.execute = MagicMock(
+        return_value=Mock(first=MagicMock(return_value=(1, 10))))
+    mock_conn.__enter__ = Mock(return_value=mock_conn)
+    mock_conn.__exit__ = Mock(return_value=None)
+    mock_engine = Mock()
+    mock_engine.connect = MagicMock(return_value=mock_conn)
+    monkeypatch.setattr(
+        "phytebyte.db.create_engine",
+        MagicMock(return_value=mock_engine))
+    source = FoodbFoodCmpdSource("db_url://compound-interest")
+    assert source.cmpd_key_ranges(3) == [(1, 5), (5, 9), (9, 11)]
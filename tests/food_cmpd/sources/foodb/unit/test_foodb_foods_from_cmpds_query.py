@@ -0,0 +1,47 @@
+import pytest
+import sqlalchemy
+
+from phytebyte.food_cmpd.sources import FoodbFoodsFromCmpdsQuery
+
+
+@pytest.fixture
+def fffcs_query():
+    return FoodbFoodsFromCmpdsQuery([123, 456])
+
+
+def test_init(fffcs_query):
+    assert fffcs_query
+
+
+def test_repr_is_implemented(fffcs_query):
+    assert "<FoodbFoodsFromCmpdsQuery" in repr(fffcs_query)
+
+
+def test_row_to_cmpd_uid_and_food_content(fffcs_query):
+    mock_row = (123, 'food1', 'a food', 'rind', 5, 'ppm', 1, 10, 5)
+    uid, food_content = fffcs_query.row_to_cmpd_uid_and_food_content(mock_row)
+    assert uid == 123
+    assert food_content.food_name == 'food1'
+    assert food_content.amount == 5
+
+
+def test_build(fffcs_query):
+    q = fffcs_query.build()
+    assert isinstance(q, sqlalchemy.sql.expression.Executable)
+
+
+def test_food_cmpd_uids_is_int__raises_AssertionError():
+    with pytest.raises(AssertionError):
+        FoodbFoodsFromCmpdsQuery(food_cmpd_uids=123)
+
+
+def test_whereclause(fffcs_query):
+    q = fffcs_query.build()
+    assert "contents.source_type" in str(q._whereclause)
+    assert "compounds.id IN" in str(q._whereclause)
+
+
+def test_order_by__groups_by_cmpd_first(fffcs_query):
+    ob_str = [str(clause) for clause in fffcs_query._order_by]
+    assert ob_str[0] == "Compound.id"
+    assert "contents.orig_content DESC" in ob_str
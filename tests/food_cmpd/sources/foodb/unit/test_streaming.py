@@ -0,0 +1,39 @@
+import pytest
+
+from phytebyte import db
+from phytebyte.food_cmpd.sources import FoodbFoodCmpdSource
+
+
+@pytest.fixture
+def mysql_foodb(monkeypatch, mock_streaming_engine_factory):
+    """ A `FoodbFoodCmpdSource` of a (mock) MySQL database, whose driver has
+    server-side cursors
+    """
+    engine = mock_streaming_engine_factory([(f"C{i}",) for i in range(10)],
+                                           3)
+    mock_conn = engine.connect()
+    mock_conn.dialect.name = 'mysql'
+    mock_conn.dialect.supports_server_side_cursors = True
+    monkeypatch.setattr(db, 'get_engine', lambda *args, **kwargs: engine)
+    return FoodbFoodCmpdSource("mysql://foodb", batch_size=4), mock_conn
+
+
+def test_fetch_all_cmpd_smiles__streams_results(mysql_foodb):
+    source, mock_conn = mysql_foodb
+    assert list(source.fetch_all_cmpd_smiles()) == \
+        [f"C{i}" for i in range(10)]
+    # Without `stream_results`, the MySQL driver buffers the whole result
+    # set client-side
+    assert mock_conn.execution_options.call_args[1]['stream_results'] is True
+    mock_conn.invalidate.assert_not_called()
+
+
+def test_fetch_all_cmpd_smiles__abandoned_stream_is_not_drained(
+        mysql_foodb):
+    source, mock_conn = mysql_foodb
+    smiles_iter = source.fetch_all_cmpd_smiles()
+    assert next(smiles_iter) == "C0"
+    smiles_iter.close()
+    assert mock_conn.execution_options.call_args[1]['stream_results'] is True
+    # Closing the unbuffered cursor would read the rest of the result set
+    mock_conn.invalidate.assert_called_once()
@@ -0,0 +1,57 @@
+import pytest
+
+from phytebyte.food_cmpd.sources import SnapshotFoodCmpdSource
+from phytebyte.food_cmpd.types import FoodContent
+
+
+@pytest.fixture
+def snapshot_source(mini_snapshot_dir):
+    return SnapshotFoodCmpdSource(mini_snapshot_dir)
+
+
+def test_fetch_all_cmpds(snapshot_source):
+    food_cmpds = list(snapshot_source.fetch_all_cmpds())
+    assert [(food_cmpd.uid, food_cmpd.smiles, food_cmpd.name)
+            for food_cmpd in food_cmpds] == [
+                (1, 'CC=O', 'Acetaldehyde'), (2, 'CCO', 'Ethanol'),
+                (3, 'C', 'Methane')]
+    assert food_cmpds[0].source is snapshot_source
+
+
+def test_cmpd_key_ranges(snapshot_source):
+    key_ranges = snapshot_source.cmpd_key_ranges(2)
+    assert [food_cmpd.uid for key_range in key_ranges
+            for food_cmpd in snapshot_source.fetch_all_cmpds(key_range)] == [
+                1, 2, 3]
+
+
+
+def test_fetch_all_cmpds__range_read_by_table(snapshot_source, monkeypatch):
+    table = snapshot_source.snapshot.table("food_compounds")
+    read_rows = []
+    rows = table.rows
+
+    def counted_rows(*args, **kwargs):
+        for row in rows(*args, **kwargs):
+            read_rows.append(row)
+            yield row
+    monkeypatch.setattr(table, 'rows', counted_rows)
+    assert [food_cmpd.uid for food_cmpd in
+            snapshot_source.fetch_all_cmpds((2, 3))] == [2]
+    # Only the range's rows are read, not the whole table
+    assert [row[0] for row in read_rows] == [2]
+
+def test_fetch_foods_many(snapshot_source):
+    foods_by_uid = snapshot_source.fetch_foods_many([2, 3])
+    assert foods_by_uid[3] == []
+    # Largest content first; 'Nutrient' contents are excluded
+    assert foods_by_uid[2] == [
+        FoodContent('Beer', 'A drink', None, 4000., 'mg/100g', None, None,
+                    4000.),
+        FoodContent('Apple', 'A fruit', 'Fruit', 2.25, 'mg/100g', None,
+                    None, 2.25)]
+
+
+def test_fetch_foods(snapshot_source):
+    assert [food.food_name for food in snapshot_source.fetch_foods(1)] == [
+        'Apple']
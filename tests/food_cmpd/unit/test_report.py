@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import Mock, MagicMock
+
+from phytebyte.food_cmpd import FoodCmpd, FoodContent, FoodCmpdReport
+
+
+@pytest.fixture
+def food_content():
+    return FoodContent('Sesame', 'A seed', 'seed', 5, 'mg/100g', 1, 10, 5)
+
+
+@pytest.fixture
+def mock_food_cmpd_source(food_content):
+    m = Mock()
+    m.fetch_foods_many = MagicMock(
+        return_value={1: [food_content], 2: []})
+    m.fetch_foods = MagicMock(return_value=[])
+    return m
+
+
+@pytest.fixture
+def food_cmpds_sorted(mock_food_cmpd_source):
+    return [(FoodCmpd(mock_food_cmpd_source, 1, 'C=O', 'cmpd1', ''), .9),
+            (FoodCmpd(mock_food_cmpd_source, 2, 'C=N', 'cmpd2', ''), .8),
+            (FoodCmpd(mock_food_cmpd_source, 3, 'CC', 'cmpd3', ''), .7)]
+
+
+def test_food_cmpd__prefetched_foods_skip_source(mock_food_cmpd_source,
+                                                 food_content):
+    food_cmpd = FoodCmpd(mock_food_cmpd_source, 1, 'C=O', 'cmpd1', '',
+                         foods=[food_content])
+    assert food_cmpd.foods == [food_content]
+    mock_food_cmpd_source.fetch_foods.assert_not_called()
+
+
+def test_rows__prefetches_top_k_in_one_call(mock_food_cmpd_source,
+                                           food_cmpds_sorted):
+    report = FoodCmpdReport(mock_food_cmpd_source, top_k=2)
+    rows = report.rows(food_cmpds_sorted)
+    mock_food_cmpd_source.fetch_foods_many.assert_called_once_with([1, 2])
+    mock_food_cmpd_source.fetch_foods.assert_not_called()
+    assert len(rows) == 1
+    assert rows[0][0] == 'cmpd1'
+    assert "Sesame" in rows[0][3]
+
+
+def test_rows__is_novel(mock_food_cmpd_source, food_cmpds_sorted):
+    report = FoodCmpdReport(mock_food_cmpd_source)
+    rows = report.rows(food_cmpds_sorted, is_novel=lambda food_cmpd: True)
+    assert rows[0][2] is True
+    assert len(rows[0]) == len(report.headers)
@@ -0,0 +1,25 @@
+import pytest
+import numpy as np
+from bitarray import bitarray
+
+from phytebyte.modeling.input import BinaryClassifierInputFactory
+
+
+@pytest.mark.parametrize("encoding, positives", [
+    ('sparse', None), ('bitarray', [bitarray('10')])])
+def test_create__memmap_dir_unsupported(encoding, positives, tmp_path):
+    if positives is None:
+        from scipy.sparse import csr_matrix
+        positives = [csr_matrix(np.ones((1, 2)))]
+    with pytest.raises(ValueError):
+        BinaryClassifierInputFactory.create(
+            encoding, positives, iter([]), memmap_dir=str(tmp_path))
+
+
+def test_create__sparse_max_negatives():
+    from scipy.sparse import csr_matrix
+    positives = csr_matrix(np.eye(2))
+    negatives = (csr_matrix(np.ones((1, 2))) for _ in range(3))
+    with pytest.raises(ValueError):
+        BinaryClassifierInputFactory.create('sparse', positives, negatives,
+                                            max_negatives=2)
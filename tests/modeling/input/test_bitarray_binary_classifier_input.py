@@ -38,3 +38,10 @@ def test_index(bbci):
     X, y = bbci.index(subset)
     assert isinstance(X, list)
     assert len(X) == 2
+
+
+def test_init__streams_negatives(pos):
+    bbci = BitarrayBinaryClassifierInput(pos, iter([bitarray('100')] * 3))
+    assert len(bbci) == 13
+    assert bbci._y.dtype == np.uint8
+    assert bbci._y.sum() == 10
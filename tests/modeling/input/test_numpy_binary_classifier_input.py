@@ -35,3 +35,85 @@ def test_index(nbci):
     X, y = nbci.index(subset)
     assert isinstance(X, np.ndarray)
     assert len(X) == 2
+
+
+def test_init__sparse():
+    from scipy.sparse import csr_matrix, issparse
+    pos = [csr_matrix(np.eye(1, 8, k, dtype=np.uint8)) for k in range(3)]
+    neg = csr_matrix(np.ones((2, 8), dtype=np.uint8))
+    nbci = NumpyBinaryClassifierInput(pos, neg, sparse=True)
+    assert len(nbci) == 5
+    X, y = nbci.index(np.array([0, 4]))
+    assert issparse(X)
+    assert X.format == 'csr'
+    assert np.array_equal(X.toarray(), [np.eye(8)[0], np.ones(8)])
+    assert list(y) == [1., 0.]
+
+
+def test_init__labels_are_compact(nbci):
+    assert nbci._y.dtype == np.uint8
+    assert list(nbci._y) == [1] * 10 + [0] * 10
+
+
+def test_init__streams_negatives():
+    pos = [np.full(4, 1, dtype=np.uint8), None, np.full(4, 2, dtype=np.uint8)]
+    neg = (np.full(4, i, dtype=np.uint8) for i in range(3, 6))
+    nbci = NumpyBinaryClassifierInput(pos, neg, max_rows=8)
+    assert len(nbci) == 5
+    assert nbci._X.dtype == np.uint8
+    assert list(nbci._X[:, 0]) == [1, 2, 3, 4, 5]
+    assert list(nbci._y) == [1, 1, 0, 0, 0]
+
+
+def test_init__more_than_max_rows():
+    neg = (np.zeros(4) for _ in range(3))
+    with pytest.raises(ValueError):
+        NumpyBinaryClassifierInput([np.ones(4)], neg, max_rows=3)
+
+
+def test_init__memmap(tmp_path):
+    neg = iter(np.zeros((3, 4), dtype=np.uint8))
+    nbci = NumpyBinaryClassifierInput(np.ones((2, 4), dtype=np.uint8), neg,
+                                      max_rows=5, memmap_dir=str(tmp_path))
+    assert isinstance(nbci._X, np.memmap)
+    # The scratch file is removed once mapped
+    assert list(tmp_path.iterdir()) == []
+    X, y = nbci.index(np.array([1, 2]))
+    assert X.tolist() == [[1] * 4, [0] * 4]
+    assert list(y) == [1, 0]
+
+
+def test_init__empty():
+    nbci = NumpyBinaryClassifierInput([], iter([]), max_rows=4)
+    assert len(nbci) == 0
+
+
+def test_init__sparse__streams_negatives():
+    from scipy.sparse import csr_matrix
+    pos = csr_matrix(np.eye(2, 6, dtype=np.uint8))
+    # More non-zeros than the arrays' initial capacity
+    neg = (csr_matrix(np.full((1, 6), i % 2, dtype=np.uint8))
+           for i in range(1000))
+    nbci = NumpyBinaryClassifierInput(pos, neg, sparse=True, max_rows=1002)
+    assert len(nbci) == 1002
+    X, y = nbci.index(np.arange(1002))
+    expected = np.vstack([np.eye(2, 6)] +
+                         [np.full((1, 6), i % 2) for i in range(1000)])
+    assert np.array_equal(X.toarray(), expected)
+    assert X.indices.dtype == X.indptr.dtype == np.int32
+    assert list(y) == [1, 1] + [0] * 1000
+
+
+def test_init__sparse__more_than_max_rows():
+    from scipy.sparse import csr_matrix
+    neg = (csr_matrix(np.ones((1, 4))) for _ in range(3))
+    with pytest.raises(ValueError):
+        NumpyBinaryClassifierInput([csr_matrix(np.ones((1, 4)))], neg,
+                                   sparse=True, max_rows=3)
+
+
+def test_init__sparse__memmap_dir_unsupported(tmp_path):
+    from scipy.sparse import csr_matrix
+    with pytest.raises(ValueError):
+        NumpyBinaryClassifierInput([csr_matrix(np.ones((1, 4)))], [],
+                                   sparse=True, memmap_dir=str(tmp_path))
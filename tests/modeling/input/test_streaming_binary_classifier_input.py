@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+
+from phytebyte.modeling.input.binary_classifier_input import (
+    StreamingBinaryClassifierInput)
+
+
+@pytest.fixture
+def sbci():
+    pos = [np.full(4, i, dtype=np.uint8) for i in range(1, 5)] + [None]
+    neg = (np.full(4, i, dtype=np.uint8) for i in range(10, 16))
+    return StreamingBinaryClassifierInput(pos, neg, max_negatives=6)
+
+
+def test__len__(sbci):
+    assert len(sbci) == 10
+
+
+def test_index(sbci):
+    with pytest.raises(NotImplementedError):
+        sbci.index(np.arange(2))
+
+
+def test_batches(sbci):
+    batches = list(sbci.batches(4))
+    assert len(batches) == 2
+    (X1, y1), (X2, y2) = batches
+    # The positives are shared evenly among the batches
+    assert list(X1[:, 0]) == [1, 2, 10, 11, 12, 13]
+    assert list(y1) == [1, 1, 0, 0, 0, 0]
+    assert list(X2[:, 0]) == [3, 4, 14, 15]
+    assert list(y2) == [1, 1, 0, 0]
+    assert y1.dtype == np.uint8
+
+
+def test_batches__more_than_max_negatives():
+    neg = (np.zeros(4) for _ in range(3))
+    sbci = StreamingBinaryClassifierInput([np.ones(4)], neg, max_negatives=2)
+    with pytest.raises(ValueError):
+        list(sbci.batches(2))
+
+
+def test_batches__sparse():
+    from scipy.sparse import csr_matrix
+    pos = [csr_matrix(np.eye(6, dtype=np.uint8)[0])]
+    neg = iter([csr_matrix(np.ones(6, dtype=np.uint8))])
+    sbci = StreamingBinaryClassifierInput(pos, neg, max_negatives=1,
+                                          encoding='sparse')
+    [(X, y)] = sbci.batches(8)
+    assert X.format == 'csr'
+    assert X.toarray().tolist() == [[1, 0, 0, 0, 0, 0], [1] * 6]
+    assert list(y) == [1, 0]
+
+
+def test_batches__bitarray():
+    from bitarray import bitarray
+    pos = [bitarray('1100')]
+    neg = iter([bitarray('0011'), bitarray('0001')])
+    sbci = StreamingBinaryClassifierInput(pos, neg, max_negatives=2,
+                                          encoding='bitarray')
+    [(X, y)] = sbci.batches(2)
+    assert X == [bitarray('1100'), bitarray('0011'), bitarray('0001')]
+    assert list(y) == [1, 0, 0]
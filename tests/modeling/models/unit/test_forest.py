@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from phytebyte.modeling.models.forest import LEAF, FlatForest
+
+
+@pytest.fixture
+def fingerprints():
+    rng = np.random.RandomState(0)
+    X = (rng.rand(300, 64) < .3).astype(np.uint8)
+    y = (X[:, :4].sum(axis=1) > 1).astype(float)
+    return X, y
+
+
+def test_from_sklearn_scores_like_predict_proba(fingerprints):
+    X, y = fingerprints
+    rfc = RandomForestClassifier(n_estimators=10, random_state=1)
+    rfc.fit(X[:200], y[:200])
+    forest = FlatForest.from_sklearn(rfc)
+    assert forest.num_trees == 10
+    assert sorted(forest.arrays()) == sorted(FlatForest.ARRAYS)
+    assert [forest.score(x) for x in X[200:]] == \
+        list(rfc.predict_proba(X[200:])[:, 1])
+
+
+def test_score_batch_like_predict_proba(fingerprints):
+    X, y = fingerprints
+    rfc = RandomForestClassifier(n_estimators=10, random_state=1)
+    rfc.fit(X[:200], y[:200])
+    forest = FlatForest.from_sklearn(rfc)
+    assert list(forest.score_batch(X[200:])) == \
+        list(rfc.predict_proba(X[200:])[:, 1])
+    assert list(forest.score_batch(X[200:201])) == [forest.score(X[200])]
+    assert len(forest.score_batch(X[:0])) == 0
+
+
+def test_from_sklearn__continuous_features():
+    rng = np.random.RandomState(1)
+    X = rng.randn(100, 5)
+    y = (X[:, 0] > 0).astype(float)
+    rfc = RandomForestClassifier(n_estimators=5, random_state=1).fit(X, y)
+    forest = FlatForest.from_sklearn(rfc)
+    assert [forest.score(x) for x in X] == list(rfc.predict_proba(X)[:, 1])
+    assert list(forest.score_batch(X)) == list(rfc.predict_proba(X)[:, 1])
+
+
+def test_from_sklearn__no_positives(fingerprints):
+    X, _ = fingerprints
+    rfc = RandomForestClassifier(n_estimators=3, random_state=1)
+    rfc.fit(X, np.zeros(len(X)))
+    forest = FlatForest.from_sklearn(rfc)
+    assert forest.score(X[0]) == 0.
+
+
+def test_children_index_the_flat_arrays(fingerprints):
+    X, y = fingerprints
+    rfc = RandomForestClassifier(n_estimators=3, random_state=1).fit(X, y)
+    forest = FlatForest.from_sklearn(rfc)
+    internal = forest.children_left != LEAF
+    assert list(forest.roots) == list(
+        np.cumsum([0] + [e.tree_.node_count for e in rfc.estimators_])[:-1])
+    assert (forest.children_left[internal] < len(forest.value)).all()
+    assert (forest.children_right[~internal] == LEAF).all()
@@ -0,0 +1,139 @@
+import pytest
+from unittest.mock import Mock, MagicMock
+import numpy as np
+
+from phytebyte.modeling.input.binary_classifier_input import (
+    NumpyBinaryClassifierInput, StreamingBinaryClassifierInput)
+from phytebyte.modeling.models import BinaryClassifierModel
+from phytebyte.modeling.models.bernoulli_nb import (
+    BernoulliNBBinaryClassifierModel)
+from phytebyte.modeling.models.logistic import LogisticBinaryClassifierModel
+
+
+@pytest.fixture
+def Xy():
+    rng = np.random.RandomState(0)
+    y = np.append(np.ones(20, dtype=np.uint8), np.zeros(60, dtype=np.uint8))
+    # Bit 0 is mostly on for positives, & off for negatives
+    X = (rng.rand(80, 16) < .3).astype(np.uint8)
+    X[:, 0] = y ^ (rng.rand(80) < .1)
+    return X, y
+
+
+def _indexed_bci(X, y):
+    bci = Mock(spec=['index', '__len__'])
+    bci.index = MagicMock(
+        side_effect=lambda idx: (X[idx] if hasattr(X, 'shape')
+                                 else [X[i] for i in idx], y[idx]))
+    bci.__len__ = Mock(return_value=len(y))
+    return bci
+
+
+@pytest.fixture
+def nbci(Xy):
+    return _indexed_bci(*Xy)
+
+
+@pytest.mark.parametrize("model_type, cls", [
+    ("Logistic", LogisticBinaryClassifierModel),
+    ("Bernoulli NB", BernoulliNBBinaryClassifierModel)])
+def test_create(model_type, cls):
+    model = BinaryClassifierModel.create(model_type)
+    assert isinstance(model, cls)
+    assert model.incremental
+    assert model.expected_encoding == 'numpy'
+    assert BinaryClassifierModel.create(
+        model_type, encoding='sparse').expected_encoding == 'sparse'
+    with pytest.raises(NotImplementedError):
+        BinaryClassifierModel.create(model_type, encoding='tensor')
+
+
+@pytest.mark.parametrize("cls", [LogisticBinaryClassifierModel,
+                                 BernoulliNBBinaryClassifierModel])
+def test_train__indexed(cls, nbci, Xy):
+    model = cls()
+    model.train(nbci, np.arange(80), batch_size=16)
+    X, y = Xy
+    scores = model.calc_scores(list(X))
+    assert scores.shape == (80,)
+    assert scores[y == 1].mean() > scores[y == 0].mean()
+    assert model.calc_score(X[0]) == scores[0]
+    assert len(model.calc_scores([])) == 0
+    assert model.training_set_hash
+
+
+def test_train__batches_like_partial_fit(nbci, Xy):
+    from sklearn.naive_bayes import BernoulliNB
+    model = BernoulliNBBinaryClassifierModel()
+    model.train(nbci, np.arange(80), batch_size=32)
+    X, y = Xy
+    learner = BernoulliNB()
+    idx = np.random.RandomState(model.random_state).permutation(80)
+    for start in (0, 32, 64):
+        batch = idx[start:start + 32]
+        learner.partial_fit(X[batch], y[batch], classes=[0, 1])
+    # The positives-first samples were shuffled into the batches
+    assert [call[0][0].tolist() for call in nbci.index.call_args_list] == \
+        [idx[:32].tolist(), idx[32:64].tolist(), idx[64:].tolist()]
+    assert np.allclose(model.calc_scores(X), learner.predict_proba(X)[:, 1])
+
+
+def test_train__streamed(Xy):
+    X, y = Xy
+    sbci = StreamingBinaryClassifierInput(X[:20], iter(X[20:]),
+                                          max_negatives=60)
+    model = BernoulliNBBinaryClassifierModel()
+    model.train(sbci, batch_size=16)
+    scores = model.calc_scores(X)
+    assert scores[y == 1].mean() > scores[y == 0].mean()
+    # All the samples were trained on (Bernoulli NB counts them)
+    assert model._learner.class_count_.tolist() == [60, 20]
+
+
+def test_train__sparse(nbci, Xy):
+    from scipy.sparse import csr_matrix
+    X, y = Xy
+    sparse_nbci = _indexed_bci(csr_matrix(X), y)
+    dense, sparse = (BernoulliNBBinaryClassifierModel(),
+                     BernoulliNBBinaryClassifierModel(encoding='sparse'))
+    dense.train(nbci, np.arange(80), batch_size=16)
+    sparse.train(sparse_nbci, np.arange(80), batch_size=16)
+    assert np.allclose(
+        sparse.calc_scores([csr_matrix(row) for row in X]),
+        dense.calc_scores(list(X)))
+
+
+def test_train__bitarray(nbci, Xy):
+    from phytebyte.fingerprinters.encoding import dense_to_bitarrays
+    X, y = Xy
+    bbci = _indexed_bci(dense_to_bitarrays(X), y)
+    dense, packed = (LogisticBinaryClassifierModel(),
+                     LogisticBinaryClassifierModel(encoding='bitarray'))
+    dense.train(nbci, np.arange(80), batch_size=16)
+    packed.train(bbci, np.arange(80), batch_size=16)
+    # Scored packed, 8 bits at a time
+    assert np.allclose(packed.calc_scores(dense_to_bitarrays(X)),
+                       dense.calc_scores(X), rtol=1e-12, atol=0)
+
+
+def test_evaluate__imbalanced():
+    # Few positives, & many more negatives, so class-sorted (positives
+    # first) mini-batches would train the positives away
+    rng = np.random.RandomState(0)
+    X = (rng.rand(3300, 64) < .2).astype(np.uint8)
+    X[:300, :8] |= (rng.rand(300, 8) < .6).astype(np.uint8)
+    bci = NumpyBinaryClassifierInput(list(X[:300]), list(X[300:]))
+    model = LogisticBinaryClassifierModel()
+    assert model.evaluate(bci, thresh=.5) > 0
+    scores = model.calc_scores(X)
+    assert scores[:300].mean() > scores[300:].mean() + .1
+
+
+def test_scores_without_learner(nbci, Xy):
+    import pickle
+    X, _ = Xy
+    model = BernoulliNBBinaryClassifierModel()
+    model.train(nbci, np.arange(80))
+    unpickled = pickle.loads(pickle.dumps(model))
+    assert unpickled._learner is None
+    assert np.array_equal(unpickled.calc_scores(X), model.calc_scores(X))
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import BernoulliNB
+
+from phytebyte.modeling.models import linear
+from phytebyte.modeling.models.linear import LinearScorer
+
+
+@pytest.fixture
+def fingerprints():
+    rng = np.random.RandomState(0)
+    # Not a whole number of bytes
+    X = (rng.rand(300, 61) < .3).astype(np.uint8)
+    y = (X[:, :4].sum(axis=1) > 1).astype(np.uint8)
+    return X, y
+
+
+@pytest.fixture(params=["Logistic", "Bernoulli NB"])
+def learner_and_scorer(request, fingerprints):
+    X, y = fingerprints
+    if request.param == "Logistic":
+        learner = SGDClassifier(loss='log_loss', random_state=1).fit(X, y)
+        return learner, LinearScorer.from_linear_model(learner)
+    learner = BernoulliNB().fit(X, y)
+    return learner, LinearScorer.from_bernoulli_nb(learner)
+
+
+def test_score_batch_like_predict_proba(learner_and_scorer, fingerprints):
+    learner, scorer = learner_and_scorer
+    X, _ = fingerprints
+    assert sorted(scorer.arrays()) == sorted(LinearScorer.ARRAYS)
+    assert scorer.num_bits == 61
+    assert np.allclose(scorer.score_batch(X),
+                       learner.predict_proba(X)[:, 1], rtol=1e-9, atol=0)
+
+
+def test_score_batch__sparse(learner_and_scorer, fingerprints):
+    _, scorer = learner_and_scorer
+    X, _ = fingerprints
+    assert np.allclose(scorer.score_batch(csr_matrix(X)),
+                       scorer.score_batch(X), rtol=1e-12, atol=0)
+
+
+def test_score_packed(learner_and_scorer, fingerprints, monkeypatch):
+    _, scorer = learner_and_scorer
+    X, _ = fingerprints
+    # Over several chunks
+    monkeypatch.setattr(linear, 'PACKED_CHUNK_SIZE', 128)
+    assert np.allclose(scorer.score_packed(np.packbits(X, axis=1)),
+                       scorer.score_batch(X), rtol=1e-12, atol=0)
+    assert scorer.score_packed(np.zeros((0, 8), dtype=np.uint8)).shape == (0,)
+
+
+def test_score__extreme_log_odds():
+    scorer = LinearScorer(np.array([1000., -1000.]), np.array([0.]))
+    assert scorer.score_batch(np.array([[1, 0], [0, 1], [0, 0]])).tolist() \
+        == [1., 0., .5]
@@ -0,0 +1,212 @@
+import json
+import os
+import pickle
+
+from bitarray import bitarray
+import numpy as np
+import pytest
+from unittest.mock import Mock, MagicMock
+
+from phytebyte.modeling.models import BinaryClassifierModel
+from phytebyte.modeling.models.persistence import (
+    FORMAT_VERSION, HEADER_FILENAME, IncompatibleModel, training_set_hash)
+
+
+@pytest.fixture
+def nbci():
+    rng = np.random.RandomState(0)
+    X = (rng.rand(60, 32) < .3).astype(np.uint8)
+    nbci = Mock()
+    nbci.index = MagicMock(return_value=(X, (X[:, 0] == 1).astype(float)))
+    return nbci
+
+
+@pytest.fixture
+def bbci():
+    bbci = Mock()
+    bbci.index = MagicMock(
+        return_value=([bitarray('1010'), bitarray('0110'), bitarray('0001')],
+                      np.array([1., 1., 0.])))
+    return bbci
+
+
+@pytest.fixture
+def rf_model(nbci):
+    model = BinaryClassifierModel.create("Random Forest")
+    model.train(nbci, np.arange(60), num_estimators=5)
+    return model
+
+
+def test_save_writes_header_and_arrays(rf_model, tmp_path):
+    path = str(tmp_path / 'model')
+    header = rf_model.save(path, 'daylight', chembl_version='ChEMBL_25')
+    with open(os.path.join(path, HEADER_FILENAME)) as f:
+        fields = json.load(f)
+    assert fields == header._asdict()
+    assert fields["format_version"] == FORMAT_VERSION
+    assert fields["model_type"] == "Random Forest"
+    assert fields["fp_type"] == 'daylight'
+    assert fields["encoding"] == 'numpy'
+    assert fields["chembl_version"] == 'ChEMBL_25'
+    assert fields["training_set_hash"] == rf_model.training_set_hash
+    assert sorted(name[:-len(".npy")] for name in os.listdir(path)
+                  if name.endswith(".npy")) == fields["arrays"]
+
+
+def test_load_random_forest__memory_mapped(rf_model, nbci, tmp_path):
+    path = str(tmp_path / 'model')
+    rf_model.save(path, 'daylight')
+    model = BinaryClassifierModel.load(path)
+    assert isinstance(model._forest.threshold, np.memmap)
+    assert model.header.fp_type == 'daylight'
+    assert model.training_set_hash == rf_model.training_set_hash
+    X, _ = nbci.index()
+    assert [model.calc_score(x) for x in X] == \
+        [rf_model.calc_score(x) for x in X]
+
+
+def test_loaded_model_pickles_as_its_path(rf_model, nbci, tmp_path):
+    path = str(tmp_path / 'model')
+    rf_model.save(path, 'daylight')
+    model = BinaryClassifierModel.load(path)
+    pickled = pickle.dumps(model)
+    assert len(pickled) < 1024
+    X, _ = nbci.index()
+    assert pickle.loads(pickled).calc_score(X[0]) == model.calc_score(X[0])
+    # Unless read into memory
+    in_memory = BinaryClassifierModel.load(path, mmap=False)
+    assert not isinstance(in_memory._forest.threshold, np.memmap)
+    assert len(pickle.dumps(in_memory)) > len(pickled)
+
+
+
+def test_loaded_model_unpickles_only_the_same_model(rf_model, nbci, tmp_path):
+    path = str(tmp_path / 'model')
+    rf_model.save(path, 'daylight')
+    pickled = pickle.dumps(BinaryClassifierModel.load(path))
+    # Replaced (e.g. re-saved by another run) before a worker maps it
+    rf_model.train(nbci, np.arange(40), num_estimators=3)
+    rf_model.save(path, 'daylight')
+    with pytest.raises(IncompatibleModel, match="was replaced"):
+        pickle.loads(pickled)
+
+def test_retrained_model_pickles_its_state(rf_model, nbci, tmp_path):
+    path = str(tmp_path / 'model')
+    rf_model.save(path, 'daylight')
+    model = BinaryClassifierModel.load(path)
+    model.train(nbci, np.arange(30), num_estimators=2)
+    assert model.header is None
+    unpickled = pickle.loads(pickle.dumps(model))
+    assert unpickled._rfc is None
+    X, _ = nbci.index(np.arange(30))
+    assert list(unpickled.calc_scores(X)) == list(model.calc_scores(X))
+
+
+def test_load_sparse_model(nbci, tmp_path):
+    from scipy.sparse import csr_matrix
+    X, y = nbci.index(np.arange(60))
+    sparse_nbci = Mock()
+    sparse_nbci.index = MagicMock(return_value=(csr_matrix(X), y))
+    model = BinaryClassifierModel.create("Random Forest", encoding='sparse')
+    model.train(sparse_nbci, np.arange(60), num_estimators=3)
+    assert model.training_set_hash != training_set_hash(X, y)
+    path = str(tmp_path / 'model')
+    model.save(path, 'daylight')
+    loaded = BinaryClassifierModel.load(path)
+    assert loaded.expected_encoding == 'sparse'
+    assert list(loaded.calc_scores(csr_matrix(X))) == \
+        list(model.calc_scores(csr_matrix(X)))
+
+
+def test_load_tanimoto(bbci, tmp_path):
+    model = BinaryClassifierModel.create("Tanimoto")
+    model.train(bbci, np.arange(3))
+    path = str(tmp_path / 'model')
+    model.save(path, 'daylight')
+    loaded = BinaryClassifierModel.load(path)
+    assert loaded._pos == [bitarray('1010'), bitarray('0110')]
+    assert loaded.calc_score(bitarray('1011')) == \
+        model.calc_score(bitarray('1011'))
+
+
+@pytest.mark.parametrize("model_type", ["Logistic", "Bernoulli NB"])
+def test_load_linear_model(model_type, nbci, tmp_path):
+    X, _ = nbci.index(np.arange(60))
+    model = BinaryClassifierModel.create(model_type)
+    model.train(nbci, np.arange(60))
+    path = str(tmp_path / 'model')
+    model.save(path, 'daylight')
+    loaded = BinaryClassifierModel.load(path)
+    assert isinstance(loaded._scorer.weights, np.memmap)
+    assert list(loaded.calc_scores(X)) == list(model.calc_scores(X))
+
+
+def test_save__replaces_model_without_touching_mapped_arrays(
+        rf_model, nbci, tmp_path):
+    path = str(tmp_path / 'model')
+    rf_model.save(path, 'daylight')
+    loaded = BinaryClassifierModel.load(path)
+    threshold = np.array(loaded._forest.threshold)
+    retrained = BinaryClassifierModel.create("Random Forest")
+    retrained.train(nbci, np.arange(30), num_estimators=2)
+    retrained.save(path, 'daylight')
+    # The first model's (mapped) arrays are left as they were
+    assert np.array_equal(loaded._forest.threshold, threshold)
+    reloaded = BinaryClassifierModel.load(path)
+    assert reloaded._forest.num_trees == 2
+    assert reloaded.training_set_hash == retrained.training_set_hash
+    # No temporary (or replaced) directories are left behind
+    assert os.listdir(str(tmp_path)) == ['model']
+
+
+def test_load__model_replaced_while_read(rf_model, tmp_path, monkeypatch):
+    from phytebyte.modeling.models import persistence
+    path = str(tmp_path / 'model')
+    rf_model.save(path, 'daylight')
+    retrained = BinaryClassifierModel.create("Random Forest")
+    retrained.train(Mock(index=MagicMock(return_value=(
+        np.eye(4), np.array([1., 0., 0., 0.])))), np.arange(4),
+        num_estimators=1)
+    read_arrays = persistence.read_arrays
+    reads = []
+
+    def read_arrays_then_replace(*args, **kwargs):
+        arrays = read_arrays(*args, **kwargs)
+        if not reads:
+            retrained.save(path, 'daylight')
+        reads.append(1)
+        return arrays
+    monkeypatch.setattr(persistence, 'read_arrays', read_arrays_then_replace)
+    loaded = BinaryClassifierModel.load(path, mmap=False)
+    assert len(reads) == 2
+    assert loaded.training_set_hash == retrained.training_set_hash
+    assert loaded._forest.num_trees == 1
+
+
+def test_load__wrong_fp_type(rf_model, tmp_path):
+    path = str(tmp_path / 'model')
+    rf_model.save(path, 'daylight')
+    with pytest.raises(IncompatibleModel):
+        BinaryClassifierModel.load(path, fp_type='spectrophore')
+
+
+def test_load__wrong_format_version(rf_model, tmp_path):
+    path = str(tmp_path / 'model')
+    rf_model.save(path, 'daylight')
+    header_path = os.path.join(path, HEADER_FILENAME)
+    with open(header_path) as f:
+        fields = json.load(f)
+    fields["format_version"] = FORMAT_VERSION + 1
+    with open(header_path, 'w') as f:
+        json.dump(fields, f)
+    with pytest.raises(IncompatibleModel):
+        BinaryClassifierModel.load(path)
+
+
+def test_training_set_hash():
+    X = np.eye(3, dtype=np.uint8)
+    y = np.array([1., 0., 0.])
+    assert training_set_hash(X, y) == training_set_hash(X.copy(), y)
+    assert training_set_hash(X, y) != training_set_hash(X, y[::-1])
+    assert training_set_hash([bitarray('10')], y[:1]) != \
+        training_set_hash([bitarray('01')], y[:1])
@@ -42,3 +42,33 @@ def test_predict(rfbcm, nbci):
         np.append(np.zeros(5), np.ones(5)),
         0.5)
     assert pred_class in [0, 1]
+
+
+def test_calc_scores__like_predict_proba(rfbcm, nbci):
+    rfbcm.train(nbci, np.arange(10))
+    X, _ = nbci.index(np.arange(10))
+    scores = rfbcm.calc_scores(list(X))
+    assert list(scores) == list(rfbcm._rfc.predict_proba(X)[:, 1])
+    assert [rfbcm.calc_score(x) for x in X] == list(scores)
+    assert len(rfbcm.calc_scores([])) == 0
+
+
+def test_sparse_encoding(nbci):
+    from scipy.sparse import csr_matrix
+    X, y = nbci.index(np.arange(10))
+    X = (X > 0).astype(np.uint8)
+    sparse_nbci = Mock()
+    sparse_nbci.index = MagicMock(return_value=(csr_matrix(X), y))
+    rfbcm = RandomForestBinaryClassifierModel(encoding='sparse')
+    assert rfbcm.expected_encoding == 'sparse'
+    rfbcm.train(sparse_nbci, np.arange(10))
+    rows = [csr_matrix(x) for x in X]
+    assert list(rfbcm.calc_scores(rows)) == \
+        list(rfbcm._rfc.predict_proba(X)[:, 1])
+    assert rfbcm.calc_score(rows[0]) == rfbcm.calc_scores(rows)[0]
+    assert len(rfbcm.calc_scores([])) == 0
+
+
+def test_unsupported_encoding():
+    with pytest.raises(NotImplementedError):
+        RandomForestBinaryClassifierModel(encoding='bitarray')
@@ -0,0 +1,47 @@
+import pytest
+
+from phytebyte.snapshot import Snapshot, SNAPSHOT_TABLES
+from phytebyte.snapshot.export import export_snapshot, snapshot_statements
+
+
+def test_statements_match_table_specs():
+    statements = snapshot_statements()
+    assert set(statements) == set(SNAPSHOT_TABLES)
+    for name, spec in SNAPSHOT_TABLES.items():
+        assert list(statements[name].c.keys()) == [
+            column for column, _ in spec.columns]
+
+
+def test_export_snapshot(mini_snapshot_dir):
+    snapshot = Snapshot(mini_snapshot_dir)
+    assert snapshot.format.name == 'sqlite'
+    assert snapshot.num_rows == {"compound_structures": 2,
+                                 "gene_activity": 3,
+                                 "food_compounds": 3,
+                                 "food_contents": 3}
+    # Mouse activities aren't exported
+    assert list(snapshot.table("gene_activity").rows(
+        ["gene_symbol", "molregno", "standard_value"])) == [
+            ('PPARG', 1, 15.), ('PPARG', 1, 25.), ('PPARG', 2, 5.)]
+
+
+def test_export_snapshot__keeps_other_database_tables(
+        mini_snapshot_dir, mini_foodb_db_url):
+    num_rows = export_snapshot(mini_snapshot_dir,
+                               {'foodb': mini_foodb_db_url},
+                               format_name='sqlite')
+    assert set(num_rows) == set(SNAPSHOT_TABLES)
+
+
+def test_export_snapshot__arrow(tmp_path, mini_foodb_db_url):
+    pytest.importorskip('pyarrow')
+    export_snapshot(str(tmp_path), {'foodb': mini_foodb_db_url},
+                    format_name='arrow')
+    snapshot = Snapshot(str(tmp_path))
+    assert list(snapshot.table("food_compounds").rows(["uid"])) == [
+        (1,), (2,), (3,)]
+
+
+def test_export_snapshot__no_tables(tmp_path):
+    with pytest.raises(ValueError):
+        export_snapshot(str(tmp_path), {'pubchem': 'sqlite://'})
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from phytebyte.snapshot import (MissingFormatDependency, Snapshot,
+                                 SnapshotFormat, TableSpec)
+from phytebyte.snapshot.snapshot import write_manifest
+
+SPEC = TableSpec(name="food_compounds", database="foodb",
+                 columns=[("uid", "int"), ("smiles", "str"),
+                          ("name", "str"), ("description", "str")],
+                 indexes=["uid"])
+ROWS = [(1, 'C', 'one', None), (2, 'CC', 'two', 'descr'),
+        (3, 'CCC', 'three', None)]
+
+
+def write_table(snapshot_format, snapshot_dir):
+    writer = snapshot_format.writer(
+        snapshot_format.path(str(snapshot_dir), SPEC), SPEC)
+    writer.write_rows(ROWS[:2])
+    writer.write_rows(ROWS[2:])
+    assert not os.path.exists(writer.path), \
+        "The table should only appear once it is closed"
+    writer.close()
+    return snapshot_format.reader(writer.path, SPEC)
+
+
+@pytest.fixture(params=['sqlite', 'arrow'])
+def snapshot_format(request):
+    if request.param == 'arrow':
+        pytest.importorskip('pyarrow')
+    return SnapshotFormat.create(request.param)
+
+
+def test_rows(snapshot_format, tmp_path):
+    reader = write_table(snapshot_format, tmp_path)
+    assert reader.num_rows == 3
+    assert list(reader.rows(["uid", "smiles", "name", "description"])) == ROWS
+
+
+def test_rows__where(snapshot_format, tmp_path):
+    reader = write_table(snapshot_format, tmp_path)
+    assert list(reader.rows(["name"], {"uid": [3, 1, 7]})) == [
+        ('one',), ('three',)]
+    assert list(reader.rows(["name"], {"uid": [1, 2], "smiles": ['CC']})) \
+        == [('two',)]
+    assert list(reader.rows(["name"], {"uid": []})) == []
+
+
+
+def test_rows__between(snapshot_format, tmp_path):
+    reader = write_table(snapshot_format, tmp_path)
+    assert list(reader.rows(["uid"], between={"uid": (2, 4)})) == [(2,), (3,)]
+    assert list(reader.rows(["uid"], between={"uid": (4, 9)})) == []
+    assert list(reader.rows(["uid"], {"name": ['one', 'three']},
+                            between={"uid": (0, 3)})) == [(1,)]
+    assert list(reader.rows(["uid"], between={"uid": (1, 3),
+                                              "smiles": ('CC', 'D')})) == \
+        [(2,)]
+
+
+def test_rows__between__unsorted(snapshot_format, tmp_path):
+    writer = snapshot_format.writer(
+        snapshot_format.path(str(tmp_path), SPEC), SPEC)
+    writer.write_rows(ROWS[::-1])
+    writer.close()
+    reader = snapshot_format.reader(writer.path, SPEC)
+    assert list(reader.rows(["uid"], between={"uid": (1, 3)})) == [(2,), (1,)]
+
+def test_take(snapshot_format, tmp_path):
+    reader = write_table(snapshot_format, tmp_path)
+    assert list(reader.take(["uid"], [0, 2])) == [(1,), (3,)]
+
+
+def test_abort__removes_partial_table(snapshot_format, tmp_path):
+    writer = snapshot_format.writer(
+        snapshot_format.path(str(tmp_path), SPEC), SPEC)
+    writer.write_rows(ROWS)
+    writer.abort()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_create__unknown_format():
+    with pytest.raises(Exception, match="parquet"):
+        SnapshotFormat.create('parquet')
+
+
+def test_snapshot__no_manifest(tmp_path):
+    with pytest.raises(FileNotFoundError, match="phytebyte snapshot"):
+        Snapshot(str(tmp_path))
+
+
+def test_snapshot__table(tmp_path):
+    snapshot_format = SnapshotFormat.create('sqlite')
+    write_table(snapshot_format, tmp_path)
+    write_manifest(str(tmp_path), 'sqlite', {"food_compounds": 3})
+    snapshot = Snapshot(str(tmp_path))
+    assert snapshot.table("food_compounds") is \
+        snapshot.table("food_compounds")
+    assert list(snapshot.table("food_compounds").rows(["uid"])) == [
+        (1,), (2,), (3,)]
+    with pytest.raises(KeyError):
+        snapshot.table("gene_activity")
+
+
+def test_create__arrow_without_pyarrow(monkeypatch):
+    import sys
+    # An import of a module set to None in `sys.modules` raises ImportError
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    monkeypatch.delitem(sys.modules, 'phytebyte.snapshot.arrow',
+                        raising=False)
+    with pytest.raises(MissingFormatDependency) as e:
+        SnapshotFormat.create('arrow')
+    assert "pyarrow" in str(e.value)
@@ -0,0 +1,60 @@
+import pytest
+
+from phytebyte.bioactive_cmpd.sources import ChemblBioactiveCompoundSource
+from phytebyte.food_cmpd.sources import FoodbFoodCmpdSource
+from phytebyte.synthetic import generate_chembl_db, generate_foodb_db
+
+
+@pytest.fixture
+def synthetic_chembl_db_url(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'chembl.db'}"
+    num_rows = generate_chembl_db(db_url, 2000, seed=1)
+    assert num_rows['compound_structures'] == 2000
+    assert num_rows['molecule_dictionary'] == 2000
+    assert num_rows['activities'] > 2000
+    return db_url
+
+
+@pytest.fixture
+def synthetic_foodb_db_url(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'foodb.db'}"
+    num_rows = generate_foodb_db(db_url, 500, seed=1, num_foods=20)
+    assert num_rows['compounds'] == 500
+    assert num_rows['foods'] == 20
+    return db_url
+
+
+def test_chembl_source(synthetic_chembl_db_url):
+    source = ChemblBioactiveCompoundSource(synthetic_chembl_db_url, .5)
+    cmpds = [lazy_cmpd() for lazy_cmpd in
+             source.fetch_with_gene_tgts(['PPARG'], 'antagonist')]
+    assert len(cmpds) > 0
+    for cmpd in cmpds:
+        assert cmpd.gene_target == 'PPARG'
+        assert len(cmpd.bioactivities) > 0
+        assert all(bioactivity.type == 'IC50' and bioactivity.units == 'nM'
+                   for bioactivity in cmpd.bioactivities)
+    lean_cmpds = [lazy_cmpd() for lazy_cmpd in source.fetch_with_gene_tgts(
+        ['PPARG'], 'antagonist', lean=True)]
+    assert [cmpd.uid for cmpd in lean_cmpds] == [cmpd.uid for cmpd in cmpds]
+    assert source.release == 'ChEMBL_synthetic_2000_1'
+
+
+def test_chembl_source__random_compounds(synthetic_chembl_db_url):
+    source = ChemblBioactiveCompoundSource(synthetic_chembl_db_url, .5)
+    excluded = list(source.fetch_all_compound_smiles())[:1000]
+    smiles = list(source.fetch_random_compounds_exc_smiles(excluded, 50))
+    assert len(set(smiles)) == 50
+    assert not set(smiles) & set(excluded)
+    # Seeded by `setseed()`
+    assert smiles == list(
+        source.fetch_random_compounds_exc_smiles(excluded, 50))
+
+
+def test_foodb_source(synthetic_foodb_db_url):
+    source = FoodbFoodCmpdSource(synthetic_foodb_db_url)
+    food_cmpds = list(source.fetch_all_cmpds())
+    assert len(food_cmpds) == 500
+    foods_by_uid = source.fetch_foods_many(
+        [food_cmpd.uid for food_cmpd in food_cmpds])
+    assert sum(len(foods) for foods in foods_by_uid.values()) > 0
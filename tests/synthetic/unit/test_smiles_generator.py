@@ -0,0 +1,29 @@
+import re
+
+from phytebyte.synthetic import SmilesGenerator
+
+
+def test_generate__distinct():
+    smiles = list(SmilesGenerator(0).generate(2000))
+    assert len(smiles) == 2000
+    assert len(set(smiles)) == 2000
+
+
+def test_generate__reproducible():
+    assert list(SmilesGenerator(3).generate(100)) == \
+        list(SmilesGenerator(3).generate(100))
+    assert list(SmilesGenerator(3).generate(100)) != \
+        list(SmilesGenerator(4).generate(100))
+
+
+def test_generate__well_formed():
+    for smiles in SmilesGenerator(1).generate(2000):
+        depth = 0
+        for char in smiles:
+            depth += {'(': 1, ')': -1}.get(char, 0)
+            assert depth >= 0, smiles
+        assert depth == 0, smiles
+        # Every ring that is opened is closed
+        ring_labels = re.findall(r'\d', re.sub(r'\[[^\]]*\]', '', smiles))
+        for label in set(ring_labels):
+            assert ring_labels.count(label) % 2 == 0, smiles
@@ -0,0 +1,37 @@
+from sqlalchemy import CheckConstraint, create_engine
+
+from phytebyte.bioactive_cmpd.sources.chembl import models as chembl_models
+from phytebyte.food_cmpd.sources.foodb import models as foodb_models
+from phytebyte.synthetic import create_sqlite_schema, sqlite_metadata
+
+
+def test_create_sqlite_schema__chembl():
+    engine = create_engine('sqlite://')
+    create_sqlite_schema(engine, chembl_models.metadata)
+    assert set(engine.table_names()) == set(chembl_models.metadata.tables)
+    engine.execute("INSERT INTO chembl_id_lookup (chembl_id, entity_type,"
+                   " entity_id) VALUES ('CHEMBL1', 'COMPOUND', 1)")
+    # Postgres casts are stripped from server defaults
+    assert engine.execute(
+        "SELECT status FROM chembl_id_lookup").scalar() == 'ACTIVE'
+
+
+def test_create_sqlite_schema__foodb():
+    engine = create_engine('sqlite://')
+    create_sqlite_schema(engine, foodb_models.metadata)
+    assert set(engine.table_names()) == set(foodb_models.metadata.tables)
+
+
+def test_sqlite_metadata__leaves_models_unchanged():
+    sqlite_md = sqlite_metadata(foodb_models.metadata)
+    assert sqlite_md.tables['compounds'].c.name.type.collation is None
+    assert sqlite_md.tables['compounds'].c.name.nullable
+    compounds = foodb_models.metadata.tables['compounds']
+    assert compounds.c.name.type.collation == 'utf8_unicode_ci'
+    assert not compounds.c.name.nullable
+
+    sqlite_md = sqlite_metadata(chembl_models.metadata)
+    assert not any(isinstance(constraint, CheckConstraint)
+                   for constraint in sqlite_md.tables['activities'].constraints)
+    assert "::" in chembl_models.metadata.tables['chembl_id_lookup']\
+        .c.status.server_default.arg.text
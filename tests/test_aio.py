@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, MagicMock
+
+import pytest
+
+from phytebyte.aio import AsyncSource
+from phytebyte.bioactive_cmpd.sources import AsyncBioactiveCompoundSource
+from phytebyte.food_cmpd.sources import AsyncFoodCmpdSource
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_run__uses_executor():
+    with ThreadPoolExecutor(max_workers=1,
+                            thread_name_prefix="test-aio") as executor:
+        async_source = AsyncSource(Mock(), executor)
+        thread_name = run(async_source.run(
+            lambda: threading.current_thread().name))
+    assert thread_name.startswith("test-aio")
+
+
+def test_run__overlaps_calls():
+    # Both calls must be in flight at once, or neither would finish
+    barrier = threading.Barrier(2, timeout=5)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        async_source = AsyncSource(Mock(), executor)
+
+        async def both():
+            return await asyncio.gather(async_source.run(barrier.wait),
+                                        async_source.run(barrier.wait))
+        assert sorted(run(both())) == [0, 1]
+
+
+def test_fetch_bioactive_cmpds__deserializes_on_executor():
+    source = Mock()
+    target_input = Mock()
+    target_input.fetch_bioactive_cmpds = MagicMock(
+        return_value=iter([lambda: 'cmpd1', lambda: 'cmpd2']))
+    async_source = AsyncBioactiveCompoundSource(source)
+    assert run(async_source.fetch_bioactive_cmpds(target_input, lean=True)) \
+        == ['cmpd1', 'cmpd2']
+    target_input.fetch_bioactive_cmpds.assert_called_once_with(
+        source, lean=True)
+
+
+def test_fetch_random_compounds_exc_smiles__returns_list():
+    source = Mock()
+    source.fetch_random_compounds_exc_smiles = MagicMock(
+        return_value=iter(['C=O', 'C=N']))
+    async_source = AsyncBioactiveCompoundSource(source)
+    assert run(async_source.fetch_random_compounds_exc_smiles(['CC'], 2)) \
+        == ['C=O', 'C=N']
+    source.fetch_random_compounds_exc_smiles.assert_called_once_with(
+        ['CC'], 2)
+
+
+def test_food_cmpd_source():
+    source = Mock()
+    source.fetch_all_cmpds = MagicMock(return_value=iter(['f1', 'f2']))
+    source.fetch_foods_many = MagicMock(return_value={1: []})
+    async_source = AsyncFoodCmpdSource(source)
+    assert run(async_source.fetch_all_cmpds((1, 5))) == ['f1', 'f2']
+    source.fetch_all_cmpds.assert_called_once_with((1, 5))
+    assert run(async_source.fetch_foods_many([1])) == {1: []}
+
+
+def test_errors_propagate():
+    source = Mock()
+    source.fetch_foods_many = MagicMock(side_effect=ValueError("boom"))
+    with pytest.raises(ValueError):
+        run(AsyncFoodCmpdSource(source).fetch_foods_many([1]))
@@ -0,0 +1,71 @@
+from phytebyte.cli import main
+from phytebyte.db import get_engine
+from phytebyte.bioactive_cmpd.sources.chembl.gene_activity import (
+    GENE_ACTIVITY_VIEW, has_gene_activity_view)
+
+
+def test_no_command__prints_help(capsys):
+    assert main([]) == 2
+    assert "usage: phytebyte" in capsys.readouterr().out
+
+
+def test_db_prepare(mini_chembl_db_url, capsys):
+    assert main(['db', 'prepare', '--chembl-db-url', mini_chembl_db_url,
+                 '--gene-targets', 'PPARG']) == 0
+    out = capsys.readouterr().out
+    assert f"'{GENE_ACTIVITY_VIEW}' is ready." in out
+    assert "before:" in out and "after:" in out
+    assert has_gene_activity_view(get_engine(mini_chembl_db_url))
+
+
+def test_db_prepare__no_db_url(monkeypatch, capsys):
+    monkeypatch.delenv('CHEMBL_DB_URL', raising=False)
+    assert main(['db', 'prepare', '--chembl-db-url', '']) == 1
+    assert "--chembl-db-url" in capsys.readouterr().err
+
+
+def test_snapshot(mini_chembl_db_url, mini_foodb_db_url, tmp_path, capsys):
+    out_dir = str(tmp_path / 'snapshot')
+    assert main(['snapshot', out_dir, '--chembl-db-url', mini_chembl_db_url,
+                 '--foodb-db-url', mini_foodb_db_url,
+                 '--format', 'sqlite']) == 0
+    out = capsys.readouterr().out
+    assert "gene_activity: 3 rows" in out
+    assert "food_contents: 3 rows" in out
+
+
+def test_snapshot__defaults_to_sqlite(mini_foodb_db_url, tmp_path, capsys):
+    out_dir = str(tmp_path / 'snapshot')
+    assert main(['snapshot', out_dir,
+                 '--foodb-db-url', mini_foodb_db_url]) == 0
+    assert "Snapshot (sqlite)" in capsys.readouterr().out
+
+
+def test_snapshot__arrow_without_pyarrow(monkeypatch, mini_foodb_db_url,
+                                         tmp_path, capsys):
+    import sys
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    monkeypatch.delitem(sys.modules, 'phytebyte.snapshot.arrow',
+                        raising=False)
+    assert main(['snapshot', str(tmp_path / 'snapshot'),
+                 '--foodb-db-url', mini_foodb_db_url,
+                 '--format', 'arrow']) == 1
+    assert "pip install phytebyte[arrow]" in capsys.readouterr().err
+
+
+def test_snapshot__no_db_urls(monkeypatch, tmp_path, capsys):
+    monkeypatch.delenv('CHEMBL_DB_URL', raising=False)
+    monkeypatch.delenv('FOODB_URL', raising=False)
+    assert main(['snapshot', str(tmp_path)]) == 1
+    assert "--foodb-db-url" in capsys.readouterr().err
+
+
+def test_synthetic(tmp_path, capsys):
+    out_dir = str(tmp_path / 'synthetic')
+    assert main(['synthetic', out_dir, '--compounds', '100',
+                 '--food-compounds', '50']) == 0
+    out = capsys.readouterr().out
+    assert "compound_structures: 100 rows" in out
+    assert "compounds: 50 rows" in out
+    assert f"sqlite:///{tmp_path}" in out
+    assert main(['synthetic', out_dir]) == 1
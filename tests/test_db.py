@@ -0,0 +1,154 @@
+import pickle
+import pytest
+import time
+from unittest.mock import Mock, MagicMock
+
+from phytebyte import db
+
+
+@pytest.fixture
+def mock_create_engine(monkeypatch):
+    m = MagicMock(side_effect=lambda *args, **kwargs: Mock())
+    monkeypatch.setattr("phytebyte.db.create_engine", m)
+    monkeypatch.setattr("phytebyte.db.install_sqlite_compat", Mock())
+    return m
+
+
+def test_get_engine__cached_per_url(mock_create_engine):
+    engine = db.get_engine("postgres:///chembl_25")
+    assert db.get_engine("postgres:///chembl_25") is engine
+    assert db.get_engine("mysql://root@localhost/foodb") is not engine
+    assert mock_create_engine.call_count == 2
+
+
+def test_get_engine__configures_queue_pool(mock_create_engine):
+    db.get_engine("postgres:///chembl_25", pool_size=16)
+    kwargs = mock_create_engine.call_args[1]
+    assert kwargs['poolclass'] is db.QueuePool
+    assert kwargs['pool_size'] == 16
+    assert kwargs['pool_pre_ping']
+
+
+def test_get_engine__sqlite_takes_no_pool_size(mock_create_engine):
+    db.get_engine("sqlite:///foodb.sqlite3", pool_size=16)
+    assert 'pool_size' not in mock_create_engine.call_args[1]
+    db.install_sqlite_compat.assert_called_once_with(
+        db.get_engine("sqlite:///foodb.sqlite3", pool_size=16))
+
+
+def test_forget_engines_after_fork(mock_create_engine):
+    engine = db.get_engine("postgres:///chembl_25")
+    db._forget_engines_after_fork()
+    engine.dispose.assert_not_called()
+    assert db.get_engine("postgres:///chembl_25") is not engine
+
+
+def test_stream_rows(mock_streaming_engine_factory):
+    mock_rows = list(range(10))
+    engine = mock_streaming_engine_factory(mock_rows, 3)
+    on_connect = Mock()
+    assert list(db.stream_rows(engine, Mock(), 4, on_connect)) == mock_rows
+    on_connect.assert_called_once()
+
+
+def test_database_source__is_picklable():
+    source = db.DatabaseSource("sqlite://", batch_size=10)
+    source.engine
+    assert pickle.loads(pickle.dumps(source)).batch_size == 10
+
+
+@pytest.fixture
+def mock_mysql_streaming_engine(mock_streaming_engine_factory):
+    engine = mock_streaming_engine_factory(list(range(10)), 3)
+    mock_conn = engine.connect()
+    mock_conn.dialect.name = 'mysql'
+    mock_conn.dialect.supports_server_side_cursors = True
+    return engine
+
+
+def test_stream_rows__mysql__raises_net_write_timeout(
+        mock_mysql_streaming_engine):
+    list(db.stream_rows(mock_mysql_streaming_engine, "SELECT 1", 4))
+    mock_conn = mock_mysql_streaming_engine.connect()
+    first_stmt = mock_conn.execute.call_args_list[0][0][0]
+    assert "net_write_timeout" in first_stmt
+    mock_conn.invalidate.assert_not_called()
+
+
+def test_stream_rows__mysql__abandoned_stream_is_not_drained(
+        mock_mysql_streaming_engine):
+    row_iter = db.stream_rows(mock_mysql_streaming_engine, "SELECT 1", 4)
+    next(row_iter)
+    row_iter.close()
+    mock_mysql_streaming_engine.connect().invalidate.assert_called_once()
+
+
+def test_stream_rows__prefetch_chunks(mock_streaming_engine_factory):
+    mock_rows = list(range(10))
+    engine = mock_streaming_engine_factory(mock_rows, 3)
+    assert list(db.stream_rows(engine, Mock(), 4,
+                               prefetch_chunks=2)) == mock_rows
+
+
+def test_prefetch__preserves_order():
+    assert list(db.prefetch(iter(range(100)), 3)) == list(range(100))
+
+
+def test_prefetch__bounded_read_ahead():
+    produced = []
+
+    def counting_iter():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    prefetch_iter = db.prefetch(counting_iter(), 3)
+    next(prefetch_iter)
+    time.sleep(.3)
+    # 1 consumed + 3 queued + (at most) 1 blocked on a full queue
+    assert len(produced) <= 5
+    prefetch_iter.close()
+
+
+def test_prefetch__reraises_in_consumer():
+    def failing_iter():
+        yield 1
+        raise ValueError("DB went away")
+
+    prefetch_iter = db.prefetch(failing_iter(), 3)
+    assert next(prefetch_iter) == 1
+    with pytest.raises(ValueError):
+        next(prefetch_iter)
+
+
+def test_prefetch__close_stops_producer():
+    closed = []
+
+    def endless_iter():
+        try:
+            while True:
+                yield 1
+        finally:
+            closed.append(True)
+
+    prefetch_iter = db.prefetch(endless_iter(), 3)
+    next(prefetch_iter)
+    prefetch_iter.close()
+    assert closed == [True]
+
+
+def test_fetch_rows__compiles_statement_once(mini_chembl_db_url, monkeypatch):
+    from sqlalchemy.util import LRUCache
+    from phytebyte import db
+    from phytebyte.bioactive_cmpd.sources import ChemblBioactivityQuery
+    from phytebyte.bioactive_cmpd.sources.chembl.bioactivity import (
+        agonist_bioact_filter)
+    monkeypatch.setattr(db, "_compiled_cache", LRUCache(10))
+    engine = db.get_engine(mini_chembl_db_url)
+    for uids, expected_uids in (([1], [1, 1]),
+                                ([1, 2], [1, 1]),
+                                ([3, 4, 5], [])):
+        query = ChemblBioactivityQuery(agonist_bioact_filter, uids)
+        rows = db.fetch_rows(engine, query.statement(), query.params)
+        assert [row[0] for row in rows] == expected_uids
+    assert len(db._compiled_cache) == 1
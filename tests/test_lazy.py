@@ -0,0 +1,40 @@
+import sys
+import types
+
+import pytest
+
+from phytebyte.lazy import lazy_attributes
+
+
+@pytest.fixture
+def package():
+    package = types.ModuleType("lazy_test_package")
+    package.__getattr__, package.__dir__ = lazy_attributes(
+        package.__name__, {"OrderedDict": "collections",
+                           "dedent": "textwrap"})
+    sys.modules[package.__name__] = package
+    yield package
+    del sys.modules[package.__name__]
+
+
+def test_lazy_attributes_import_on_first_access(package):
+    from collections import OrderedDict
+    assert "OrderedDict" not in vars(package)
+    assert package.OrderedDict is OrderedDict
+    # Cached on the package
+    assert vars(package)["OrderedDict"] is OrderedDict
+
+
+def test_lazy_attributes_dir(package):
+    assert {"OrderedDict", "dedent"} <= set(dir(package))
+
+
+def test_lazy_attributes_unknown_name(package):
+    with pytest.raises(AttributeError, match="lazy_test_package"):
+        package.missing
+
+
+def test_phytebyte_exports_resolve():
+    import phytebyte.bioactive_cmpd.sources.chembl as chembl
+    for name in chembl.__all__:
+        assert getattr(chembl, name) is not None
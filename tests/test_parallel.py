@@ -0,0 +1,109 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from phytebyte import parallel
+from phytebyte.parallel import Pool, SharedArray
+
+
+@pytest.fixture
+def start_method():
+    yield parallel.set_start_method
+    parallel.set_start_method(None)
+
+
+def _init_worker(shared_array):
+    global _worker_array
+    _worker_array = shared_array
+
+
+def _row_sum(i):
+    return int(_worker_array.array[i].sum())
+
+
+def test_shared_array_pickles_as_a_mapping():
+    array = np.arange(4096, dtype=np.uint64).reshape(64, 64)
+    with SharedArray(array) as shared:
+        attached = pickle.loads(pickle.dumps(shared))
+        assert len(pickle.dumps(shared)) < array.nbytes
+        assert np.array_equal(attached.array, array)
+        assert not attached.array.flags.writeable
+        attached.close()
+
+
+def test_shared_array__attached_untracked(monkeypatch):
+    from multiprocessing import resource_tracker
+    registered = []
+    with SharedArray(np.arange(8)) as shared:
+        monkeypatch.setattr(resource_tracker, 'register',
+                            lambda name, rtype: registered.append(name))
+        attached = pickle.loads(pickle.dumps(shared))
+        assert registered == []
+        assert attached._finalizer.still_active()
+        # Views of the array don't stop an exiting worker's finalizer
+        view = attached.array
+        attached._detach()
+        del view
+        attached.close()
+        assert not attached._finalizer.still_active()
+        assert attached._shm is None
+
+
+SHARED_ARRAY_POOL_SCRIPT = """
+import numpy as np
+from phytebyte import parallel
+from tests.test_parallel import _init_worker, _row_sum
+
+if __name__ == '__main__':
+    parallel.set_start_method('spawn')
+    with parallel.SharedArray(np.arange(12).reshape(3, 4)) as shared:
+        p = parallel.Pool(2, initializer=_init_worker, initargs=(shared,))
+        print(p.map(_row_sum, range(3)))
+        p.close()
+        p.join()
+"""
+
+
+def test_shared_array__workers_exit_cleanly(tmp_path):
+    import os
+    import subprocess
+    import sys
+    from phytebyte import ROOT_DIR
+    script = tmp_path / "pool.py"
+    script.write_text(SHARED_ARRAY_POOL_SCRIPT)
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(ROOT_DIR))
+    result = subprocess.run([sys.executable, str(script)],
+                            capture_output=True, text=True, timeout=60,
+                            env=env)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[6, 22, 38]"
+    assert "leaked" not in result.stderr
+    assert "Traceback" not in result.stderr
+
+
+def test_shared_array__empty():
+    with SharedArray(np.zeros((0, 16), dtype=np.uint64)) as shared:
+        assert len(shared) == 0
+        assert shared.array.shape == (0, 16)
+
+
+def test_set_start_method__unsupported(start_method):
+    with pytest.raises(ValueError):
+        start_method('teleport')
+
+
+def test_start_method__env_var(start_method, monkeypatch):
+    monkeypatch.setenv(parallel.START_METHOD_ENV_VAR, 'spawn')
+    assert parallel.get_start_method() == 'spawn'
+    start_method('forkserver')
+    assert parallel.get_start_method() == 'forkserver'
+
+
+@pytest.mark.parametrize("method", ['fork', 'forkserver', 'spawn'])
+def test_pool_ships_state_to_workers(start_method, method):
+    start_method(method)
+    array = np.arange(12).reshape(3, 4)
+    with SharedArray(array) as shared, \
+            Pool(2, initializer=_init_worker, initargs=(shared,)) as p:
+        assert p.map(_row_sum, range(3)) == [6, 22, 38]
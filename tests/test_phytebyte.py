@@ -1,4 +1,5 @@
 from phytebyte import PhyteByte
+import numpy as np
 import pytest
 from unittest.mock import Mock, MagicMock
 
@@ -156,9 +157,10 @@ def create_ctx_mgr_for(obj):
 
 
 @pytest.fixture
-def phytebyte_fixture_with_model(phytebyte_fixture):
-    phytebyte_fixture.model = Mock()
-    phytebyte_fixture.model.calc_score = MagicMock(return_value=100.00)
+def phytebyte_fixture_with_model(monkeypatch, phytebyte_fixture):
+    monkeypatch.setattr(PhyteByte, 'model', Mock())
+    phytebyte_fixture.model.calc_scores = MagicMock(
+        side_effect=lambda encoded_cmpds: [100.00] * len(encoded_cmpds))
     return phytebyte_fixture
 
 
@@ -223,6 +225,76 @@ def test_train_model_calls__ModelInputLoader_load(mock_ModelInputLoader,
         ((1000,), {'output_fingerprinter': mock_fingerprinter})]
 
 
+
+def test_load_positive_compounds__with_bioactivities(monkeypatch,
+                                                     phytebyte_fixture):
+    loader_kwargs = []
+
+    class ModelInputLoaderMock():
+        def __init__(self, *args, **kwargs):
+            loader_kwargs.append(kwargs)
+
+        def load_positive_compounds(self):
+            return []
+
+        def load(self, *args, **kwargs):
+            return [Mock()]
+    monkeypatch.setattr("phytebyte.phytebyte.ModelInputLoader",
+                        ModelInputLoaderMock)
+    phytebyte_fixture.load_positive_compounds('model_type')
+    phytebyte_fixture.train_model('model_type', 1000)
+    # Only model input (which needs only SMILES) is loaded lean
+    assert [kwargs['lean'] for kwargs in loader_kwargs] == [False, True]
+
+def test_train_model__model_encoding(monkeypatch, phytebyte_fixture,
+                                     mock_binary_classifier_model):
+    create = MagicMock(return_value=mock_binary_classifier_model)
+    monkeypatch.setattr("phytebyte.phytebyte.BinaryClassifierModel.create",
+                        create)
+    phytebyte_fixture.set_model_encoding('sparse')
+    phytebyte_fixture.train_model('model_type', 1000)
+    create.assert_called_once_with('model_type', encoding='sparse')
+
+
+def test_train_model__model_input_memmap_dir(monkeypatch, phytebyte_fixture,
+                                             mock_binary_classifier_input):
+    init_kwargs = []
+
+    class ModelInputLoaderMock():
+        def __init__(self, *args, **kwargs):
+            init_kwargs.append(kwargs)
+
+        def load(self, *args, **kwargs):
+            return mock_binary_classifier_input
+
+    monkeypatch.setattr("phytebyte.phytebyte.ModelInputLoader",
+                        ModelInputLoaderMock)
+    phytebyte_fixture.set_model_input_memmap_dir('/scratch')
+    phytebyte_fixture.train_model('model_type', 1000)
+    assert [kwargs['memmap_dir'] for kwargs in init_kwargs] == ['/scratch']
+
+
+def test_train_model__streams_incremental_model_input(
+        monkeypatch, phytebyte_fixture, mock_binary_classifier_model,
+        mock_binary_classifier_input):
+    init_kwargs = []
+
+    class ModelInputLoaderMock():
+        def __init__(self, *args, **kwargs):
+            init_kwargs.append(kwargs)
+
+        def load(self, *args, **kwargs):
+            return mock_binary_classifier_input
+
+    monkeypatch.setattr("phytebyte.phytebyte.ModelInputLoader",
+                        ModelInputLoaderMock)
+    mock_binary_classifier_model.incremental = True
+    phytebyte_fixture.train_model('model_type', 1000)
+    mock_binary_classifier_model.incremental = False
+    phytebyte_fixture.train_model('model_type', 1000)
+    assert [kwargs['stream'] for kwargs in init_kwargs] == [True, False]
+
+
 def test_train_model__sets_model(phytebyte_fixture,
                                  mock_binary_classifier_model):
     phytebyte_fixture.train_model('model_type', 1000)
@@ -234,8 +306,6 @@ def test_predict_bioactive_food_cmpd_iter__returns_iter(
         mock_food_cmpd_source,
         monkeypatch):
 
-    phytebyte_fixture_with_model.model.calc_score = MagicMock(
-        return_value=mock_probability)
     food_cmpd_iter = phytebyte_fixture_with_model.\
         predict_bioactive_food_cmpd_iter(
             mock_food_cmpd_source)
@@ -245,8 +315,6 @@ def test_predict_bioactive_food_cmpd_iter__returns_iter(
 def test_predict_bioactive_food_cmpd_iter__calls_fetch_all_cmpds(
         phytebyte_fixture_with_model,
         mock_food_cmpd_source):
-    phytebyte_fixture_with_model.model.calc_score = MagicMock(
-        return_value=mock_probability)
     food_cmpd_iter = phytebyte_fixture_with_model.\
         predict_bioactive_food_cmpd_iter(
             mock_food_cmpd_source)
@@ -257,3 +325,182 @@ def test_predict_bioactive_food_cmpd_iter__calls_fetch_all_cmpds(
 @pytest.mark.xfail
 def test_load_config(mock_source, mock_target_input):
     PhyteByte(mock_source, mock_target_input, "path_to_config")
+
+
+def test_predict_bioactive_food_cmpd_iter__partitioned__key_order(
+        phytebyte_fixture_with_model):
+    food_cmpds = {(1, 5): [Mock(uid=1), Mock(uid=2)], (5, 9): [Mock(uid=5)]}
+    m = Mock()
+    m.cmpd_key_ranges = MagicMock(return_value=[(1, 5), (5, 9)])
+    m.fetch_all_cmpds = MagicMock(side_effect=lambda kr: iter(food_cmpds[kr]))
+    scored = list(phytebyte_fixture_with_model.
+                  predict_bioactive_food_cmpd_iter(m, num_partitions=2))
+    m.cmpd_key_ranges.assert_called_once_with(2)
+    assert [food_cmpd.uid for food_cmpd, _ in scored] == [1, 2, 5]
+    m.fetch_all_cmpd_smiles.assert_not_called()
+
+
+def test_predict_bioactive_food_cmpd_iter__partitioned__streams_units(
+        monkeypatch, phytebyte_fixture_with_model):
+    monkeypatch.setattr(PhyteByte, 'partition_unit_keys', 2)
+    food_cmpds = {(1, 3): [Mock(uid=1), Mock(uid=2)], (3, 5): [],
+                  (5, 6): [Mock(uid=5)], (6, 8): [Mock(uid=7)]}
+    m = Mock()
+    m.cmpd_key_ranges = MagicMock(return_value=[(1, 6), (6, 8)])
+    m.fetch_all_cmpds = MagicMock(side_effect=lambda kr: iter(food_cmpds[kr]))
+    scored = list(phytebyte_fixture_with_model.
+                  predict_bioactive_food_cmpd_iter(m, num_partitions=2))
+    assert [food_cmpd.uid for food_cmpd, _ in scored] == [1, 2, 5, 7]
+    assert sorted(call[0][0] for call in m.fetch_all_cmpds.call_args_list) \
+        == sorted(food_cmpds)
+
+
+
+def test_predict_bioactive_food_cmpd_iter__partitioned__unpartitionable(
+        phytebyte_fixture_with_model):
+    m = Mock()
+    # (As the `FoodCmpdSource` default, for sources that can't be split)
+    m.cmpd_key_ranges = MagicMock(return_value=[None])
+    m.fetch_all_cmpds = MagicMock(
+        return_value=iter([Mock(uid=1), Mock(uid=2)]))
+    scored = list(phytebyte_fixture_with_model.
+                  predict_bioactive_food_cmpd_iter(m, num_partitions=2))
+    assert [food_cmpd.uid for food_cmpd, _ in scored] == [1, 2]
+    m.fetch_all_cmpds.assert_called_once_with(None)
+
+def test_predict_bioactive_food_cmpd_iter__scores_in_chunks(
+        monkeypatch, phytebyte_fixture_with_model, mock_fingerprinter):
+    monkeypatch.setattr(PhyteByte, 'scoring_chunk_size', 2)
+    mock_fingerprinter.fingerprint_and_encode = MagicMock(
+        side_effect=lambda smiles, encoding: None if smiles == 'X' else
+        len(smiles))
+    PhyteByte.model.calc_scores = MagicMock(
+        side_effect=lambda encoded_cmpds: [.1 * encoded_cmpd
+                                           for encoded_cmpd in encoded_cmpds])
+    smiles = ['C', 'X', 'CC', 'CCC', 'X']
+    m = Mock()
+    m.fetch_all_cmpds = MagicMock(
+        return_value=iter([Mock(uid=i) for i in range(len(smiles))]))
+    m.fetch_all_cmpd_smiles = MagicMock(return_value=iter(smiles))
+    scored = list(phytebyte_fixture_with_model.
+                  predict_bioactive_food_cmpd_iter(m))
+    assert [(food_cmpd.uid, score) for food_cmpd, score in scored] == [
+        (0, .1), (2, .2), (3, .1 * 3)]
+    assert [call[0][0] for call in
+            PhyteByte.model.calc_scores.call_args_list] == [[1], [2, 3]]
+
+
+def test_train_and_sort_predicted__overlaps_food_scan(
+        monkeypatch, phytebyte_fixture_with_model,
+        mock_binary_classifier_model, mock_binary_classifier_input,
+        mock_source, mock_fingerprinter):
+    import threading
+    food_scan_started = threading.Event()
+    calls = []
+
+    class ModelInputLoaderMock():
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def load_positive_compounds(self):
+            # Only returns if the food scan runs concurrently
+            assert food_scan_started.wait(timeout=5)
+            return [Mock(smiles='C=O'), Mock(smiles='C=N')]
+
+        def neg_reservoir_size(self, bioactive_cmpd_list, factor):
+            return len(bioactive_cmpd_list) * factor * 2
+
+        def cluster_positive_compounds(self, bioactive_cmpd_list):
+            calls.append('cluster')
+            return ['cluster']
+
+        def load_clusters(self, clusters, factor, fingerprinter,
+                          neg_smiles_reservoir):
+            calls.append(('load_clusters', clusters, neg_smiles_reservoir))
+            return [mock_binary_classifier_input]
+
+    monkeypatch.setattr("phytebyte.phytebyte.ModelInputLoader",
+                        ModelInputLoaderMock)
+    mock_binary_classifier_input.__len__ = Mock(return_value=3)
+    mock_source.fetch_random_compounds_exc_smiles = MagicMock(
+        return_value=iter(['CC', 'NN']))
+    food_cmpds = [Mock(uid=1, smiles='C'), Mock(uid=2, smiles='CC')]
+
+    def fetch_all_cmpds(key_range=None):
+        food_scan_started.set()
+        return iter(food_cmpds)
+    food_cmpd_source = Mock()
+    food_cmpd_source.fetch_all_cmpds = fetch_all_cmpds
+    mock_binary_classifier_model.calc_scores = MagicMock(
+        return_value=[.2, .9])
+    mock_binary_classifier_model.expected_encoding = 'numpy'
+
+    scored = phytebyte_fixture_with_model.\
+        train_and_sort_predicted_bioactive_food_cmpds(
+            'model_type', 3, food_cmpd_source)
+
+    mock_source.fetch_random_compounds_exc_smiles.assert_called_once_with(
+        ['C=O', 'C=N'], 12)
+    assert calls == ['cluster', ('load_clusters', ['cluster'], ['CC', 'NN'])]
+    mock_binary_classifier_model.train.assert_called_once()
+    bci, idx = mock_binary_classifier_model.train.call_args[0]
+    assert bci is mock_binary_classifier_input
+    assert list(idx) == [0, 1, 2]
+    assert [(food_cmpd.uid, score) for food_cmpd, score in scored] == [
+        (2, .9), (1, .2)]
+
+
+class LengthFingerprinter(object):
+    def fingerprint_and_encode(self, smiles, encoding):
+        return len(smiles)
+
+
+class DoublingModel(object):
+    expected_encoding = 'numpy'
+
+    def calc_score(self, encoded_cmpd):
+        return 2. * encoded_cmpd
+
+    def calc_scores(self, encoded_cmpds):
+        return [self.calc_score(encoded_cmpd)
+                for encoded_cmpd in encoded_cmpds]
+
+
+@pytest.mark.parametrize("method", ['forkserver', 'spawn'])
+def test_scoring_pool__ships_fingerprinter_and_model(monkeypatch, method):
+    from phytebyte import parallel
+    monkeypatch.setattr(PhyteByte, 'fingerprinter', LengthFingerprinter())
+    monkeypatch.setattr(PhyteByte, 'model', DoublingModel())
+    parallel.set_start_method(method)
+    try:
+        with PhyteByte._scoring_pool() as p:
+            scores = p.map(PhyteByte._predict_cmpd_bioactivity,
+                           ['C', 'CCO'])
+    finally:
+        parallel.set_start_method(None)
+    assert scores == [2., 6.]
+
+
+def test_save_and_load_model(monkeypatch, tmp_path, mock_target_input):
+    from phytebyte.modeling.models import BinaryClassifierModel
+    from phytebyte.modeling.models.persistence import IncompatibleModel
+    X = np.eye(8, dtype=np.uint8)
+    bci = Mock()
+    bci.index = MagicMock(return_value=(X, np.arange(8) % 2))
+    model = BinaryClassifierModel.create("Random Forest")
+    model.train(bci, np.arange(8), num_estimators=3)
+    monkeypatch.setattr(PhyteByte, 'model', model)
+    monkeypatch.setattr(PhyteByte, 'fingerprinter', Mock(fp_type='daylight'))
+    source = Mock(release='ChEMBL_25')
+    path = str(tmp_path / 'model')
+
+    PhyteByte(source, mock_target_input).save_model(path)
+    PhyteByte.model = None
+    loaded = PhyteByte(source, mock_target_input).load_model(path)
+    assert PhyteByte.model is loaded
+    assert loaded.header.chembl_version == 'ChEMBL_25'
+    assert loaded.calc_score(X[1]) == model.calc_score(X[1])
+
+    PhyteByte.fingerprinter = Mock(fp_type='spectrophore')
+    with pytest.raises(IncompatibleModel):
+        PhyteByte(source, mock_target_input).load_model(path)
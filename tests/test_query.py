@@ -0,0 +1,98 @@
+import pytest
+
+from phytebyte import Query
+from phytebyte.food_cmpd.sources import FoodbFoodCmpdQuery
+
+
+def test_split_key_range():
+    assert Query.split_key_range(1, 10, 3) == [(1, 5), (5, 9), (9, 11)]
+
+
+def test_split_key_range__covers_every_key_once():
+    key_ranges = Query.split_key_range(7, 1000, 16)
+    assert len(key_ranges) <= 16
+    keys = [k for lower, upper in key_ranges for k in range(lower, upper)]
+    assert keys == list(range(7, 1001))
+
+
+def test_split_key_range__more_partitions_than_keys():
+    assert Query.split_key_range(1, 2, 8) == [(1, 2), (2, 3)]
+
+
+def test_split_key_range__no_rows():
+    assert Query.split_key_range(None, None, 8) == []
+
+
+def test_build_range():
+    q = FoodbFoodCmpdQuery().build_range((10, 20))
+    assert "compounds.id >=" in str(q._whereclause)
+    assert "compounds.id <" in str(q._whereclause)
+
+
+def test_build_range__none_is_whole_table():
+    assert str(FoodbFoodCmpdQuery().build_range(None)) ==\
+        str(FoodbFoodCmpdQuery().build())
+
+
+def test_build_page():
+    q = FoodbFoodCmpdQuery().build_page(100, after_key=5)
+    assert "compounds.id >" in str(q._whereclause)
+    assert q._limit == 100
+
+
+def test_build_key_bounds():
+    q = FoodbFoodCmpdQuery().build_key_bounds()
+    assert "min(compounds.id)" in str(q)
+    assert "max(compounds.id)" in str(q)
+
+
+def test_no_key_column__raises_NotImplementedError():
+    class KeylessQuery(FoodbFoodCmpdQuery):
+        @property
+        def _key_column(self):
+            return None
+
+    with pytest.raises(NotImplementedError):
+        KeylessQuery().build_range((10, 20))
+
+
+def gene_tgts_query(gene_tgts, lean=True):
+    from phytebyte.bioactive_cmpd.sources import ChemblBioactiveCompoundQuery
+    from phytebyte.bioactive_cmpd.sources.chembl.bioactivity import (
+        agonist_bioact_filter)
+    return ChemblBioactiveCompoundQuery(agonist_bioact_filter,
+                                        gene_tgts=gene_tgts, lean=lean)
+
+
+def test_statement__shared_per_shape():
+    statement = gene_tgts_query(['PPARG']).statement()
+    assert gene_tgts_query(['NR1H4', 'RXRA']).statement() is statement
+    assert gene_tgts_query(['PPARG'], lean=False).statement() is not statement
+    assert gene_tgts_query(None).statement() is not statement
+
+
+def test_statement__binds_params():
+    query = gene_tgts_query(['PPARG', 'NR1H4'])
+    assert query.params == {'gene_tgts': ['PPARG', 'NR1H4']}
+    assert "PPARG" not in str(query.statement())
+    assert "PPARG" in str(query)
+
+
+def test_statement__cache_is_bounded(monkeypatch):
+    from phytebyte import query
+    monkeypatch.setattr(query, "_statements", query.OrderedDict())
+    monkeypatch.setattr(query, "STATEMENT_CACHE_SIZE", 1)
+    first = gene_tgts_query(['PPARG']).statement()
+    gene_tgts_query(['PPARG'], lean=False).statement()
+    assert len(query._statements) == 1
+    assert gene_tgts_query(['PPARG']).statement() is not first
+
+
+def test_statement__executes_like_build(mini_chembl_db_url):
+    from phytebyte.db import get_engine
+    query = gene_tgts_query(['PPARG', 'NR1H4'])
+    with get_engine(mini_chembl_db_url).connect() as conn:
+        bound_rows = conn.execute(query.statement(), query.params).fetchall()
+        literal_rows = conn.execute(query.build()).fetchall()
+    assert len(bound_rows) == 1
+    assert bound_rows == literal_rows
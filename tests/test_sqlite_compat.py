@@ -0,0 +1,26 @@
+from sqlalchemy import column, func, select, table, text
+
+from phytebyte.db import get_engine
+
+
+def test_array_agg(tmp_path):
+    engine = get_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    engine.execute("CREATE TABLE t (k INTEGER, v NUMERIC)")
+    engine.execute("INSERT INTO t VALUES (1, 1.5), (1, 2), (2, NULL)")
+    t = table('t', column('k'), column('v'))
+    rows = engine.execute(select([t.c.k, func.array_agg(t.c.v)])
+                          .group_by(t.c.k).order_by(t.c.k)).fetchall()
+    assert [tuple(row) for row in rows] == [(1, [1.5, 2]), (2, [None])]
+
+
+def test_setseed__seeds_random():
+    engine = get_engine("sqlite://")
+
+    def seeded_randoms(seed):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT setseed(:seed)"), seed=seed)
+            return [conn.execute(select([func.random()])).scalar()
+                    for _ in range(3)]
+    assert seeded_randoms(.5) == seeded_randoms(.5)
+    assert seeded_randoms(.5) != seeded_randoms(.25)
+    assert all(0 <= value < 1 for value in seeded_randoms(.5))
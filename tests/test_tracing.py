@@ -0,0 +1,99 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+
+from phytebyte import ROOT_DIR, tracing
+from phytebyte.db import fetch_rows
+
+
+@pytest.fixture
+def tracer():
+    tracer = tracing.enable_tracing()
+    yield tracer
+    tracing.disable_tracing()
+
+
+def test_disabled_tracing_is_a_no_op():
+    assert tracing.get_tracer() is None
+    with tracing.span("stage", items=3) as trace_args:
+        trace_args["rejection_rate"] = .5
+    tracing.count("db.rows_fetched", 10)
+    assert tracing.get_tracer() is None
+
+
+def test_span_records_args_and_counter_deltas(tracer):
+    tracing.count("db.rows_fetched", 5)
+    with tracing.span("outer", items=2) as trace_args:
+        with tracing.span("inner"):
+            tracing.count("db.rows_fetched", 3)
+        tracing.count("fingerprinter.fingerprints")
+        trace_args["rejection_rate"] = .25
+    inner, outer = tracer.events
+    assert inner["name"] == "inner"
+    assert inner["args"]["db.rows_fetched"] == 3
+    assert "fingerprinter.fingerprints" not in inner["args"]
+    assert outer["name"] == "outer"
+    assert outer["ph"] == "X"
+    assert outer["args"]["items"] == 2
+    assert outer["args"]["rejection_rate"] == .25
+    assert outer["args"]["db.rows_fetched"] == 3
+    assert outer["args"]["fingerprinter.fingerprints"] == 1
+    assert outer["dur"] >= inner["dur"]
+    assert tracer.counters == {"db.rows_fetched": 8,
+                               "fingerprinter.fingerprints": 1}
+
+
+def test_span_is_recorded_on_error(tracer):
+    with pytest.raises(ValueError):
+        with tracing.span("failing"):
+            raise ValueError
+    assert [event["name"] for event in tracer.events] == ["failing"]
+
+
+def test_summary(tracer):
+    for _ in range(3):
+        with tracing.span("stage"):
+            pass
+    summary = tracer.summary()
+    assert summary["stage"]["calls"] == 3
+    assert summary["stage"]["wall_s"] >= 0
+
+
+def test_write_chrome_trace(tracer, tmp_path):
+    with tracing.span("stage"):
+        tracing.count("screening.scored", 2)
+    path = str(tmp_path / "trace.json")
+    tracer.write(path)
+    with open(path) as f:
+        trace = json.load(f)
+    assert [event["ph"] for event in trace["traceEvents"]] == ["X", "C"]
+    assert trace["traceEvents"][1]["args"] == {"screening.scored": 2}
+    assert trace["otherData"]["counters"] == {"screening.scored": 2}
+
+
+def test_fetch_rows_counts_rows(tracer, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    engine.execute("CREATE TABLE t (x INTEGER)")
+    engine.execute("INSERT INTO t VALUES (1), (2), (3)")
+    assert len(fetch_rows(engine, "SELECT x FROM t")) == 3
+    assert tracer.counters == {"db.rows_fetched": 3}
+
+
+def test_trace_env_var_writes_trace_at_exit(tmp_path):
+    path = str(tmp_path / "trace.json")
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(ROOT_DIR),
+               **{tracing.TRACE_ENV_VAR: path})
+    env.pop(tracing.TRACE_OWNER_ENV_VAR, None)
+    subprocess.run(
+        [sys.executable, "-c",
+         "from phytebyte.tracing import span\n"
+         "with span('stage'):\n"
+         "    pass\n"],
+        env=env, check=True)
+    with open(path) as f:
+        trace = json.load(f)
+    assert [event["name"] for event in trace["traceEvents"]] == ["stage"]